@@ -4,8 +4,7 @@ Point d'entrée de la plateforme de supervision des liaisons micro-ondes FH.
 """
 import streamlit as st
 from backend.security.auth import authenticate_user
-from backend.database.models import FHLink
-from backend.database.connection import get_db_context
+from backend.ai_engine.risk_scoring import start_risk_scheduler
 import config
 
 # Configuration de la page (DOIT être la première commande Streamlit)
@@ -77,22 +76,9 @@ def init_session_state():
 
 
 def get_available_links():
-    """Récupère la liste des liaisons FH disponibles."""
-    with get_db_context() as db:
-        links = db.query(FHLink).filter(FHLink.actif == True).all()
-        # Extraire les données pendant que la session est active
-        links_data = []
-        for link in links:
-            links_data.append({
-                'id': link.id,
-                'nom': link.nom,
-                'site_a': link.site_a,
-                'site_b': link.site_b,
-                'frequence_ghz': link.frequence_ghz,
-                'distance_km': link.distance_km,
-                'actif': link.actif
-            })
-        return links_data
+    """Récupère la liste des liaisons FH disponibles (lue dans l'instantané de la flotte)."""
+    from backend.analytics.fleet_snapshot import fleet_snapshot
+    return fleet_snapshot.links()
 
 
 def login_page():
@@ -233,12 +219,63 @@ def main_app():
         st.page_link("pages/1_📊_Dashboard.py", label="📊 Dashboard", icon="📊")
         st.page_link("pages/2_🚨_Alertes.py", label="🚨 Alertes", icon="🚨")
         st.page_link("pages/3_💬_Chatbot.py", label="💬 Chatbot", icon="💬")
+        st.page_link("pages/5_🔮_Risques.py", label="🔮 Risques", icon="🔮")
         
         # Vérifier le rôle pour afficher Import
         user_role = user['role'].value if hasattr(user['role'], 'value') else user['role']
         if user_role == 'ADMIN':
             st.page_link("pages/4_📤_Import.py", label="📤 Import", icon="📤")
-        
+
+            # Supervision du cache de requêtes (partagé entre sessions)
+            from backend.database.query_cache import get_cache_stats
+            from backend.alerts.alert_index import open_alert_index
+            from backend.alerts.correlation import alert_correlator
+            from backend.analytics.fleet_snapshot import fleet_snapshot
+            from backend.ai_engine.model_registry import model_registry
+            from backend.ai_engine.isolation_forest import isolation_forest_store
+            from backend.ai_engine.risk_scoring import risk_scheduler
+            with st.expander("⚡ Cache des requêtes"):
+                for cache_name, cache_stats in get_cache_stats().items():
+                    st.caption(
+                        f"**{cache_name}** : {cache_stats['hits']} hit(s) / {cache_stats['misses']} miss "
+                        f"({cache_stats['hit_rate']:.0f} %), {cache_stats['entries']} entrée(s), "
+                        f"{cache_stats['invalidations']} invalidation(s)"
+                    )
+                index_stats = open_alert_index.stats()
+                st.caption(
+                    f"**open_alerts** : {index_stats['alerts']} alerte(s) ouverte(s), "
+                    f"{index_stats['keys']} clé(s) (liaison, type)"
+                )
+                snapshot_stats = fleet_snapshot.stats()
+                if snapshot_stats['age_seconds'] is not None:
+                    st.caption(
+                        f"**fleet_snapshot** : {snapshot_stats['links']} liaison(s), "
+                        f"âge {snapshot_stats['age_seconds']:.0f}s"
+                    )
+                correlation_stats = alert_correlator.stats()
+                st.caption(
+                    f"**incidents** : {correlation_stats['incidents']} incident(s) en corrélation, "
+                    f"{correlation_stats['window_keys']} groupe(s) (site, cause) dans la fenêtre"
+                )
+                registry_stats = model_registry.stats()
+                st.caption(
+                    f"**modèles** : {registry_stats['models']} modèle(s) en mémoire, "
+                    f"{registry_stats['hits']} prédiction(s) sans réentraînement, "
+                    f"{registry_stats['fits']} entraînement(s)"
+                )
+                forest_stats = isolation_forest_store.stats()
+                st.caption(
+                    f"**isolation forest** : {forest_stats['models']} modèle(s) entraîné(s), "
+                    f"{forest_stats['loaded']} chargé(s), {forest_stats['scored']} mesure(s) scorée(s)"
+                )
+                scheduler_status = risk_scheduler.status()
+                if scheduler_status['last_summary'] is not None:
+                    st.caption(
+                        f"**risques** : {scheduler_status['last_summary']['nb_links']} liaison(s) en "
+                        f"{scheduler_status['last_summary']['duree_s']:.1f}s, prochain calcul "
+                        f"{scheduler_status['next_run']:%H:%M:%S} UTC"
+                    )
+
         st.markdown("---")
         
         # Déconnexion
@@ -295,14 +332,26 @@ def main_app():
     # Statistiques rapides
     st.markdown("### 📈 Vue d'ensemble")
     
-    from backend.analytics.kpi_calculator import get_latest_kpis
-    from backend.alerts.alert_engine import get_active_alerts
+    from backend.analytics.fleet_snapshot import fleet_snapshot, NO_DATA_STATUS
+    
+    # Instantané de la flotte : une lecture, tri et filtres côté client
+    snapshot = fleet_snapshot.get()
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Liaisons en alerte", int((snapshot['alertes_actives'] > 0).sum()))
+    with col2:
+        st.metric("Alertes actives (flotte)", int(snapshot['alertes_actives'].sum()))
+    with col3:
+        st.metric(f"{config.ALERT_SEVERITIES['CRITIQUE']['icon']} Critiques", int(snapshot['critiques'].sum()))
+    with col4:
+        st.metric(f"{config.ALERT_SEVERITIES['MAJEURE']['icon']} Majeures", int(snapshot['majeures'].sum()))
     
     if st.session_state.selected_link:
-        kpis = get_latest_kpis(st.session_state.selected_link)
-        alerts = get_active_alerts(st.session_state.selected_link)
+        selected = snapshot[snapshot['link_id'] == st.session_state.selected_link]
         
-        if kpis:
+        if not selected.empty and selected.iloc[0]['etat_global'] != NO_DATA_STATUS:
+            kpis = selected.iloc[0]
             col1, col2, col3, col4 = st.columns(4)
             
             with col1:
@@ -321,10 +370,68 @@ def main_app():
                 st.metric("SNR", f"{kpis['snr_db']:.1f} dB")
             
             with col4:
-                st.metric("Alertes actives", len(alerts))
+                st.metric("Alertes actives", int(kpis['alertes_actives']))
         else:
             st.info("💡 Aucune donnée disponible. Importez des mesures depuis la page Import.")
     
+    # Vue flotte : une ligne par liaison
+    st.markdown("### 🌐 Flotte")
+    col1, col2, col3, col4 = st.columns([2, 2, 1, 1])
+    with col1:
+        search = st.text_input("Rechercher (liaison, site)", key="fleet_search")
+    with col2:
+        etats = st.multiselect(
+            "État",
+            options=['NORMAL', 'DEGRADED', 'CRITIQUE', NO_DATA_STATUS],
+            key="fleet_etats"
+        )
+    with col3:
+        only_alerts = st.checkbox("En alerte uniquement", key="fleet_only_alerts")
+    with col4:
+        if st.button("🔄 Rafraîchir", use_container_width=True, key="fleet_refresh"):
+            fleet_snapshot.invalidate()
+            st.rerun()
+    
+    view = snapshot
+    if search:
+        pattern = search.lower()
+        view = view[
+            view['nom'].str.lower().str.contains(pattern, regex=False)
+            | view['site_a'].str.lower().str.contains(pattern, regex=False)
+            | view['site_b'].str.lower().str.contains(pattern, regex=False)
+        ]
+    if etats:
+        view = view[view['etat_global'].isin(etats)]
+    if only_alerts:
+        view = view[view['alertes_actives'] > 0]
+    
+    st.dataframe(
+        view.sort_values(['critiques', 'alertes_actives'], ascending=False),
+        hide_index=True,
+        use_container_width=True,
+        column_order=['nom', 'site_a', 'site_b', 'etat_global', 'alertes_actives', 'critiques', 'majeures',
+                      'rssi_dbm', 'snr_db', 'ber', 'latency_ms', 'packet_loss', 'rainfall_mm', 'timestamp'],
+        column_config={
+            'nom': "Liaison",
+            'site_a': "Site A",
+            'site_b': "Site B",
+            'etat_global': "État",
+            'alertes_actives': "Alertes",
+            'critiques': "Critiques",
+            'majeures': "Majeures",
+            'rssi_dbm': st.column_config.NumberColumn("RSSI (dBm)", format="%.1f"),
+            'snr_db': st.column_config.NumberColumn("SNR (dB)", format="%.1f"),
+            'ber': st.column_config.NumberColumn("BER", format="%.1e"),
+            'latency_ms': st.column_config.NumberColumn("Latence (ms)", format="%.1f"),
+            'packet_loss': st.column_config.NumberColumn("Pertes (%)", format="%.2f"),
+            'rainfall_mm': st.column_config.NumberColumn("Pluie (mm)", format="%.1f"),
+            'timestamp': st.column_config.DatetimeColumn("Dernière mesure", format="YYYY-MM-DD HH:mm")
+        }
+    )
+    snapshot_stats = fleet_snapshot.stats()
+    st.caption(f"{len(view)} / {len(snapshot)} liaison(s) — instantané du "
+               f"{snapshot_stats['built_on']:%Y-%m-%d %H:%M:%S} UTC")
+    
     st.markdown("---")
     
     # Informations système
@@ -360,6 +467,8 @@ def main_app():
 def main():
     """Point d'entrée principal."""
     init_session_state()
+    # Job planifié de scoring du risque (démarré une fois par processus)
+    start_risk_scheduler()
     
     if st.session_state.authenticated:
         main_app()
@@ -3,14 +3,15 @@ Détecteur d'anomalies basé sur l'analyse statistique.
 """
 import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
-from typing import List, Dict, Tuple
-from backend.database.models import MesureKPI
-from backend.database.connection import get_db_context
+from scipy.ndimage import maximum_filter1d
+from typing import Iterable, List, Dict, Tuple
+from backend.analytics.measure_window import MeasureWindow, load_fleet_windows, resolve_window
+from backend.ai_engine.streaming_detector import evaluate_anomaly_state, get_anomaly_states
 import config
 
 
-def detect_anomalies_zscore(link_id: int, metric: str, hours: int = 48, threshold: float = None) -> List[Dict]:
+def detect_anomalies_zscore(link_id: int, metric: str, hours: int = 48, threshold: float = None,
+                            window: MeasureWindow = None) -> List[Dict]:
     """
     Détecte les anomalies en utilisant le Z-score.
     
@@ -19,6 +20,7 @@ def detect_anomalies_zscore(link_id: int, metric: str, hours: int = 48, threshol
         metric (str): Métrique à analyser
         hours (int): Période d'analyse
         threshold (float): Seuil de détection (écarts-types)
+        window (MeasureWindow, optional): Mesures préchargées (évite la requête)
         
     Returns:
         List[Dict]: Liste des anomalies détectées
@@ -26,120 +28,219 @@ def detect_anomalies_zscore(link_id: int, metric: str, hours: int = 48, threshol
     if threshold is None:
         threshold = config.IA_CONFIG['anomaly_threshold']
     
-    with get_db_context() as db:
-        date_from = datetime.utcnow() - timedelta(hours=hours)
-        
-        measures = (
-            db.query(MesureKPI)
-            .filter(
-                MesureKPI.link_id == link_id,
-                MesureKPI.timestamp >= date_from
-            )
-            .order_by(MesureKPI.timestamp)
-            .all()
-        )
-        
-        if len(measures) < config.IA_CONFIG['min_data_points']:
-            return []
-        
-        # Extraire les valeurs
-        values = [getattr(m, metric) for m in measures]
-        timestamps = [m.timestamp for m in measures]
-        
-        # Calculer moyenne et écart-type
-        mean_val = np.mean(values)
-        std_val = np.std(values)
-        
-        if std_val == 0:
-            return []
-        
-        # Calculer Z-scores
-        z_scores = [(v - mean_val) / std_val for v in values]
-        
-        # Détecter anomalies
-        anomalies = []
-        for i, z in enumerate(z_scores):
-            if abs(z) > threshold:
-                anomalies.append({
-                    'timestamp': timestamps[i],
-                    'value': values[i],
-                    'z_score': float(z),
-                    'severity': 'HIGH' if abs(z) > threshold + 1 else 'MODERATE'
-                })
-        
-        return anomalies
+    window = resolve_window(link_id, hours, window)
+    
+    if len(window) < config.IA_CONFIG['min_data_points']:
+        return []
+    
+    values = window[metric]
+    
+    # Calculer moyenne et écart-type
+    mean_val = np.mean(values)
+    std_val = np.std(values)
+    
+    if std_val == 0:
+        return []
+    
+    # Calculer Z-scores et détecter les anomalies
+    z_scores = (values - mean_val) / std_val
+    anomalies = []
+    for i in np.flatnonzero(np.abs(z_scores) > threshold):
+        z = z_scores[i]
+        anomalies.append({
+            'timestamp': window.timestamp_at(i),
+            'value': float(values[i]),
+            'z_score': float(z),
+            'severity': 'HIGH' if abs(z) > threshold + 1 else 'MODERATE'
+        })
+    
+    return anomalies
+
+
+# Colonnes du résultat de detect_drops_array
+DROP_COLUMNS = ['link_id', 'timestamp', 'methode', 'horizon', 'previous_value', 'current_value', 'drop', 'severity']
+
+
+def detect_drops_array(link_ids: np.ndarray, timestamps: np.ndarray, values: np.ndarray,
+                       drop_threshold: float, lags: Iterable[int] = (1,),
+                       windows: Iterable[int] = ()) -> pd.DataFrame:
+    """
+    Détecte les chutes brutales sur les mesures de plusieurs liaisons à la fois.
+    Les mesures sont triées par (liaison, timestamp) puis comparées par décalage
+    (np.diff groupé : une comparaison n'est retenue que si les deux mesures
+    appartiennent à la même liaison) :
+    - lag k : chute par rapport à la mesure k pas plus tôt ;
+    - fenêtre w : chute par rapport au maximum des w mesures précédentes.
+    Les valeurs manquantes (NaN) ne déclenchent aucune chute.
+
+    Args:
+        link_ids (np.ndarray): ID de liaison de chaque mesure
+        timestamps (np.ndarray): Timestamps (datetime64)
+        values (np.ndarray): Valeurs de la métrique
+        drop_threshold (float): Seuil de chute (unité de la métrique)
+        lags (Iterable[int]): Décalages comparés (en nombre de mesures)
+        windows (Iterable[int]): Fenêtres glissantes (en nombre de mesures)
+
+    Returns:
+        pd.DataFrame: Une ligne par chute (colonnes DROP_COLUMNS, méthode 'lag' ou 'fenetre'),
+        triée par liaison, timestamp, méthode et horizon
+    """
+    link_ids = np.asarray(link_ids, dtype='int64')
+    timestamps = np.asarray(timestamps, dtype='datetime64[ns]')
+    values = np.asarray(values, dtype='float64')
+
+    # Tri par (liaison, timestamp) sauf si les mesures le sont déjà
+    ordered = (
+        np.all(link_ids[1:] >= link_ids[:-1])
+        and np.all((link_ids[1:] != link_ids[:-1]) | (timestamps[1:] >= timestamps[:-1]))
+    )
+    if not ordered:
+        order = pd.DataFrame({'link_id': link_ids, 'timestamp': timestamps}).sort_values(
+            ['link_id', 'timestamp']
+        ).index.to_numpy()
+        link_ids, timestamps, values = link_ids[order], timestamps[order], values[order]
 
+    found = []
 
-def detect_sudden_drops(link_id: int, metric: str, hours: int = 24, drop_threshold: float = 10) -> List[Dict]:
+    def _collect(method: str, horizon: int, reference: np.ndarray, offset: int):
+        # reference[i] est comparée à values[offset + i]
+        current = values[offset:]
+        with np.errstate(invalid='ignore'):
+            drops = reference - current
+            hits = np.flatnonzero(drops > drop_threshold)
+        found.append((method, horizon, hits + offset, reference[hits], current[hits], drops[hits]))
+
+    for lag in sorted(set(lags)):
+        if 0 < lag < len(values):
+            reference = np.where(link_ids[:-lag] == link_ids[lag:], values[:-lag], np.nan)
+            _collect('lag', lag, reference, lag)
+
+    windows = sorted(width for width in set(windows) if width > 0)
+    if windows and len(values) >= 2:
+        # Position de chaque mesure dans sa liaison
+        is_start = np.concatenate(([True], link_ids[1:] != link_ids[:-1]))
+        group_start = np.flatnonzero(is_start)[np.cumsum(is_start) - 1]
+        position = np.arange(len(values)) - group_start
+        filled = np.where(np.isnan(values), -np.inf, values)
+
+    for width in windows:
+        if len(values) < 2:
+            break
+        # Maximum glissant des w dernières mesures en O(n) (filtre de van Herk), fenêtre [i - w + 1, i]
+        rolling = maximum_filter1d(filled, size=width, origin=(width - 1) // 2)
+        reference = rolling[:-1].copy()
+        # Fenêtres à cheval sur la liaison précédente : maximum recalculé sur les seules mesures de la liaison
+        edge = np.flatnonzero((position[1:] > 0) & (position[1:] < width)) + 1
+        edge_reference = np.full(len(edge), -np.inf)
+        edge_position = position[edge]
+        max_lag = min(width - 1, int(edge_position.max())) if len(edge) else 0
+        for lag in range(1, max_lag + 1):
+            # Mesures d'une autre liaison masquées, index bornés à 0 (pas de lecture hors tableau)
+            source = np.maximum(edge - lag, 0)
+            edge_reference = np.where(lag <= edge_position, np.fmax(edge_reference, filled[source]), edge_reference)
+        reference[edge - 1] = edge_reference
+        reference[position[1:] == 0] = -np.inf
+        reference[np.isneginf(reference)] = np.nan
+        _collect('fenetre', width, reference, 1)
+
+    if not found:
+        return pd.DataFrame(columns=DROP_COLUMNS)
+
+    methods, horizons, positions, previous, current, drops = zip(*found)
+    sizes = [len(position) for position in positions]
+    positions = np.concatenate(positions)
+    drops = np.concatenate(drops)
+    result = pd.DataFrame({
+        'link_id': link_ids[positions],
+        'timestamp': timestamps[positions],
+        'methode': np.repeat(methods, sizes),
+        'horizon': np.repeat(np.array(horizons, dtype='int64'), sizes),
+        'previous_value': np.concatenate(previous),
+        'current_value': np.concatenate(current),
+        'drop': drops,
+        'severity': np.where(drops > drop_threshold * 2, 'CRITICAL', 'HIGH')
+    })
+    return result.sort_values(['link_id', 'timestamp', 'methode', 'horizon'], kind='stable', ignore_index=True)
+
+
+def detect_sudden_drops(link_id: int, metric: str, hours: int = 24, drop_threshold: float = 10,
+                        window: MeasureWindow = None) -> List[Dict]:
     """
-    Détecte les chutes brutales de signal.
+    Détecte les chutes brutales de signal (entre deux mesures consécutives).
     
     Args:
         link_id (int): ID de la liaison
         metric (str): Métrique (rssi_dbm, snr_db)
         hours (int): Période d'analyse
         drop_threshold (float): Seuil de chute (unité de la métrique)
+        window (MeasureWindow, optional): Mesures préchargées (évite la requête)
         
     Returns:
         List[Dict]: Liste des chutes détectées
     """
-    with get_db_context() as db:
-        date_from = datetime.utcnow() - timedelta(hours=hours)
-        
-        measures = (
-            db.query(MesureKPI)
-            .filter(
-                MesureKPI.link_id == link_id,
-                MesureKPI.timestamp >= date_from
-            )
-            .order_by(MesureKPI.timestamp)
-            .all()
-        )
-        
-        if len(measures) < 2:
-            return []
-        
-        drops = []
-        for i in range(1, len(measures)):
-            prev_val = getattr(measures[i-1], metric)
-            curr_val = getattr(measures[i], metric)
-            drop = prev_val - curr_val
-            
-            if drop > drop_threshold:
-                drops.append({
-                    'timestamp': measures[i].timestamp,
-                    'previous_value': prev_val,
-                    'current_value': curr_val,
-                    'drop': float(drop),
-                    'severity': 'CRITICAL' if drop > drop_threshold * 2 else 'HIGH'
-                })
+    window = resolve_window(link_id, hours, window)
+    
+    if len(window) < 2:
+        return []
+    
+    drops = detect_drops_array(
+        np.full(len(window), link_id), window.timestamps, window[metric], drop_threshold
+    )
+    return [
+        {
+            'timestamp': row.timestamp.to_pydatetime(),
+            'previous_value': float(row.previous_value),
+            'current_value': float(row.current_value),
+            'drop': float(row.drop),
+            'severity': row.severity
+        }
+        for row in drops.itertuples(index=False)
+    ]
+
+
+def detect_fleet_drops(metric: str, hours: int = 24, drop_threshold: float = 10,
+                       lags: Iterable[int] = (1,), windows: Iterable[int] = (),
+                       link_ids: Iterable[int] = None) -> pd.DataFrame:
+    """
+    Détecte les chutes brutales de toute la flotte en une requête et une passe vectorisée.
+    
+    Args:
+        metric (str): Métrique (rssi_dbm, snr_db)
+        hours (int): Période d'analyse
+        drop_threshold (float): Seuil de chute (unité de la métrique)
+        lags (Iterable[int]): Décalages comparés (en nombre de mesures)
+        windows (Iterable[int]): Fenêtres glissantes (en nombre de mesures)
+        link_ids (Iterable[int], optional): Liaisons à analyser (toutes par défaut)
         
-        return drops
+    Returns:
+        pd.DataFrame: Chutes détectées (voir detect_drops_array)
+    """
+    fleet = load_fleet_windows(hours, link_ids)
+    if not fleet:
+        return pd.DataFrame(columns=DROP_COLUMNS)
+    
+    windows_list = list(fleet.values())
+    return detect_drops_array(
+        np.concatenate([np.full(len(w), w.link_id) for w in windows_list]),
+        np.concatenate([w.timestamps for w in windows_list]),
+        np.concatenate([w[metric] for w in windows_list]),
+        drop_threshold, lags, windows
+    )
 
 
-def is_anomalous(link_id: int) -> Tuple[bool, str]:
+def is_anomalous(link_id: int, states: Dict[str, Dict] = None) -> Tuple[bool, str]:
     """
     Détermine si la liaison présente actuellement des anomalies.
+    Lit l'état du détecteur en flux (mis à jour à l'import) au lieu de relire
+    les mesures : anomalies RSSI/SNR des 12 dernières heures, chute brutale des 6 dernières.
     
     Args:
         link_id (int): ID de la liaison
+        states (Dict[str, Dict], optional): États déjà lus (voir get_anomaly_states)
         
     Returns:
         Tuple[bool, str]: (Anomalie détectée, Description)
     """
-    # Vérifier RSSI
-    rssi_anomalies = detect_anomalies_zscore(link_id, 'rssi_dbm', hours=12)
-    if rssi_anomalies:
-        return True, f"Anomalie RSSI détectée : {len(rssi_anomalies)} événement(s)"
-    
-    # Vérifier SNR
-    snr_anomalies = detect_anomalies_zscore(link_id, 'snr_db', hours=12)
-    if snr_anomalies:
-        return True, f"Anomalie SNR détectée : {len(snr_anomalies)} événement(s)"
-    
-    # Vérifier chutes brutales
-    rssi_drops = detect_sudden_drops(link_id, 'rssi_dbm', hours=6, drop_threshold=8)
-    if rssi_drops:
-        return True, f"Chute brutale de signal détectée"
-    
-    return False, "Aucune anomalie détectée"
+    if states is None:
+        states = get_anomaly_states([link_id]).get(link_id, {})
+    return evaluate_anomaly_state(states)
@@ -0,0 +1,550 @@
+"""
+Moteur d'anomalies multivariées Isolation Forest.
+
+Une mesure est décrite par RSSI, SNR, log10(BER), latence, pertes de paquets et
+pluie (ISOLATION_FOREST_CONFIG['features']). Les forêts sont entraînées hors
+ligne par liaison (liaison_{id}) ou par bande de fréquence (bande_{GHz}, toutes
+les liaisons de la bande) :
+
+    python -m backend.ai_engine.isolation_forest --mode liaison|cluster
+
+Après l'entraînement (sklearn.ensemble.IsolationForest), chaque forêt est
+exportée en tableaux plats (attribut, seuil float32, fils gauche/droit,
+profondeur des feuilles) sérialisés avec joblib et relus avec mmap_mode='r' : les
+tableaux restent dans le cache de pages, partagés entre processus, et un
+modèle se charge sans copie. Un estimateur sklearn pickle ne se prête pas au
+mmap (ses arbres recopient leurs nœuds au chargement).
+
+Le scoring parcourt tous les arbres pour un bloc de mesures à la fois (une
+étape vectorisée par niveau de profondeur) et reproduit exactement
+score_samples / predict de sklearn. Chaque bloc de mesures importées est
+scoré en un appel (score_measures) ; les anomalies alimentent l'état
+MULTIVARIATE_METRIC du détecteur en flux.
+
+Coûts mesurés (benchmarks/benchmark_isolation_forest.py, 1 cœur, 100 arbres x 256
+échantillons, 6 attributs) :
+- entraînement : ~0,25 s par forêt, quelle que soit la taille de l'historique
+  au-delà de max_samples (plus le chargement des mesures d'entraînement) ;
+- export ~5 ms, écriture joblib ~1 ms (~240 Ko), chargement mmap ~1 ms ;
+- scoring par blocs : ~140 000 mesures/s (x1,5 par rapport à
+  IsolationForest.score_samples + predict, x15 par rapport au scoring mesure
+  par mesure, ~100 µs par appel).
+Un entraînement coûte autant que le scoring de ~35 000 mesures ; un lot
+importé de 10 000 mesures coûte ~70 ms de scoring. Sans modèle entraîné, le
+scoring ne coûte qu'une lecture du dossier des modèles.
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+import joblib
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+from backend.database.models import FHLink, MesureKPI
+from backend.database.connection import get_db_context
+from backend.ai_engine.streaming_detector import MULTIVARIATE_METRIC, clear_event_state, update_event_states
+from backend.security.logger import log_info, log_error
+import config
+
+# Plancher du BER avant passage au logarithme
+BER_FLOOR = 1e-15
+
+
+def average_path_length(n_samples: np.ndarray) -> np.ndarray:
+    """
+    Longueur moyenne c(n) d'un chemin d'échec dans un arbre binaire de recherche
+    de n éléments (normalisation des profondeurs d'Isolation Forest).
+
+    Args:
+        n_samples (np.ndarray): Nombres d'échantillons
+
+    Returns:
+        np.ndarray: c(n) (0 pour n <= 1, 1 pour n = 2)
+    """
+    n = np.asarray(n_samples, dtype='float64')
+    result = np.zeros_like(n)
+    result[n == 2] = 1.0
+    large = n > 2
+    result[large] = 2.0 * (np.log(n[large] - 1.0) + np.euler_gamma) - 2.0 * (n[large] - 1.0) / n[large]
+    return result
+
+
+def band_key(frequence_ghz: float) -> str:
+    """Clé du modèle partagé par les liaisons d'une bande de fréquence."""
+    return f"bande_{int(round(frequence_ghz))}"
+
+
+def link_key(link_id: int) -> str:
+    """Clé du modèle propre à une liaison."""
+    return f"liaison_{link_id}"
+
+
+def prepare_features(frame: pd.DataFrame, medians: np.ndarray = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Construit la matrice des attributs (BER en log10, valeurs manquantes remplacées par les médianes).
+
+    Args:
+        frame (pd.DataFrame): Mesures (colonnes ISOLATION_FOREST_CONFIG['features'])
+        medians (np.ndarray, optional): Médianes d'entraînement (calculées sur frame par défaut)
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Matrice (mesures x attributs, float64) et médianes utilisées
+    """
+    features = config.ISOLATION_FOREST_CONFIG['features']
+    X = np.column_stack([
+        pd.to_numeric(frame[feature], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+        if feature in frame else np.full(len(frame), np.nan)
+        for feature in features
+    ]) if len(frame) else np.empty((0, len(features)))
+    if 'ber' in features:
+        column = features.index('ber')
+        X[:, column] = np.log10(np.clip(X[:, column], BER_FLOOR, None))
+    if medians is None:
+        with np.errstate(all='ignore'):
+            medians = np.nanmedian(X, axis=0) if len(X) else np.zeros(len(features))
+        medians = np.nan_to_num(medians)
+    missing = np.isnan(X)
+    if missing.any():
+        X[missing] = np.take(medians, np.nonzero(missing)[1])
+    return X, medians
+
+
+def export_forest(forest, medians: np.ndarray, metadata: Dict) -> Dict:
+    """
+    Exporte une IsolationForest entraînée en tableaux plats (tous les arbres bout à bout).
+    Une feuille est son propre fils (gauche et droit, seuil +inf) : le parcours peut
+    continuer jusqu'à la profondeur maximale sans test.
+
+    Args:
+        forest (IsolationForest): Forêt entraînée
+        medians (np.ndarray): Médianes d'imputation
+        metadata (Dict): Métadonnées d'entraînement
+
+    Returns:
+        Dict: Modèle exporté (tableaux numpy et métadonnées)
+    """
+    feature, threshold, children, leaf_value, roots = [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for tree, tree_features in zip(forest.estimators_, forest.estimators_features_):
+        nodes = tree.tree_
+        count = nodes.node_count
+        index = np.arange(offset, offset + count)
+        is_leaf = nodes.children_left == -1
+        depth = nodes.compute_node_depths()  # racine = 1
+
+        feature.append(np.where(is_leaf, 0, np.asarray(tree_features)[np.maximum(nodes.feature, 0)]))
+        threshold.append(np.where(is_leaf, np.inf, nodes.threshold))
+        # Fils gauche (x <= seuil) puis fils droit de chaque nœud
+        children.append(np.column_stack((
+            np.where(is_leaf, index, nodes.children_left + offset),
+            np.where(is_leaf, index, nodes.children_right + offset)
+        )).ravel())
+        # Longueur du chemin jusqu'à la feuille, corrigée de la taille de la feuille
+        leaf_value.append(np.where(
+            is_leaf, depth + average_path_length(nodes.n_node_samples) - 1.0, 0.0
+        ))
+        roots.append(offset)
+        max_depth = max(max_depth, nodes.max_depth)
+        offset += count
+
+    # Les arbres sklearn comparent des attributs float32 à des seuils float64 :
+    # x <= seuil équivaut à x <= (plus grand float32 inférieur ou égal au seuil)
+    threshold = np.concatenate(threshold)
+    threshold32 = threshold.astype('float32')
+    rounded_up = threshold32.astype('float64') > threshold
+    threshold32[rounded_up] = np.nextafter(threshold32[rounded_up], np.float32(-np.inf))
+
+    return {
+        **metadata,
+        'feature': np.concatenate(feature).astype('int32'),
+        'threshold': threshold32,
+        'children': np.concatenate(children).astype('int32'),
+        'leaf_value': np.concatenate(leaf_value).astype('float64'),
+        'roots': np.array(roots, dtype='int32'),
+        'max_depth': int(max_depth),
+        'medians': np.asarray(medians, dtype='float64'),
+        'c_norm': float(average_path_length([forest.max_samples_])[0]),
+        'threshold_score': float(-forest.offset_)
+    }
+
+
+def forest_scores(model: Dict, X: np.ndarray, block_size: int = None) -> np.ndarray:
+    """
+    Score d'anomalie de chaque mesure (score_samples de sklearn, au signe près :
+    plus le score est proche de 1, plus la mesure est isolée).
+    Tous les arbres sont parcourus ensemble, niveau par niveau, par blocs de mesures
+    (petits blocs : les tableaux de travail restent dans le cache du processeur).
+
+    Args:
+        model (Dict): Modèle exporté (export_forest)
+        X (np.ndarray): Matrice des attributs (prepare_features)
+        block_size (int, optional): Mesures par bloc (ISOLATION_FOREST_CONFIG['bloc_scoring'])
+
+    Returns:
+        np.ndarray: Scores dans ]0, 1]
+    """
+    block_size = block_size or config.ISOLATION_FOREST_CONFIG['bloc_scoring']
+    # Vues ndarray des tableaux mappés (sans copie) : évite le surcoût np.memmap à chaque opération
+    feature, threshold, children, roots, leaf_value = (
+        np.asarray(model[name]) for name in ('feature', 'threshold', 'children', 'roots', 'leaf_value')
+    )
+    X = np.asarray(X, dtype='float32')
+    nb_features = X.shape[1]
+    depths = np.empty(len(X))
+
+    for start in range(0, len(X), block_size):
+        block = X[start:start + block_size]
+        flat = block.ravel()
+        row_offsets = (np.arange(len(block), dtype='int32') * nb_features)[:, None]
+        nodes = np.broadcast_to(roots, (len(block), len(roots))).copy()
+        for _ in range(model['max_depth']):
+            values = flat.take(row_offsets + feature.take(nodes))
+            nodes = children.take(2 * nodes + (values > threshold.take(nodes)))
+        depths[start:start + len(block)] = leaf_value.take(nodes).sum(axis=1)
+
+    return 2.0 ** (-depths / (len(roots) * model['c_norm']))
+
+
+def load_training_frame(link_ids: List[int], days: float = None, now: datetime = None) -> pd.DataFrame:
+    """
+    Charge en une requête les mesures d'entraînement de plusieurs liaisons.
+
+    Args:
+        link_ids (List[int]): Liaisons
+        days (float, optional): Historique (ISOLATION_FOREST_CONFIG['training_days'])
+        now (datetime, optional): Fin de l'historique (UTC)
+
+    Returns:
+        pd.DataFrame: Mesures (link_id et attributs)
+    """
+    days = days if days is not None else config.ISOLATION_FOREST_CONFIG['training_days']
+    date_from = (now or datetime.utcnow()) - timedelta(days=days)
+    features = config.ISOLATION_FOREST_CONFIG['features']
+    query = select(MesureKPI.link_id, *[getattr(MesureKPI, feature) for feature in features]).where(
+        MesureKPI.link_id.in_(link_ids), MesureKPI.timestamp >= date_from
+    )
+    with get_db_context() as db:
+        rows = db.execute(query).all()
+    return pd.DataFrame(rows, columns=['link_id'] + features)
+
+
+def fit_forest(frame: pd.DataFrame, key: str, scope: str, link_ids: List[int], random_state: int = 42) -> Optional[Dict]:
+    """
+    Entraîne une forêt sur des mesures et l'exporte.
+
+    Args:
+        frame (pd.DataFrame): Mesures d'entraînement
+        key (str): Clé du modèle
+        scope (str): 'liaison' ou 'cluster'
+        link_ids (List[int]): Liaisons couvertes
+        random_state (int): Graine (échantillonnage et arbres)
+
+    Returns:
+        Optional[Dict]: Modèle exporté, ou None si les mesures sont insuffisantes
+    """
+    from sklearn.ensemble import IsolationForest
+
+    settings = config.ISOLATION_FOREST_CONFIG
+    if len(frame) < settings['min_samples']:
+        return None
+    if len(frame) > settings['max_training_samples']:
+        frame = frame.sample(settings['max_training_samples'], random_state=random_state)
+
+    started = time.perf_counter()
+    X, medians = prepare_features(frame)
+    forest = IsolationForest(
+        n_estimators=settings['n_estimators'],
+        max_samples=min(settings['max_samples'], len(X)),
+        contamination=settings['contamination'],
+        random_state=random_state
+    ).fit(X.astype('float32'))
+    return export_forest(forest, medians, {
+        'key': key,
+        'scope': scope,
+        'link_ids': list(link_ids),
+        'features': list(settings['features']),
+        'nb_samples': len(X),
+        'fit_seconds': time.perf_counter() - started,
+        'trained_at': datetime.utcnow()
+    })
+
+
+class IsolationForestStore:
+    """Modèles Isolation Forest exportés, sur disque (joblib) et mappés en mémoire."""
+
+    def __init__(self, directory: str = None):
+        self.directory = Path(
+            directory if directory is not None
+            else Path(config.MODEL_REGISTRY_CONFIG['dossier']) / 'isolation_forest'
+        )
+        self._models: Dict[str, tuple] = {}  # clé -> (mtime, modèle)
+        self._bands: Dict[int, str] = {}  # link_id -> clé du modèle de sa bande
+        self._loads = 0
+        self._scored = 0
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.joblib"
+
+    def _available(self) -> Dict[str, float]:
+        """Modèles présents sur disque (clé -> date de modification)."""
+        try:
+            with os.scandir(self.directory) as entries:
+                return {
+                    entry.name[:-len('.joblib')]: entry.stat().st_mtime
+                    for entry in entries if entry.name.endswith('.joblib')
+                }
+        except FileNotFoundError:
+            return {}
+
+    def save(self, model: Dict) -> Path:
+        """
+        Écrit un modèle exporté (fichier temporaire puis renommage atomique).
+
+        Args:
+            model (Dict): Modèle (export_forest)
+
+        Returns:
+            Path: Fichier du modèle
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        os.close(fd)
+        try:
+            joblib.dump(model, tmp_path)
+            os.replace(tmp_path, self._path(model['key']))
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return self._path(model['key'])
+
+    def get(self, key: str, mtime: float = None) -> Optional[Dict]:
+        """
+        Retourne un modèle (relu en mmap si le fichier a changé depuis le dernier chargement).
+
+        Args:
+            key (str): Clé du modèle
+            mtime (float, optional): Date de modification connue du fichier
+
+        Returns:
+            Optional[Dict]: Modèle, ou None s'il est absent ou illisible
+        """
+        path = self._path(key)
+        if mtime is None:
+            try:
+                mtime = path.stat().st_mtime
+            except FileNotFoundError:
+                return None
+        with self._lock:
+            cached = self._models.get(key)
+            if cached is not None and cached[0] == mtime:
+                return cached[1]
+        try:
+            model = joblib.load(path, mmap_mode='r')
+        except Exception as e:
+            log_error(f"Modèle Isolation Forest illisible {path}", e, module="IsolationForest")
+            return None
+        with self._lock:
+            self._models[key] = (mtime, model)
+            self._loads += 1
+        return model
+
+    def _band_keys(self, link_ids: List[int], db=None) -> Dict[int, str]:
+        """Clé du modèle de bande de chaque liaison (fréquences lues une fois par liaison)."""
+        with self._lock:
+            missing = [link_id for link_id in link_ids if link_id not in self._bands]
+        if missing:
+            query = select(FHLink.id, FHLink.frequence_ghz).where(FHLink.id.in_(missing))
+            if db is not None:
+                rows = db.execute(query).all()
+            else:
+                with get_db_context() as session:
+                    rows = session.execute(query).all()
+            with self._lock:
+                for link_id, frequence_ghz in rows:
+                    self._bands[link_id] = band_key(frequence_ghz)
+        with self._lock:
+            return {link_id: self._bands[link_id] for link_id in link_ids if link_id in self._bands}
+
+    def score_measures(self, frame: pd.DataFrame, db=None) -> pd.DataFrame:
+        """
+        Score un bloc de mesures en un appel : un modèle par liaison (modèle propre
+        à la liaison, sinon modèle de sa bande), un parcours vectorisé par modèle.
+
+        Args:
+            frame (pd.DataFrame): Mesures (link_id et attributs)
+            db (Session, optional): Session active (lecture des fréquences)
+
+        Returns:
+            pd.DataFrame: score (NaN sans modèle), anomalie et modele, alignés sur frame
+        """
+        result = pd.DataFrame({
+            'score': np.full(len(frame), np.nan),
+            'anomalie': np.zeros(len(frame), dtype=bool),
+            'modele': None
+        }, index=frame.index)
+        available = self._available()
+        if not available or frame.empty:
+            return result
+
+        link_column = frame['link_id'].to_numpy(dtype='int64')
+        link_ids = np.unique(link_column).tolist()
+        keys = {link_id: link_key(link_id) for link_id in link_ids if link_key(link_id) in available}
+        unresolved = [link_id for link_id in link_ids if link_id not in keys]
+        if unresolved and any(key.startswith('bande_') for key in available):
+            keys.update({
+                link_id: key for link_id, key in self._band_keys(unresolved, db).items() if key in available
+            })
+        if not keys:
+            return result
+
+        row_keys = pd.Series(link_column).map(keys).to_numpy()
+        scores = result['score'].to_numpy(copy=True)
+        flags = result['anomalie'].to_numpy(copy=True)
+        for key in set(keys.values()):
+            model = self.get(key, available[key])
+            if model is None:
+                continue
+            rows = np.flatnonzero(row_keys == key)
+            X, _ = prepare_features(frame.iloc[rows], model['medians'])
+            scores[rows] = forest_scores(model, X)
+            flags[rows] = scores[rows] > model['threshold_score']
+        result['score'], result['anomalie'], result['modele'] = scores, flags, row_keys
+        with self._lock:
+            self._scored += int((~np.isnan(scores)).sum())
+        return result
+
+    def forget(self, link_id: int) -> None:
+        """Supprime le modèle propre à une liaison (mesures supprimées)."""
+        key = link_key(link_id)
+        with self._lock:
+            self._models.pop(key, None)
+            self._bands.pop(link_id, None)
+        try:
+            self._path(key).unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            log_error(f"Suppression du modèle {key} impossible", e, module="IsolationForest")
+
+    def stats(self) -> Dict:
+        """
+        Retourne l'état du magasin de modèles (supervision).
+
+        Returns:
+            Dict: Modèles sur disque, modèles chargés, chargements et mesures scorées
+        """
+        available = len(self._available())
+        with self._lock:
+            return {'models': available, 'loaded': len(self._models), 'loads': self._loads, 'scored': self._scored}
+
+
+# Magasin partagé par le processus
+isolation_forest_store = IsolationForestStore()
+
+
+def score_measures(frame: pd.DataFrame, db=None) -> pd.DataFrame:
+    """
+    Score un bloc de mesures avec les modèles entraînés (voir IsolationForestStore.score_measures).
+
+    Args:
+        frame (pd.DataFrame): Mesures (link_id et attributs)
+        db (Session, optional): Session active
+
+    Returns:
+        pd.DataFrame: score, anomalie et modele par mesure
+    """
+    return isolation_forest_store.score_measures(frame, db)
+
+
+def update_multivariate_states(db, frame: pd.DataFrame) -> int:
+    """
+    Score des mesures importées et met à jour l'état MULTIVARIATE_METRIC de leurs liaisons.
+
+    Args:
+        db (Session): Session SQLAlchemy active (même transaction que l'insertion)
+        frame (pd.DataFrame): Mesures importées (link_id, timestamp et attributs)
+
+    Returns:
+        int: Nombre d'anomalies multivariées détectées
+    """
+    scored = isolation_forest_store.score_measures(frame, db)
+    return update_event_states(
+        db, MULTIVARIATE_METRIC, frame, scored['score'].to_numpy(), scored['anomalie'].to_numpy()
+    )
+
+
+def reset_multivariate_state(db, link_id: int) -> None:
+    """Supprime l'état MULTIVARIATE_METRIC et le modèle propre d'une liaison (mesures supprimées)."""
+    clear_event_state(db, MULTIVARIATE_METRIC, link_id)
+    isolation_forest_store.forget(link_id)
+
+
+def train_models(mode: str = 'liaison', link_ids: Iterable[int] = None, days: float = None) -> Dict:
+    """
+    Entraîne et enregistre les modèles hors ligne.
+
+    Args:
+        mode (str): 'liaison' (un modèle par liaison) ou 'cluster' (un modèle par bande de fréquence)
+        link_ids (Iterable[int], optional): Liaisons à couvrir (toutes les liaisons actives par défaut)
+        days (float, optional): Historique d'entraînement en jours
+
+    Returns:
+        Dict: Modèles entraînés, ignorés (mesures insuffisantes), durées de chargement et d'entraînement
+    """
+    if mode not in ('liaison', 'cluster'):
+        raise ValueError(f"Mode d'entraînement inconnu : {mode}")
+
+    query = select(FHLink.id, FHLink.frequence_ghz).where(FHLink.actif == True)
+    if link_ids is not None:
+        query = query.where(FHLink.id.in_(list(link_ids)))
+    with get_db_context() as db:
+        links = db.execute(query.order_by(FHLink.id)).all()
+
+    if mode == 'liaison':
+        groups = {link_key(link_id): [link_id] for link_id, _ in links}
+    else:
+        groups = {}
+        for link_id, frequence_ghz in links:
+            groups.setdefault(band_key(frequence_ghz), []).append(link_id)
+
+    summary = {'mode': mode, 'trained': [], 'skipped': [], 'load_seconds': 0.0, 'fit_seconds': 0.0}
+    for key, group_links in groups.items():
+        started = time.perf_counter()
+        frame = load_training_frame(group_links, days)
+        summary['load_seconds'] += time.perf_counter() - started
+
+        model = fit_forest(frame, key, mode, group_links)
+        if model is None:
+            summary['skipped'].append(key)
+            continue
+        summary['fit_seconds'] += model['fit_seconds']
+        isolation_forest_store.save(model)
+        summary['trained'].append(key)
+
+    log_info(f"Isolation Forest ({mode}) : {len(summary['trained'])} modèle(s) entraîné(s), "
+             f"{len(summary['skipped'])} ignoré(s), entraînement {summary['fit_seconds']:.1f}s", "IsolationForest")
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Entraînement hors ligne des modèles Isolation Forest")
+    parser.add_argument('--mode', choices=['liaison', 'cluster'], default='liaison',
+                        help="Un modèle par liaison ou par bande de fréquence")
+    parser.add_argument('--days', type=float, default=None, help="Historique d'entraînement (jours)")
+    parser.add_argument('--links', type=int, nargs='*', default=None, help="Liaisons à entraîner")
+    args = parser.parse_args()
+
+    result = train_models(args.mode, args.links, args.days)
+    print(f"🌲 {len(result['trained'])} modèle(s) entraîné(s) dans {isolation_forest_store.directory} "
+          f"(chargement {result['load_seconds']:.1f}s, entraînement {result['fit_seconds']:.1f}s)")
+    if result['skipped']:
+        print(f"⚠️ Mesures insuffisantes (< {config.ISOLATION_FOREST_CONFIG['min_samples']}) : "
+              f"{', '.join(result['skipped'])}")
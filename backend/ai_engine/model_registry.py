@@ -0,0 +1,150 @@
+"""
+Registre des modèles de prédiction, partagé par tout le processus.
+
+Un modèle par (liaison, métrique) : coefficients de la tendance linéaire et
+métadonnées d'entraînement (origine des temps, dernière mesure utilisée,
+nombre de points, date d'entraînement). predict_next_values sert ses
+prédictions depuis le registre et ne réentraîne que si une mesure plus récente
+est arrivée ou si le modèle a plus de IA_CONFIG['retrain_interval'] heures.
+Chaque modèle est écrit dans un fichier JSON (MODEL_REGISTRY_CONFIG['dossier'])
+et relu à la demande : un redémarrage ne force pas le réentraînement de toutes
+les liaisons.
+"""
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from backend.security.logger import log_error
+import config
+
+# Champs datetime d'un modèle (sérialisés en ISO 8601)
+DATETIME_FIELDS = ('origin', 'last_timestamp', 'trained_at')
+
+
+class ModelRegistry:
+    """Modèles entraînés par (link_id, métrique), en mémoire et sur disque."""
+
+    def __init__(self, directory: str = None, retrain_hours: float = None):
+        self.directory = Path(directory if directory is not None else config.MODEL_REGISTRY_CONFIG['dossier'])
+        self.retrain_hours = (
+            retrain_hours if retrain_hours is not None
+            else config.IA_CONFIG['retrain_interval']
+        )
+        self._models: Dict[Tuple[int, str], Dict] = {}
+        self._hits = 0
+        self._fits = 0
+        self._lock = threading.Lock()
+
+    def _path(self, link_id: int, metric: str) -> Path:
+        return self.directory / f"{link_id}_{metric}.json"
+
+    def _read(self, link_id: int, metric: str) -> Optional[Dict]:
+        """Relit un modèle persisté (None s'il est absent ou illisible)."""
+        path = self._path(link_id, metric)
+        if not path.exists():
+            return None
+        try:
+            model = json.loads(path.read_text(encoding='utf-8'))
+            for field in DATETIME_FIELDS:
+                if model.get(field) is not None:
+                    model[field] = datetime.fromisoformat(model[field])
+            return model
+        except (OSError, ValueError) as e:
+            log_error(f"Modèle illisible {path}", e, module="ModelRegistry")
+            return None
+
+    def _write(self, model: Dict) -> None:
+        """Écrit un modèle (fichier temporaire puis renommage atomique)."""
+        payload = {
+            field: value.isoformat() if field in DATETIME_FIELDS and value is not None else value
+            for field, value in model.items()
+        }
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(payload, f)
+            os.replace(tmp_path, self._path(model['link_id'], model['metric']))
+        except OSError as e:
+            log_error(f"Écriture du modèle impossible dans {self.directory}", e, module="ModelRegistry")
+
+    def get(self, link_id: int, metric: str) -> Optional[Dict]:
+        """
+        Retourne le modèle d'une liaison et d'une métrique (mémoire, sinon disque).
+
+        Args:
+            link_id (int): ID de la liaison
+            metric (str): Métrique prédite
+
+        Returns:
+            Optional[Dict]: Modèle, ou None s'il n'a jamais été entraîné
+        """
+        key = (link_id, metric)
+        with self._lock:
+            if key not in self._models:
+                model = self._read(link_id, metric)
+                if model is None:
+                    return None
+                self._models[key] = model
+            return self._models[key]
+
+    def is_fresh(self, model: Optional[Dict], last_timestamp: Optional[datetime], now: datetime = None) -> bool:
+        """
+        Indique si un modèle peut servir sans réentraînement.
+
+        Args:
+            model (Optional[Dict]): Modèle du registre
+            last_timestamp (Optional[datetime]): Dernière mesure disponible pour la liaison
+            now (datetime, optional): Instant de référence (UTC)
+
+        Returns:
+            bool: True si aucune mesure plus récente et modèle de moins de retrain_interval heures
+        """
+        if model is None or model.get('last_timestamp') != last_timestamp:
+            return False
+        now = now or datetime.utcnow()
+        fresh = now - model['trained_at'] < timedelta(hours=self.retrain_hours)
+        if fresh:
+            with self._lock:
+                self._hits += 1
+        return fresh
+
+    def store(self, model: Dict) -> None:
+        """
+        Enregistre un modèle entraîné (mémoire et disque).
+
+        Args:
+            model (Dict): Modèle (link_id, metric, coefficients et métadonnées)
+        """
+        with self._lock:
+            self._models[(model['link_id'], model['metric'])] = model
+            self._fits += 1
+        self._write(model)
+
+    def forget(self, link_id: int) -> None:
+        """Supprime les modèles d'une liaison (mesures supprimées)."""
+        with self._lock:
+            for key in [key for key in self._models if key[0] == link_id]:
+                del self._models[key]
+        for path in self.directory.glob(f"{link_id}_*.json"):
+            try:
+                path.unlink()
+            except OSError as e:
+                log_error(f"Suppression du modèle {path} impossible", e, module="ModelRegistry")
+
+    def stats(self) -> Dict:
+        """
+        Retourne l'état du registre (supervision).
+
+        Returns:
+            Dict: Modèles en mémoire, prédictions servies sans réentraînement, entraînements
+        """
+        with self._lock:
+            return {'models': len(self._models), 'hits': self._hits, 'fits': self._fits}
+
+
+# Registre partagé par le processus
+model_registry = ModelRegistry()
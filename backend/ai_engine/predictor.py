@@ -3,21 +3,118 @@ Module de prédiction pour anticiper les dégradations.
 """
 import numpy as np
 from datetime import datetime, timedelta
-from typing import Dict, List
-from sklearn.linear_model import LinearRegression
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import func, select
+from backend.analytics.measure_window import MeasureWindow, load_fleet_windows, resolve_window
+from backend.analytics.least_squares import grouped_linear_fit
+from backend.ai_engine.model_registry import model_registry
 from backend.database.models import MesureKPI
 from backend.database.connection import get_db_context
 import config
 
+# Fenêtre d'entraînement des modèles de tendance
+TRAINING_HOURS = 48
 
-def predict_next_values(link_id: int, metric: str, hours_ahead: int = None) -> Dict:
+
+def _latest_timestamp(link_id: int) -> Optional[datetime]:
+    """Timestamp de la dernière mesure de la liaison (index unique link_id, timestamp)."""
+    with get_db_context() as db:
+        return db.execute(
+            select(func.max(MesureKPI.timestamp)).where(MesureKPI.link_id == link_id)
+        ).scalar()
+
+
+def _trend_model(link_id: int, metric: str, window: MeasureWindow, fit=None) -> Dict:
+    """Construit le modèle du registre depuis une fenêtre et son ajustement (n, slope, intercept, r2)."""
+    model = {
+        'link_id': link_id,
+        'metric': metric,
+        'status': 'INSUFFICIENT_DATA',
+        'nb_points': len(window),
+        'last_timestamp': window.timestamp_at(len(window) - 1) if len(window) else None,
+        'trained_at': datetime.utcnow()
+    }
+    if fit is None or fit['n'] < config.IA_CONFIG['min_data_points']:
+        return model
+    
+    model.update(
+        status='OK',
+        coef=float(fit['slope']),
+        intercept=float(fit['intercept']),
+        score=float(fit['r2']),
+        origin=window.timestamp_at(0),
+        last_offset_hours=float(window.elapsed_seconds()[-1] / 3600),
+        current_value=float(window[metric][-1])
+    )
+    return model
+
+
+def fit_trend_model(link_id: int, metric: str, window: MeasureWindow = None) -> Dict:
+    """
+    Entraîne la tendance linéaire d'une métrique sur les 48 dernières heures
+    (moindres carrés en forme fermée, x en heures depuis la première mesure).
+    
+    Args:
+        link_id (int): ID de la liaison
+        metric (str): Métrique à prédire
+        window (MeasureWindow, optional): Mesures préchargées (évite la requête)
+        
+    Returns:
+        Dict: Modèle (coefficients et métadonnées d'entraînement, voir ModelRegistry)
+    """
+    window = resolve_window(link_id, TRAINING_HOURS, window)
+    if len(window) == 0:
+        return _trend_model(link_id, metric, window)
+    
+    fit = grouped_linear_fit(np.zeros(len(window)), window.elapsed_seconds() / 3600, window[metric])
+    return _trend_model(link_id, metric, window, fit.iloc[0])
+
+
+def fit_trend_models(metric: str, link_ids: Iterable[int] = None, store: bool = True) -> Dict[int, Dict]:
+    """
+    Entraîne les tendances de toute la flotte en une requête et une passe de
+    moindres carrés groupés, et les enregistre dans le registre.
+    
+    Args:
+        metric (str): Métrique à prédire
+        link_ids (Iterable[int], optional): Liaisons à entraîner (toutes par défaut)
+        store (bool): Enregistrer les modèles dans le registre
+        
+    Returns:
+        Dict[int, Dict]: Modèle par liaison (liaisons ayant des mesures)
+    """
+    fleet = load_fleet_windows(TRAINING_HOURS, link_ids)
+    if not fleet:
+        return {}
+    
+    windows = list(fleet.values())
+    fits = grouped_linear_fit(
+        np.concatenate([np.full(len(w), w.link_id) for w in windows]),
+        np.concatenate([w.elapsed_seconds() / 3600 for w in windows]),
+        np.concatenate([w[metric] for w in windows])
+    )
+    
+    models = {}
+    for link_id, window in fleet.items():
+        models[link_id] = _trend_model(link_id, metric, window, fits.loc[link_id])
+        if store:
+            model_registry.store(models[link_id])
+    return models
+
+
+def predict_next_values(link_id: int, metric: str, hours_ahead: int = None,
+                        window: MeasureWindow = None) -> Dict:
     """
     Prédit les valeurs futures d'une métrique.
+    Les prédictions sont servies depuis le registre des modèles ; la tendance
+    n'est réentraînée que si une mesure plus récente est arrivée ou si le
+    modèle a plus de IA_CONFIG['retrain_interval'] heures.
     
     Args:
         link_id (int): ID de la liaison
         metric (str): Métrique à prédire
         hours_ahead (int): Horizon de prédiction
+        window (MeasureWindow, optional): Mesures préchargées (évite la requête)
         
     Returns:
         Dict: Prédictions et statistiques
@@ -25,90 +122,88 @@ def predict_next_values(link_id: int, metric: str, hours_ahead: int = None) -> D
     if hours_ahead is None:
         hours_ahead = config.IA_CONFIG['prediction_horizon']
     
-    with get_db_context() as db:
-        # Récupérer les mesures des dernières 48h
-        date_from = datetime.utcnow() - timedelta(hours=48)
-        
-        measures = (
-            db.query(MesureKPI)
-            .filter(
-                MesureKPI.link_id == link_id,
-                MesureKPI.timestamp >= date_from
-            )
-            .order_by(MesureKPI.timestamp)
-            .all()
-        )
-        
-        if len(measures) < config.IA_CONFIG['min_data_points']:
-            return {'status': 'INSUFFICIENT_DATA'}
-        
-        # Préparer les données
-        timestamps = [(m.timestamp - measures[0].timestamp).total_seconds() / 3600 for m in measures]
-        values = [getattr(m, metric) for m in measures]
-        
-        X = np.array(timestamps).reshape(-1, 1)
-        y = np.array(values)
-        
-        # Entraîner le modèle
-        model = LinearRegression()
-        model.fit(X, y)
-        
-        # Prédire
-        last_timestamp = timestamps[-1]
-        future_timestamps = [last_timestamp + i for i in range(1, hours_ahead + 1)]
-        X_future = np.array(future_timestamps).reshape(-1, 1)
-        predictions = model.predict(X_future)
-        
-        # Calculer la confiance
-        score = model.score(X, y)
-        
-        return {
-            'status': 'OK',
-            'metric': metric,
-            'current_value': values[-1],
-            'predictions': [float(p) for p in predictions],
-            'timestamps': [measures[0].timestamp + timedelta(hours=t) for t in future_timestamps],
-            'confidence': float(score),
-            'trend': 'DEGRADING' if predictions[-1] < values[-1] - 2 else 'STABLE'
-        }
+    if window is not None:
+        last_timestamp = window.timestamp_at(len(window) - 1) if len(window) else None
+    else:
+        last_timestamp = _latest_timestamp(link_id)
+    
+    model = model_registry.get(link_id, metric)
+    if not model_registry.is_fresh(model, last_timestamp):
+        model = fit_trend_model(link_id, metric, window)
+        model_registry.store(model)
+    
+    if model['status'] != 'OK':
+        return {'status': model['status']}
+    
+    # Prédire depuis les coefficients du modèle
+    future_timestamps = [model['last_offset_hours'] + i for i in range(1, hours_ahead + 1)]
+    predictions = model['intercept'] + model['coef'] * np.array(future_timestamps)
+    current_value = model['current_value']
+    
+    return {
+        'status': 'OK',
+        'metric': metric,
+        'current_value': current_value,
+        'predictions': [float(p) for p in predictions],
+        'timestamps': [model['origin'] + timedelta(hours=t) for t in future_timestamps],
+        'confidence': model['score'],
+        'trend': 'DEGRADING' if predictions[-1] < current_value - 2 else 'STABLE'
+    }
 
 
-def predict_degradation_risk(link_id: int) -> Dict:
+def classify_degradation_risk(future_rssi: float, confidence: float, estimated_time: datetime = None) -> Dict:
     """
-    Évalue le risque de dégradation dans les prochaines heures.
+    Classe un RSSI prédit par rapport au seuil de dégradation.
     
     Args:
-        link_id (int): ID de la liaison
+        future_rssi (float): RSSI prédit à l'horizon (dBm)
+        confidence (float): Confiance de la prédiction (R²)
+        estimated_time (datetime, optional): Instant de la prédiction
         
     Returns:
-        Dict: Évaluation du risque
+        Dict: Évaluation du risque (risk_level HIGH / MODERATE / LOW)
     """
-    # Prédire RSSI
-    rssi_pred = predict_next_values(link_id, 'rssi_dbm', hours_ahead=2)
-    if rssi_pred['status'] != 'OK':
-        return {'risk_level': 'UNKNOWN', 'reason': 'Données insuffisantes'}
-    
-    # Vérifier si le RSSI prédit descend sous le seuil critique
     rssi_threshold = config.SEUILS_RSSI['DEGRADED']
-    future_rssi = rssi_pred['predictions'][-1]
     
     if future_rssi < rssi_threshold:
         return {
             'risk_level': 'HIGH',
             'reason': f"RSSI prédit ({future_rssi:.1f} dBm) sous le seuil de dégradation",
-            'estimated_time': rssi_pred['timestamps'][-1],
-            'confidence': rssi_pred['confidence']
+            'estimated_time': estimated_time,
+            'confidence': confidence
         }
-    elif future_rssi < rssi_threshold + 5:
+    elif future_rssi < rssi_threshold + config.RISK_SCORING_CONFIG['marge_moderee_db']:
         return {
             'risk_level': 'MODERATE',
             'reason': f"RSSI prédit ({future_rssi:.1f} dBm) proche du seuil",
-            'estimated_time': rssi_pred['timestamps'][-1],
-            'confidence': rssi_pred['confidence']
+            'estimated_time': estimated_time,
+            'confidence': confidence
         }
     else:
         return {
             'risk_level': 'LOW',
             'reason': f"RSSI prédit stable ({future_rssi:.1f} dBm)",
-            'confidence': rssi_pred['confidence']
+            'confidence': confidence
         }
+
+
+def predict_degradation_risk(link_id: int, window: MeasureWindow = None) -> Dict:
+    """
+    Évalue le risque de dégradation dans les prochaines heures.
+    
+    Args:
+        link_id (int): ID de la liaison
+        window (MeasureWindow, optional): Mesures préchargées (au moins 48h)
+        
+    Returns:
+        Dict: Évaluation du risque
+    """
+    # Prédire RSSI
+    rssi_pred = predict_next_values(link_id, 'rssi_dbm', hours_ahead=2, window=window)
+    if rssi_pred['status'] != 'OK':
+        return {'risk_level': 'UNKNOWN', 'reason': 'Données insuffisantes'}
+    
+    # Vérifier si le RSSI prédit descend sous le seuil critique
+    return classify_degradation_risk(
+        rssi_pred['predictions'][-1], rssi_pred['confidence'], rssi_pred['timestamps'][-1]
+    )
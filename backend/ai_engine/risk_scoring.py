@@ -0,0 +1,326 @@
+"""
+Scoring du risque de dégradation de toute la flotte.
+
+Le job ajuste la tendance RSSI (48h) de chaque liaison active par lots : un lot
+est chargé en une requête et ajusté en une passe de moindres carrés groupés
+(fit_trend_models), les lots étant répartis sur un pool de processus. Le RSSI
+prédit à l'horizon IA_CONFIG['prediction_horizon'] est classé comme dans
+predict_degradation_risk ; la confiance (R²) et le franchissement estimé du
+seuil SEUILS_RSSI['DEGRADED'] (ETA) sont enregistrés dans risques_liaisons,
+une ligne par liaison remplacée à chaque calcul. Un planificateur relance le
+job toutes les RISK_SCORING_CONFIG['interval_minutes'] minutes ; le premier
+calcul n'a lieu au démarrage du serveur que si RISK_SCORING_CONFIG['au_demarrage'].
+En SQLite, les lectures et le remplacement des lignes passent par le verrou de
+get_db_context et ne se mêlent pas aux transactions des pages.
+"""
+import atexit
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import case, delete, func, insert, select
+from backend.database.models import FHLink, RisqueLiaison
+from backend.database.connection import engine, get_db_context
+from backend.ai_engine.predictor import classify_degradation_risk, fit_trend_models
+from backend.security.logger import log_info, log_error
+import config
+
+# Niveaux de risque, du plus au moins urgent (ordre du classement)
+RISK_LEVELS = ['HIGH', 'MODERATE', 'LOW', 'UNKNOWN']
+
+
+def score_model(link_id: int, model: Optional[Dict], horizon: int) -> Dict:
+    """
+    Calcule la ligne de risque d'une liaison depuis son modèle de tendance RSSI.
+
+    Args:
+        link_id (int): ID de la liaison
+        model (Optional[Dict]): Modèle de fit_trend_models (None si aucune mesure)
+        horizon (int): Horizon de prédiction (heures)
+
+    Returns:
+        Dict: Ligne de risques_liaisons (sans calcule_le)
+    """
+    row = {
+        'link_id': link_id,
+        'niveau': 'UNKNOWN',
+        'raison': 'Données insuffisantes',
+        'rssi_actuel': None,
+        'rssi_predit': None,
+        'marge_db': None,
+        'pente_db_h': None,
+        'confiance': None,
+        'eta': None,
+        'horizon_heures': horizon,
+        'nb_points': model['nb_points'] if model else 0,
+        'derniere_mesure': model['last_timestamp'] if model else None
+    }
+    if model is None or model['status'] != 'OK':
+        return row
+
+    threshold = config.SEUILS_RSSI['DEGRADED']
+    future_rssi = model['intercept'] + model['coef'] * (model['last_offset_hours'] + horizon)
+    risk = classify_degradation_risk(future_rssi, model['score'])
+
+    # ETA : seuil déjà franchi, ou franchissement de la droite de tendance dans eta_max_heures
+    fitted_now = model['intercept'] + model['coef'] * model['last_offset_hours']
+    eta = None
+    if model['current_value'] < threshold or fitted_now < threshold:
+        eta = model['last_timestamp']
+    elif model['coef'] < 0:
+        hours_to_threshold = (threshold - fitted_now) / model['coef']
+        if hours_to_threshold <= config.RISK_SCORING_CONFIG['eta_max_heures']:
+            eta = model['last_timestamp'] + timedelta(hours=hours_to_threshold)
+
+    row.update(
+        niveau=risk['risk_level'],
+        raison=risk['reason'],
+        rssi_actuel=model['current_value'],
+        rssi_predit=float(future_rssi),
+        marge_db=float(future_rssi - threshold),
+        pente_db_h=model['coef'],
+        confiance=model['score'],
+        eta=eta
+    )
+    return row
+
+
+def score_links(link_ids: List[int]) -> List[Dict]:
+    """
+    Score un lot de liaisons (une requête, un ajustement groupé). Exécuté dans les workers.
+
+    Args:
+        link_ids (List[int]): Liaisons du lot
+
+    Returns:
+        List[Dict]: Une ligne de risque par liaison
+    """
+    horizon = config.IA_CONFIG['prediction_horizon']
+    models = fit_trend_models('rssi_dbm', link_ids, store=False)
+    return [score_model(link_id, models.get(link_id), horizon) for link_id in link_ids]
+
+
+def _can_use_processes() -> bool:
+    """Une base SQLite en mémoire n'est pas visible depuis d'autres processus."""
+    return not (engine.dialect.name == 'sqlite' and engine.url.database in (None, '', ':memory:'))
+
+
+_run_lock = threading.Lock()
+
+
+def run_risk_scoring(link_ids: Iterable[int] = None) -> Dict:
+    """
+    Score les liaisons actives (ou les liaisons données) et enregistre les résultats.
+
+    Args:
+        link_ids (Iterable[int], optional): Liaisons à scorer (toutes les liaisons actives par défaut)
+
+    Returns:
+        Dict: Résumé (nombre de liaisons, répartition par niveau, durée, processus utilisés)
+    """
+    with _run_lock:
+        started = time.perf_counter()
+        if link_ids is None:
+            with get_db_context() as db:
+                link_ids = db.execute(select(FHLink.id).where(FHLink.actif == True)).scalars().all()
+        link_ids = sorted(set(link_ids))
+
+        batch_size = config.RISK_SCORING_CONFIG['links_per_batch']
+        batches = [link_ids[i:i + batch_size] for i in range(0, len(link_ids), batch_size)]
+        workers = min(config.RISK_SCORING_CONFIG['max_workers'], os.cpu_count() or 1, len(batches))
+
+        rows = None
+        # Démarrer des processus (~1s chacun) ne paie que sur une flotte importante
+        if workers > 1 and len(link_ids) >= config.RISK_SCORING_CONFIG['min_links_processus'] and _can_use_processes():
+            # spawn : pas de fork d'un processus multi-thread (Streamlit) ni de connexion partagée
+            try:
+                with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+                    rows = [row for batch_rows in pool.map(score_links, batches) for row in batch_rows]
+            except (BrokenProcessPool, OSError) as e:
+                log_error("Pool de processus indisponible, scoring dans le processus courant", e,
+                          module="RiskScoring")
+        if rows is None:
+            workers = 1
+            rows = [row for batch in batches for row in score_links(batch)]
+
+        computed_at = datetime.utcnow()
+        for row in rows:
+            row['calcule_le'] = computed_at
+
+        with get_db_context() as db:
+            for i in range(0, len(link_ids), batch_size):
+                db.execute(delete(RisqueLiaison).where(RisqueLiaison.link_id.in_(link_ids[i:i + batch_size])))
+            if rows:
+                db.execute(insert(RisqueLiaison), rows)
+            db.commit()
+
+        par_niveau = {level: 0 for level in RISK_LEVELS}
+        for row in rows:
+            par_niveau[row['niveau']] += 1
+        summary = {
+            'nb_links': len(rows),
+            'par_niveau': par_niveau,
+            'duree_s': time.perf_counter() - started,
+            'nb_processus': workers,
+            'calcule_le': computed_at
+        }
+        log_info(f"Scoring du risque : {len(rows)} liaison(s) en {summary['duree_s']:.1f}s "
+                 f"({workers} processus), {par_niveau['HIGH']} à risque élevé", "RiskScoring")
+        return summary
+
+
+def _level_order():
+    """Expression SQL du rang d'un niveau (HIGH d'abord)."""
+    return case({level: rank for rank, level in enumerate(RISK_LEVELS)}, value=RisqueLiaison.niveau, else_=len(RISK_LEVELS))
+
+
+def get_risk_ranking(niveaux: List[str] = None, limit: int = None) -> List[Dict]:
+    """
+    Retourne les liaisons classées par risque (niveau, puis marge au seuil croissante).
+
+    Args:
+        niveaux (List[str], optional): Niveaux à retenir (tous par défaut)
+        limit (int, optional): Nombre maximum de liaisons
+
+    Returns:
+        List[Dict]: Risques avec nom et sites de la liaison
+    """
+    query = (
+        select(RisqueLiaison.__table__, FHLink.nom, FHLink.site_a, FHLink.site_b)
+        .join(FHLink, FHLink.id == RisqueLiaison.link_id)
+        .where(FHLink.actif == True)
+        .order_by(_level_order(), RisqueLiaison.marge_db.is_(None), RisqueLiaison.marge_db, RisqueLiaison.link_id)
+    )
+    if niveaux:
+        query = query.where(RisqueLiaison.niveau.in_(niveaux))
+    if limit is not None:
+        query = query.limit(limit)
+
+    with get_db_context() as db:
+        return [dict(row) for row in db.execute(query).mappings().all()]
+
+
+def get_link_risk(link_id: int) -> Optional[Dict]:
+    """
+    Retourne le dernier risque calculé pour une liaison.
+
+    Args:
+        link_id (int): ID de la liaison
+
+    Returns:
+        Optional[Dict]: Risque, ou None si la liaison n'a pas encore été scorée
+    """
+    with get_db_context() as db:
+        row = db.execute(
+            select(RisqueLiaison.__table__).where(RisqueLiaison.link_id == link_id)
+        ).mappings().first()
+    return dict(row) if row else None
+
+
+def get_risk_summary() -> Dict:
+    """
+    Retourne la répartition des liaisons par niveau de risque.
+
+    Returns:
+        Dict: Nombre de liaisons par niveau et date du dernier calcul
+    """
+    with get_db_context() as db:
+        rows = db.execute(
+            select(RisqueLiaison.niveau, func.count(), func.max(RisqueLiaison.calcule_le))
+            .group_by(RisqueLiaison.niveau)
+        ).all()
+    par_niveau = {level: 0 for level in RISK_LEVELS}
+    computed = [computed_at for _, _, computed_at in rows if computed_at is not None]
+    for niveau, count, _ in rows:
+        par_niveau[niveau] = count
+    return {
+        'par_niveau': par_niveau,
+        'nb_links': sum(par_niveau.values()),
+        'calcule_le': max(computed) if computed else None
+    }
+
+
+class RiskScoringScheduler:
+    """Relance run_risk_scoring périodiquement dans un thread de fond."""
+
+    def __init__(self, interval_minutes: float = None, run_at_start: bool = None):
+        self.interval_minutes = (
+            interval_minutes if interval_minutes is not None
+            else config.RISK_SCORING_CONFIG['interval_minutes']
+        )
+        self.run_at_start = (
+            run_at_start if run_at_start is not None
+            else config.RISK_SCORING_CONFIG['au_demarrage']
+        )
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_summary: Optional[Dict] = None
+        self._last_error: Optional[str] = None
+        self._next_run: Optional[datetime] = None
+        self._lock = threading.Lock()
+
+    def _run(self) -> None:
+        # Premier calcul après interval_minutes (au démarrage si run_at_start), puis toutes les interval_minutes
+        delay = 0 if self.run_at_start else self.interval_minutes * 60
+        while not self._stop.wait(delay):
+            delay = self.interval_minutes * 60
+            try:
+                summary, error = run_risk_scoring(), None
+            except Exception as e:
+                summary, error = None, str(e)
+                log_error(f"Scoring du risque en échec : {error}", module="RiskScoring")
+            with self._lock:
+                if summary is not None:
+                    self._last_summary = summary
+                self._last_error = error
+                self._next_run = datetime.utcnow() + timedelta(minutes=self.interval_minutes)
+
+    def start(self) -> None:
+        """Démarre le planificateur (sans effet s'il tourne déjà)."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._next_run = datetime.utcnow() + timedelta(minutes=0 if self.run_at_start else self.interval_minutes)
+            self._thread = threading.Thread(target=self._run, name='risk-scoring', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = None) -> None:
+        """Arrête le planificateur (le calcul en cours se termine)."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def status(self) -> Dict:
+        """
+        Retourne l'état du planificateur (supervision).
+
+        Returns:
+            Dict: En cours, dernier résumé, dernière erreur et prochain calcul (UTC)
+        """
+        with self._lock:
+            return {
+                'running': self._thread is not None and self._thread.is_alive(),
+                'last_summary': self._last_summary,
+                'last_error': self._last_error,
+                'next_run': self._next_run
+            }
+
+
+# Planificateur partagé par le processus
+risk_scheduler = RiskScoringScheduler()
+_scheduler_started = False
+
+
+def start_risk_scheduler() -> None:
+    """Démarre le job planifié si RISK_SCORING_CONFIG['enabled'] (une fois par processus)."""
+    global _scheduler_started
+    if not config.RISK_SCORING_CONFIG['enabled'] or _scheduler_started:
+        return
+    _scheduler_started = True
+    risk_scheduler.start()
+    atexit.register(risk_scheduler.stop, 5)
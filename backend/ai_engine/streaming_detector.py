@@ -0,0 +1,345 @@
+"""
+Détecteur d'anomalies en flux.
+
+Pour chaque (liaison, métrique), l'état tient une moyenne et une variance
+mobiles exponentielles (EWMA, alpha = 2 / (span + 1)) mises à jour en O(1) par
+mesure :
+    diff = x - moyenne ; moyenne += alpha * diff ; variance = (1 - alpha) * (variance + alpha * diff²)
+Une mesure est anormale si son écart à la moyenne de l'état précédent dépasse
+IA_CONFIG['anomaly_threshold'] écarts-types. L'état est mis à jour à l'import
+(même transaction que l'insertion) et persisté dans etats_anomalies : un
+redémarrage reprend là où le flux s'était arrêté. Un lot de mesures est traité
+en une passe vectorisée (filtre récursif scipy.signal.lfilter, identique à la
+mise à jour mesure par mesure), ce qui sert aussi au recalcul complet
+(rebuild_anomaly_states) pour les reprises d'historique.
+"""
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+from scipy.signal import lfilter
+from typing import Dict, Iterable, List, Tuple
+from sqlalchemy import delete, insert, select, update
+from backend.database.models import EtatAnomalie, MesureKPI
+from backend.database.connection import get_db_context
+import config
+
+# Champs de l'état persisté (hors id, link_id, metrique)
+STATE_FIELDS = [
+    'nb_mesures', 'moyenne', 'variance', 'derniere_valeur', 'dernier_timestamp', 'dernier_zscore',
+    'derniere_anomalie', 'debut_anomalies', 'nb_anomalies', 'derniere_chute', 'valeur_chute'
+]
+
+
+# État des anomalies multivariées (Isolation Forest, voir isolation_forest.py)
+MULTIVARIATE_METRIC = 'isolation_forest'
+
+
+def new_state() -> Dict:
+    """État vide d'un flux (aucune mesure)."""
+    state = {field: None for field in STATE_FIELDS}
+    state.update(nb_mesures=0, nb_anomalies=0)
+    return state
+
+
+def _ewm_recurrence(decay: float, inputs: np.ndarray, initial: float) -> np.ndarray:
+    """Calcule y_k = decay * y_{k-1} + inputs_k pour tout le lot (filtre récursif d'ordre 1)."""
+    return lfilter([1.0], [1.0, -decay], inputs, zi=[decay * initial])[0]
+
+
+def _record_episodes(state: Dict, moments: np.ndarray) -> None:
+    """
+    Ajoute des anomalies (timestamps triés) aux épisodes de l'état, modifié sur place.
+    Une anomalie plus d'une fenêtre après le début de l'épisode en ouvre un nouveau.
+    """
+    episode = timedelta(hours=config.STREAMING_ANOMALY_CONFIG['fenetre_heures'])
+    for moment in moments:
+        moment = pd.Timestamp(moment).to_pydatetime()
+        if state['debut_anomalies'] is None or moment - state['debut_anomalies'] > episode:
+            state['debut_anomalies'], state['nb_anomalies'] = moment, 0
+        state['nb_anomalies'] += 1
+        state['derniere_anomalie'] = moment
+
+
+def update_stream(state: Dict, metric: str, timestamps: np.ndarray, values: np.ndarray) -> Tuple[Dict, int]:
+    """
+    Intègre un lot de mesures d'un flux (liaison, métrique) à son état.
+    Les mesures antérieures ou égales au dernier timestamp de l'état sont ignorées
+    (déjà intégrées ; un historique ancien se recalcule avec rebuild_anomaly_states).
+
+    Args:
+        state (Dict): État courant (voir new_state), non modifié
+        metric (str): Métrique du flux
+        timestamps (np.ndarray): Timestamps triés (datetime64[ns])
+        values (np.ndarray): Valeurs de la métrique
+
+    Returns:
+        Tuple[Dict, int]: (Nouvel état, nombre d'anomalies détectées dans le lot)
+    """
+    timestamps = np.asarray(timestamps, dtype='datetime64[ns]')
+    values = np.asarray(values, dtype='float64')
+    keep = ~np.isnan(values)
+    if state['dernier_timestamp'] is not None:
+        keep &= timestamps > np.datetime64(state['dernier_timestamp'], 'ns')
+    timestamps, values = timestamps[keep], values[keep]
+    if len(values) == 0:
+        return state, 0
+
+    alpha = 2.0 / (config.STREAMING_ANOMALY_CONFIG['span'] + 1)
+    decay = 1.0 - alpha
+    n0 = state['nb_mesures']
+    mean0 = state['moyenne'] if n0 else values[0]
+    var0 = state['variance'] if n0 else 0.0
+
+    # Moyenne : m_k = (1 - a) m_{k-1} + a x_k ; variance : v_k = (1 - a) v_{k-1} + (1 - a) a d_k²
+    means = _ewm_recurrence(decay, alpha * values, mean0)
+    prev_means = np.concatenate(([mean0], means[:-1]))
+    diffs = values - prev_means
+    variances = _ewm_recurrence(decay, decay * alpha * diffs ** 2, var0)
+    prev_vars = np.concatenate(([var0], variances[:-1]))
+
+    # Z-score de chaque mesure par rapport à l'état précédent ; la variance, partie de 0
+    # à la première mesure, est corrigée de ce biais d'initialisation (poids 1 - (1 - a)^(n - 1))
+    n_before = n0 + np.arange(len(values))
+    weights = 1.0 - decay ** np.maximum(n_before - 1, 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        stds = np.sqrt(prev_vars / weights)
+        z_scores = np.where(stds > 0, diffs / stds, 0.0)
+    anomalies = (
+        (n_before >= config.IA_CONFIG['min_data_points'])
+        & (np.abs(z_scores) > config.IA_CONFIG['anomaly_threshold'])
+    )
+
+    new = dict(state)
+    new.update(
+        nb_mesures=n0 + len(values),
+        moyenne=float(means[-1]),
+        variance=float(variances[-1]),
+        derniere_valeur=float(values[-1]),
+        dernier_timestamp=pd.Timestamp(timestamps[-1]).to_pydatetime(),
+        dernier_zscore=float(z_scores[-1])
+    )
+
+    _record_episodes(new, timestamps[anomalies])
+
+    # Chutes brutales entre deux mesures consécutives
+    drop_threshold = config.STREAMING_ANOMALY_CONFIG['chutes'].get(metric)
+    if drop_threshold is not None:
+        previous = np.concatenate(([state['derniere_valeur'] if n0 else np.nan], values[:-1]))
+        drops = np.flatnonzero(previous - values > drop_threshold)
+        if len(drops):
+            new['derniere_chute'] = pd.Timestamp(timestamps[drops[-1]]).to_pydatetime()
+            new['valeur_chute'] = float(previous[drops[-1]] - values[drops[-1]])
+
+    return new, int(anomalies.sum())
+
+
+def _load_states(db, link_ids: Iterable[int]) -> Dict[Tuple[int, str], Dict]:
+    """Charge les états persistés des liaisons, indexés par (link_id, métrique)."""
+    rows = db.execute(
+        select(EtatAnomalie).where(EtatAnomalie.link_id.in_(list(link_ids)))
+    ).scalars().all()
+    return {
+        (row.link_id, row.metrique): {'id': row.id, **{field: getattr(row, field) for field in STATE_FIELDS}}
+        for row in rows
+    }
+
+
+def _save_states(db, states: Dict[Tuple[int, str], Dict]) -> None:
+    """Écrit les états (mise à jour executemany des existants, insertion des nouveaux)."""
+    updates = [state for state in states.values() if state.get('id') is not None]
+    inserts = [
+        {'link_id': link_id, 'metrique': metric, **{field: state[field] for field in STATE_FIELDS}}
+        for (link_id, metric), state in states.items() if state.get('id') is None
+    ]
+    if updates:
+        db.execute(update(EtatAnomalie), updates)
+    if inserts:
+        db.execute(insert(EtatAnomalie), inserts)
+
+
+def update_anomaly_states(db, frame: pd.DataFrame) -> int:
+    """
+    Met à jour l'état du détecteur avec des mesures nouvellement insérées.
+    Une liaison recevant des mesures antérieures à son état est recalculée
+    depuis la base (rebuild_anomaly_states, mesures du lot comprises).
+
+    Args:
+        db (Session): Session SQLAlchemy active (même transaction que l'insertion)
+        frame (pd.DataFrame): Mesures (link_id, timestamp, métriques)
+
+    Returns:
+        int: Nombre d'anomalies détectées
+    """
+    if frame.empty:
+        return 0
+    metrics = config.STREAMING_ANOMALY_CONFIG['metriques']
+    frame = frame.sort_values(['link_id', 'timestamp'], kind='stable')
+    link_column = frame['link_id'].to_numpy(dtype='int64')
+    timestamps = pd.to_datetime(frame['timestamp']).to_numpy(dtype='datetime64[ns]')
+    columns = {metric: frame[metric].to_numpy(dtype='float64') for metric in metrics}
+
+    states = _load_states(db, np.unique(link_column).tolist())
+
+    # Lignes triées par liaison : une coupe par liaison, un lot vectorisé par flux
+    boundaries = np.flatnonzero(np.diff(link_column)) + 1
+    nb_anomalies = 0
+    touched = {}
+    late_links = []
+    for start, end in zip(np.concatenate(([0], boundaries)), np.concatenate((boundaries, [len(link_column)]))):
+        link_id = int(link_column[start])
+        # Mesures antérieures à l'état (import dans le désordre) : recalcul complet de la liaison.
+        # Seuls les flux EWMA comptent (les états externes, ex. Isolation Forest, ne sont pas recalculés)
+        last = [state['dernier_timestamp'] for (state_link, metric), state in states.items()
+                if state_link == link_id and metric in metrics and state['dernier_timestamp'] is not None]
+        if last and timestamps[start] <= np.datetime64(min(last), 'ns'):
+            late_links.append(link_id)
+            continue
+        for metric in metrics:
+            key = (link_id, metric)
+            state = states.get(key) or new_state()
+            updated, found = update_stream(state, metric, timestamps[start:end], columns[metric][start:end])
+            if updated is not state:
+                touched[key] = updated
+                nb_anomalies += found
+
+    _save_states(db, touched)
+    for link_id in late_links:
+        rebuild_anomaly_states(db, link_id)
+    return nb_anomalies
+
+
+def update_event_states(db, metric: str, frame: pd.DataFrame, scores: np.ndarray, flags: np.ndarray) -> int:
+    """
+    Met à jour l'état d'un détecteur externe (ex. Isolation Forest) depuis des
+    mesures déjà scorées : dernier score, nombre de mesures et épisodes d'anomalies.
+    Les mesures antérieures ou égales au dernier timestamp de l'état sont ignorées.
+
+    Args:
+        db (Session): Session SQLAlchemy active (même transaction que l'insertion)
+        metric (str): Nom de l'état (ex. MULTIVARIATE_METRIC)
+        frame (pd.DataFrame): Mesures scorées (link_id, timestamp)
+        scores (np.ndarray): Score de chaque mesure (NaN : mesure non scorée, ignorée)
+        flags (np.ndarray): Mesures anormales
+
+    Returns:
+        int: Nombre d'anomalies enregistrées
+    """
+    scored = ~np.isnan(scores)
+    if not scored.any():
+        return 0
+    work = pd.DataFrame({
+        'link_id': frame['link_id'].to_numpy(dtype='int64')[scored],
+        'timestamp': pd.to_datetime(frame['timestamp']).to_numpy(dtype='datetime64[ns]')[scored],
+        'score': np.asarray(scores, dtype='float64')[scored],
+        'flag': np.asarray(flags, dtype=bool)[scored]
+    }).sort_values(['link_id', 'timestamp'], kind='stable')
+
+    states = _load_states(db, work['link_id'].unique().tolist())
+    touched = {}
+    nb_anomalies = 0
+    for link_id, rows in work.groupby('link_id', sort=False):
+        key = (int(link_id), metric)
+        state = states.get(key, new_state())
+        timestamps = rows['timestamp'].to_numpy()
+        if state['dernier_timestamp'] is not None:
+            rows = rows[timestamps > np.datetime64(state['dernier_timestamp'], 'ns')]
+            timestamps = rows['timestamp'].to_numpy()
+        if rows.empty:
+            continue
+        new = dict(state)
+        new.update(
+            nb_mesures=state['nb_mesures'] + len(rows),
+            derniere_valeur=float(rows['score'].iloc[-1]),
+            dernier_timestamp=pd.Timestamp(timestamps[-1]).to_pydatetime()
+        )
+        flagged = timestamps[rows['flag'].to_numpy()]
+        _record_episodes(new, flagged)
+        nb_anomalies += len(flagged)
+        touched[key] = new
+
+    _save_states(db, touched)
+    return nb_anomalies
+
+
+def clear_event_state(db, metric: str, link_id: int) -> None:
+    """
+    Supprime l'état d'un détecteur externe pour une liaison (mesures supprimées).
+
+    Args:
+        db (Session): Session SQLAlchemy active
+        metric (str): Nom de l'état
+        link_id (int): ID de la liaison
+    """
+    db.execute(delete(EtatAnomalie).where(EtatAnomalie.link_id == link_id, EtatAnomalie.metrique == metric))
+
+
+def rebuild_anomaly_states(db, link_id: int) -> int:
+    """
+    Recalcule l'état d'une liaison depuis tout son historique (mode lot :
+    reprise d'historique, mesures supprimées, rattrapage initial).
+
+    Args:
+        db (Session): Session SQLAlchemy active (commit à la charge de l'appelant)
+        link_id (int): ID de la liaison
+
+    Returns:
+        int: Nombre de mesures relues
+    """
+    metrics = config.STREAMING_ANOMALY_CONFIG['metriques']
+    db.execute(delete(EtatAnomalie).where(EtatAnomalie.link_id == link_id, EtatAnomalie.metrique.in_(metrics)))
+    rows = db.execute(
+        select(MesureKPI.link_id, MesureKPI.timestamp, *[getattr(MesureKPI, m) for m in metrics])
+        .where(MesureKPI.link_id == link_id)
+        .order_by(MesureKPI.timestamp)
+    ).all()
+    if rows:
+        update_anomaly_states(db, pd.DataFrame(rows, columns=['link_id', 'timestamp'] + metrics))
+    return len(rows)
+
+
+def get_anomaly_states(link_ids: Iterable[int]) -> Dict[int, Dict[str, Dict]]:
+    """
+    Lit les états du détecteur de plusieurs liaisons en une requête.
+
+    Args:
+        link_ids (Iterable[int]): Liaisons
+
+    Returns:
+        Dict[int, Dict[str, Dict]]: {link_id: {métrique: état}}
+    """
+    with get_db_context() as db:
+        states = _load_states(db, link_ids)
+    by_link: Dict[int, Dict[str, Dict]] = {}
+    for (link_id, metric), state in states.items():
+        by_link.setdefault(link_id, {})[metric] = state
+    return by_link
+
+
+def evaluate_anomaly_state(states: Dict[str, Dict], now: datetime = None) -> Tuple[bool, str]:
+    """
+    Détermine, depuis l'état du détecteur, si une liaison présente des anomalies récentes.
+
+    Args:
+        states (Dict[str, Dict]): États de la liaison par métrique
+        now (datetime, optional): Instant de référence (maintenant par défaut)
+
+    Returns:
+        Tuple[bool, str]: (Anomalie détectée, Description)
+    """
+    now = now or datetime.utcnow()
+    window = timedelta(hours=config.STREAMING_ANOMALY_CONFIG['fenetre_heures'])
+    labels = {'rssi_dbm': 'RSSI', 'snr_db': 'SNR', MULTIVARIATE_METRIC: 'multivariée'}
+
+    for metric in config.STREAMING_ANOMALY_CONFIG['metriques'] + [MULTIVARIATE_METRIC]:
+        state = states.get(metric)
+        if state and state['derniere_anomalie'] is not None and state['derniere_anomalie'] >= now - window:
+            label = labels.get(metric, metric)
+            return True, f"Anomalie {label} détectée : {state['nb_anomalies']} événement(s)"
+
+    drop_window = timedelta(hours=config.STREAMING_ANOMALY_CONFIG['fenetre_chute_heures'])
+    for metric in config.STREAMING_ANOMALY_CONFIG['chutes']:
+        state = states.get(metric)
+        if state and state['derniere_chute'] is not None and state['derniere_chute'] >= now - drop_window:
+            return True, "Chute brutale de signal détectée"
+
+    return False, "Aucune anomalie détectée"
@@ -1,12 +1,20 @@
 """
 Moteur de génération et gestion des alertes.
 """
+import numpy as np
 from datetime import datetime
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
+from sqlalchemy import func, select, tuple_
 from backend.database.models import Alerte, MesureKPI, FHLink
 from backend.database.connection import get_db_context
+from backend.database.query_cache import active_alerts_cache, fleet_alert_counts_cache, invalidate_alerts
+from backend.alerts.alert_index import open_alert_index
+from backend.alerts.correlation import alert_correlator
+from backend.alerts.notifier import notify_alert_created
 from backend.analytics.kpi_calculator import calculate_link_status, get_latest_kpis
+from backend.analytics.measure_window import WINDOW_METRICS, load_measure_window, window_scope
 from backend.ai_engine.anomaly_detector import is_anomalous
+from backend.alerts.rule_engine import get_rule_engine
 import config
 
 
@@ -40,17 +48,21 @@ def create_alert(
     try:
         with get_db_context() as db:
             # Vérifier si une alerte similaire existe déjà (même type, même liaison, non résolue)
-            existing_alert = db.query(Alerte).filter(
-                Alerte.link_id == link_id,
-                Alerte.type == alert_type,
-                Alerte.resolved == False
-            ).first()
-            
-            # Si une alerte similaire existe déjà, ne pas créer de doublon
-            if existing_alert:
+            # via l'index en mémoire des alertes ouvertes (pas de requête par alerte)
+            if open_alert_index.contains(link_id, alert_type):
                 print(f"Alerte {alert_type} déjà active pour liaison {link_id}")
                 return False, 0
             
+            # Rattacher l'alerte à un incident (même site, même cause) ;
+            # en tempête, seul l'incident est mis à jour
+            correlated = alert_correlator.correlate(db, [{
+                'link_id': link_id, 'type': alert_type, 'severite': severite
+            }])
+            if not correlated:
+                db.commit()
+                print(f"Alerte {alert_type} rattachée à un incident en cours pour liaison {link_id}")
+                return False, 0
+            
             # Créer la nouvelle alerte
             alerte = Alerte(
                 link_id=link_id,
@@ -62,17 +74,24 @@ def create_alert(
                 resolved=False,
                 valeur_mesuree=valeur_mesuree,
                 seuil_declenche=seuil_declenche,
-                ia_generated=ia_generated
+                ia_generated=ia_generated,
+                incident_id=correlated[0]['incident_id']
             )
             
             db.add(alerte)
             db.commit()
             db.refresh(alerte)
+            open_alert_index.add(link_id, alert_type, alerte.id)
+            invalidate_alerts([link_id])
+            notify_alert_created({'id': alerte.id, 'link_id': link_id, 'type': alert_type,
+                                  'severite': severite, 'message': message})
             
             print(f"✓ Alerte créée : {alert_type} [{severite}] pour liaison {link_id}")
             return True, alerte.id
             
     except Exception as e:
+        # Incidents non écrits : la mémoire du corrélateur est rechargée depuis la base
+        alert_correlator.invalidate()
         print(f"Erreur création alerte : {e}")
         return False, 0
 
@@ -99,89 +118,43 @@ def check_and_create_alerts(link_id: int) -> List[int]:
     print(f"\n🔍 Vérification alertes pour liaison {link_id}")
     print(f"   RSSI: {kpis['rssi_dbm']:.1f} dBm | SNR: {kpis['snr_db']:.1f} dB | BER: {kpis['ber']:.2e}")
     
-    # Vérifier RSSI
-    if kpis['rssi_dbm'] < config.SEUILS_RSSI['CRITIQUE']:
-        print(f"   → RSSI critique détecté ({kpis['rssi_dbm']:.1f} < {config.SEUILS_RSSI['CRITIQUE']})")
-        success, alert_id = create_alert(
-            link_id=link_id,
-            alert_type='RSSI_LOW',
-            severite='CRITIQUE',
-            message=f"RSSI critique : {kpis['rssi_dbm']:.1f} dBm",
-            recommandation="Vérifier immédiatement l'alignement des antennes et les conditions météo",
-            valeur_mesuree=kpis['rssi_dbm'],
-            seuil_declenche=config.SEUILS_RSSI['CRITIQUE']
-        )
-        if success:
-            created_alerts.append(alert_id)
-    
-    elif kpis['rssi_dbm'] < config.SEUILS_RSSI['DEGRADED']:
-        print(f"   → RSSI dégradé détecté ({kpis['rssi_dbm']:.1f} < {config.SEUILS_RSSI['DEGRADED']})")
-        success, alert_id = create_alert(
-            link_id=link_id,
-            alert_type='RSSI_LOW',
-            severite='MAJEURE',
-            message=f"RSSI dégradé : {kpis['rssi_dbm']:.1f} dBm",
-            recommandation="Surveillance accrue recommandée, planifier une inspection",
-            valeur_mesuree=kpis['rssi_dbm'],
-            seuil_declenche=config.SEUILS_RSSI['DEGRADED']
-        )
-        if success:
-            created_alerts.append(alert_id)
-    
-    # Vérifier SNR
-    if kpis['snr_db'] < config.SEUILS_SNR['CRITIQUE']:
-        success, alert_id = create_alert(
-            link_id=link_id,
-            alert_type='SNR_LOW',
-            severite='CRITIQUE',
-            message=f"SNR critique : {kpis['snr_db']:.1f} dB",
-            recommandation="Réduire les sources d'interférence, vérifier la configuration",
-            valeur_mesuree=kpis['snr_db'],
-            seuil_declenche=config.SEUILS_SNR['CRITIQUE']
-        )
-        if success:
-            created_alerts.append(alert_id)
-    
-    elif kpis['snr_db'] < config.SEUILS_SNR['DEGRADED']:
-        success, alert_id = create_alert(
-            link_id=link_id,
-            alert_type='SNR_LOW',
-            severite='MAJEURE',
-            message=f"SNR dégradé : {kpis['snr_db']:.1f} dB",
-            recommandation="Surveiller l'évolution, identifier les sources d'interférence",
-            valeur_mesuree=kpis['snr_db'],
-            seuil_declenche=config.SEUILS_SNR['DEGRADED']
-        )
-        if success:
-            created_alerts.append(alert_id)
-    
-    # Vérifier impact pluie
-    if kpis['rainfall_mm'] > 15 and kpis['rssi_dbm'] < config.SEUILS_RSSI['ACCEPTABLE']:
-        success, alert_id = create_alert(
-            link_id=link_id,
-            alert_type='RAINFALL_IMPACT',
-            severite='MAJEURE',
-            message=f"Impact pluie détecté : {kpis['rainfall_mm']:.1f} mm, RSSI={kpis['rssi_dbm']:.1f} dBm",
-            recommandation="Atténuation due à la pluie, surveillance renforcée jusqu'à amélioration météo",
-            valeur_mesuree=kpis['rainfall_mm'],
-            seuil_declenche=15
-        )
-        if success:
-            created_alerts.append(alert_id)
-    
-    # Vérifier anomalies IA
-    anomaly_detected, anomaly_msg = is_anomalous(link_id)
-    if anomaly_detected:
-        success, alert_id = create_alert(
-            link_id=link_id,
-            alert_type='ANOMALY_DETECTED',
-            severite='PREDICTIVE',
-            message=f"Anomalie détectée par l'IA : {anomaly_msg}",
-            recommandation="Analyser les métriques détaillées et les tendances",
-            ia_generated=True
-        )
-        if success:
-            created_alerts.append(alert_id)
+    engine = get_rule_engine()
+    with window_scope():
+        # Règles d'alerte (compilées une fois, voir rule_engine)
+        if engine.requires_history:
+            window = load_measure_window(link_id, config.ALERT_RULES_CONFIG['historique_heures'])
+            candidates = engine.evaluate_windows({link_id: window})
+        else:
+            columns = {metric: np.array([kpis.get(metric)], dtype='float64') for metric in WINDOW_METRICS}
+            candidates = engine.evaluate(columns, np.array([link_id]))
+
+        for candidate in candidates:
+            print(f"   → {candidate['type']} [{candidate['severite']}] : {candidate['message']}")
+            success, alert_id = create_alert(
+                link_id=link_id,
+                alert_type=candidate['type'],
+                severite=candidate['severite'],
+                message=candidate['message'],
+                recommandation=candidate['recommandation'],
+                valeur_mesuree=candidate['valeur_mesuree'],
+                seuil_declenche=candidate['seuil_declenche']
+            )
+            if success:
+                created_alerts.append(alert_id)
+        
+        # Vérifier anomalies IA
+        anomaly_detected, anomaly_msg = is_anomalous(link_id)
+        if anomaly_detected:
+            success, alert_id = create_alert(
+                link_id=link_id,
+                alert_type='ANOMALY_DETECTED',
+                severite='PREDICTIVE',
+                message=f"Anomalie détectée par l'IA : {anomaly_msg}",
+                recommandation="Analyser les métriques détaillées et les tendances",
+                ia_generated=True
+            )
+            if success:
+                created_alerts.append(alert_id)
     
     return created_alerts
 
@@ -212,6 +185,8 @@ def resolve_alert(alert_id: int, resolved_by: str) -> Tuple[bool, str]:
             alerte.resolved_by = resolved_by
             
             db.commit()
+            open_alert_index.remove(alerte.link_id, alerte.type, alerte.id)
+            invalidate_alerts([alerte.link_id])
             
             return True, "Alerte résolue avec succès"
             
@@ -222,6 +197,8 @@ def resolve_alert(alert_id: int, resolved_by: str) -> Tuple[bool, str]:
 def get_active_alerts(link_id: int = None) -> List[Dict]:
     """
     Récupère les alertes actives sous forme de dictionnaires.
+    Le résultat est mis en cache (partagé entre sessions, invalidé à chaque
+    création, résolution ou suppression d'alerte).
     
     Args:
         link_id (int, optional): Filtrer par liaison
@@ -229,6 +206,12 @@ def get_active_alerts(link_id: int = None) -> List[Dict]:
     Returns:
         List[Dict]: Liste des alertes actives
     """
+    key = link_id or None
+    return active_alerts_cache.get_or_load(key, lambda: _load_active_alerts(key))
+
+
+def _load_active_alerts(link_id: int = None) -> List[Dict]:
+    """Charge les alertes actives depuis la base (sans cache)."""
     with get_db_context() as db:
         query = db.query(Alerte).filter(Alerte.resolved == False)
         
@@ -252,6 +235,7 @@ def get_active_alerts(link_id: int = None) -> List[Dict]:
                 'valeur_mesuree': alert.valeur_mesuree,
                 'seuil_declenche': alert.seuil_declenche,
                 'ia_generated': alert.ia_generated,
+                'incident_id': alert.incident_id,
                 'resolved_at': alert.resolved_at if hasattr(alert, 'resolved_at') else None,
                 'resolved_by': alert.resolved_by if hasattr(alert, 'resolved_by') else None
             })
@@ -261,7 +245,7 @@ def get_active_alerts(link_id: int = None) -> List[Dict]:
 
 def get_alerts_count_by_severity(link_id: int = None) -> Dict:
     """
-    Compte les alertes actives par sévérité.
+    Compte les alertes actives par sévérité (une requête GROUP BY).
     
     Args:
         link_id (int, optional): Filtrer par liaison
@@ -269,22 +253,154 @@ def get_alerts_count_by_severity(link_id: int = None) -> Dict:
     Returns:
         Dict: Dictionnaire {sévérité: compte}
     """
+    counts = get_alerts_histogram(link_id=link_id, resolved=False)
+    return {severity: counts.get(severity, 0) for severity in config.ALERT_SEVERITIES}
+
+
+def get_fleet_alert_counts() -> Dict[int, Dict[str, int]]:
+    """
+    Compte les alertes actives de toute la flotte par liaison et par sévérité,
+    en une requête agrégée. Le résultat est mis en cache (invalidé à chaque
+    création, résolution ou suppression d'alerte).
+    
+    Returns:
+        Dict[int, Dict[str, int]]: {link_id: {sévérité: compte}} (liaisons ayant des alertes actives)
+    """
+    return fleet_alert_counts_cache.get_or_load(None, _load_fleet_alert_counts)
+
+
+def _load_fleet_alert_counts() -> Dict[int, Dict[str, int]]:
+    """Charge les comptes par liaison et sévérité depuis la base (sans cache)."""
     with get_db_context() as db:
-        query = db.query(Alerte).filter(Alerte.resolved == False)
-        
-        if link_id:
-            query = query.filter(Alerte.link_id == link_id)
+        rows = db.execute(
+            select(Alerte.link_id, Alerte.severite, func.count(Alerte.id))
+            .where(Alerte.resolved == False)
+            .group_by(Alerte.link_id, Alerte.severite)
+        ).all()
+    
+    counts = {}
+    for link_id, severite, count in rows:
+        counts.setdefault(link_id, {})[severite] = count
+    return counts
+
+
+def _alert_filters(link_id: int = None, severities: List[str] = None, resolved: bool = None,
+                   date_from: datetime = None) -> List:
+    """Conditions SQL communes à la liste paginée, au comptage et à l'histogramme des alertes."""
+    conditions = []
+    if link_id:
+        conditions.append(Alerte.link_id == link_id)
+    if resolved is not None:
+        conditions.append(Alerte.resolved == resolved)
+    if severities:
+        conditions.append(Alerte.severite.in_(severities))
+    if date_from is not None:
+        conditions.append(Alerte.timestamp >= date_from)
+    return conditions
+
+
+def get_alerts_page(
+    link_id: int = None,
+    severities: List[str] = None,
+    resolved: bool = None,
+    date_from: datetime = None,
+    cursor: Tuple[datetime, int] = None,
+    page_size: int = None
+) -> Tuple[List[Dict], Optional[Tuple[datetime, int]]]:
+    """
+    Récupère une page d'alertes, de la plus récente à la plus ancienne, par
+    pagination par clé sur (timestamp, id) : le coût d'une page ne dépend pas
+    de sa position. Le texte des recommandations n'est pas chargé (voir
+    get_alert_recommandation).
+    
+    Args:
+        link_id (int, optional): Filtrer par liaison
+        severities (List[str], optional): Sévérités retenues
+        resolved (bool, optional): True résolues, False actives, None toutes
+        date_from (datetime, optional): Alertes postérieures à cette date
+        cursor (Tuple[datetime, int], optional): Clé (timestamp, id) de la dernière alerte de la page précédente
+        page_size (int, optional): Alertes par page (config.ALERTS_PAGE_CONFIG par défaut)
         
-        alerts = query.all()
+    Returns:
+        Tuple[List[Dict], Optional[Tuple[datetime, int]]]: (Alertes de la page, curseur de la page suivante ou None)
+    """
+    page_size = page_size or config.ALERTS_PAGE_CONFIG['page_size']
+    conditions = _alert_filters(link_id, severities, resolved, date_from)
+    if cursor is not None:
+        conditions.append(tuple_(Alerte.timestamp, Alerte.id) < tuple_(*cursor))
+    
+    query = (
+        select(
+            Alerte.id, Alerte.link_id, Alerte.timestamp, Alerte.type, Alerte.severite,
+            Alerte.message, Alerte.recommandation.isnot(None).label('has_recommandation'),
+            Alerte.resolved, Alerte.valeur_mesuree, Alerte.seuil_declenche, Alerte.ia_generated,
+            Alerte.incident_id, Alerte.resolved_at, Alerte.resolved_by
+        )
+        .where(*conditions)
+        .order_by(Alerte.timestamp.desc(), Alerte.id.desc())
+        .limit(page_size + 1)
+    )
+    with get_db_context() as db:
+        rows = db.execute(query).mappings().all()
+    
+    alerts = [dict(row) for row in rows[:page_size]]
+    next_cursor = (alerts[-1]['timestamp'], alerts[-1]['id']) if len(rows) > page_size else None
+    return alerts, next_cursor
+
+
+def get_alert_recommandation(alert_id: int) -> Optional[str]:
+    """
+    Charge le texte de recommandation d'une alerte (chargement à la demande).
+    
+    Args:
+        alert_id (int): ID de l'alerte
         
-        # Extraire les sévérités DANS le contexte de la session
-        severities = [a.severite for a in alerts]
+    Returns:
+        Optional[str]: Recommandation, None si absente
+    """
+    with get_db_context() as db:
+        return db.execute(select(Alerte.recommandation).where(Alerte.id == alert_id)).scalar()
+
+
+def count_alerts(link_id: int = None, severities: List[str] = None, resolved: bool = None,
+                 date_from: datetime = None) -> int:
+    """
+    Compte les alertes correspondant aux filtres (COUNT servi par les index, sans charger les lignes).
+    
+    Args:
+        link_id (int, optional): Filtrer par liaison
+        severities (List[str], optional): Sévérités retenues
+        resolved (bool, optional): True résolues, False actives, None toutes
+        date_from (datetime, optional): Alertes postérieures à cette date
         
-        counts = {}
-        for severity in config.ALERT_SEVERITIES.keys():
-            counts[severity] = severities.count(severity)
+    Returns:
+        int: Nombre d'alertes
+    """
+    conditions = _alert_filters(link_id, severities, resolved, date_from)
+    with get_db_context() as db:
+        return db.execute(select(func.count(Alerte.id)).where(*conditions)).scalar()
+
+
+def get_alerts_histogram(link_id: int = None, severities: List[str] = None, resolved: bool = None,
+                         date_from: datetime = None) -> Dict[str, int]:
+    """
+    Répartition des alertes par sévérité en une requête GROUP BY.
+    
+    Args:
+        link_id (int, optional): Filtrer par liaison
+        severities (List[str], optional): Sévérités retenues
+        resolved (bool, optional): True résolues, False actives, None toutes
+        date_from (datetime, optional): Alertes postérieures à cette date
         
-        return counts
+    Returns:
+        Dict[str, int]: {sévérité: nombre} (sévérités présentes uniquement)
+    """
+    conditions = _alert_filters(link_id, severities, resolved, date_from)
+    with get_db_context() as db:
+        rows = db.execute(
+            select(Alerte.severite, func.count(Alerte.id)).where(*conditions).group_by(Alerte.severite)
+        ).all()
+    return {severite: count for severite, count in rows}
 
 
 def delete_alert(alert_id: int) -> Tuple[bool, str]:
@@ -304,8 +420,13 @@ def delete_alert(alert_id: int) -> Tuple[bool, str]:
             if not alerte:
                 return False, "Alerte non trouvée"
             
+            link_id, alert_type = alerte.link_id, alerte.type
+            if alerte.incident_id is not None:
+                alert_correlator.release(db, alerte.incident_id, link_id, alert_type)
             db.delete(alerte)
             db.commit()
+            open_alert_index.remove(link_id, alert_type, alert_id)
+            invalidate_alerts([link_id])
             
             return True, "Alerte supprimée"
             
@@ -0,0 +1,130 @@
+"""
+Index en mémoire des alertes ouvertes, partagé par tout le processus.
+
+create_alert consulte cet index au lieu d'une requête SELECT par alerte pour
+éviter les doublons (même liaison, même type, non résolue). L'index est chargé
+une fois depuis la base (index partiel ix_alertes_ouvertes), tenu à jour par
+create_alert, resolve_alert et delete_alert, et rechargé périodiquement pour
+prendre en compte les écritures d'autres processus (scripts, autres instances).
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, Optional, Set, Tuple
+from sqlalchemy import select
+from backend.database.models import Alerte
+from backend.database.connection import get_db_context
+import config
+
+
+class OpenAlertIndex:
+    """Clés (link_id, type) des alertes non résolues, avec les IDs correspondants."""
+
+    def __init__(self, refresh_seconds: float = None):
+        self.refresh_seconds = (
+            refresh_seconds if refresh_seconds is not None
+            else config.CACHE_CONFIG['open_alerts_refresh_seconds']
+        )
+        self._alerts: Dict[Tuple[int, str], Set[int]] = {}
+        self._loaded_at: Optional[float] = None
+        # Incrémenté à chaque modification : un chargement concurrent est écarté
+        self._version = 0
+        self._lock = threading.RLock()
+
+    def _ensure_loaded(self) -> None:
+        """
+        Charge l'index depuis la base s'il est vide, invalidé ou trop ancien.
+        La requête est faite hors du verrou de l'index : une lecture de l'index
+        n'attend jamais une transaction en cours. Un chargement concurrent d'un
+        ajout, d'un retrait ou d'une invalidation est recommencé.
+        """
+        while True:
+            with self._lock:
+                if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.refresh_seconds:
+                    return
+                version = self._version
+            with get_db_context() as db:
+                rows = db.execute(
+                    select(Alerte.id, Alerte.link_id, Alerte.type).where(Alerte.resolved == False)
+                ).all()
+            alerts: Dict[Tuple[int, str], Set[int]] = {}
+            for alert_id, link_id, alert_type in rows:
+                alerts.setdefault((link_id, alert_type), set()).add(alert_id)
+            with self._lock:
+                if self._version == version:
+                    self._alerts = alerts
+                    self._loaded_at = time.monotonic()
+                    return
+
+    @contextmanager
+    def _loaded(self) -> Iterator[Dict[Tuple[int, str], Set[int]]]:
+        """Fournit l'index chargé, verrou de l'index tenu (rechargé s'il est invalidé entre-temps)."""
+        while True:
+            self._ensure_loaded()
+            with self._lock:
+                if self._loaded_at is not None:
+                    yield self._alerts
+                    return
+
+    def contains(self, link_id: int, alert_type: str) -> bool:
+        """Indique si une alerte non résolue de ce type existe pour la liaison."""
+        with self._loaded() as alerts:
+            return (link_id, alert_type) in alerts
+
+    def open_keys(self, link_ids: Iterable[int] = None) -> Set[Tuple[int, str]]:
+        """
+        Retourne les clés (link_id, type) des alertes ouvertes.
+
+        Args:
+            link_ids (Iterable[int], optional): Restreindre à ces liaisons
+
+        Returns:
+            Set[Tuple[int, str]]: Clés des alertes ouvertes
+        """
+        with self._loaded() as alerts:
+            if link_ids is None:
+                return set(alerts)
+            link_ids = set(link_ids)
+            return {key for key in alerts if key[0] in link_ids}
+
+    def add(self, link_id: int, alert_type: str, alert_id: int) -> None:
+        """Enregistre une alerte ouverte qui vient d'être créée."""
+        with self._lock:
+            self._version += 1
+            if self._loaded_at is not None:
+                self._alerts.setdefault((link_id, alert_type), set()).add(alert_id)
+
+    def remove(self, link_id: int, alert_type: str, alert_id: int) -> None:
+        """Retire une alerte résolue ou supprimée."""
+        with self._lock:
+            self._version += 1
+            ids = self._alerts.get((link_id, alert_type))
+            if ids is not None:
+                ids.discard(alert_id)
+                if not ids:
+                    del self._alerts[(link_id, alert_type)]
+
+    def invalidate(self) -> None:
+        """Force le rechargement depuis la base au prochain accès."""
+        with self._lock:
+            self._version += 1
+            self._loaded_at = None
+            self._alerts = {}
+
+    def stats(self) -> Dict:
+        """
+        Retourne l'état de l'index (supervision).
+
+        Returns:
+            Dict: Nombre de clés et d'alertes ouvertes, âge du chargement (s)
+        """
+        with self._lock:
+            return {
+                'keys': len(self._alerts),
+                'alerts': sum(len(ids) for ids in self._alerts.values()),
+                'age_seconds': None if self._loaded_at is None else time.monotonic() - self._loaded_at
+            }
+
+
+# Index partagé par le processus
+open_alert_index = OpenAlertIndex()
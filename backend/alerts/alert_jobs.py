@@ -0,0 +1,162 @@
+"""
+Génération des alertes en tâche de fond après un import.
+
+L'import retourne dès que les mesures sont enregistrées : les liaisons touchées
+sont soumises à un pool de threads, par lots évalués en parallèle avec
+evaluate_fleet_alerts. L'interface suit l'avancement via get_job_status().
+
+En SQLite, la connexion unique (StaticPool) est partagée par tout le processus :
+le pool n'a alors qu'un worker, et chaque transaction d'un lot prend le verrou
+de get_db_context (database_lock), comme celles des pages Streamlit : une page
+attend la fin de la transaction en cours au lieu de la valider ou de l'annuler.
+"""
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+from backend.database.connection import engine
+from backend.alerts.fleet_evaluator import evaluate_fleet_alerts
+from backend.security.logger import log_info, log_error
+import config
+
+# Statuts d'une tâche
+JOB_PENDING = 'EN_ATTENTE'
+JOB_RUNNING = 'EN_COURS'
+JOB_DONE = 'TERMINEE'
+JOB_FAILED = 'ERREUR'
+
+_jobs: "OrderedDict[str, Dict]" = OrderedDict()
+_futures: Dict[str, List] = {}
+_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Crée le pool de workers au premier usage."""
+    global _executor
+    with _lock:
+        if _executor is None:
+            max_workers = 1 if engine.dialect.name == 'sqlite' else config.ALERT_JOBS_CONFIG['max_workers']
+            _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='alert-job')
+        return _executor
+
+
+def _run_batch(job_id: str, link_ids: List[int]) -> None:
+    """Évalue les alertes d'un lot de liaisons et met à jour l'avancement de la tâche."""
+    with _lock:
+        job = _jobs[job_id]
+        if job['status'] == JOB_PENDING:
+            job['status'] = JOB_RUNNING
+            job['started_at'] = datetime.utcnow()
+
+    try:
+        evaluation = evaluate_fleet_alerts(link_ids)
+        error = None
+    except Exception as e:
+        evaluation, error = None, str(e)
+        log_error(f"Tâche d'alertes {job_id} : erreur sur un lot de {len(link_ids)} liaison(s) : {error}",
+                  module="AlertJobs")
+
+    with _lock:
+        job['nb_links_done'] += len(link_ids)
+        if evaluation is not None:
+            job['nb_alerts'] += evaluation['nb_alerts']
+            for alert_type, count in evaluation['par_type'].items():
+                job['par_type'][alert_type] = job['par_type'].get(alert_type, 0) + count
+        else:
+            job['errors'].append(error)
+
+        job['batches_done'] += 1
+        if job['batches_done'] == job['nb_batches']:
+            job['status'] = JOB_FAILED if job['errors'] else JOB_DONE
+            job['finished_at'] = datetime.utcnow()
+            log_info(f"Tâche d'alertes {job_id} terminée : {job['nb_alerts']} alerte(s) "
+                     f"sur {job['nb_links']} liaison(s)", "AlertJobs")
+
+
+def submit_alert_job(link_ids: Iterable[int]) -> str:
+    """
+    Soumet la génération des alertes des liaisons données en tâche de fond.
+
+    Args:
+        link_ids (Iterable[int]): Liaisons touchées par l'import
+
+    Returns:
+        str: Identifiant de la tâche (voir get_job_status)
+    """
+    link_ids = sorted(set(link_ids))
+    batch_size = config.ALERT_JOBS_CONFIG['links_per_batch']
+    batches = [link_ids[i:i + batch_size] for i in range(0, len(link_ids), batch_size)]
+
+    job_id = uuid.uuid4().hex[:12]
+    job = {
+        'id': job_id,
+        'status': JOB_PENDING if batches else JOB_DONE,
+        'nb_links': len(link_ids),
+        'nb_links_done': 0,
+        'nb_batches': len(batches),
+        'batches_done': 0,
+        'nb_alerts': 0,
+        'par_type': {},
+        'errors': [],
+        'created_at': datetime.utcnow(),
+        'started_at': None,
+        'finished_at': None if batches else datetime.utcnow()
+    }
+
+    with _lock:
+        _jobs[job_id] = job
+        # Seules les dernières tâches terminées sont conservées
+        finished = [jid for jid, j in _jobs.items() if j['status'] in (JOB_DONE, JOB_FAILED)]
+        for old_id in finished[:max(0, len(finished) - config.ALERT_JOBS_CONFIG['max_jobs_kept'])]:
+            del _jobs[old_id]
+            _futures.pop(old_id, None)
+
+    executor = _get_executor()
+    futures = [executor.submit(_run_batch, job_id, batch) for batch in batches]
+    with _lock:
+        _futures[job_id] = futures
+
+    log_info(f"Tâche d'alertes {job_id} soumise : {len(link_ids)} liaison(s) en {len(batches)} lot(s)",
+             "AlertJobs")
+    return job_id
+
+
+def get_job_status(job_id: str) -> Optional[Dict]:
+    """
+    Retourne l'état d'une tâche de génération d'alertes.
+
+    Args:
+        job_id (str): Identifiant de la tâche
+
+    Returns:
+        Optional[Dict]: Statut, avancement (0-1), alertes créées par type, erreurs (None si inconnue)
+    """
+    with _lock:
+        job = _jobs.get(job_id)
+        if job is None:
+            return None
+        status = {**job, 'par_type': dict(job['par_type']), 'errors': list(job['errors'])}
+
+    status['progress'] = status['nb_links_done'] / status['nb_links'] if status['nb_links'] else 1.0
+    status['finished'] = status['status'] in (JOB_DONE, JOB_FAILED)
+    return status
+
+
+def wait_for_job(job_id: str, timeout: float = None) -> Optional[Dict]:
+    """
+    Attend la fin d'une tâche (scripts, tests) et retourne son état.
+
+    Args:
+        job_id (str): Identifiant de la tâche
+        timeout (float, optional): Attente maximale en secondes
+
+    Returns:
+        Optional[Dict]: État de la tâche (voir get_job_status)
+    """
+    with _lock:
+        futures = list(_futures.get(job_id, []))
+    wait(futures, timeout=timeout)
+    return get_job_status(job_id)
@@ -0,0 +1,416 @@
+"""
+Corrélation des alertes en incidents (tempêtes d'alertes).
+
+Lors d'une forte pluie, de nombreuses liaisons se dégradent en même temps et
+chacune produit ses alertes RSSI_LOW, SNR_LOW, RAINFALL_IMPACT, ANOMALY_DETECTED.
+Avant insertion, chaque alerte est rattachée à un incident parent :
+- groupement par site (FHLink.site_a / site_b) et par cause racine
+  (config.CORRELATION_CONFIG['causes'], une cause dominante absorbant les autres) ;
+- fenêtre glissante en mémoire (deque par (site, cause), éviction au fil de l'eau)
+  qui compte les liaisons distinctes touchées récemment ;
+- au-delà de 'storm_threshold' alertes par incident, les alertes ne sont plus
+  insérées : seul l'incident est mis à jour (compteurs, liaisons, sévérité).
+  Ces alertes n'existent que dans Incident.membres : elles n'apparaissent ni dans
+  la liste ni dans les comptes d'alertes, et sont closes avec l'incident.
+Un membre dont l'alerte a été résolue ou supprimée alors que l'incident est
+encore ouvert est rattaché de nouveau si le défaut revient (alerte recréée).
+Les sites des liaisons sont mémorisés et relus à chaque rechargement des incidents
+(CACHE_CONFIG['open_alerts_refresh_seconds']).
+"""
+import json
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime, timedelta
+from typing import Deque, Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import or_, select, update
+from backend.database.models import Alerte, FHLink, Incident
+from backend.database.connection import get_db_context
+from backend.database.query_cache import invalidate_alerts
+from backend.alerts.alert_index import open_alert_index
+from backend.security.logger import log_info
+import config
+
+
+class SlidingWindow:
+    """Événements récents (instant, liaison) par clé, sur une fenêtre glissante de N secondes."""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self._events: Dict[Tuple, Deque[Tuple[float, int]]] = {}
+        self._links: Dict[Tuple, Counter] = {}
+
+    def _evict(self, key: Tuple, now: float) -> None:
+        """Retire les événements sortis de la fenêtre (les plus anciens sont en tête)."""
+        events = self._events.get(key)
+        if events is None:
+            return
+        links = self._links[key]
+        while events and events[0][0] < now - self.seconds:
+            _, link_id = events.popleft()
+            links[link_id] -= 1
+            if not links[link_id]:
+                del links[link_id]
+        if not events:
+            del self._events[key]
+            del self._links[key]
+
+    def add(self, key: Tuple, now: float, link_id: int) -> None:
+        """Enregistre un événement pour une clé."""
+        self._evict(key, now)
+        self._events.setdefault(key, deque()).append((now, link_id))
+        self._links.setdefault(key, Counter())[link_id] += 1
+
+    def links(self, key: Tuple, now: float) -> Set[int]:
+        """Liaisons distinctes ayant un événement dans la fenêtre pour cette clé."""
+        self._evict(key, now)
+        return set(self._links.get(key, ()))
+
+    def clear(self) -> None:
+        self._events.clear()
+        self._links.clear()
+
+
+def _severity_level(severite: str) -> int:
+    return config.ALERT_SEVERITIES.get(severite, {}).get('level', 0)
+
+
+class AlertCorrelator:
+    """
+    Rattache les alertes candidates aux incidents ouverts, partagé par tout le processus.
+    Les incidents mis à jour dans la fenêtre sont gardés en mémoire (rechargés
+    périodiquement depuis la base, comme l'index des alertes ouvertes).
+    """
+
+    def __init__(self, refresh_seconds: float = None):
+        self.refresh_seconds = (
+            refresh_seconds if refresh_seconds is not None
+            else config.CACHE_CONFIG['open_alerts_refresh_seconds']
+        )
+        self.window = SlidingWindow(config.CORRELATION_CONFIG['window_minutes'] * 60)
+        self._incidents: Dict[Tuple[str, str], Dict] = {}
+        self._sites: Dict[int, Tuple[str, ...]] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.RLock()
+
+    @property
+    def window_delta(self) -> timedelta:
+        return timedelta(minutes=config.CORRELATION_CONFIG['window_minutes'])
+
+    def _ensure_loaded(self, db) -> None:
+        """
+        Charge les incidents non résolus mis à jour dans la fenêtre (si vide, invalidé ou trop ancien).
+        Les sites des liaisons sont relus avec eux (changement de site d'une liaison).
+        """
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.refresh_seconds:
+            return
+        self._sites = {}
+        rows = db.execute(
+            select(Incident).where(Incident.resolved == False,
+                                   Incident.date_maj >= datetime.utcnow() - self.window_delta)
+        ).scalars().all()
+        # Membres créés en base (ouverts ou résolus) : les autres ont été supprimés (tempête)
+        created: Dict[int, Set[Tuple[int, str]]] = {}
+        if rows:
+            for incident_id, link_id, alert_type in db.execute(
+                select(Alerte.incident_id, Alerte.link_id, Alerte.type)
+                .where(Alerte.incident_id.in_([row.id for row in rows]))
+            ).all():
+                created.setdefault(incident_id, set()).add((link_id, alert_type))
+        self._incidents = {}
+        for row in rows:
+            membres = {tuple(membre) for membre in json.loads(row.membres or '[]')}
+            self._incidents[(row.site, row.cause)] = {
+                'id': row.id,
+                'severite': row.severite,
+                'date_maj': row.date_maj,
+                'nb_alertes': row.nb_alertes,
+                'nb_supprimees': row.nb_supprimees,
+                'membres': membres,
+                'supprimees': membres - created.get(row.id, set()),
+                'liaisons': {link_id for link_id, _ in membres}
+            }
+        self._loaded_at = time.monotonic()
+
+    def _link_sites(self, db, link_ids: Iterable[int]) -> Dict[int, Tuple[str, ...]]:
+        """Sites (site_a, site_b) des liaisons, mémorisés jusqu'au prochain rechargement des incidents."""
+        missing = [link_id for link_id in set(link_ids) if link_id not in self._sites]
+        if missing:
+            for link_id, site_a, site_b in db.execute(
+                select(FHLink.id, FHLink.site_a, FHLink.site_b).where(FHLink.id.in_(missing))
+            ).all():
+                self._sites[link_id] = tuple(dict.fromkeys((site_a, site_b)))
+        return self._sites
+
+    def _group(self, sites: Tuple[str, ...], cause: str, now: float, date: datetime) -> Tuple[Tuple[str, str], int]:
+        """
+        Choisit le groupe (site, cause) d'une alerte : incident ouvert en priorité,
+        sinon le site qui compte le plus de liaisons touchées dans la fenêtre.
+        Une cause dominante active sur le site absorbe la cause de l'alerte.
+        """
+        best, best_links = None, 0
+        for site in sites:
+            causes = [cause]
+            for dominante, absorbees in config.CORRELATION_CONFIG['dominantes'].items():
+                if cause in absorbees and (self._is_open((site, dominante), date)
+                                           or self.window.links((site, dominante), now)):
+                    causes = [dominante, cause]
+                    break
+            key = (site, causes[0])
+            if self._is_open(key, date):
+                return key, 0
+            nb_links = len(set().union(*[self.window.links((site, c), now) for c in causes]))
+            if nb_links > best_links:
+                best, best_links = key, nb_links
+        return best, best_links
+
+    def _is_open(self, key: Tuple[str, str], date: datetime) -> bool:
+        """Un incident est ouvert à la corrélation s'il a été mis à jour dans la fenêtre."""
+        incident = self._incidents.get(key)
+        if incident is not None and incident['date_maj'] < date - self.window_delta:
+            del self._incidents[key]
+            return False
+        return incident is not None
+
+    def _open_incident(self, db, key: Tuple[str, str], severite: str, date: datetime) -> Dict:
+        """Crée un incident et y rattache les alertes ouvertes récentes du même groupe."""
+        site, cause = key
+        libelle = config.CORRELATION_CONFIG['libelles'].get(cause, cause)
+        row = Incident(site=site, cause=cause, severite=severite, titre=f"{libelle} - site {site}",
+                       date_debut=date, date_maj=date, membres='[]')
+        db.add(row)
+        db.flush()
+        incident = {'id': row.id, 'severite': severite, 'date_maj': date, 'nb_alertes': 0,
+                    'nb_supprimees': 0, 'membres': set(), 'supprimees': set(), 'liaisons': set()}
+        self._incidents[key] = incident
+
+        # Alertes créées avant l'ouverture de l'incident (liaisons du site, même cause)
+        causes = {cause} | set(config.CORRELATION_CONFIG['dominantes'].get(cause, []))
+        types = [t for t, c in config.CORRELATION_CONFIG['causes'].items() if c in causes]
+        link_ids = select(FHLink.id).where(or_(FHLink.site_a == site, FHLink.site_b == site))
+        earlier = db.execute(
+            select(Alerte.id, Alerte.link_id, Alerte.type, Alerte.severite).where(
+                Alerte.resolved == False, Alerte.incident_id.is_(None),
+                Alerte.link_id.in_(link_ids), Alerte.type.in_(types),
+                Alerte.timestamp >= date - self.window_delta)
+        ).all()
+        if earlier:
+            db.execute(update(Alerte).where(Alerte.id.in_([a.id for a in earlier])).values(incident_id=row.id))
+            for alert in earlier:
+                self._attach(incident, alert.link_id, alert.type, alert.severite)
+        return incident
+
+    @staticmethod
+    def _attach(incident: Dict, link_id: int, alert_type: str, severite: str) -> None:
+        incident['membres'].add((link_id, alert_type))
+        incident['liaisons'].add(link_id)
+        incident['nb_alertes'] += 1
+        if _severity_level(severite) > _severity_level(incident['severite']):
+            incident['severite'] = severite
+
+    def correlate(self, db, records: List[Dict]) -> List[Dict]:
+        """
+        Rattache des alertes candidates aux incidents (créés si besoin) et retourne
+        celles à insérer, avec 'incident_id' renseigné (None hors incident). Les alertes
+        au-delà du seuil de tempête sont comptées dans l'incident mais pas retournées.
+        Les incidents sont écrits dans la session db (commit par l'appelant).
+
+        Args:
+            db: Session SQLAlchemy de l'insertion
+            records (List[Dict]): Alertes à créer (champs link_id, type, severite...)
+
+        Returns:
+            List[Dict]: Alertes à insérer
+        """
+        causes = config.CORRELATION_CONFIG['causes']
+        storm_threshold = config.CORRELATION_CONFIG['storm_threshold']
+        date = datetime.utcnow()
+        now = time.monotonic()
+
+        with self._lock:
+            self._ensure_loaded(db)
+            sites = self._link_sites(db, [record['link_id'] for record in records])
+
+            # Toutes les alertes du lot entrent dans la fenêtre avant le groupement
+            for record in records:
+                if record['type'] in causes:
+                    for site in sites.get(record['link_id'], ()):
+                        self.window.add((site, causes[record['type']]), now, record['link_id'])
+
+            kept, touched = [], {}
+            for record in records:
+                link_id, alert_type = record['link_id'], record['type']
+                if alert_type not in causes or link_id not in sites:
+                    kept.append({**record, 'incident_id': None})
+                    continue
+
+                key, nb_links = self._group(sites[link_id], causes[alert_type], now, date)
+                incident = self._incidents.get(key)
+                if incident is None:
+                    if nb_links < config.CORRELATION_CONFIG['min_links']:
+                        kept.append({**record, 'incident_id': None})
+                        continue
+                    incident = self._open_incident(db, key, record['severite'], date)
+
+                incident['date_maj'] = date
+                touched[key] = incident
+                member = (link_id, alert_type)
+                if member in incident['supprimees'] or (
+                        member in incident['membres'] and open_alert_index.contains(link_id, alert_type)):
+                    continue  # déjà couverte : alerte ouverte ou supprimée (tempête) lors d'une évaluation précédente
+
+                # Nouveau membre, ou membre dont l'alerte a été résolue ou supprimée : le défaut est revenu
+                self._attach(incident, link_id, alert_type, record['severite'])
+                if incident['nb_alertes'] > storm_threshold:
+                    incident['nb_supprimees'] += 1
+                    incident['supprimees'].add(member)
+                    continue
+                kept.append({**record, 'incident_id': incident['id']})
+
+            for incident in touched.values():
+                db.execute(update(Incident).where(Incident.id == incident['id']).values(
+                    severite=incident['severite'],
+                    date_maj=incident['date_maj'],
+                    nb_liaisons=len(incident['liaisons']),
+                    nb_alertes=incident['nb_alertes'],
+                    nb_supprimees=incident['nb_supprimees'],
+                    membres=json.dumps(sorted(incident['membres']))
+                ))
+        return kept
+
+    def release(self, db, incident_id: int, link_id: int, alert_type: str) -> None:
+        """
+        Retire d'un incident le membre d'une alerte supprimée : si le défaut revient
+        avant la clôture de l'incident, une nouvelle alerte est créée.
+        Les membres d'alertes résolues restent (historique) et sont recréés de même.
+
+        Args:
+            db: Session SQLAlchemy de la suppression
+            incident_id (int): Incident de l'alerte
+            link_id (int): Liaison de l'alerte
+            alert_type (str): Type de l'alerte
+        """
+        member = [link_id, alert_type]
+        row = db.get(Incident, incident_id)
+        if row is not None:
+            row.membres = json.dumps([m for m in json.loads(row.membres or '[]') if m != member])
+        with self._lock:
+            for incident in self._incidents.values():
+                if incident['id'] == incident_id:
+                    incident['membres'].discard(tuple(member))
+
+    def forget(self, incident_id: int) -> None:
+        """Retire un incident résolu de la mémoire."""
+        with self._lock:
+            self._incidents = {key: incident for key, incident in self._incidents.items()
+                               if incident['id'] != incident_id}
+
+    def invalidate(self) -> None:
+        """Force le rechargement des incidents et vide la fenêtre glissante."""
+        with self._lock:
+            self._loaded_at = None
+            self._incidents = {}
+            self._sites = {}
+            self.window.clear()
+
+    def stats(self) -> Dict:
+        """
+        Retourne l'état du corrélateur (supervision).
+
+        Returns:
+            Dict: Incidents ouverts à la corrélation, clés de la fenêtre glissante
+        """
+        with self._lock:
+            return {
+                'incidents': len(self._incidents),
+                'window_keys': len(self.window._events),
+                'age_seconds': None if self._loaded_at is None else time.monotonic() - self._loaded_at
+            }
+
+
+# Corrélateur partagé par le processus
+alert_correlator = AlertCorrelator()
+
+
+def get_active_incidents(limit: int = None) -> List[Dict]:
+    """
+    Récupère les incidents non résolus, du plus récent au plus ancien.
+
+    Args:
+        limit (int, optional): Nombre maximal d'incidents
+
+    Returns:
+        List[Dict]: Incidents (dont la liste des liaisons touchées)
+    """
+    with get_db_context() as db:
+        query = db.query(Incident).filter(Incident.resolved == False).order_by(Incident.date_maj.desc())
+        if limit:
+            query = query.limit(limit)
+
+        incidents = []
+        for incident in query.all():
+            membres = json.loads(incident.membres or '[]')
+            incidents.append({
+                'id': incident.id,
+                'site': incident.site,
+                'cause': incident.cause,
+                'severite': incident.severite,
+                'titre': incident.titre,
+                'date_debut': incident.date_debut,
+                'date_maj': incident.date_maj,
+                'nb_liaisons': incident.nb_liaisons,
+                'nb_alertes': incident.nb_alertes,
+                'nb_supprimees': incident.nb_supprimees,
+                'membres': [tuple(membre) for membre in membres],
+                'liaisons': sorted({link_id for link_id, _ in membres}),
+                'types': sorted({alert_type for _, alert_type in membres})
+            })
+        return incidents
+
+
+def resolve_incident(incident_id: int, resolved_by: str) -> Tuple[bool, str]:
+    """
+    Marque un incident comme résolu, ainsi que ses alertes ouvertes.
+
+    Args:
+        incident_id (int): ID de l'incident
+        resolved_by (str): Email de l'utilisateur qui résout
+
+    Returns:
+        Tuple[bool, str]: (Succès, Message)
+    """
+    try:
+        with get_db_context() as db:
+            incident = db.query(Incident).filter(Incident.id == incident_id).first()
+
+            if not incident:
+                return False, "Incident non trouvé"
+
+            if incident.resolved:
+                return False, "Incident déjà résolu"
+
+            now = datetime.utcnow()
+            incident.resolved = True
+            incident.resolved_at = now
+            incident.resolved_by = resolved_by
+
+            alerts = db.execute(
+                select(Alerte.id, Alerte.link_id, Alerte.type)
+                .where(Alerte.incident_id == incident_id, Alerte.resolved == False)
+            ).all()
+            if alerts:
+                db.execute(update(Alerte).where(Alerte.id.in_([a.id for a in alerts])).values(
+                    resolved=True, resolved_at=now, resolved_by=resolved_by))
+
+            db.commit()
+
+        alert_correlator.forget(incident_id)
+        for alert in alerts:
+            open_alert_index.remove(alert.link_id, alert.type, alert.id)
+        invalidate_alerts({alert.link_id for alert in alerts})
+        log_info(f"Incident {incident_id} résolu par {resolved_by} ({len(alerts)} alerte(s))", "Correlation")
+
+        return True, f"Incident résolu ({len(alerts)} alerte(s))"
+
+    except Exception as e:
+        return False, f"Erreur : {str(e)}"
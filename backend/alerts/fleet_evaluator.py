@@ -0,0 +1,181 @@
+"""
+Évaluation des alertes de toute la flotte en une passe.
+
+Les règles de check_and_create_alerts (moteur de règles, anomalies IA)
+sont appliquées à toutes les liaisons à la fois :
+- dernière mesure par liaison via une seule requête fenêtrée (ROW_NUMBER),
+  ou fenêtres de toute la flotte en une requête si une règle a une durée/hystérésis ;
+- règles compilées évaluées en lot (rule_engine) ;
+- anomalies IA lues dans l'état du détecteur en flux (une requête) ;
+- alertes ouvertes (link_id, type) lues dans l'index en mémoire pour éviter les doublons ;
+- alertes corrélées en incidents (site, cause racine), tempêtes réduites à l'incident ;
+- nouvelles alertes insérées en executemany.
+"""
+import numpy as np
+from datetime import datetime
+from typing import Dict, Iterable, List
+from sqlalchemy import func, insert, select
+from backend.database.models import Alerte, MesureKPI
+from backend.database.connection import get_db_context
+from backend.database.query_cache import invalidate_alerts
+from backend.alerts.alert_index import open_alert_index
+from backend.alerts.correlation import alert_correlator
+from backend.alerts.notifier import notify_alert_created
+from backend.analytics.measure_window import WINDOW_METRICS, load_fleet_windows
+from backend.alerts.rule_engine import get_rule_engine
+from backend.ai_engine.anomaly_detector import is_anomalous
+from backend.ai_engine.streaming_detector import get_anomaly_states
+from backend.security.logger import log_info
+import config
+
+
+def get_latest_measures(link_ids: Iterable[int] = None) -> Dict[str, np.ndarray]:
+    """
+    Récupère la dernière mesure de chaque liaison en une requête (ROW_NUMBER).
+
+    Args:
+        link_ids (Iterable[int], optional): Liaisons à évaluer (toutes par défaut)
+
+    Returns:
+        Dict[str, np.ndarray]: Colonnes link_id, timestamp et métriques (WINDOW_METRICS)
+    """
+    columns = ['link_id', 'timestamp'] + WINDOW_METRICS
+    rang = func.row_number().over(
+        partition_by=MesureKPI.link_id,
+        order_by=MesureKPI.timestamp.desc()
+    ).label('rang')
+
+    ranked = select(*[getattr(MesureKPI, column) for column in columns], rang)
+    if link_ids is not None:
+        ranked = ranked.where(MesureKPI.link_id.in_(list(link_ids)))
+    ranked = ranked.subquery()
+
+    with get_db_context() as db:
+        rows = db.execute(
+            select(*[ranked.c[column] for column in columns]).where(ranked.c.rang == 1)
+        ).all()
+
+    values = list(zip(*rows)) if rows else [() for _ in columns]
+    latest = {
+        'link_id': np.array(values[0], dtype='int64'),
+        'timestamp': np.array(values[1], dtype='datetime64[ns]')
+    }
+    for column, column_values in zip(columns[2:], values[2:]):
+        latest[column] = np.array(column_values, dtype='float64')
+    return latest
+
+
+def _anomaly_candidates(link_ids: Iterable[int]) -> List[Dict]:
+    """
+    Applique is_anomalous à chaque liaison, les états du détecteur en flux
+    étant lus en une requête.
+    """
+    link_ids = list(link_ids)
+    states = get_anomaly_states(link_ids)
+    candidates = []
+    for link_id in link_ids:
+        anomaly_detected, anomaly_msg = is_anomalous(link_id, states=states.get(link_id, {}))
+        if anomaly_detected:
+            candidates.append({
+                'link_id': link_id,
+                'type': 'ANOMALY_DETECTED',
+                'severite': 'PREDICTIVE',
+                'message': f"Anomalie détectée par l'IA : {anomaly_msg}",
+                'recommandation': "Analyser les métriques détaillées et les tendances",
+                'valeur_mesuree': None,
+                'seuil_declenche': None,
+                'ia_generated': True
+            })
+    return candidates
+
+
+def evaluate_fleet_alerts(link_ids: Iterable[int] = None, include_anomalies: bool = True) -> Dict:
+    """
+    Évalue les règles d'alerte sur toutes les liaisons (ou une sélection) en une passe
+    et insère les nouvelles alertes en bloc. Une alerte n'est pas créée si une alerte
+    non résolue du même type existe déjà pour la liaison.
+
+    Args:
+        link_ids (Iterable[int], optional): Liaisons à évaluer (toutes par défaut)
+        include_anomalies (bool): Appliquer aussi la détection d'anomalies IA
+
+    Returns:
+        Dict: {
+            'nb_links': Liaisons évaluées (ayant au moins une mesure),
+            'nb_alerts': Alertes créées,
+            'alert_ids': IDs des alertes créées (si le dialecte supporte RETURNING),
+            'par_type': {type: nombre d'alertes créées},
+            'nb_supprimees': Alertes rattachées à un incident sans être créées (tempête)
+        }
+    """
+    link_ids = set(link_ids) if link_ids is not None else None
+
+    engine = get_rule_engine()
+
+    if engine.requires_history:
+        windows = load_fleet_windows(config.ALERT_RULES_CONFIG['historique_heures'], link_ids)
+        candidates = engine.evaluate_windows(windows)
+        evaluated = list(windows)
+    else:
+        latest = get_latest_measures(link_ids)
+        candidates = engine.evaluate(latest, latest['link_id'])
+        evaluated = latest['link_id'].tolist()
+
+    if include_anomalies:
+        candidates += _anomaly_candidates(evaluated)
+
+    result = {'nb_links': len(evaluated), 'nb_alerts': 0, 'alert_ids': [], 'par_type': {}, 'nb_supprimees': 0}
+    if not candidates:
+        return result
+
+    # Alertes ouvertes (link_id, type) : index en mémoire, pas de requête par alerte
+    open_keys = open_alert_index.open_keys(link_ids)
+    now = datetime.utcnow()
+    records = []
+    for candidate in candidates:
+        key = (candidate['link_id'], candidate['type'])
+        if key in open_keys:
+            continue
+        open_keys.add(key)
+        records.append({**candidate, 'timestamp': now, 'resolved': False})
+
+    if not records:
+        return result
+
+    nb_candidates = len(records)
+    with get_db_context() as db:
+        try:
+            # Rattachement aux incidents (même site, même cause) ; en tempête, alertes non insérées
+            records = alert_correlator.correlate(db, records)
+            if records:
+                if db.get_bind().dialect.insert_executemany_returning:
+                    statement = insert(Alerte).returning(Alerte.id, sort_by_parameter_order=True)
+                    result['alert_ids'] = list(db.execute(statement, records).scalars())
+                else:
+                    db.execute(insert(Alerte), records)
+            db.commit()
+        except Exception:
+            alert_correlator.invalidate()
+            raise
+    result['nb_supprimees'] = nb_candidates - len(records)
+
+    if not records:
+        return result
+
+    if result['alert_ids']:
+        for record, alert_id in zip(records, result['alert_ids']):
+            open_alert_index.add(record['link_id'], record['type'], alert_id)
+    else:
+        # IDs inconnus sans RETURNING : rechargement de l'index au prochain accès
+        open_alert_index.invalidate()
+
+    for record in records:
+        result['par_type'][record['type']] = result['par_type'].get(record['type'], 0) + 1
+    result['nb_alerts'] = len(records)
+
+    invalidate_alerts({record['link_id'] for record in records})
+    for record in records:
+        notify_alert_created(record)
+    log_info(f"Évaluation flotte : {result['nb_alerts']} alerte(s) créée(s) sur {result['nb_links']} liaison(s)"
+             f", {result['nb_supprimees']} rattachée(s) à un incident sans création", "FleetEvaluator")
+    return result
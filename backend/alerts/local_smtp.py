@@ -0,0 +1,111 @@
+"""
+Serveur SMTP local minimal (développement, benchmarks, essais du notifier).
+
+Accepte les commandes EHLO/HELO, MAIL, RCPT, DATA, RSET, NOOP et QUIT et
+conserve les messages reçus en mémoire. Peut simuler des pannes transitoires
+(réponse 451 aux premiers DATA) pour exercer les nouvelles tentatives.
+
+Usage :
+    python -m backend.alerts.local_smtp --port 8025
+"""
+import argparse
+import asyncio
+import threading
+import time
+from email import message_from_bytes, policy
+from email.message import EmailMessage
+from typing import List
+
+
+class LocalSMTPServer:
+    """Serveur SMTP en mémoire, exécuté dans un thread dédié."""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, fail_first: int = 0):
+        self.host = host
+        self.port = port
+        self.fail_first = fail_first
+        self.messages: List[EmailMessage] = []
+        self.received_at: List[float] = []
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._ready = threading.Event()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Dialogue SMTP avec un client."""
+        async def reply(line: str):
+            writer.write(f"{line}\r\n".encode())
+            await writer.drain()
+
+        await reply("220 netpulse-local ESMTP")
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            command = line.decode(errors='replace').strip().upper()
+            if command.startswith(('EHLO', 'HELO')):
+                await reply("250 netpulse-local")
+            elif command.startswith(('MAIL', 'RCPT', 'RSET', 'NOOP')):
+                await reply("250 OK")
+            elif command == 'DATA':
+                await reply("354 Fin des données par <CRLF>.<CRLF>")
+                lines = []
+                while True:
+                    data_line = await reader.readline()
+                    if data_line in (b".\r\n", b".\n", b""):
+                        break
+                    lines.append(data_line[1:] if data_line.startswith(b"..") else data_line)
+                if self.fail_first > 0:
+                    self.fail_first -= 1
+                    await reply("451 Erreur temporaire simulée")
+                    continue
+                self.messages.append(message_from_bytes(b"".join(lines), policy=policy.default))
+                self.received_at.append(time.perf_counter())
+                await reply("250 Message accepté")
+            elif command == 'QUIT':
+                await reply("221 Au revoir")
+                break
+            else:
+                await reply("502 Commande non supportée")
+        writer.close()
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        self._server = self._loop.run_until_complete(asyncio.start_server(self._handle, self.host, self.port))
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        self._loop.run_forever()
+        self._server.close()
+        self._loop.run_until_complete(self._server.wait_closed())
+        self._loop.close()
+
+    def start(self) -> 'LocalSMTPServer':
+        """Démarre le serveur (port choisi par le système si port=0)."""
+        self._thread = threading.Thread(target=self._run, name='local-smtp', daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def stop(self):
+        """Arrête le serveur."""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serveur SMTP local (messages affichés)")
+    parser.add_argument('--port', type=int, default=8025)
+    args = parser.parse_args()
+
+    server = LocalSMTPServer(port=args.port).start()
+    print(f"📬 Serveur SMTP local sur 127.0.0.1:{server.port} (Ctrl+C pour arrêter)")
+    seen = 0
+    try:
+        while True:
+            time.sleep(1)
+            for message in server.messages[seen:]:
+                print(f"\n📧 {message['To']} — {message['Subject']}\n{message.get_content()}")
+            seen = len(server.messages)
+    except KeyboardInterrupt:
+        server.stop()
@@ -1,20 +1,39 @@
 """
 Module de notification (email, SMS, etc.).
-Pour l'instant, simulation des notifications.
+
+Les notifications d'alertes ne sont jamais envoyées dans le fil de la création
+d'alerte : elles sont confiées à un dispatcher asyncio qui tourne dans un thread
+dédié (NotificationService) :
+- file bornée (au-delà de queue_size alertes en attente, les notifications sont abandonnées et comptées) ;
+- regroupement par destinataire : une alerte déjà en attente pour la même
+  liaison et le même type n'est envoyée qu'une fois (avec son nombre d'occurrences) ;
+- digest : un message par destinataire dès digest_size alertes ou digest_seconds ;
+- nouvelles tentatives avec backoff exponentiel ;
+- transports interchangeables (console, SMTP, ou enregistrés via register_transport) ;
+- métriques de débit et de latence (metrics()).
 """
-from typing import List
+import asyncio
+import atexit
+import smtplib
+import threading
+import time
+from collections import OrderedDict, deque
 from datetime import datetime
+from email.message import EmailMessage
+from typing import Callable, Dict, List, Optional
+from backend.security.logger import log_info, log_error
+import config
 
 
 def send_email_notification(to: List[str], subject: str, body: str) -> bool:
     """
     Simule l'envoi d'une notification email.
-    
+
     Args:
         to (List[str]): Liste d'emails destinataires
         subject (str): Sujet
         body (str): Corps du message
-        
+
     Returns:
         bool: Succès de l'envoi
     """
@@ -29,11 +48,11 @@ def send_email_notification(to: List[str], subject: str, body: str) -> bool:
 def send_sms_notification(phone: str, message: str) -> bool:
     """
     Simule l'envoi d'une notification SMS.
-    
+
     Args:
         phone (str): Numéro de téléphone
         message (str): Message
-        
+
     Returns:
         bool: Succès de l'envoi
     """
@@ -44,18 +63,342 @@ def send_sms_notification(phone: str, message: str) -> bool:
     return True
 
 
+class ConsoleTransport:
+    """Transport de développement : affiche les notifications (email, ou SMS si pas d'@)."""
+
+    async def send(self, recipient: str, subject: str, body: str) -> None:
+        if '@' in recipient:
+            send_email_notification([recipient], subject, body)
+        else:
+            send_sms_notification(recipient, f"{subject}\n{body}")
+
+
+class SMTPTransport:
+    """Transport SMTP (smtplib exécuté hors de la boucle asyncio)."""
+
+    def __init__(self, host: str, port: int, sender: str, username: str = None,
+                 password: str = None, use_tls: bool = False, timeout: float = 10):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+
+    def _send_sync(self, recipient: str, subject: str, body: str) -> None:
+        message = EmailMessage()
+        message['From'] = self.sender
+        message['To'] = recipient
+        message['Subject'] = subject
+        message.set_content(body)
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            if self.use_tls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password)
+            smtp.send_message(message)
+
+    async def send(self, recipient: str, subject: str, body: str) -> None:
+        await asyncio.to_thread(self._send_sync, recipient, subject, body)
+
+
+# Transports disponibles : nom -> fabrique sans argument
+TRANSPORTS: Dict[str, Callable] = {
+    'console': ConsoleTransport,
+    'smtp': lambda: SMTPTransport(**config.NOTIFICATION_CONFIG['smtp'])
+}
+
+
+def register_transport(name: str, factory: Callable) -> None:
+    """
+    Enregistre un transport (objet exposant `async send(recipient, subject, body)`,
+    qui lève une exception en cas d'échec).
+
+    Args:
+        name (str): Nom utilisé dans NOTIFICATION_CONFIG['transport']
+        factory (Callable): Fabrique sans argument du transport
+    """
+    TRANSPORTS[name] = factory
+
+
+def format_digest(alerts: List[Dict]) -> tuple:
+    """
+    Construit le sujet et le corps d'un message pour une ou plusieurs alertes.
+
+    Args:
+        alerts (List[Dict]): Alertes regroupées ({'alert': ..., 'count': ...})
+
+    Returns:
+        tuple: (Sujet, Corps)
+    """
+    if len(alerts) == 1:
+        alert = alerts[0]['alert']
+        subject = f"[NetPulse-AI] Alerte {alert['severite']} - {alert['type']}"
+    else:
+        worst = max(alerts, key=lambda a: config.ALERT_SEVERITIES.get(a['alert']['severite'], {}).get('level', 0))
+        subject = f"[NetPulse-AI] {len(alerts)} alertes (max {worst['alert']['severite']})"
+
+    lines = []
+    for entry in alerts:
+        alert = entry['alert']
+        repeat = f" (x{entry['count']})" if entry['count'] > 1 else ""
+        link = f" liaison {alert['link_id']}" if alert.get('link_id') is not None else ""
+        lines.append(f"- [{alert['severite']}] {alert['type']}{link} : {alert['message']}{repeat}")
+    return subject, "\n".join(lines)
+
+
+class NotificationDispatcher:
+    """Dispatcher asyncio : file bornée, regroupement par destinataire, digest, nouvelles tentatives."""
+
+    def __init__(self, transport, queue_size: int = None, digest_size: int = None, digest_seconds: float = None,
+                 max_retries: int = None, backoff_seconds: float = None, max_concurrent_sends: int = None):
+        settings = config.NOTIFICATION_CONFIG
+        self.transport = transport
+        self.queue_size = queue_size if queue_size is not None else settings['queue_size']
+        self.digest_size = digest_size if digest_size is not None else settings['digest_size']
+        self.digest_seconds = digest_seconds if digest_seconds is not None else settings['digest_seconds']
+        self.max_retries = max_retries if max_retries is not None else settings['max_retries']
+        self.backoff_seconds = backoff_seconds if backoff_seconds is not None else settings['backoff_seconds']
+        self.max_concurrent_sends = (
+            max_concurrent_sends if max_concurrent_sends is not None else settings['max_concurrent_sends']
+        )
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._pending: Dict[str, OrderedDict] = {}  # destinataire -> {(link_id, type): entrée}
+        self._opened_at: Dict[str, float] = {}  # destinataire -> ouverture du digest en cours
+        self._sends = set()
+        self._semaphore = None
+        self._stopping = False
+
+        self._latencies = deque(maxlen=10000)
+        self._started_at = None
+        self.counters = {
+            'submitted': 0, 'dropped': 0, 'coalesced': 0, 'messages_sent': 0,
+            'alerts_delivered': 0, 'retries': 0, 'failures': 0
+        }
+
+    def submit_nowait(self, recipients: List[str], alert: Dict) -> bool:
+        """Met une alerte en file pour ses destinataires (à appeler depuis la boucle). False si la file est pleine."""
+        try:
+            self._queue.put_nowait((tuple(recipients), alert, time.perf_counter()))
+        except asyncio.QueueFull:
+            self.counters['dropped'] += 1
+            return False
+        self.counters['submitted'] += 1
+        return True
+
+    async def submit(self, recipients: List[str], alert: Dict) -> bool:
+        """Version coroutine de submit_nowait."""
+        return self.submit_nowait(recipients, alert)
+
+    def _add_pending(self, recipients: tuple, alert: Dict, enqueued_at: float) -> None:
+        """Ajoute une alerte au digest de chaque destinataire (regroupée si déjà en attente)."""
+        key = (alert.get('link_id'), alert['type'])
+        for recipient in recipients:
+            pending = self._pending.get(recipient)
+            if pending is None:
+                pending = self._pending[recipient] = OrderedDict()
+                self._opened_at[recipient] = time.perf_counter()
+            if key in pending:
+                pending[key]['alert'] = alert
+                pending[key]['count'] += 1
+                pending[key]['enqueued'].append(enqueued_at)
+                self.counters['coalesced'] += 1
+            else:
+                pending[key] = {'alert': alert, 'count': 1, 'enqueued': [enqueued_at]}
+            if len(pending) >= self.digest_size:
+                self._flush(recipient)
+
+    def _next_deadline(self) -> Optional[float]:
+        """Délai avant le prochain digest à envoyer (None si rien en attente)."""
+        if not self._opened_at:
+            return None
+        return max(0.0, min(self._opened_at.values()) + self.digest_seconds - time.perf_counter())
+
+    def _flush(self, recipient: str) -> None:
+        """Lance l'envoi du digest d'un destinataire."""
+        entries = list(self._pending.pop(recipient, {}).values())
+        self._opened_at.pop(recipient, None)
+        if entries:
+            task = asyncio.ensure_future(self._send(recipient, entries))
+            self._sends.add(task)
+            task.add_done_callback(self._sends.discard)
+
+    def _flush_due(self) -> None:
+        """Envoie les digests dont le délai est écoulé."""
+        now = time.perf_counter()
+        for recipient, opened_at in list(self._opened_at.items()):
+            if now - opened_at >= self.digest_seconds:
+                self._flush(recipient)
+
+    async def _send(self, recipient: str, entries: List[Dict]) -> None:
+        """Envoie un digest avec nouvelles tentatives (backoff exponentiel)."""
+        subject, body = format_digest(entries)
+        async with self._semaphore:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    await self.transport.send(recipient, subject, body)
+                    break
+                except Exception as e:
+                    if attempt == self.max_retries:
+                        self.counters['failures'] += 1
+                        log_error(f"Notification à {recipient} abandonnée après {attempt + 1} essai(s) : {e}",
+                                  module="Notifier")
+                        return
+                    self.counters['retries'] += 1
+                    await asyncio.sleep(self.backoff_seconds * 2 ** attempt)
+
+        delivered_at = time.perf_counter()
+        self.counters['messages_sent'] += 1
+        for entry in entries:
+            self.counters['alerts_delivered'] += entry['count']
+            self._latencies.extend(delivered_at - enqueued for enqueued in entry['enqueued'])
+
+    async def run(self) -> None:
+        """Boucle principale : consomme la file et envoie les digests jusqu'à stop()."""
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._semaphore = asyncio.Semaphore(self.max_concurrent_sends)
+        self._started_at = time.perf_counter()
+
+        while not (self._stopping and self._queue.empty()):
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout=self._next_deadline())
+                # Vider ce qui est déjà en file avant de regarder les délais
+                while item is not None:
+                    self._add_pending(*item)
+                    item = self._queue.get_nowait() if not self._queue.empty() else None
+            except asyncio.TimeoutError:
+                pass
+            self._flush_due()
+
+        # Arrêt : envoi immédiat de tout ce qui est en attente
+        for recipient in list(self._pending):
+            self._flush(recipient)
+        if self._sends:
+            await asyncio.gather(*self._sends, return_exceptions=True)
+
+    def stop(self) -> None:
+        """Demande l'arrêt (à appeler depuis la boucle) : la file est vidée et les digests envoyés."""
+        self._stopping = True
+        try:
+            self._queue.put_nowait(None)
+        except asyncio.QueueFull:
+            pass
+
+    def metrics(self) -> Dict:
+        """
+        Retourne les compteurs, le débit et la latence de bout en bout.
+
+        Returns:
+            Dict: Compteurs, alertes livrées/s, latence p50/p95/max (s), taille de la file
+        """
+        latencies = sorted(self._latencies)
+        elapsed = time.perf_counter() - self._started_at if self._started_at else 0.0
+
+        def percentile(q: float) -> Optional[float]:
+            return latencies[min(len(latencies) - 1, int(q * len(latencies)))] if latencies else None
+
+        return {
+            **self.counters,
+            'queue_size': self._queue.qsize() if self._queue is not None else 0,
+            'throughput_per_s': self.counters['alerts_delivered'] / elapsed if elapsed else 0.0,
+            'latency_p50_s': percentile(0.50),
+            'latency_p95_s': percentile(0.95),
+            'latency_max_s': latencies[-1] if latencies else None
+        }
+
+
+class NotificationService:
+    """Héberge un NotificationDispatcher dans un thread dédié ; notify() est appelable depuis tout thread."""
+
+    def __init__(self, transport=None, **dispatcher_options):
+        if transport is None:
+            transport = TRANSPORTS[config.NOTIFICATION_CONFIG['transport']]()
+        self.dispatcher = NotificationDispatcher(transport, **dispatcher_options)
+        self._loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='notifier', daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def _run(self):
+        async def main():
+            task = asyncio.ensure_future(self.dispatcher.run())
+            await asyncio.sleep(0)  # la file du dispatcher est créée
+            self._ready.set()
+            await task
+
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_until_complete(main())
+        self._loop.close()
+
+    def notify(self, alert: Dict, recipients: List[str]) -> None:
+        """
+        Met en file la notification d'une alerte pour ses destinataires (non bloquant).
+
+        Args:
+            alert (Dict): Alerte (link_id, type, severite, message)
+            recipients (List[str]): Emails ou numéros de téléphone
+        """
+        self._loop.call_soon_threadsafe(self.dispatcher.submit_nowait, recipients, alert)
+
+    def stop(self, timeout: float = None) -> None:
+        """Vide la file, envoie les digests en attente et arrête le thread."""
+        if self._thread.is_alive():
+            self._loop.call_soon_threadsafe(self.dispatcher.stop)
+            self._thread.join(timeout)
+
+    def metrics(self) -> Dict:
+        """Métriques du dispatcher (voir NotificationDispatcher.metrics)."""
+        return self.dispatcher.metrics()
+
+
+_service: Optional[NotificationService] = None
+_service_lock = threading.Lock()
+
+
+def get_notification_service() -> NotificationService:
+    """Retourne le service de notification du processus (démarré au premier usage)."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = NotificationService()
+            atexit.register(_service.stop, 30)
+            log_info(f"Service de notification démarré (transport {config.NOTIFICATION_CONFIG['transport']})",
+                     "Notifier")
+        return _service
+
+
+def notify_alert_created(alert: Dict) -> None:
+    """
+    Notifie une alerte créée aux destinataires configurés, si les notifications
+    sont activées et la sévérité suffisante. Ne bloque jamais l'appelant.
+
+    Args:
+        alert (Dict): Alerte (link_id, type, severite, message)
+    """
+    settings = config.NOTIFICATION_CONFIG
+    if not settings['enabled'] or not settings['recipients']:
+        return
+    level = config.ALERT_SEVERITIES.get(alert['severite'], {}).get('level', 0)
+    if level < config.ALERT_SEVERITIES[settings['min_severity']]['level']:
+        return
+    get_notification_service().notify(alert, settings['recipients'])
+
+
 def notify_alert(alert_type: str, severity: str, message: str, recipients: List[str]) -> bool:
     """
-    Envoie une notification pour une alerte.
-    
+    Envoie une notification pour une alerte (via le dispatcher, sans attendre l'envoi).
+
     Args:
         alert_type (str): Type d'alerte
         severity (str): Sévérité
         message (str): Message
         recipients (List[str]): Liste des destinataires
-        
+
     Returns:
-        bool: Succès de la notification
+        bool: Notification mise en file
     """
-    subject = f"[NetPulse-AI] Alerte {severity} - {alert_type}"
-    return send_email_notification(recipients, subject, message)
+    get_notification_service().notify({'type': alert_type, 'severite': severity, 'message': message}, recipients)
+    return True
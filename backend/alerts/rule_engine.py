@@ -0,0 +1,248 @@
+"""
+Moteur de règles d'alerte déclaratif.
+
+Les règles (config.ALERT_RULES, un fichier YAML ou le paramètre système
+'alertes_regles') sont compilées une fois en prédicats vectorisés, puis
+évaluées en lot sur des flux de mesures de plusieurs liaisons :
+- niveaux seuil -> sévérité (le niveau actif le plus sévère l'emporte) ;
+- conditions supplémentaires (ex: pluie ET RSSI bas) ;
+- durée : N échantillons consécutifs en dépassement avant déclenchement ;
+- hystérésis : l'état ne retombe qu'une fois la marge franchie.
+"""
+import json
+import os
+import numpy as np
+from functools import lru_cache
+from typing import Dict, List, Tuple
+from backend.database.models import ParametresSysteme
+from backend.database.connection import get_db_context
+from backend.analytics.measure_window import WINDOW_METRICS, MeasureWindow
+from backend.security.logger import log_error
+import config
+
+# Opérateurs de comparaison autorisés
+OPERATEURS = {
+    '<': np.less,
+    '<=': np.less_equal,
+    '>': np.greater,
+    '>=': np.greater_equal
+}
+
+
+def _check_comparison(definition: Dict, context: str) -> Tuple[str, str]:
+    """Valide la métrique et l'opérateur d'une règle ou d'une condition."""
+    metrique = definition.get('metrique')
+    operateur = definition.get('operateur')
+    if metrique not in WINDOW_METRICS:
+        raise ValueError(f"{context} : métrique inconnue '{metrique}' (attendu : {', '.join(WINDOW_METRICS)})")
+    if operateur not in OPERATEURS:
+        raise ValueError(f"{context} : opérateur inconnu '{operateur}' (attendu : {', '.join(OPERATEURS)})")
+    return metrique, operateur
+
+
+class CompiledRule:
+    """Règle compilée : seuils en tableau NumPy, évaluée sur des colonnes de mesures."""
+
+    def __init__(self, definition: Dict):
+        self.type = definition.get('type')
+        if not self.type:
+            raise ValueError("Règle sans 'type'")
+        context = f"Règle {self.type}"
+
+        self.metrique, operateur = _check_comparison(definition, context)
+        self.compare = OPERATEURS[operateur]
+        # Sens de la marge d'hystérésis : un seuil bas se lève au-dessus, un seuil haut en dessous
+        self.direction = 1.0 if operateur in ('<', '<=') else -1.0
+
+        self.conditions = []
+        for condition in definition.get('conditions', []):
+            metrique, cond_operateur = _check_comparison(condition, context)
+            self.conditions.append((metrique, OPERATEURS[cond_operateur], float(condition['seuil'])))
+
+        niveaux = definition.get('niveaux', [])
+        if not niveaux:
+            raise ValueError(f"{context} : aucun niveau défini")
+        for niveau in niveaux:
+            if niveau.get('severite') not in config.ALERT_SEVERITIES:
+                raise ValueError(f"{context} : sévérité inconnue '{niveau.get('severite')}'")
+        # Du plus sévère au moins sévère (ordre stable pour les sévérités de même niveau)
+        self.niveaux = sorted(niveaux, key=lambda n: -config.ALERT_SEVERITIES[n['severite']]['level'])
+        self.seuils = np.array([float(n['seuil']) for n in self.niveaux])
+
+        self.duree = int(definition.get('duree', 1))
+        self.hysteresis = float(definition.get('hysteresis', 0.0))
+        if self.duree < 1 or self.hysteresis < 0:
+            raise ValueError(f"{context} : 'duree' doit être >= 1 et 'hysteresis' >= 0")
+
+        self.metriques = {self.metrique} | {metrique for metrique, _, _ in self.conditions}
+
+    @property
+    def requires_history(self) -> bool:
+        """La règle a besoin de l'historique (durée ou hystérésis) et pas seulement de la dernière mesure."""
+        return self.duree > 1 or self.hysteresis > 0
+
+    def evaluate(self, columns: Dict[str, np.ndarray], starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+        """
+        Évalue la règle sur des flux de mesures concaténés.
+
+        Args:
+            columns (Dict[str, np.ndarray]): Métriques, flux triés par timestamp et mis bout à bout
+            starts (np.ndarray): Indice de début de chaque flux
+            ends (np.ndarray): Indice de la dernière mesure de chaque flux
+
+        Returns:
+            np.ndarray: Pour chaque flux, indice du niveau actif à la dernière mesure (-1 si aucun)
+        """
+        values = columns[self.metrique]
+        n = len(values)
+        conditions = np.ones(n, dtype=bool)
+        for metrique, compare, seuil in self.conditions:
+            conditions &= compare(columns[metrique], seuil)
+
+        # Dépassements par niveau : matrice (niveaux, mesures)
+        breach = self.compare(values[None, :], self.seuils[:, None]) & conditions
+        if not self.requires_history:
+            active = breach[:, ends]
+        else:
+            index = np.arange(n)
+
+            # Déclenchement : 'duree' dépassements consécutifs dans le même flux
+            raised = breach
+            if self.duree > 1:
+                consecutive = np.cumsum(breach, axis=1)
+                consecutive[:, self.duree:] -= consecutive[:, :-self.duree].copy()
+                stream_start = np.repeat(starts, np.diff(np.append(starts, n)))
+                raised = (consecutive == self.duree) & (index - stream_start >= self.duree - 1)
+
+            # Retour à la normale : marge d'hystérésis franchie (ou condition levée)
+            cleared = ~(self.compare(values[None, :], self.seuils[:, None] + self.direction * self.hysteresis)
+                        & conditions)
+
+            # État final de chaque flux : actif si le dernier déclenchement suit le dernier retour à la normale
+            last_raise = np.maximum.reduceat(np.where(raised, index, -1), starts, axis=1)
+            last_clear = np.maximum.reduceat(np.where(cleared, index, -1), starts, axis=1)
+            active = last_raise > last_clear
+
+        # Niveau le plus sévère actif (premier vrai), -1 sinon
+        return np.where(active.any(axis=0), active.argmax(axis=0), -1)
+
+
+class RuleEngine:
+    """Ensemble de règles compilées, évaluées en lot."""
+
+    def __init__(self, definitions: List[Dict]):
+        self.rules = [CompiledRule(definition) for definition in definitions]
+
+    @property
+    def requires_history(self) -> bool:
+        """Au moins une règle a besoin de l'historique des mesures."""
+        return any(rule.requires_history for rule in self.rules)
+
+    def evaluate(self, columns: Dict[str, np.ndarray], link_ids: np.ndarray) -> List[Dict]:
+        """
+        Évalue toutes les règles sur des flux de mesures et retourne les alertes candidates.
+
+        Args:
+            columns (Dict[str, np.ndarray]): Métriques (mêmes longueurs que link_ids)
+            link_ids (np.ndarray): Liaison de chaque mesure, regroupées par liaison et triées par timestamp
+
+        Returns:
+            List[Dict]: Alertes candidates (champs de create_alert), une par règle et liaison au plus
+        """
+        link_ids = np.asarray(link_ids)
+        if len(link_ids) == 0:
+            return []
+
+        boundaries = np.flatnonzero(np.diff(link_ids)) + 1
+        starts = np.concatenate(([0], boundaries))
+        ends = np.concatenate((boundaries - 1, [len(link_ids) - 1]))
+
+        # Valeurs de la dernière mesure de chaque flux (messages et valeurs mesurées)
+        last_values = {
+            metrique: columns[metrique][ends].tolist() for metrique in WINDOW_METRICS if metrique in columns
+        }
+        last_links = link_ids[ends].tolist()
+
+        candidates = []
+        for rule in self.rules:
+            levels = rule.evaluate(columns, starts, ends)
+            for stream in np.flatnonzero(levels >= 0).tolist():
+                niveau = rule.niveaux[levels[stream]]
+                fields = {metrique: values[stream] for metrique, values in last_values.items()}
+                fields.update(valeur=fields[rule.metrique], seuil=float(niveau['seuil']))
+                candidates.append({
+                    'link_id': int(last_links[stream]),
+                    'type': rule.type,
+                    'severite': niveau['severite'],
+                    'message': niveau.get('message', "{valeur}").format(**fields),
+                    'recommandation': niveau.get('recommandation'),
+                    'valeur_mesuree': fields['valeur'],
+                    'seuil_declenche': fields['seuil'],
+                    'ia_generated': False
+                })
+        return candidates
+
+    def evaluate_windows(self, windows: Dict[int, MeasureWindow]) -> List[Dict]:
+        """
+        Évalue les règles sur des fenêtres de mesures (une par liaison).
+
+        Args:
+            windows (Dict[int, MeasureWindow]): Fenêtres par liaison
+
+        Returns:
+            List[Dict]: Alertes candidates
+        """
+        windows = [window for window in windows.values() if len(window)]
+        if not windows:
+            return []
+        link_ids = np.concatenate([np.full(len(window), window.link_id) for window in windows])
+        columns = {
+            metrique: np.concatenate([window[metrique] for window in windows])
+            for metrique in WINDOW_METRICS
+        }
+        return self.evaluate(columns, link_ids)
+
+
+@lru_cache(maxsize=8)
+def _compile(definitions_json: str) -> RuleEngine:
+    """Compile un jeu de règles (mémorisé par contenu : recompilé seulement s'il change)."""
+    return RuleEngine(json.loads(definitions_json))
+
+
+def load_rule_definitions() -> Tuple[List[Dict], str]:
+    """
+    Charge les définitions de règles : paramètre système (JSON), sinon fichier YAML,
+    sinon règles par défaut de config.py.
+
+    Returns:
+        Tuple[List[Dict], str]: (Définitions, source)
+    """
+    parametre = config.ALERT_RULES_CONFIG['parametre']
+    with get_db_context() as db:
+        row = db.query(ParametresSysteme.valeur).filter(ParametresSysteme.cle == parametre).first()
+    if row is not None:
+        return json.loads(row.valeur), f"parametre:{parametre}"
+
+    fichier = config.ALERT_RULES_CONFIG['fichier']
+    if fichier and os.path.exists(fichier):
+        import yaml  # Dépendance optionnelle, requise seulement pour un fichier de règles
+        with open(fichier, encoding='utf-8') as f:
+            return yaml.safe_load(f), f"fichier:{fichier}"
+
+    return config.ALERT_RULES, "config"
+
+
+def get_rule_engine() -> RuleEngine:
+    """
+    Retourne le moteur compilé pour les règles en vigueur. Une définition
+    invalide est journalisée et remplacée par les règles par défaut.
+
+    Returns:
+        RuleEngine: Moteur de règles compilé
+    """
+    try:
+        definitions, _ = load_rule_definitions()
+        return _compile(json.dumps(definitions, sort_keys=True))
+    except Exception as e:
+        log_error(f"Règles d'alerte invalides ({e}), utilisation des règles par défaut", module="RuleEngine")
+        return _compile(json.dumps(config.ALERT_RULES, sort_keys=True))
@@ -0,0 +1,103 @@
+"""
+Réduction de séries temporelles pour l'affichage (côté serveur).
+
+Deux méthodes conservent la forme et les extrêmes d'une série en la réduisant
+à un nombre cible de points :
+- LTTB (Largest-Triangle-Three-Buckets) pour les courbes ;
+- min/max par bucket pour les séries dont les pics comptent (pluie, barres).
+"""
+import numpy as np
+import pandas as pd
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Sélectionne les indices à conserver avec l'algorithme LTTB.
+
+    Args:
+        x (np.ndarray): Abscisses croissantes (float)
+        y (np.ndarray): Ordonnées (float, sans NaN)
+        n_out (int): Nombre de points à conserver (>= 3)
+
+    Returns:
+        np.ndarray: Indices conservés (premier et dernier points inclus)
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # Buckets intermédiaires (le premier et le dernier point sont toujours gardés)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+
+    previous = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        # Point moyen du bucket suivant (le dernier point pour le dernier bucket)
+        next_start, next_end = end, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        # Aire du triangle (point précédent, candidat, moyenne suivante)
+        areas = np.abs(
+            (x[previous] - avg_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (avg_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        indices[i + 1] = previous
+
+    return indices
+
+
+def minmax_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Sélectionne, par bucket, l'indice du minimum et celui du maximum.
+
+    Args:
+        y (np.ndarray): Ordonnées (float, sans NaN)
+        n_out (int): Nombre de points à conserver (2 par bucket)
+
+    Returns:
+        np.ndarray: Indices conservés, triés
+    """
+    n = len(y)
+    if n_out >= n or n_out < 2:
+        return np.arange(n)
+
+    buckets = np.arange(n) * (n_out // 2) // n
+    grouped = pd.Series(y).groupby(buckets)
+    return np.unique(np.concatenate((grouped.idxmin().to_numpy(), grouped.idxmax().to_numpy())))
+
+
+def downsample(df: pd.DataFrame, x: str, y: str, n_out: int, method: str = 'lttb') -> pd.DataFrame:
+    """
+    Réduit une série (colonnes x, y d'un DataFrame trié) à environ n_out points.
+
+    Args:
+        df (pd.DataFrame): Données triées par x
+        x (str): Colonne des abscisses (timestamp ou numérique)
+        y (str): Colonne des ordonnées
+        n_out (int): Nombre cible de points
+        method (str): 'lttb' ou 'minmax'
+
+    Returns:
+        pd.DataFrame: Lignes conservées (colonnes x et y), index réinitialisé
+    """
+    series = df[[x, y]].dropna().reset_index(drop=True)
+    if len(series) <= n_out:
+        return series
+
+    values = series[y].to_numpy(dtype='float64')
+    if method == 'minmax':
+        keep = minmax_indices(values, n_out)
+    elif method == 'lttb':
+        abscissa = series[x]
+        if pd.api.types.is_datetime64_any_dtype(abscissa):
+            abscissa = abscissa.astype('datetime64[ns]').astype('int64')
+        keep = lttb_indices(abscissa.to_numpy(dtype='float64'), values, n_out)
+    else:
+        raise ValueError(f"Méthode de réduction inconnue : {method}")
+
+    return series.iloc[keep].reset_index(drop=True)
@@ -0,0 +1,169 @@
+"""
+Instantané de l'état de la flotte, partagé par toutes les sessions du processus.
+
+Une ligne par liaison active : caractéristiques, dernière mesure, état global et
+nombre d'alertes ouvertes par sévérité. L'instantané est construit en trois
+requêtes (liaisons, dernières mesures ROW_NUMBER, comptes d'alertes GROUP BY)
+puis rafraîchi périodiquement ; la page d'accueil et le sélecteur de liaison
+le lisent en une fois, tri et filtres étant faits côté client. Les comptes
+d'alertes sont réappliqués à chaque lecture depuis leur propre cache, invalidé
+par toute écriture d'alerte.
+"""
+import threading
+import time
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Dict, List, Optional
+from sqlalchemy import select
+from backend.database.models import FHLink
+from backend.database.connection import get_db_context
+from backend.analytics.kpi_calculator import classify_link_status_array
+from backend.analytics.measure_window import WINDOW_METRICS
+import config
+
+# Colonnes de l'instantané
+SNAPSHOT_COLUMNS = (
+    ['link_id', 'nom', 'site_a', 'site_b', 'frequence_ghz', 'distance_km', 'timestamp']
+    + WINDOW_METRICS
+    + ['etat_global', 'alertes_actives', 'critiques', 'majeures']
+)
+
+# État d'une liaison sans aucune mesure
+NO_DATA_STATUS = 'SANS DONNÉES'
+
+
+def build_fleet_snapshot() -> pd.DataFrame:
+    """
+    Construit l'instantané de la flotte depuis la base (sans cache).
+
+    Returns:
+        pd.DataFrame: Une ligne par liaison active (colonnes SNAPSHOT_COLUMNS)
+    """
+    from backend.alerts.fleet_evaluator import get_latest_measures
+
+    with get_db_context() as db:
+        rows = db.execute(
+            select(FHLink.id.label('link_id'), FHLink.nom, FHLink.site_a, FHLink.site_b,
+                   FHLink.frequence_ghz, FHLink.distance_km)
+            .where(FHLink.actif == True)
+            .order_by(FHLink.id)
+        ).mappings().all()
+    links = pd.DataFrame(rows, columns=SNAPSHOT_COLUMNS[:6])
+
+    latest = pd.DataFrame(get_latest_measures(links['link_id'].tolist()))
+    snapshot = links.merge(latest, on='link_id', how='left')
+
+    snapshot['etat_global'] = np.where(
+        snapshot['timestamp'].isna(), NO_DATA_STATUS,
+        classify_link_status_array(snapshot['rssi_dbm'], snapshot['snr_db'], snapshot['ber'])
+    )
+
+    return apply_alert_counts(snapshot)[SNAPSHOT_COLUMNS]
+
+
+def apply_alert_counts(snapshot: pd.DataFrame) -> pd.DataFrame:
+    """
+    Renseigne les comptes d'alertes ouvertes de chaque liaison (modifié sur place).
+    Les comptes viennent de get_fleet_alert_counts, dont le cache est invalidé à
+    chaque création, résolution ou suppression d'alerte : ils restent à jour même
+    quand l'instantané (liaisons, dernières mesures) est plus ancien.
+
+    Args:
+        snapshot (pd.DataFrame): Instantané (colonne link_id)
+
+    Returns:
+        pd.DataFrame: Le même instantané, colonnes alertes_actives, critiques et majeures (entiers)
+    """
+    from backend.alerts.alert_engine import get_fleet_alert_counts
+
+    counts = get_fleet_alert_counts()
+    for column, severites in (('alertes_actives', None), ('critiques', ['CRITIQUE']), ('majeures', ['MAJEURE'])):
+        totals = pd.Series({
+            link_id: sum(count for severite, count in by_severite.items()
+                         if severites is None or severite in severites)
+            for link_id, by_severite in counts.items()
+        }, dtype='int64')
+        snapshot[column] = snapshot['link_id'].map(totals).fillna(0).astype('int64')
+    return snapshot
+
+
+class FleetSnapshot:
+    """Instantané de la flotte reconstruit au plus toutes les N secondes."""
+
+    def __init__(self, refresh_seconds: float = None):
+        self.refresh_seconds = (
+            refresh_seconds if refresh_seconds is not None
+            else config.FLEET_SNAPSHOT_CONFIG['refresh_seconds']
+        )
+        self._frame: Optional[pd.DataFrame] = None
+        self._built_at: Optional[float] = None
+        self._built_on: Optional[datetime] = None
+        # Incrémenté à chaque invalidation : une reconstruction concurrente est écartée
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def get(self) -> pd.DataFrame:
+        """
+        Retourne l'instantané (reconstruit s'il est absent, invalidé ou trop ancien).
+
+        Returns:
+            pd.DataFrame: Copie de l'instantané (modifiable par l'appelant)
+        """
+        # Reconstruction hors du verrou de l'instantané : une lecture d'un instantané
+        # à jour n'attend jamais une transaction en cours. Une invalidation pendant
+        # la reconstruction relance celle-ci.
+        while True:
+            with self._lock:
+                if self._built_at is not None and time.monotonic() - self._built_at < self.refresh_seconds:
+                    frame = self._frame.copy()
+                    break
+                version = self._version
+            rebuilt = build_fleet_snapshot()
+            with self._lock:
+                if self._version == version:
+                    self._frame = rebuilt
+                    self._built_at = time.monotonic()
+                    self._built_on = datetime.utcnow()
+                    frame = rebuilt.copy()
+                    break
+        # Comptes d'alertes relus à chaque accès (cache invalidé par les écritures d'alertes)
+        return apply_alert_counts(frame)
+
+    def links(self) -> List[Dict]:
+        """
+        Liaisons actives (caractéristiques uniquement), lues dans l'instantané.
+
+        Returns:
+            List[Dict]: Liaisons triées par ID
+        """
+        columns = ['link_id', 'nom', 'site_a', 'site_b', 'frequence_ghz', 'distance_km']
+        links = self.get()[columns].rename(columns={'link_id': 'id'}).to_dict('records')
+        for link in links:
+            link['id'] = int(link['id'])
+            link['actif'] = True
+        return links
+
+    def invalidate(self) -> None:
+        """Force la reconstruction au prochain accès (import, nouvelle liaison)."""
+        with self._lock:
+            self._version += 1
+            self._built_at = None
+
+    def stats(self) -> Dict:
+        """
+        Retourne l'état de l'instantané (supervision).
+
+        Returns:
+            Dict: Nombre de liaisons, âge (s) et date de construction (UTC)
+        """
+        with self._lock:
+            return {
+                'links': 0 if self._frame is None else len(self._frame),
+                'age_seconds': None if self._built_at is None else time.monotonic() - self._built_at,
+                'built_on': self._built_on
+            }
+
+
+# Instantané partagé par le processus
+fleet_snapshot = FleetSnapshot()
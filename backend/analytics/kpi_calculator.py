@@ -2,11 +2,15 @@
 Calculateur de KPIs pour les liaisons micro-ondes FH.
 Calcule les métriques et indicateurs de performance.
 """
+import math
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
-from typing import Dict, Tuple
+from typing import Dict, List, Tuple
+from sqlalchemy import and_, case, func, select
 from backend.database.models import MesureKPI, FHLink, KPISynthese
 from backend.database.connection import get_db_context
+from backend.database.query_cache import latest_kpis_cache
 import config
 
 
@@ -67,9 +71,81 @@ def calculate_link_status(rssi: float, snr: float, ber: float) -> str:
         return 'NORMAL'
 
 
+# États globaux indexés par code de sévérité (0 = NORMAL, 1 = DEGRADED, 2 = CRITIQUE)
+LINK_STATUS_LABELS = np.array(['NORMAL', 'DEGRADED', 'CRITIQUE'])
+
+
+def classify_link_status_codes(rssi, snr, ber) -> np.ndarray:
+    """
+    Version vectorisée de calculate_link_status, renvoyant des codes de sévérité.
+    Mêmes seuils que la version scalaire ; une valeur manquante (NaN/None) est CRITIQUE.
+    
+    Args:
+        rssi (array-like): RSSI en dBm
+        snr (array-like): SNR en dB
+        ber (array-like): BER
+        
+    Returns:
+        np.ndarray: Codes int8 (0 = NORMAL, 1 = DEGRADED, 2 = CRITIQUE)
+    """
+    rssi = np.asarray(rssi, dtype='float64')
+    snr = np.asarray(snr, dtype='float64')
+    ber = np.asarray(ber, dtype='float64')
+    
+    # searchsorted sur les bornes [DEGRADED, ACCEPTABLE] : 0 = CRITIQUE, 1 = DEGRADED, 2 = NORMAL
+    rssi_bounds = [config.SEUILS_RSSI['DEGRADED'], config.SEUILS_RSSI['ACCEPTABLE']]
+    snr_bounds = [config.SEUILS_SNR['DEGRADED'], config.SEUILS_SNR['ACCEPTABLE']]
+    rssi_codes = 2 - np.searchsorted(rssi_bounds, rssi, side='right')
+    snr_codes = 2 - np.searchsorted(snr_bounds, snr, side='right')
+    
+    # BER : plus c'est grand, pire c'est (NaN est trié en fin, donc CRITIQUE)
+    ber_bounds = [config.SEUILS_BER['ACCEPTABLE'], config.SEUILS_BER['DEGRADED']]
+    ber_codes = np.searchsorted(ber_bounds, ber, side='left')
+    
+    # NaN : trié en fin par searchsorted, à reclasser CRITIQUE pour RSSI/SNR
+    codes = np.maximum(np.maximum(rssi_codes, snr_codes), ber_codes)
+    codes[np.isnan(rssi) | np.isnan(snr)] = 2
+    
+    return codes.astype('int8')
+
+
+def classify_link_status_array(rssi, snr, ber) -> np.ndarray:
+    """
+    Détermine l'état global de chaque mesure selon les seuils ITU/ETSI (version vectorisée).
+    
+    Args:
+        rssi (array-like): RSSI en dBm
+        snr (array-like): SNR en dB
+        ber (array-like): BER
+        
+    Returns:
+        np.ndarray: États (NORMAL, DEGRADED, CRITIQUE) par mesure
+    """
+    return LINK_STATUS_LABELS[classify_link_status_codes(rssi, snr, ber)]
+
+
+def compute_availability(rssi, snr, ber) -> float:
+    """
+    Calcule le pourcentage de mesures en état NORMAL.
+    
+    Args:
+        rssi (array-like): RSSI en dBm
+        snr (array-like): SNR en dB
+        ber (array-like): BER
+        
+    Returns:
+        float: Disponibilité en % (0.0 si aucune mesure)
+    """
+    codes = classify_link_status_codes(rssi, snr, ber)
+    if codes.size == 0:
+        return 0.0
+    return float(np.count_nonzero(codes == 0)) / codes.size * 100
+
+
 def get_latest_kpis(link_id: int) -> Dict:
     """
     Récupère les dernières métriques KPI d'une liaison.
+    Le résultat est mis en cache (partagé entre sessions, invalidé à l'import).
     
     Args:
         link_id (int): ID de la liaison
@@ -77,6 +153,11 @@ def get_latest_kpis(link_id: int) -> Dict:
     Returns:
         Dict: Dictionnaire des KPIs ou None si aucune donnée
     """
+    return latest_kpis_cache.get_or_load(link_id, lambda: _load_latest_kpis(link_id))
+
+
+def _load_latest_kpis(link_id: int) -> Dict:
+    """Charge les dernières métriques KPI d'une liaison depuis la base (sans cache)."""
     with get_db_context() as db:
         latest_measure = (
             db.query(MesureKPI)
@@ -107,86 +188,186 @@ def get_latest_kpis(link_id: int) -> Dict:
         }
 
 
+def normal_status_condition():
+    """
+    Condition SQL équivalente à calculate_link_status(...) == 'NORMAL'.
+    Une métrique NULL rend la condition fausse (mesure non comptée comme disponible).
+    
+    Returns:
+        ColumnElement: Expression booléenne sur MesureKPI
+    """
+    return and_(
+        MesureKPI.rssi_dbm >= config.SEUILS_RSSI['ACCEPTABLE'],
+        MesureKPI.snr_db >= config.SEUILS_SNR['ACCEPTABLE'],
+        MesureKPI.ber <= config.SEUILS_BER['ACCEPTABLE']
+    )
+
+
+def sample_std(count: int, total: float, total_sq: float) -> float:
+    """Écart-type échantillon (ddof=1) à partir de n, Σx et Σx² (repli SQLite, rollups)."""
+    if not count or count < 2 or total is None or total_sq is None:
+        return float('nan')
+    variance = (total_sq - total * total / count) / (count - 1)
+    return math.sqrt(max(variance, 0.0))
+
+
+def get_measure_series(link_id: int, columns: List[str], date_from: datetime = None,
+                       date_to: datetime = None) -> pd.DataFrame:
+    """
+    Récupère uniquement les colonnes demandées des mesures d'une liaison, triées par date.
+    
+    Args:
+        link_id (int): ID de la liaison
+        columns (List[str]): Colonnes de MesureKPI à charger (en plus du timestamp)
+        date_from (datetime, optional): Début de la période
+        date_to (datetime, optional): Fin de la période
+        
+    Returns:
+        pd.DataFrame: Colonnes timestamp + columns
+    """
+    query = select(MesureKPI.timestamp, *[getattr(MesureKPI, column) for column in columns]).where(
+        MesureKPI.link_id == link_id
+    )
+    if date_from is not None:
+        query = query.where(MesureKPI.timestamp >= date_from)
+    if date_to is not None:
+        query = query.where(MesureKPI.timestamp <= date_to)
+    
+    with get_db_context() as db:
+        rows = db.execute(query.order_by(MesureKPI.timestamp)).all()
+    
+    return pd.DataFrame(rows, columns=['timestamp'] + list(columns))
+
+
 def calculate_period_statistics(link_id: int, hours: int = 24) -> Dict:
     """
     Calcule les statistiques sur une période donnée.
+    Les agrégats sont calculés par la base en une seule requête (aucune ligne chargée).
+    Au-delà de config.ROLLUP_CONFIG['min_period_hours'], les rollups horaires sont
+    lus à la place des mesures brutes (période alignée sur l'heure).
     
     Args:
         link_id (int): ID de la liaison
-        hours (int): Nombre d'heures à analyser
+        hours (int): Nombre d'heures à analyser (None = toutes les mesures)
         
     Returns:
         Dict: Statistiques calculées
     """
+    if hours is None or hours >= config.ROLLUP_CONFIG['min_period_hours']:
+        return calculate_rollup_statistics(link_id, hours)
+    
     with get_db_context() as db:
         date_from = datetime.utcnow() - timedelta(hours=hours)
         
-        measures = (
-            db.query(MesureKPI)
+        # SQLite n'a pas de STDDEV_SAMP : repli sur Σx et Σx²
+        native_std = db.get_bind().dialect.name in ('mysql', 'mariadb', 'postgresql')
+        
+        aggregates = [
+            func.count(MesureKPI.id).label('nb_mesures'),
+            func.sum(case((normal_status_condition(), 1), else_=0)).label('nb_normal')
+        ]
+        for column, functions in (
+            ('rssi_dbm', ('avg', 'min', 'max')),
+            ('snr_db', ('avg', 'min', 'max')),
+            ('ber', ('avg', 'min', 'max')),
+            ('latency_ms', ('avg', 'max')),
+            ('packet_loss', ('avg', 'max')),
+            ('rainfall_mm', ('avg', 'max'))
+        ):
+            attribute = getattr(MesureKPI, column)
+            for name in functions:
+                aggregates.append(getattr(func, name)(attribute).label(f"{column}_{name}"))
+        for column in ('rssi_dbm', 'snr_db'):
+            attribute = getattr(MesureKPI, column)
+            if native_std:
+                aggregates.append(func.stddev_samp(attribute).label(f"{column}_std"))
+            else:
+                aggregates.append(func.count(attribute).label(f"{column}_count"))
+                aggregates.append(func.sum(attribute).label(f"{column}_sum"))
+                aggregates.append(func.sum(attribute * attribute).label(f"{column}_sumsq"))
+        
+        row = (
+            db.query(*aggregates)
             .filter(
                 MesureKPI.link_id == link_id,
                 MesureKPI.timestamp >= date_from
             )
-            .all()
+            .one()
+            ._mapping
         )
         
-        if not measures:
+        if not row['nb_mesures']:
             return None
         
-        # Conversion en DataFrame pour faciliter les calculs
-        df = pd.DataFrame([{
-            'timestamp': m.timestamp,
-            'rssi_dbm': m.rssi_dbm,
-            'snr_db': m.snr_db,
-            'ber': m.ber,
-            'latency_ms': m.latency_ms,
-            'packet_loss': m.packet_loss,
-            'rainfall_mm': m.rainfall_mm
-        } for m in measures])
+        def std(column: str) -> float:
+            if native_std:
+                value = row[f"{column}_std"]
+                return float(value) if value is not None else float('nan')
+            return sample_std(row[f"{column}_count"], row[f"{column}_sum"], row[f"{column}_sumsq"])
         
         # Calcul des statistiques
         stats = {
             'periode': f"{hours}h",
-            'nb_mesures': len(df),
+            'nb_mesures': row['nb_mesures'],
             'rssi': {
-                'avg': df['rssi_dbm'].mean(),
-                'min': df['rssi_dbm'].min(),
-                'max': df['rssi_dbm'].max(),
-                'std': df['rssi_dbm'].std()
+                'avg': row['rssi_dbm_avg'],
+                'min': row['rssi_dbm_min'],
+                'max': row['rssi_dbm_max'],
+                'std': std('rssi_dbm')
             },
             'snr': {
-                'avg': df['snr_db'].mean(),
-                'min': df['snr_db'].min(),
-                'max': df['snr_db'].max(),
-                'std': df['snr_db'].std()
+                'avg': row['snr_db_avg'],
+                'min': row['snr_db_min'],
+                'max': row['snr_db_max'],
+                'std': std('snr_db')
             },
             'ber': {
-                'avg': df['ber'].mean(),
-                'min': df['ber'].min(),
-                'max': df['ber'].max()
+                'avg': row['ber_avg'],
+                'min': row['ber_min'],
+                'max': row['ber_max']
             },
             'latency': {
-                'avg': df['latency_ms'].mean(),
-                'max': df['latency_ms'].max()
+                'avg': row['latency_ms_avg'],
+                'max': row['latency_ms_max']
             },
             'packet_loss': {
-                'avg': df['packet_loss'].mean(),
-                'max': df['packet_loss'].max()
+                'avg': row['packet_loss_avg'],
+                'max': row['packet_loss_max']
             },
             'rainfall': {
-                'avg': df['rainfall_mm'].mean(),
-                'max': df['rainfall_mm'].max()
+                'avg': row['rainfall_mm_avg'],
+                'max': row['rainfall_mm_max']
             }
         }
         
-        # Calculer la disponibilité (% de temps en état NORMAL)
-        normal_count = sum(1 for _, row in df.iterrows() 
-                          if calculate_link_status(row['rssi_dbm'], row['snr_db'], row['ber']) == 'NORMAL')
-        stats['disponibilite'] = (normal_count / len(df)) * 100
+        # Disponibilité (% de mesures en état NORMAL), comptée par CASE côté base
+        # (int() : MySQL renvoie SUM() en DECIMAL)
+        stats['disponibilite'] = (int(row['nb_normal'] or 0) / row['nb_mesures']) * 100
         
         return stats
 
 
+def calculate_rollup_statistics(link_id: int, hours: int = None) -> Dict:
+    """
+    Calcule les statistiques d'une période à partir des rollups horaires.
+    
+    Args:
+        link_id (int): ID de la liaison
+        hours (int, optional): Nombre d'heures à analyser (None = toutes les mesures)
+        
+    Returns:
+        Dict: Statistiques (même format que calculate_period_statistics)
+    """
+    from backend.analytics.rollups import get_rollups, summarize_rollups
+    
+    date_from = datetime.utcnow() - timedelta(hours=hours) if hours is not None else None
+    stats = summarize_rollups(get_rollups(link_id, date_from=date_from, granularity='hourly'))
+    if stats is None:
+        return None
+    
+    return {'periode': f"{hours}h" if hours is not None else "Tout", **stats}
+
+
 def calculate_availability(link_id: int, date_from: datetime, date_to: datetime) -> float:
     """
     Calcule le taux de disponibilité d'une liaison sur une période.
@@ -200,8 +381,9 @@ def calculate_availability(link_id: int, date_from: datetime, date_to: datetime)
         float: Taux de disponibilité en %
     """
     with get_db_context() as db:
-        measures = (
-            db.query(MesureKPI)
+        # Seules les colonnes utiles au classement sont chargées (pas d'objets ORM)
+        rows = (
+            db.query(MesureKPI.rssi_dbm, MesureKPI.snr_db, MesureKPI.ber)
             .filter(
                 MesureKPI.link_id == link_id,
                 MesureKPI.timestamp >= date_from,
@@ -210,16 +392,11 @@ def calculate_availability(link_id: int, date_from: datetime, date_to: datetime)
             .all()
         )
         
-        if not measures:
+        if not rows:
             return 0.0
         
-        # Compter les mesures en état NORMAL
-        normal_count = sum(
-            1 for m in measures
-            if calculate_link_status(m.rssi_dbm, m.snr_db, m.ber) == 'NORMAL'
-        )
-        
-        return (normal_count / len(measures)) * 100
+        rssi, snr, ber = np.array(rows, dtype='float64').T
+        return compute_availability(rssi, snr, ber)
 
 
 def generate_daily_synthesis(link_id: int, date: datetime) -> Tuple[bool, str]:
@@ -260,11 +437,7 @@ def generate_daily_synthesis(link_id: int, date: datetime) -> Tuple[bool, str]:
             } for m in measures])
             
             # Calculer disponibilité
-            normal_count = sum(
-                1 for m in measures
-                if calculate_link_status(m.rssi_dbm, m.snr_db, m.ber) == 'NORMAL'
-            )
-            disponibilite = (normal_count / len(measures)) * 100
+            disponibilite = compute_availability(df['rssi_dbm'], df['snr_db'], df['ber'])
             
             # Déterminer état global
             if disponibilite >= 99.9:
@@ -321,7 +494,7 @@ def generate_daily_synthesis(link_id: int, date: datetime) -> Tuple[bool, str]:
 
 def get_kpi_trend(link_id: int, metric: str, days: int = 7) -> pd.DataFrame:
     """
-    Récupère la tendance d'une métrique sur plusieurs jours.
+    Récupère la tendance d'une métrique sur plusieurs jours (rollups journaliers).
     
     Args:
         link_id (int): ID de la liaison
@@ -331,30 +504,21 @@ def get_kpi_trend(link_id: int, metric: str, days: int = 7) -> pd.DataFrame:
     Returns:
         pd.DataFrame: DataFrame avec la tendance
     """
-    with get_db_context() as db:
-        date_from = datetime.utcnow() - timedelta(days=days)
-        
-        syntheses = (
-            db.query(KPISynthese)
-            .filter(
-                KPISynthese.link_id == link_id,
-                KPISynthese.date >= date_from
-            )
-            .order_by(KPISynthese.date)
-            .all()
-        )
-        
-        data = []
-        for s in syntheses:
-            row = {'date': s.date}
-            if metric == 'rssi':
-                row['value'] = s.rssi_avg
-            elif metric == 'snr':
-                row['value'] = s.snr_avg
-            elif metric == 'ber':
-                row['value'] = s.ber_avg
-            elif metric == 'disponibilite':
-                row['value'] = s.disponibilite
-            data.append(row)
-        
-        return pd.DataFrame(data)
+    from backend.analytics.rollups import get_rollups
+    
+    date_from = datetime.utcnow() - timedelta(days=days)
+    rollups = get_rollups(link_id, date_from=date_from, granularity='daily')
+    
+    if rollups.empty:
+        return pd.DataFrame()
+    
+    columns = {
+        'rssi': 'rssi_dbm_avg',
+        'snr': 'snr_db_avg',
+        'ber': 'ber_avg',
+        'disponibilite': 'disponibilite'
+    }
+    return pd.DataFrame({
+        'date': rollups['bucket'],
+        'value': rollups[columns[metric]] if metric in columns else None
+    })
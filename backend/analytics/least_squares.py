@@ -0,0 +1,128 @@
+"""
+Moindres carrés linéaires en forme fermée, vectorisés par groupe.
+
+Une tendance y = pente * x + ordonnée ne dépend que des sommes n, Σx, Σy, Σxy,
+Σx² et Σy² : pente = Sxy / Sxx, ordonnée = ȳ - pente * x̄, R² = Sxy² / (Sxx * Syy)
+(sommes centrées). grouped_linear_fit calcule ces sommes pour tous les groupes
+(liaison, ou liaison x métrique) en une passe np.bincount ; linear_fit_from_sums
+part de sommes déjà agrégées, par exemple celles des rollups KPI
+(rollup_regression_sums). Les points NaN sont ignorés.
+"""
+import numpy as np
+import pandas as pd
+from typing import Dict
+
+# Colonnes du résultat d'un ajustement
+FIT_COLUMNS = ['n', 'slope', 'intercept', 'r2']
+
+
+def _fit_centered(n: np.ndarray, mean_x: np.ndarray, mean_y: np.ndarray,
+                  sxx: np.ndarray, sxy: np.ndarray, syy: np.ndarray) -> Dict[str, np.ndarray]:
+    """Pente, ordonnée et R² depuis les moyennes et les sommes centrées."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # x constant : pente nulle et ordonnée = moyenne (comme LinearRegression)
+        slope = np.where(sxx > 0, sxy / sxx, 0.0)
+        intercept = mean_y - slope * mean_x
+        # R² = 1 - SSres / SStot, avec SSres = Syy - pente * Sxy ; ajustement exact si y constant
+        r2 = np.where(syy > 0, 1.0 - (syy - slope * sxy) / syy, 1.0)
+    empty = n == 0
+    return {
+        'n': n.astype('int64'),
+        'slope': np.where(empty, np.nan, slope),
+        'intercept': np.where(empty, np.nan, intercept),
+        'r2': np.where(empty, np.nan, r2)
+    }
+
+
+def linear_fit_from_sums(n, sum_x, sum_y, sum_xy, sum_xx, sum_yy) -> Dict[str, np.ndarray]:
+    """
+    Ajuste une droite par groupe depuis des sommes brutes (combinables de façon incrémentale).
+    Les x doivent rester proches de 0 (ex. heures depuis le début de la période) pour
+    limiter les erreurs d'arrondi de Σx² - n x̄².
+
+    Args:
+        n, sum_x, sum_y, sum_xy, sum_xx, sum_yy: Sommes par groupe (scalaires ou tableaux)
+
+    Returns:
+        Dict[str, np.ndarray]: n, slope, intercept, r2 par groupe
+    """
+    n = np.asarray(n, dtype='float64')
+    sum_x, sum_y = np.asarray(sum_x, dtype='float64'), np.asarray(sum_y, dtype='float64')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean_x = sum_x / n
+        mean_y = sum_y / n
+    sxx = np.maximum(np.asarray(sum_xx, dtype='float64') - n * mean_x * mean_x, 0.0)
+    syy = np.maximum(np.asarray(sum_yy, dtype='float64') - n * mean_y * mean_y, 0.0)
+    sxy = np.asarray(sum_xy, dtype='float64') - n * mean_x * mean_y
+    return _fit_centered(n, mean_x, mean_y, sxx, sxy, syy)
+
+
+def grouped_linear_fit(group_ids: np.ndarray, x: np.ndarray, y: np.ndarray) -> pd.DataFrame:
+    """
+    Ajuste une droite y = f(x) pour chaque groupe, en une passe vectorisée.
+    Les sommes sont centrées sur la moyenne de chaque groupe (deux passes
+    np.bincount), ce qui reste stable quelle que soit l'origine des x.
+
+    Args:
+        group_ids (np.ndarray): Identifiant de groupe de chaque point
+        x (np.ndarray): Abscisses
+        y (np.ndarray): Ordonnées
+
+    Returns:
+        pd.DataFrame: Une ligne par groupe (index = identifiant, colonnes FIT_COLUMNS)
+    """
+    group_ids = np.asarray(group_ids)
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+
+    if len(group_ids) and np.all(group_ids[1:] >= group_ids[:-1]):
+        # Points déjà triés par groupe (fenêtres de la flotte) : codes sans tri
+        changes = np.concatenate(([True], group_ids[1:] != group_ids[:-1]))
+        groups, codes = group_ids[changes], np.cumsum(changes) - 1
+    else:
+        groups, codes = np.unique(group_ids, return_inverse=True)
+    valid = ~(np.isnan(x) | np.isnan(y))
+    codes, x, y = codes[valid], x[valid], y[valid]
+    size = len(groups)
+
+    n = np.bincount(codes, minlength=size).astype('float64')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean_x = np.bincount(codes, x, minlength=size) / n
+        mean_y = np.bincount(codes, y, minlength=size) / n
+    dx = x - mean_x[codes]
+    dy = y - mean_y[codes]
+    fit = _fit_centered(
+        n, mean_x, mean_y,
+        np.bincount(codes, dx * dx, minlength=size),
+        np.bincount(codes, dx * dy, minlength=size),
+        np.bincount(codes, dy * dy, minlength=size)
+    )
+    return pd.DataFrame(fit, index=pd.Index(groups, name='group'), columns=FIT_COLUMNS)
+
+
+def rollup_regression_sums(rollups: pd.DataFrame, metric: str, bucket_hours: float) -> Dict[str, float]:
+    """
+    Sommes de régression (x en heures) d'une métrique depuis des rollups KPI.
+    Chaque mesure est placée au centre de son bucket : la pente est exacte à la
+    largeur du bucket près, sans relire les mesures brutes.
+
+    Args:
+        rollups (pd.DataFrame): Rollups d'une liaison (bucket, {metric}_count/_sum/_sumsq)
+        metric (str): Métrique
+        bucket_hours (float): Largeur d'un bucket en heures (1 horaire, 24 journalier)
+
+    Returns:
+        Dict[str, float]: n, sum_x, sum_y, sum_xy, sum_xx, sum_yy (x = heures depuis le premier bucket)
+    """
+    buckets = pd.to_datetime(rollups['bucket'])
+    x = (buckets - buckets.min()).dt.total_seconds().to_numpy() / 3600 + bucket_hours / 2
+    count = rollups[f"{metric}_count"].astype('float64').fillna(0).to_numpy()
+    total = rollups[f"{metric}_sum"].astype('float64').fillna(0).to_numpy()
+    return {
+        'n': float(count.sum()),
+        'sum_x': float((count * x).sum()),
+        'sum_y': float(total.sum()),
+        'sum_xy': float((total * x).sum()),
+        'sum_xx': float((count * x * x).sum()),
+        'sum_yy': float(rollups[f"{metric}_sumsq"].astype('float64').fillna(0).sum())
+    }
@@ -0,0 +1,210 @@
+"""
+Chargeur de fenêtres de mesures en colonnes NumPy, partagé par les fonctions
+d'analyse et d'IA.
+
+Une fenêtre (timestamps + métriques) est chargée en une seule requête. Dans un
+window_scope(), les fenêtres sont mémorisées par liaison et une fenêtre plus
+courte est découpée dans une fenêtre plus longue déjà chargée : une vérification
+d'alertes complète ne coûte qu'une requête.
+"""
+import numpy as np
+import pandas as pd
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import select
+from backend.database.models import MesureKPI
+from backend.database.connection import get_db_context
+
+# Métriques chargées dans chaque fenêtre
+WINDOW_METRICS = ['rssi_dbm', 'snr_db', 'ber', 'latency_ms', 'packet_loss', 'rainfall_mm']
+
+# Portée de mémorisation courante : {'now': datetime, 'windows': {link_id: [MeasureWindow]}}
+_window_scope: ContextVar[Optional[Dict]] = ContextVar('measure_window_scope', default=None)
+
+
+class MeasureWindow:
+    """Mesures d'une liaison sur [date_from, now], triées par timestamp, en colonnes NumPy."""
+
+    def __init__(self, link_id: int, date_from: datetime, now: datetime,
+                 timestamps: np.ndarray, columns: Dict[str, np.ndarray]):
+        self.link_id = link_id
+        self.date_from = date_from
+        self.now = now
+        self.timestamps = timestamps
+        self.columns = columns
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def __getitem__(self, metric: str) -> np.ndarray:
+        return self.columns[metric]
+
+    @property
+    def hours(self) -> float:
+        """Durée de la fenêtre en heures."""
+        return (self.now - self.date_from).total_seconds() / 3600
+
+    def last(self, hours: float) -> 'MeasureWindow':
+        """
+        Retourne la sous-fenêtre des dernières heures (vue, sans copie ni requête).
+
+        Args:
+            hours (float): Durée de la sous-fenêtre
+
+        Returns:
+            MeasureWindow: Sous-fenêtre [now - hours, now]
+        """
+        date_from = self.now - timedelta(hours=hours)
+        if date_from <= self.date_from:
+            return self
+        start = int(np.searchsorted(self.timestamps, np.datetime64(date_from, 'ns'), side='left'))
+        return MeasureWindow(
+            self.link_id, date_from, self.now,
+            self.timestamps[start:],
+            {metric: values[start:] for metric, values in self.columns.items()}
+        )
+
+    def elapsed_seconds(self) -> np.ndarray:
+        """Secondes écoulées depuis la première mesure de la fenêtre."""
+        if len(self) == 0:
+            return np.empty(0)
+        return (self.timestamps - self.timestamps[0]).astype('timedelta64[ns]').astype('int64') / 1e9
+
+    def timestamp_at(self, index: int) -> datetime:
+        """Timestamp d'une mesure en datetime Python."""
+        return pd.Timestamp(self.timestamps[index]).to_pydatetime()
+
+
+def _query_window(link_id: int, date_from: datetime, now: datetime) -> MeasureWindow:
+    """Charge une fenêtre de mesures en une requête (colonnes uniquement, pas d'objets ORM)."""
+    query = (
+        select(MesureKPI.timestamp, *[getattr(MesureKPI, metric) for metric in WINDOW_METRICS])
+        .where(MesureKPI.link_id == link_id, MesureKPI.timestamp >= date_from)
+        .order_by(MesureKPI.timestamp)
+    )
+    with get_db_context() as db:
+        rows = db.execute(query).all()
+
+    if rows:
+        timestamps, *values = zip(*rows)
+    else:
+        timestamps, values = (), [() for _ in WINDOW_METRICS]
+
+    return MeasureWindow(
+        link_id, date_from, now,
+        np.array(timestamps, dtype='datetime64[ns]'),
+        {metric: np.array(column, dtype='float64') for metric, column in zip(WINDOW_METRICS, values)}
+    )
+
+
+def load_measure_window(link_id: int, hours: float) -> MeasureWindow:
+    """
+    Charge les mesures des dernières heures d'une liaison.
+    Dans un window_scope(), le résultat est mémorisé (et découpé pour les fenêtres plus courtes).
+
+    Args:
+        link_id (int): ID de la liaison
+        hours (float): Durée de la fenêtre
+
+    Returns:
+        MeasureWindow: Fenêtre de mesures
+    """
+    scope = _window_scope.get()
+    if scope is None:
+        now = datetime.utcnow()
+        return _query_window(link_id, now - timedelta(hours=hours), now)
+
+    cached: List[MeasureWindow] = scope['windows'].setdefault(link_id, [])
+    for window in cached:
+        if window.hours >= hours:
+            return window.last(hours)
+
+    window = _query_window(link_id, scope['now'] - timedelta(hours=hours), scope['now'])
+    cached.append(window)
+    return window
+
+
+def load_fleet_windows(hours: float, link_ids: Iterable[int] = None) -> Dict[int, MeasureWindow]:
+    """
+    Charge en une seule requête les fenêtres de plusieurs liaisons (toutes par défaut).
+
+    Args:
+        hours (float): Durée des fenêtres
+        link_ids (Iterable[int], optional): Liaisons à charger
+
+    Returns:
+        Dict[int, MeasureWindow]: Fenêtre par liaison (seules les liaisons ayant des mesures)
+    """
+    scope = _window_scope.get()
+    now = scope['now'] if scope is not None else datetime.utcnow()
+    date_from = now - timedelta(hours=hours)
+
+    query = select(
+        MesureKPI.link_id, MesureKPI.timestamp, *[getattr(MesureKPI, metric) for metric in WINDOW_METRICS]
+    ).where(MesureKPI.timestamp >= date_from)
+    if link_ids is not None:
+        query = query.where(MesureKPI.link_id.in_(list(link_ids)))
+    with get_db_context() as db:
+        rows = db.execute(query.order_by(MesureKPI.link_id, MesureKPI.timestamp)).all()
+
+    if not rows:
+        return {}
+
+    link_column, timestamps, *values = zip(*rows)
+    link_column = np.array(link_column, dtype='int64')
+    timestamps = np.array(timestamps, dtype='datetime64[ns]')
+    values = [np.array(column, dtype='float64') for column in values]
+
+    # Lignes triées par liaison : une coupe par liaison, sans copie
+    boundaries = np.flatnonzero(np.diff(link_column)) + 1
+    starts = np.concatenate(([0], boundaries))
+    ends = np.concatenate((boundaries, [len(link_column)]))
+
+    windows = {}
+    for start, end in zip(starts, ends):
+        link_id = int(link_column[start])
+        windows[link_id] = MeasureWindow(
+            link_id, date_from, now, timestamps[start:end],
+            {metric: column[start:end] for metric, column in zip(WINDOW_METRICS, values)}
+        )
+        if scope is not None:
+            scope['windows'].setdefault(link_id, []).append(windows[link_id])
+    return windows
+
+
+def resolve_window(link_id: int, hours: float, window: MeasureWindow = None) -> MeasureWindow:
+    """
+    Retourne la fenêtre demandée : découpée dans la fenêtre préchargée si fournie,
+    chargée sinon.
+
+    Args:
+        link_id (int): ID de la liaison
+        hours (float): Durée de la fenêtre
+        window (MeasureWindow, optional): Fenêtre préchargée (au moins aussi longue)
+
+    Returns:
+        MeasureWindow: Fenêtre de mesures
+    """
+    if window is not None:
+        return window.last(hours)
+    return load_measure_window(link_id, hours)
+
+
+@contextmanager
+def window_scope():
+    """
+    Portée de mémorisation des fenêtres (une vérification, une requête de page…).
+    L'instant de référence est figé à l'ouverture pour que les fenêtres soient cohérentes ;
+    une portée imbriquée réutilise la portée englobante.
+    """
+    if _window_scope.get() is not None:
+        yield
+        return
+
+    token = _window_scope.set({'now': datetime.utcnow(), 'windows': {}})
+    try:
+        yield
+    finally:
+        _window_scope.reset(token)
@@ -0,0 +1,265 @@
+"""
+Rollups KPI horaires et journaliers.
+
+Chaque bucket (liaison, début d'heure ou de jour) stocke, par métrique,
+count / sum / sumsq / min / max ainsi que le nombre de mesures en état NORMAL.
+Ces agrégats sont additifs : l'import les fusionne de façon incrémentale et
+les lectures longues (tendances, heures de pointe, Dashboard) recombinent
+moyennes, écarts-types et disponibilité sans relire les mesures brutes.
+"""
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Dict, Iterable
+from sqlalchemy import delete, insert, select, update
+from backend.database.models import MesureKPI, KPIRollupHoraire, KPIRollupJournalier
+from backend.database.connection import get_db_context
+from backend.analytics.kpi_calculator import classify_link_status_codes, sample_std
+
+# Métriques agrégées dans les rollups
+ROLLUP_METRICS = ['rssi_dbm', 'snr_db', 'ber', 'latency_ms', 'packet_loss', 'rainfall_mm']
+
+# Granularité -> (modèle, fréquence pandas)
+ROLLUP_GRANULARITIES = {
+    'hourly': (KPIRollupHoraire, 'h'),
+    'daily': (KPIRollupJournalier, 'D')
+}
+
+_COUNT_COLUMNS = ['nb_mesures', 'nb_normal'] + [f"{m}_count" for m in ROLLUP_METRICS]
+_SUM_COLUMNS = [f"{m}_{agg}" for m in ROLLUP_METRICS for agg in ('sum', 'sumsq')]
+_MIN_COLUMNS = [f"{m}_min" for m in ROLLUP_METRICS]
+_MAX_COLUMNS = [f"{m}_max" for m in ROLLUP_METRICS]
+_AGGREGATE_COLUMNS = _COUNT_COLUMNS + _SUM_COLUMNS + _MIN_COLUMNS + _MAX_COLUMNS
+
+
+def aggregate_measures(frame: pd.DataFrame, freq: str) -> pd.DataFrame:
+    """
+    Agrège des mesures brutes par (liaison, bucket).
+
+    Args:
+        frame (pd.DataFrame): Mesures avec link_id, timestamp et les métriques
+        freq (str): Fréquence pandas du bucket ('h' ou 'D')
+
+    Returns:
+        pd.DataFrame: Une ligne par (link_id, bucket) avec les colonnes des rollups
+    """
+    work = pd.DataFrame({
+        'link_id': frame['link_id'].to_numpy(dtype='int64'),
+        'bucket': pd.to_datetime(frame['timestamp']).dt.floor(freq).astype('datetime64[ns]').to_numpy(),
+        'normal': classify_link_status_codes(frame['rssi_dbm'], frame['snr_db'], frame['ber']) == 0
+    })
+    aggregations = {
+        'nb_mesures': ('normal', 'size'),
+        'nb_normal': ('normal', 'sum')
+    }
+    for metric in ROLLUP_METRICS:
+        values = pd.to_numeric(frame[metric], errors='coerce').to_numpy(dtype='float64') \
+            if metric in frame.columns else np.full(len(frame), np.nan)
+        work[metric] = values
+        work[f"{metric}__sq"] = values * values
+        aggregations[f"{metric}_count"] = (metric, 'count')
+        aggregations[f"{metric}_sum"] = (metric, 'sum')
+        aggregations[f"{metric}_sumsq"] = (f"{metric}__sq", 'sum')
+        aggregations[f"{metric}_min"] = (metric, 'min')
+        aggregations[f"{metric}_max"] = (metric, 'max')
+
+    return work.groupby(['link_id', 'bucket'], sort=False).agg(**aggregations).reset_index()
+
+
+def _to_records(frame: pd.DataFrame, columns: Iterable[str]) -> list:
+    """Convertit des agrégats en dictionnaires executemany (NaN -> None, types Python)."""
+    records = frame[list(columns)].astype(object).where(frame[list(columns)].notna(), None)
+    records = records.to_dict('records')
+    for record in records:
+        if 'bucket' in record:
+            record['bucket'] = pd.Timestamp(record['bucket']).to_pydatetime()
+        for key in _COUNT_COLUMNS + ['link_id', 'id']:
+            if record.get(key) is not None:
+                record[key] = int(record[key])
+    return records
+
+
+def _load_existing(db, model, aggregates: pd.DataFrame) -> pd.DataFrame:
+    """Charge les rollups existants couvrant les buckets des agrégats."""
+    table = model.__table__
+    rows = db.execute(
+        select(table).where(
+            table.c.link_id.in_(aggregates['link_id'].unique().tolist()),
+            table.c.bucket.between(
+                pd.Timestamp(aggregates['bucket'].min()).to_pydatetime(),
+                pd.Timestamp(aggregates['bucket'].max()).to_pydatetime()
+            )
+        )
+    ).mappings().all()
+    existing = pd.DataFrame(rows, columns=table.c.keys())
+    existing['bucket'] = pd.to_datetime(existing['bucket']).astype('datetime64[ns]')
+    existing['link_id'] = existing['link_id'].astype('int64')
+    return existing
+
+
+def merge_rollups(db, model, aggregates: pd.DataFrame) -> int:
+    """
+    Fusionne des agrégats dans une table de rollup (addition des compteurs et
+    sommes, min/max des extrêmes). Les buckets absents sont créés.
+
+    Args:
+        db (Session): Session SQLAlchemy active (commit à la charge de l'appelant)
+        model: KPIRollupHoraire ou KPIRollupJournalier
+        aggregates (pd.DataFrame): Résultat de aggregate_measures
+
+    Returns:
+        int: Nombre de buckets touchés
+    """
+    if aggregates.empty:
+        return 0
+
+    existing = _load_existing(db, model, aggregates)
+    merged = aggregates.merge(existing, on=['link_id', 'bucket'], how='left', suffixes=('', '_old'))
+    found = merged['id'].notna()
+
+    for column in _COUNT_COLUMNS + _SUM_COLUMNS:
+        merged[column] = merged[column] + merged[f"{column}_old"].fillna(0)
+    for column in _MIN_COLUMNS:
+        merged[column] = np.fmin(merged[column], merged[f"{column}_old"].astype('float64'))
+    for column in _MAX_COLUMNS:
+        merged[column] = np.fmax(merged[column], merged[f"{column}_old"].astype('float64'))
+
+    table = model.__table__
+    if found.any():
+        db.execute(update(model), _to_records(merged[found], ['id'] + _AGGREGATE_COLUMNS))
+    if (~found).any():
+        db.execute(insert(table), _to_records(merged[~found], ['link_id', 'bucket'] + _AGGREGATE_COLUMNS))
+
+    return len(merged)
+
+
+def update_rollups(db, frame: pd.DataFrame) -> None:
+    """
+    Met à jour les rollups horaires et journaliers avec des mesures nouvellement insérées.
+
+    Args:
+        db (Session): Session SQLAlchemy active (même transaction que l'insertion)
+        frame (pd.DataFrame): Mesures insérées (link_id, timestamp, métriques)
+    """
+    if frame.empty:
+        return
+    for model, freq in ROLLUP_GRANULARITIES.values():
+        merge_rollups(db, model, aggregate_measures(frame, freq))
+
+
+def rebuild_rollups(db, link_id: int, date_from: datetime = None, date_to: datetime = None) -> int:
+    """
+    Recalcule les rollups d'une liaison depuis les mesures brutes.
+    Utilisé pour le rattrapage initial et après suppression de mesures.
+
+    Args:
+        db (Session): Session SQLAlchemy active (commit à la charge de l'appelant)
+        link_id (int): ID de la liaison
+        date_from (datetime, optional): Début de la plage (étendu au bucket)
+        date_to (datetime, optional): Fin de la plage (étendue au bucket)
+
+    Returns:
+        int: Nombre de mesures relues
+    """
+    nb_measures = 0
+    columns = [MesureKPI.link_id, MesureKPI.timestamp] + [getattr(MesureKPI, m) for m in ROLLUP_METRICS]
+
+    for model, freq in ROLLUP_GRANULARITIES.values():
+        table = model.__table__
+        bucket_from = pd.Timestamp(date_from).floor(freq).to_pydatetime() if date_from is not None else None
+        bucket_to = pd.Timestamp(date_to).floor(freq).to_pydatetime() if date_to is not None else None
+
+        purge = delete(table).where(table.c.link_id == link_id)
+        query = select(*columns).where(MesureKPI.link_id == link_id)
+        if bucket_from is not None:
+            purge = purge.where(table.c.bucket >= bucket_from)
+            query = query.where(MesureKPI.timestamp >= bucket_from)
+        if bucket_to is not None:
+            purge = purge.where(table.c.bucket <= bucket_to)
+            query = query.where(MesureKPI.timestamp < bucket_to + pd.Timedelta(1, unit=freq).to_pytimedelta())
+
+        db.execute(purge)
+        rows = db.execute(query).all()
+        nb_measures = len(rows)
+        if rows:
+            frame = pd.DataFrame(rows, columns=['link_id', 'timestamp'] + ROLLUP_METRICS)
+            aggregates = aggregate_measures(frame, freq)
+            db.execute(insert(table), _to_records(aggregates, ['link_id', 'bucket'] + _AGGREGATE_COLUMNS))
+
+    return nb_measures
+
+
+def get_rollups(link_id: int, date_from: datetime = None, date_to: datetime = None,
+                granularity: str = 'hourly') -> pd.DataFrame:
+    """
+    Récupère les rollups d'une liaison, avec moyennes et disponibilité par bucket.
+
+    Args:
+        link_id (int): ID de la liaison
+        date_from (datetime, optional): Début de la période
+        date_to (datetime, optional): Fin de la période
+        granularity (str): 'hourly' ou 'daily'
+
+    Returns:
+        pd.DataFrame: Colonnes des rollups + {métrique}_avg et disponibilite, triées par bucket
+    """
+    model, freq = ROLLUP_GRANULARITIES[granularity]
+    table = model.__table__
+
+    query = select(table).where(table.c.link_id == link_id)
+    if date_from is not None:
+        query = query.where(table.c.bucket >= pd.Timestamp(date_from).floor(freq).to_pydatetime())
+    if date_to is not None:
+        query = query.where(table.c.bucket <= date_to)
+
+    with get_db_context() as db:
+        rows = db.execute(query.order_by(table.c.bucket)).mappings().all()
+
+    frame = pd.DataFrame(rows, columns=table.c.keys())
+    frame['bucket'] = pd.to_datetime(frame['bucket'])
+    for metric in ROLLUP_METRICS:
+        counts = frame[f"{metric}_count"].astype('float64')
+        frame[f"{metric}_avg"] = frame[f"{metric}_sum"].astype('float64') / counts.where(counts > 0)
+    frame['disponibilite'] = frame['nb_normal'] / frame['nb_mesures'].where(frame['nb_mesures'] > 0) * 100
+
+    return frame
+
+
+def summarize_rollups(frame: pd.DataFrame) -> Dict:
+    """
+    Recombine des rollups en statistiques globales (format calculate_period_statistics).
+
+    Args:
+        frame (pd.DataFrame): Résultat de get_rollups
+
+    Returns:
+        Dict: Statistiques (sans la clé 'periode'), ou None si aucune mesure
+    """
+    nb_mesures = int(frame['nb_mesures'].sum()) if not frame.empty else 0
+    if nb_mesures == 0:
+        return None
+
+    def metric_stats(metric: str) -> Dict:
+        count = float(frame[f"{metric}_count"].sum())
+        total = float(frame[f"{metric}_sum"].sum())
+        total_sq = float(frame[f"{metric}_sumsq"].sum())
+        return {
+            'avg': total / count if count else float('nan'),
+            'min': frame[f"{metric}_min"].min(),
+            'max': frame[f"{metric}_max"].max(),
+            'std': sample_std(count, total, total_sq)
+        }
+
+    rssi, snr, ber = metric_stats('rssi_dbm'), metric_stats('snr_db'), metric_stats('ber')
+    latency, packet_loss, rainfall = metric_stats('latency_ms'), metric_stats('packet_loss'), metric_stats('rainfall_mm')
+
+    return {
+        'nb_mesures': nb_mesures,
+        'rssi': rssi,
+        'snr': snr,
+        'ber': {key: ber[key] for key in ('avg', 'min', 'max')},
+        'latency': {key: latency[key] for key in ('avg', 'max')},
+        'packet_loss': {key: packet_loss[key] for key in ('avg', 'max')},
+        'rainfall': {key: rainfall[key] for key in ('avg', 'max')},
+        'disponibilite': int(frame['nb_normal'].sum()) / nb_mesures * 100
+    }
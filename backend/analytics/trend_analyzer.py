@@ -4,152 +4,175 @@ Analyseur de tendances pour identifier les patterns dans les données.
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from typing import Dict, List
-from backend.database.models import MesureKPI
-from backend.database.connection import get_db_context
+from typing import Dict, Iterable, List
+from backend.analytics.rollups import get_rollups
+from backend.analytics.measure_window import MeasureWindow, load_fleet_windows, resolve_window
+from backend.analytics.least_squares import grouped_linear_fit, linear_fit_from_sums, rollup_regression_sums
 
+# Au-delà de cette période, la tendance est calculée sur les rollups horaires (sans relire les mesures)
+ROLLUP_TREND_MIN_HOURS = 72
 
-def detect_degradation_trend(link_id: int, metric: str, hours: int = 24) -> Dict:
+# Métriques pour lesquelles une pente négative est une dégradation
+DECREASING_IS_BAD = ['rssi_dbm', 'snr_db']
+
+
+def classify_trend(metric, slope):
+    """
+    Classe une pente (unité de la métrique par seconde) en DEGRADATION / AMELIORATION / STABLE.
+    
+    Args:
+        metric (str ou np.ndarray): Métrique(s)
+        slope (float ou np.ndarray): Pente(s)
+        
+    Returns:
+        str ou np.ndarray: Tendance(s)
+    """
+    # Pour RSSI et SNR une pente négative est mauvaise ; pour BER, latence, etc. une pente positive
+    oriented = np.where(np.isin(metric, DECREASING_IS_BAD), -1.0, 1.0) * np.asarray(slope, dtype='float64')
+    trend = np.select([oriented > 0.01, oriented < -0.01], ['DEGRADATION', 'AMELIORATION'], 'STABLE')
+    return trend.item() if trend.ndim == 0 else trend
+
+
+def detect_degradation_trend(link_id: int, metric: str, hours: int = 24, window: MeasureWindow = None) -> Dict:
     """
     Détecte une tendance à la dégradation pour une métrique.
+    Au-delà de ROLLUP_TREND_MIN_HOURS (sans fenêtre préchargée), la régression
+    est calculée depuis les sommes des rollups horaires.
     
     Args:
         link_id (int): ID de la liaison
         metric (str): Métrique à analyser ('rssi_dbm', 'snr_db', etc.)
         hours (int): Période d'analyse en heures
+        window (MeasureWindow, optional): Mesures préchargées (évite la requête)
         
     Returns:
         Dict: Résultat de l'analyse
     """
-    with get_db_context() as db:
-        date_from = datetime.utcnow() - timedelta(hours=hours)
-        
-        measures = (
-            db.query(MesureKPI)
-            .filter(
-                MesureKPI.link_id == link_id,
-                MesureKPI.timestamp >= date_from
-            )
-            .order_by(MesureKPI.timestamp)
-            .all()
-        )
-        
-        if len(measures) < 10:
-            return {'trend': 'INSUFFICIENT_DATA', 'slope': 0}
-        
-        # Extraire les valeurs
-        values = [getattr(m, metric) for m in measures]
-        timestamps = [(m.timestamp - measures[0].timestamp).total_seconds() for m in measures]
-        
-        # Calcul de la régression linéaire
-        slope, intercept = np.polyfit(timestamps, values, 1)
-        
-        # Déterminer la tendance
-        if metric in ['rssi_dbm', 'snr_db']:
-            # Pour RSSI et SNR, une pente négative est mauvaise
-            if slope < -0.01:
-                trend = 'DEGRADATION'
-            elif slope > 0.01:
-                trend = 'AMELIORATION'
-            else:
-                trend = 'STABLE'
-        else:
-            # Pour BER, latence, etc., une pente positive est mauvaise
-            if slope > 0.01:
-                trend = 'DEGRADATION'
-            elif slope < -0.01:
-                trend = 'AMELIORATION'
-            else:
-                trend = 'STABLE'
+    if window is None and hours >= ROLLUP_TREND_MIN_HOURS:
+        rollups = get_rollups(link_id, date_from=datetime.utcnow() - timedelta(hours=hours), granularity='hourly')
+        fit = linear_fit_from_sums(**rollup_regression_sums(rollups, metric, bucket_hours=1))
+        nb_points = int(fit['n'])
+        # Pente par heure -> par seconde (seuils de classify_trend)
+        slope, r2 = float(fit['slope']) / 3600, float(fit['r2'])
+    else:
+        window = resolve_window(link_id, hours, window)
+        fit = grouped_linear_fit(np.zeros(len(window)), window.elapsed_seconds(), window[metric])
+        nb_points = int(fit['n'].iloc[0]) if len(fit) else 0
+        if nb_points:
+            slope, r2 = float(fit['slope'].iloc[0]), float(fit['r2'].iloc[0])
+    
+    if nb_points < 10:
+        return {'trend': 'INSUFFICIENT_DATA', 'slope': 0}
+    
+    return {
+        'trend': classify_trend(metric, slope),
+        'slope': slope,
+        'r2': r2,
+        'nb_points': nb_points,
+        'periode_hours': hours
+    }
+
+
+def detect_fleet_trends(hours: int = 24, metrics: Iterable[str] = ('rssi_dbm', 'snr_db'),
+                        link_ids: Iterable[int] = None) -> pd.DataFrame:
+    """
+    Calcule la tendance de chaque (liaison, métrique) de la flotte en une requête
+    et une passe de moindres carrés groupés.
+    
+    Args:
+        hours (int): Période d'analyse en heures
+        metrics (Iterable[str]): Métriques à analyser
+        link_ids (Iterable[int], optional): Liaisons à analyser (toutes par défaut)
         
-        return {
-            'trend': trend,
-            'slope': float(slope),
-            'nb_points': len(measures),
-            'periode_hours': hours
-        }
+    Returns:
+        pd.DataFrame: link_id, metric, n, slope (par seconde), intercept, r2, trend
+    """
+    metrics = list(metrics)
+    columns = ['link_id', 'metric', 'n', 'slope', 'intercept', 'r2', 'trend']
+    fleet = load_fleet_windows(hours, link_ids)
+    if not fleet:
+        return pd.DataFrame(columns=columns)
+    
+    windows = list(fleet.values())
+    links = np.concatenate([np.full(len(w), w.link_id) for w in windows])
+    elapsed = np.concatenate([w.elapsed_seconds() for w in windows])
+    
+    # Un groupe par (liaison, métrique) : les colonnes des métriques sont empilées
+    groups = np.concatenate([links * len(metrics) + i for i in range(len(metrics))])
+    values = np.concatenate([np.concatenate([w[metric] for w in windows]) for metric in metrics])
+    fit = grouped_linear_fit(groups, np.tile(elapsed, len(metrics)), values).reset_index()
+    
+    fit['link_id'] = fit['group'] // len(metrics)
+    fit['metric'] = np.array(metrics)[fit['group'] % len(metrics)]
+    fit['trend'] = np.where(fit['n'] < 10, 'INSUFFICIENT_DATA', classify_trend(fit['metric'], fit['slope']))
+    return fit[columns]
 
 
-def analyze_correlation(link_id: int, hours: int = 48) -> Dict:
+def analyze_correlation(link_id: int, hours: int = 48, window: MeasureWindow = None) -> Dict:
     """
     Analyse la corrélation entre les métriques et la pluie.
     
     Args:
         link_id (int): ID de la liaison
         hours (int): Période d'analyse
+        window (MeasureWindow, optional): Mesures préchargées (évite la requête)
         
     Returns:
         Dict: Corrélations calculées
     """
-    with get_db_context() as db:
-        date_from = datetime.utcnow() - timedelta(hours=hours)
-        
-        measures = (
-            db.query(MesureKPI)
-            .filter(
-                MesureKPI.link_id == link_id,
-                MesureKPI.timestamp >= date_from
-            )
-            .all()
-        )
-        
-        if len(measures) < 20:
-            return {'status': 'INSUFFICIENT_DATA'}
-        
-        # Créer DataFrame
-        df = pd.DataFrame([{
-            'rssi_dbm': m.rssi_dbm,
-            'snr_db': m.snr_db,
-            'rainfall_mm': m.rainfall_mm
-        } for m in measures])
-        
-        # Calculer corrélations
-        corr_rssi_rain = df['rssi_dbm'].corr(df['rainfall_mm'])
-        corr_snr_rain = df['snr_db'].corr(df['rainfall_mm'])
-        
-        return {
-            'status': 'OK',
-            'rssi_rainfall_corr': float(corr_rssi_rain),
-            'snr_rainfall_corr': float(corr_snr_rain),
-            'rainfall_impact': 'HIGH' if abs(corr_rssi_rain) > 0.7 else 'MODERATE' if abs(corr_rssi_rain) > 0.4 else 'LOW'
-        }
+    window = resolve_window(link_id, hours, window)
+    
+    if len(window) < 20:
+        return {'status': 'INSUFFICIENT_DATA'}
+    
+    # Créer DataFrame (vues sur les colonnes de la fenêtre)
+    df = pd.DataFrame({
+        'rssi_dbm': window['rssi_dbm'],
+        'snr_db': window['snr_db'],
+        'rainfall_mm': window['rainfall_mm']
+    })
+    
+    # Calculer corrélations
+    corr_rssi_rain = df['rssi_dbm'].corr(df['rainfall_mm'])
+    corr_snr_rain = df['snr_db'].corr(df['rainfall_mm'])
+    
+    return {
+        'status': 'OK',
+        'rssi_rainfall_corr': float(corr_rssi_rain),
+        'snr_rainfall_corr': float(corr_snr_rain),
+        'rainfall_impact': 'HIGH' if abs(corr_rssi_rain) > 0.7 else 'MODERATE' if abs(corr_rssi_rain) > 0.4 else 'LOW'
+    }
 
 
-def get_peak_hours(link_id: int, days: int = 7) -> List[int]:
+def get_peak_hours(link_id: int, days: int = 7, window: MeasureWindow = None) -> List[int]:
     """
     Identifie les heures de pointe (dégradation maximale).
     
     Args:
         link_id (int): ID de la liaison
         days (int): Nombre de jours à analyser
+        window (MeasureWindow, optional): Mesures préchargées ; sinon rollups horaires
         
     Returns:
         List[int]: Liste des heures (0-23) de pointe
     """
-    with get_db_context() as db:
-        date_from = datetime.utcnow() - timedelta(days=days)
-        
-        measures = (
-            db.query(MesureKPI)
-            .filter(
-                MesureKPI.link_id == link_id,
-                MesureKPI.timestamp >= date_from
-            )
-            .all()
-        )
-        
-        # Grouper par heure
-        hourly_rssi = {}
-        for m in measures:
-            hour = m.timestamp.hour
-            if hour not in hourly_rssi:
-                hourly_rssi[hour] = []
-            hourly_rssi[hour].append(m.rssi_dbm)
-        
-        # Calculer moyenne par heure
-        avg_by_hour = {hour: np.mean(values) for hour, values in hourly_rssi.items()}
-        
-        # Trouver les 3 pires heures
-        worst_hours = sorted(avg_by_hour.items(), key=lambda x: x[1])[:3]
-        
-        return [hour for hour, _ in worst_hours]
+    if window is not None:
+        window = window.last(days * 24)
+        if len(window) == 0:
+            return []
+        hours = pd.DatetimeIndex(window.timestamps).hour
+        avg_by_hour = pd.Series(window['rssi_dbm']).groupby(hours).mean()
+        return [int(hour) for hour in avg_by_hour.nsmallest(3).index]
+    
+    date_from = datetime.utcnow() - timedelta(days=days)
+    rollups = get_rollups(link_id, date_from=date_from, granularity='hourly')
+    
+    if rollups.empty:
+        return []
+    
+    # Moyenne RSSI par heure de la journée, pondérée par le nombre de mesures
+    by_hour = rollups.groupby(rollups['bucket'].dt.hour)[['rssi_dbm_sum', 'rssi_dbm_count']].sum()
+    avg_by_hour = (by_hour['rssi_dbm_sum'] / by_hour['rssi_dbm_count']).dropna()
+    
+    # Trouver les 3 pires heures
+    return [int(hour) for hour in avg_by_hour.nsmallest(3).index]
@@ -29,9 +29,13 @@ def recognize_intent(user_message: str) -> Dict:
             r'comment.*(va|aller|marche)',
             r'status'
         ],
+        'get_incidents': [
+            r'incident',
+            r'(tempête|orage|corrél)'
+        ],
         'get_alerts': [
             r'(alerte|alert)',
-            r'(problème|incident|erreur)',
+            r'(problème|erreur)',
             r'quoi.*(ne va pas|problème)'
         ],
         'get_metrics': [
@@ -131,6 +135,7 @@ def get_intent_description(intent: str) -> str:
     descriptions = {
         'get_status': 'Consulter l\'état de la liaison',
         'get_alerts': 'Consulter les alertes actives',
+        'get_incidents': 'Consulter les incidents en cours (alertes corrélées)',
         'get_metrics': 'Consulter les métriques techniques',
         'get_recommendations': 'Obtenir des recommandations',
         'get_history': 'Consulter l\'historique',
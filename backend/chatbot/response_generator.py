@@ -5,6 +5,7 @@ from datetime import datetime
 from typing import Dict, List
 from backend.analytics.kpi_calculator import get_latest_kpis, calculate_period_statistics
 from backend.alerts.alert_engine import get_active_alerts
+from backend.alerts.correlation import get_active_incidents
 from backend.ai_engine.predictor import predict_degradation_risk
 from backend.database.models import FHLink
 from backend.database.connection import get_db_context
@@ -44,6 +45,9 @@ def generate_response(intent: str, entities: Dict, link_id: int) -> str:
     elif intent == 'get_alerts':
         return get_alerts_response(link_id)
     
+    elif intent == 'get_incidents':
+        return get_incidents_response(link_id)
+    
     elif intent == 'get_metrics':
         return get_metrics_response(link_id, entities.get('metrics'))
     
@@ -295,11 +299,37 @@ def get_alerts_response(link_id: int) -> str:
             response += f"- {alert.get('message', 'Alerte prédictive')}\n"
         response += "\n"
     
+    nb_incidents = len({a.get('incident_id') for a in alerts if a.get('incident_id')})
+    if nb_incidents:
+        response += f"🌩️ Ces alertes font partie de {nb_incidents} incident(s) en cours (demandez \"incidents\" pour le détail).\n\n"
+    
     response += "💡 **Recommandation :** Consultez la page Alertes pour plus de détails et actions correctives."
     
     return response
 
 
+def get_incidents_response(link_id: int) -> str:
+    """Génère une réponse sur les incidents en cours (alertes corrélées par site et cause)."""
+    incidents = get_active_incidents(limit=10)
+    
+    if not incidents:
+        return "✅ **Aucun incident en cours**\n\nAucune dégradation simultanée de plusieurs liaisons n'a été détectée."
+    
+    response = f"🌩️ **Incidents en cours** ({len(incidents)})\n\n"
+    for incident in incidents:
+        icon = config.ALERT_SEVERITIES.get(incident['severite'], {}).get('icon', '⚠️')
+        response += f"{icon} **{incident['titre']}** : {incident['nb_liaisons']} liaison(s), {incident['nb_alertes']} alerte(s)"
+        response += f" depuis {incident['date_debut'].strftime('%H:%M')}"
+        if link_id in incident['liaisons']:
+            response += " — *concerne la liaison active*"
+        response += "\n"
+    
+    response += "\n💡 **Recommandation :** Traitez la cause commune (météo, site) avant les alertes individuelles ; "
+    response += "un incident se résout en une fois depuis la page Alertes."
+    
+    return response
+
+
 def get_metrics_response(link_id: int, requested_metrics: List[str] = None) -> str:
     """Génère une réponse avec les métriques détaillées."""
     kpis = get_latest_kpis(link_id)
@@ -441,6 +471,7 @@ def get_help_response() -> str:
     response += "**Exemples de questions :**\n"
     response += "• \"Quel est l'état de la liaison ?\"\n"
     response += "• \"Affiche les alertes actives\"\n"
+    response += "• \"Y a-t-il des incidents en cours ?\"\n"
     response += "• \"Quelles sont les métriques actuelles ?\"\n"
     response += "• \"Prévisions pour les 2 prochaines heures\"\n"
     response += "• \"Quelles sont les recommandations ?\"\n"
@@ -2,7 +2,8 @@
 Gestion des connexions à la base de données.
 Fournit des fonctions pour créer et gérer les sessions SQLAlchemy.
 """
-from contextlib import contextmanager
+import threading
+from contextlib import contextmanager, nullcontext
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, scoped_session
 from sqlalchemy.pool import StaticPool
@@ -17,6 +18,23 @@ engine = create_engine(
     echo=config.ENVIRONMENT == 'development'
 )
 
+# En SQLite, toutes les sessions partagent la même connexion (StaticPool) : le commit
+# ou le rollback d'un thread validerait ou annulerait la transaction en cours d'un autre
+# (page Streamlit, tâche d'alertes, scoring planifié). Les transactions sont donc
+# sérialisées par un verrou de processus (réentrant : sessions imbriquées d'un même thread).
+_sqlite_lock = threading.RLock() if engine.dialect.name == 'sqlite' else None
+
+
+def database_lock():
+    """
+    Verrou des transactions du processus (SQLite uniquement, sans effet sinon).
+
+    Returns:
+        Context manager à tenir pendant toute utilisation d'une session
+    """
+    return _sqlite_lock if _sqlite_lock is not None else nullcontext()
+
+
 # Factory de sessions
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -51,7 +69,8 @@ def get_db():
 def get_db_context():
     """
     Context manager pour la gestion de session de base de données.
-    Ferme automatiquement la session après utilisation.
+    Ferme automatiquement la session après utilisation. En SQLite, la session
+    est exclusive dans le processus (voir database_lock).
     
     Yields:
         Session: Session SQLAlchemy
@@ -61,15 +80,16 @@ def get_db_context():
             user = db.query(Utilisateur).first()
             print(user)
     """
-    db = SessionLocal()
-    try:
-        yield db
-        db.commit()
-    except Exception as e:
-        db.rollback()
-        raise e
-    finally:
-        db.close()
+    with database_lock():
+        db = SessionLocal()
+        try:
+            yield db
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            raise e
+        finally:
+            db.close()
 
 
 def get_scoped_session():
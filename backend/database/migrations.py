@@ -0,0 +1,249 @@
+"""
+Migrations de schéma pour les bases existantes (SQLite et MySQL).
+Base.metadata.create_all() ne crée que les tables absentes : les index et
+contraintes ajoutés aux tables existantes sont appliqués ici.
+
+Usage :
+    python backend/database/migrations.py
+"""
+import sys
+from pathlib import Path
+
+# Ajouter le répertoire racine au path
+root_dir = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(root_dir))
+
+from sqlalchemy import inspect, text
+from backend.database.models import Base, MesureKPI, FHLink, KPIRollupHoraire, Alerte, EtatAnomalie
+from backend.database.connection import engine, get_db_context
+from backend.security.logger import log_info
+
+
+def _index_exists(table_name: str, index_name: str) -> bool:
+    """Vérifie si un index existe sur une table."""
+    inspector = inspect(engine)
+    if not inspector.has_table(table_name):
+        return False
+    return any(idx['name'] == index_name for idx in inspector.get_indexes(table_name))
+
+
+def _column_exists(table_name: str, column_name: str) -> bool:
+    """Vérifie si une colonne existe sur une table."""
+    inspector = inspect(engine)
+    if not inspector.has_table(table_name):
+        return False
+    return any(col['name'] == column_name for col in inspector.get_columns(table_name))
+
+
+def _create_model_index(model, index_name: str):
+    """Crée un index déclaré dans __table_args__ d'un modèle."""
+    index = next(idx for idx in model.__table__.indexes if idx.name == index_name)
+    index.create(bind=engine)
+
+
+def migrate_mesures_unique_index() -> bool:
+    """
+    Ajoute l'index composite unique (link_id, timestamp) sur mesures_kpi.
+    Les doublons existants sont supprimés (la mesure de plus petit ID est conservée).
+
+    Returns:
+        bool: True si la migration a été appliquée, False si déjà présente
+    """
+    index_name = 'uq_mesures_link_timestamp'
+
+    if _index_exists(MesureKPI.__tablename__, index_name):
+        print(f"  • Index {index_name} déjà présent, skip")
+        return False
+
+    with engine.begin() as conn:
+        # Table dérivée obligatoire pour MySQL (pas de sous-requête sur la table modifiée)
+        result = conn.execute(text(
+            "DELETE FROM mesures_kpi WHERE id NOT IN ("
+            "SELECT id FROM (SELECT MIN(id) AS id FROM mesures_kpi "
+            "GROUP BY link_id, timestamp) AS mesures_conservees)"
+        ))
+        if result.rowcount:
+            print(f"  ✓ {result.rowcount} mesure(s) en doublon supprimée(s)")
+
+    _create_model_index(MesureKPI, index_name)
+    print(f"  ✓ Index {index_name} créé")
+    log_info(f"Migration appliquée : index {index_name}", "Migrations")
+    return True
+
+
+def migrate_kpi_rollups() -> bool:
+    """
+    Remplit les tables de rollups horaires et journaliers à partir des mesures
+    existantes (les imports suivants les maintiennent de façon incrémentale).
+
+    Returns:
+        bool: True si le rattrapage a été effectué, False si déjà remplies ou base vide
+    """
+    from backend.analytics.rollups import rebuild_rollups
+
+    with get_db_context() as db:
+        if db.query(KPIRollupHoraire.id).first() is not None:
+            print("  • Rollups déjà remplis, skip")
+            return False
+        if db.query(MesureKPI.id).first() is None:
+            print("  • Aucune mesure, skip")
+            return False
+
+        link_ids = [link_id for (link_id,) in db.query(FHLink.id).all()]
+        nb_measures = 0
+        for link_id in link_ids:
+            nb_measures += rebuild_rollups(db, link_id)
+            db.commit()
+
+    print(f"  ✓ Rollups calculés pour {len(link_ids)} liaison(s) ({nb_measures} mesures)")
+    log_info(f"Migration appliquée : rollups KPI ({nb_measures} mesures)", "Migrations")
+    return True
+
+
+def migrate_anomaly_states() -> bool:
+    """
+    Calcule l'état du détecteur d'anomalies en flux à partir des mesures
+    existantes (les imports suivants le maintiennent mesure par mesure).
+
+    Returns:
+        bool: True si le rattrapage a été effectué, False si déjà rempli ou base vide
+    """
+    from backend.ai_engine.streaming_detector import rebuild_anomaly_states
+
+    with get_db_context() as db:
+        if db.query(EtatAnomalie.id).first() is not None:
+            print("  • États du détecteur déjà calculés, skip")
+            return False
+        if db.query(MesureKPI.id).first() is None:
+            print("  • Aucune mesure, skip")
+            return False
+
+        link_ids = [link_id for (link_id,) in db.query(FHLink.id).all()]
+        nb_measures = 0
+        for link_id in link_ids:
+            nb_measures += rebuild_anomaly_states(db, link_id)
+            db.commit()
+
+    print(f"  ✓ États du détecteur calculés pour {len(link_ids)} liaison(s) ({nb_measures} mesures)")
+    log_info(f"Migration appliquée : états du détecteur d'anomalies ({nb_measures} mesures)", "Migrations")
+    return True
+
+
+def migrate_alertes_open_index() -> bool:
+    """
+    Ajoute l'index partiel des alertes ouvertes (link_id, type, resolved) sur alertes.
+
+    Returns:
+        bool: True si la migration a été appliquée, False si déjà présente
+    """
+    index_name = 'ix_alertes_ouvertes'
+
+    if _index_exists(Alerte.__tablename__, index_name):
+        print(f"  • Index {index_name} déjà présent, skip")
+        return False
+
+    _create_model_index(Alerte, index_name)
+    print(f"  ✓ Index {index_name} créé")
+    log_info(f"Migration appliquée : index {index_name}", "Migrations")
+    return True
+
+
+def migrate_alertes_link_timestamp_index() -> bool:
+    """
+    Ajoute l'index composite (link_id, timestamp) sur alertes (pagination de la page Alertes).
+
+    Returns:
+        bool: True si la migration a été appliquée, False si déjà présente
+    """
+    index_name = 'ix_alertes_link_timestamp'
+
+    if _index_exists(Alerte.__tablename__, index_name):
+        print(f"  • Index {index_name} déjà présent, skip")
+        return False
+
+    _create_model_index(Alerte, index_name)
+    print(f"  ✓ Index {index_name} créé")
+    log_info(f"Migration appliquée : index {index_name}", "Migrations")
+    return True
+
+
+def migrate_alertes_incident_id() -> bool:
+    """
+    Ajoute la colonne incident_id (rattachement à un incident corrélé) sur alertes.
+    La table incidents est créée par create_all().
+
+    Returns:
+        bool: True si la migration a été appliquée, False si déjà présente
+    """
+    table_name = Alerte.__tablename__
+
+    if _column_exists(table_name, 'incident_id'):
+        print("  • Colonne alertes.incident_id déjà présente, skip")
+        return False
+
+    with engine.begin() as conn:
+        if engine.dialect.name == 'sqlite':
+            # SQLite : pas d'ALTER TABLE ADD CONSTRAINT, la référence est déclarée avec la colonne
+            conn.execute(text(
+                "ALTER TABLE alertes ADD COLUMN incident_id INTEGER "
+                "REFERENCES incidents(id) ON DELETE SET NULL"
+            ))
+        else:
+            conn.execute(text("ALTER TABLE alertes ADD COLUMN incident_id INTEGER NULL"))
+            conn.execute(text(
+                "ALTER TABLE alertes ADD CONSTRAINT fk_alertes_incident "
+                "FOREIGN KEY (incident_id) REFERENCES incidents(id) ON DELETE SET NULL"
+            ))
+
+    _create_model_index(Alerte, 'ix_alertes_incident_id')
+    print("  ✓ Colonne alertes.incident_id créée")
+    log_info("Migration appliquée : colonne alertes.incident_id", "Migrations")
+    return True
+
+
+MIGRATIONS = [
+    migrate_mesures_unique_index,
+    migrate_kpi_rollups,
+    migrate_alertes_open_index,
+    migrate_alertes_incident_id,
+    migrate_alertes_link_timestamp_index,
+    migrate_anomaly_states,
+]
+
+
+def run_migrations() -> int:
+    """
+    Crée les tables manquantes puis applique toutes les migrations en attente.
+
+    Returns:
+        int: Nombre de migrations appliquées
+    """
+    Base.metadata.create_all(bind=engine)
+
+    applied = 0
+    for migration in MIGRATIONS:
+        print(f"🔧 {migration.__name__}")
+        if migration():
+            applied += 1
+
+    return applied
+
+
+def main():
+    """Fonction principale de migration."""
+    print("\n" + "="*60)
+    print(f"🔧 MIGRATION DU SCHÉMA ({engine.dialect.name})")
+    print("="*60 + "\n")
+
+    try:
+        applied = run_migrations()
+        print(f"\n✅ {applied} migration(s) appliquée(s)\n")
+    except Exception as e:
+        print(f"\n❌ Erreur lors de la migration : {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
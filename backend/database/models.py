@@ -5,7 +5,7 @@ Définit les 7 tables principales de l'application.
 from datetime import datetime
 from sqlalchemy import (
     Column, Integer, String, Float, DateTime, Boolean, 
-    ForeignKey, Text, Enum as SQLEnum
+    ForeignKey, Text, Index, Enum as SQLEnum, text
 )
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
@@ -62,6 +62,10 @@ class FHLink(Base):
     mesures = relationship("MesureKPI", back_populates="link", cascade="all, delete-orphan")
     syntheses = relationship("KPISynthese", back_populates="link", cascade="all, delete-orphan")
     alertes = relationship("Alerte", back_populates="link", cascade="all, delete-orphan")
+    rollups_horaires = relationship("KPIRollupHoraire", cascade="all, delete-orphan")
+    rollups_journaliers = relationship("KPIRollupJournalier", cascade="all, delete-orphan")
+    etats_anomalies = relationship("EtatAnomalie", cascade="all, delete-orphan")
+    risque = relationship("RisqueLiaison", cascade="all, delete-orphan", uselist=False)
     
     def __repr__(self):
         return f"<FHLink(id={self.id}, nom='{self.nom}', {self.site_a} <-> {self.site_b})>"
@@ -70,6 +74,11 @@ class FHLink(Base):
 class MesureKPI(Base):
     """Table des mesures KPI en temps réel."""
     __tablename__ = 'mesures_kpi'
+    __table_args__ = (
+        # Index composite unique : filtre (link_id, plage de timestamp) + tri par timestamp,
+        # et garantit une seule mesure par liaison et par instant
+        Index('uq_mesures_link_timestamp', 'link_id', 'timestamp', unique=True),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     link_id = Column(Integer, ForeignKey('fh_links.id', ondelete='CASCADE'), nullable=False, index=True)
@@ -117,9 +126,134 @@ class KPISynthese(Base):
         return f"<KPISynthese(id={self.id}, link_id={self.link_id}, date={self.date}, etat={self.etat_global})>"
 
 
+class KPIRollupMixin:
+    """
+    Colonnes communes des rollups KPI : agrégats additifs par liaison et par bucket.
+    Pour chaque métrique : count / sum / sumsq / min / max (moyenne, écart-type et
+    extrêmes se recombinent sur n'importe quelle plage de buckets).
+    """
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    link_id = Column(Integer, ForeignKey('fh_links.id', ondelete='CASCADE'), nullable=False)
+    bucket = Column(DateTime, nullable=False)  # Début du bucket
+    nb_mesures = Column(Integer, nullable=False, default=0)
+    nb_normal = Column(Integer, nullable=False, default=0)  # Mesures en état NORMAL
+    
+    rssi_dbm_count = Column(Integer, nullable=False, default=0)
+    rssi_dbm_sum = Column(Float)
+    rssi_dbm_sumsq = Column(Float)
+    rssi_dbm_min = Column(Float)
+    rssi_dbm_max = Column(Float)
+    
+    snr_db_count = Column(Integer, nullable=False, default=0)
+    snr_db_sum = Column(Float)
+    snr_db_sumsq = Column(Float)
+    snr_db_min = Column(Float)
+    snr_db_max = Column(Float)
+    
+    ber_count = Column(Integer, nullable=False, default=0)
+    ber_sum = Column(Float)
+    ber_sumsq = Column(Float)
+    ber_min = Column(Float)
+    ber_max = Column(Float)
+    
+    latency_ms_count = Column(Integer, nullable=False, default=0)
+    latency_ms_sum = Column(Float)
+    latency_ms_sumsq = Column(Float)
+    latency_ms_min = Column(Float)
+    latency_ms_max = Column(Float)
+    
+    packet_loss_count = Column(Integer, nullable=False, default=0)
+    packet_loss_sum = Column(Float)
+    packet_loss_sumsq = Column(Float)
+    packet_loss_min = Column(Float)
+    packet_loss_max = Column(Float)
+    
+    rainfall_mm_count = Column(Integer, nullable=False, default=0)
+    rainfall_mm_sum = Column(Float)
+    rainfall_mm_sumsq = Column(Float)
+    rainfall_mm_min = Column(Float)
+    rainfall_mm_max = Column(Float)
+    
+    def __repr__(self):
+        return f"<{type(self).__name__}(link_id={self.link_id}, bucket={self.bucket}, nb_mesures={self.nb_mesures})>"
+
+
+class KPIRollupHoraire(KPIRollupMixin, Base):
+    """Table des rollups KPI horaires (maintenue à l'import)."""
+    __tablename__ = 'kpi_rollups_horaires'
+    __table_args__ = (
+        Index('uq_rollups_horaires_link_bucket', 'link_id', 'bucket', unique=True),
+    )
+
+
+class KPIRollupJournalier(KPIRollupMixin, Base):
+    """Table des rollups KPI journaliers (maintenue à l'import)."""
+    __tablename__ = 'kpi_rollups_journaliers'
+    __table_args__ = (
+        Index('uq_rollups_journaliers_link_bucket', 'link_id', 'bucket', unique=True),
+    )
+
+
+class EtatAnomalie(Base):
+    """Table de l'état du détecteur d'anomalies en flux (par liaison et métrique, maintenue à l'import)."""
+    __tablename__ = 'etats_anomalies'
+    __table_args__ = (
+        Index('uq_etats_anomalies_link_metrique', 'link_id', 'metrique', unique=True),
+    )
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    link_id = Column(Integer, ForeignKey('fh_links.id', ondelete='CASCADE'), nullable=False)
+    metrique = Column(String(50), nullable=False)
+    nb_mesures = Column(Integer, nullable=False, default=0)
+    moyenne = Column(Float)  # moyenne mobile exponentielle
+    variance = Column(Float)  # variance mobile exponentielle
+    derniere_valeur = Column(Float)
+    dernier_timestamp = Column(DateTime)
+    dernier_zscore = Column(Float)
+    derniere_anomalie = Column(DateTime)
+    debut_anomalies = Column(DateTime)  # première anomalie de l'épisode en cours
+    nb_anomalies = Column(Integer, nullable=False, default=0)  # anomalies de l'épisode en cours
+    derniere_chute = Column(DateTime)
+    valeur_chute = Column(Float)
+    
+    def __repr__(self):
+        return f"<EtatAnomalie(link_id={self.link_id}, metrique='{self.metrique}', nb_mesures={self.nb_mesures})>"
+
+
+class RisqueLiaison(Base):
+    """Table des risques de dégradation (dernier calcul du job de scoring, une ligne par liaison)."""
+    __tablename__ = 'risques_liaisons'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    link_id = Column(Integer, ForeignKey('fh_links.id', ondelete='CASCADE'), nullable=False, unique=True)
+    niveau = Column(String(20), nullable=False, index=True)  # HIGH, MODERATE, LOW, UNKNOWN
+    raison = Column(Text)
+    rssi_actuel = Column(Float)  # dBm
+    rssi_predit = Column(Float)  # dBm, à l'horizon
+    marge_db = Column(Float)  # rssi_predit - SEUILS_RSSI['DEGRADED'] (négative : seuil franchi)
+    pente_db_h = Column(Float)  # tendance RSSI (dB/h)
+    confiance = Column(Float)  # R² de la tendance
+    eta = Column(DateTime)  # franchissement estimé du seuil de dégradation
+    horizon_heures = Column(Integer, nullable=False)
+    nb_points = Column(Integer, nullable=False, default=0)
+    derniere_mesure = Column(DateTime)
+    calcule_le = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f"<RisqueLiaison(link_id={self.link_id}, niveau='{self.niveau}')>"
+
+
 class Alerte(Base):
     """Table des alertes système."""
     __tablename__ = 'alertes'
+    __table_args__ = (
+        # Index partiel des alertes ouvertes : recherche de doublon (link_id, type) et
+        # chargement de l'index en mémoire (MySQL ne gère pas les index partiels : index complet)
+        Index('ix_alertes_ouvertes', 'link_id', 'type', 'resolved',
+              sqlite_where=text('resolved = 0'), postgresql_where=text('NOT resolved')),
+        # Pagination par clé (timestamp, id) et comptage filtré par période d'une liaison
+        Index('ix_alertes_link_timestamp', 'link_id', 'timestamp'),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     link_id = Column(Integer, ForeignKey('fh_links.id', ondelete='CASCADE'), nullable=False, index=True)
@@ -134,15 +268,44 @@ class Alerte(Base):
     valeur_mesuree = Column(Float)
     seuil_declenche = Column(Float)
     ia_generated = Column(Boolean, default=False)
+    incident_id = Column(Integer, ForeignKey('incidents.id', ondelete='SET NULL'), index=True)
     
     # Relations
     link = relationship("FHLink", back_populates="alertes")
+    incident = relationship("Incident", back_populates="alertes")
     
     def __repr__(self):
         status = "Résolue" if self.resolved else "Active"
         return f"<Alerte(id={self.id}, type='{self.type}', severite='{self.severite}', status='{status}')>"
 
 
+class Incident(Base):
+    """Table des incidents : alertes corrélées (même site, même cause racine, même fenêtre)."""
+    __tablename__ = 'incidents'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    site = Column(String(255), nullable=False, index=True)
+    cause = Column(String(50), nullable=False)
+    severite = Column(String(50), nullable=False)
+    titre = Column(Text, nullable=False)
+    date_debut = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    date_maj = Column(DateTime, default=datetime.utcnow, nullable=False)
+    nb_liaisons = Column(Integer, default=0, nullable=False)
+    nb_alertes = Column(Integer, default=0, nullable=False)  # alertes rattachées (créées ou supprimées)
+    nb_supprimees = Column(Integer, default=0, nullable=False)  # alertes non créées (tempête)
+    membres = Column(Text)  # JSON [[link_id, type], ...] des alertes rattachées
+    resolved = Column(Boolean, default=False, nullable=False, index=True)
+    resolved_at = Column(DateTime)
+    resolved_by = Column(String(255))
+    
+    # Relations
+    alertes = relationship("Alerte", back_populates="incident")
+    
+    def __repr__(self):
+        status = "Résolu" if self.resolved else "Actif"
+        return f"<Incident(id={self.id}, site='{self.site}', cause='{self.cause}', status='{status}')>"
+
+
 class TraceConnexion(Base):
     """Table des traces de connexion et actions utilisateur."""
     __tablename__ = 'traces_connexion'
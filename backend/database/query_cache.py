@@ -0,0 +1,148 @@
+"""
+Cache de résultats de requêtes, partagé par toutes les sessions Streamlit du processus.
+
+Chaque cache est borné (LRU) et ses entrées expirent après un TTL. Les fonctions
+d'écriture (import de mesures, création/résolution/suppression d'alertes)
+invalident précisément les clés des liaisons touchées.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable
+import config
+
+_MISSING = object()
+
+
+class QueryCache:
+    """Cache TTL + LRU thread-safe avec compteurs de hits/misses."""
+
+    def __init__(self, name: str, ttl_seconds: float = None, max_entries: int = None):
+        self.name = name
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else config.CACHE_CONFIG['ttl_seconds']
+        self.max_entries = max_entries if max_entries is not None else config.CACHE_CONFIG['max_entries']
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        # Générations : une invalidation pendant un chargement empêche de stocker la valeur périmée
+        self._generation = 0
+        self._key_generations: Dict[Hashable, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Any:
+        """Retourne la valeur en cache (copie) ou _MISSING si absente ou expirée."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return _MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            # Copie : l'appelant ne doit pas pouvoir modifier la valeur partagée
+            return copy.deepcopy(entry[1])
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        """Stocke une valeur (verrou détenu) et évince l'entrée la moins récemment utilisée si besoin."""
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, copy.deepcopy(value))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Stocke une valeur et évince l'entrée la moins récemment utilisée si besoin."""
+        with self._lock:
+            self._store(key, value)
+
+    def _generation_of(self, key: Hashable) -> tuple:
+        """Génération d'une clé (verrou détenu) : change à chaque invalidation de la clé ou du cache."""
+        return (self._generation, self._key_generations.get(key, 0))
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Retourne la valeur en cache ou l'obtient via loader() puis la met en cache.
+        Une valeur dont la clé a été invalidée pendant le chargement est retournée
+        sans être mise en cache.
+
+        Args:
+            key (Hashable): Clé du cache (ex: link_id)
+            loader (Callable): Fonction de chargement appelée en cas de miss
+
+        Returns:
+            Any: Valeur (copie indépendante du cache)
+        """
+        value = self.get(key)
+        if value is not _MISSING:
+            return value
+        with self._lock:
+            generation = self._generation_of(key)
+        value = loader()
+        with self._lock:
+            if self._generation_of(key) == generation:
+                self._store(key, value)
+        return value
+
+    def invalidate(self, keys: Iterable[Hashable]) -> None:
+        """Supprime les entrées des clés données (les clés absentes sont ignorées)."""
+        with self._lock:
+            for key in keys:
+                self._key_generations[key] = self._key_generations.get(key, 0) + 1
+                if self._entries.pop(key, _MISSING) is not _MISSING:
+                    self.invalidations += 1
+
+    def clear(self) -> None:
+        """Vide le cache."""
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._generation += 1
+            self._key_generations.clear()
+
+    def stats(self) -> Dict:
+        """
+        Retourne les compteurs du cache.
+
+        Returns:
+            Dict: Entrées, hits, misses, taux de hit (%) et invalidations
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits / total * 100) if total else 0.0,
+                'invalidations': self.invalidations
+            }
+
+
+# Caches partagés, indexés par link_id (None = toutes les liaisons)
+latest_kpis_cache = QueryCache('latest_kpis')
+active_alerts_cache = QueryCache('active_alerts')
+# Agrégats de toute la flotte (clé None)
+fleet_alert_counts_cache = QueryCache('fleet_alert_counts')
+
+
+def invalidate_measures(link_ids: Iterable[int]) -> None:
+    """Invalide les dernières mesures des liaisons dont les mesures ont changé."""
+    latest_kpis_cache.invalidate(set(link_ids))
+
+
+def invalidate_alerts(link_ids: Iterable[int]) -> None:
+    """Invalide les alertes actives des liaisons touchées (et les vues toutes liaisons)."""
+    active_alerts_cache.invalidate(set(link_ids) | {None})
+    fleet_alert_counts_cache.invalidate([None])
+
+
+def get_cache_stats() -> Dict[str, Dict]:
+    """
+    Retourne les compteurs de tous les caches de requêtes (supervision).
+
+    Returns:
+        Dict[str, Dict]: {nom du cache: statistiques}
+    """
+    return {cache.name: cache.stats()
+            for cache in (latest_kpis_cache, active_alerts_cache, fleet_alert_counts_cache)}
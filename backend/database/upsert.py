@@ -0,0 +1,40 @@
+"""
+Insertions en masse tolérantes aux doublons, selon le dialecte SQL.
+"""
+from typing import List, Dict
+from sqlalchemy import insert
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+
+
+def insert_ignore_duplicates(db, table, records: List[Dict], conflict_columns: List[str]) -> int:
+    """
+    Insère des lignes en ignorant celles qui violent une contrainte d'unicité.
+
+    - SQLite / PostgreSQL : INSERT ... ON CONFLICT DO NOTHING
+    - MySQL / MariaDB : INSERT IGNORE
+
+    Args:
+        db (Session): Session SQLAlchemy active
+        table (Table): Table SQLAlchemy cible (ex: MesureKPI.__table__)
+        records (List[Dict]): Lignes à insérer (executemany)
+        conflict_columns (List[str]): Colonnes de la contrainte d'unicité
+
+    Returns:
+        int: Nombre de lignes effectivement insérées
+    """
+    if not records:
+        return 0
+
+    dialect = db.get_bind().dialect.name
+
+    if dialect == 'sqlite':
+        stmt = sqlite.insert(table).on_conflict_do_nothing(index_elements=conflict_columns)
+    elif dialect == 'postgresql':
+        stmt = postgresql.insert(table).on_conflict_do_nothing(index_elements=conflict_columns)
+    elif dialect in ('mysql', 'mariadb'):
+        stmt = mysql.insert(table).prefix_with('IGNORE')
+    else:
+        raise NotImplementedError(f"Dialecte non supporté pour l'upsert : {dialect}")
+
+    result = db.execute(stmt, records)
+    return result.rowcount
@@ -2,7 +2,7 @@
 Parser CSV/Excel pour l'import de données de mesures FH.
 """
 import pandas as pd
-from typing import Tuple, Optional
+from typing import Tuple, Optional, Iterator
 from pathlib import Path
 import config
 
@@ -81,8 +81,10 @@ def parse_uploaded_file(uploaded_file) -> Tuple[Optional[pd.DataFrame], bool, st
         
         if file_extension == '.csv':
             df = pd.read_csv(uploaded_file)
-        elif file_extension in ['.xlsx', '.xls']:
+        elif file_extension == '.xlsx':
             df = pd.read_excel(uploaded_file, engine='openpyxl')
+        elif file_extension == '.xls':
+            df = pd.read_excel(uploaded_file, engine='xlrd')
         else:
             return None, False, f"Format de fichier non supporté : {file_extension}"
         
@@ -95,6 +97,145 @@ def parse_uploaded_file(uploaded_file) -> Tuple[Optional[pd.DataFrame], bool, st
         return None, False, f"Erreur lors du parsing du fichier : {str(e)}"
 
 
+def apply_column_dtypes(chunk: pd.DataFrame) -> pd.DataFrame:
+    """
+    Applique les types explicites de config.DATA_VALIDATION['column_dtypes'] à un lot.
+    Les valeurs non convertibles deviennent NaN/NaT (rejetées ensuite à la validation) ;
+    les dates non reconnues sont comptées dans chunk.attrs['conversion_errors'].
+    
+    Args:
+        chunk (pd.DataFrame): Lot aux colonnes normalisées
+        
+    Returns:
+        pd.DataFrame: Lot typé
+    """
+    conversion_errors = {}
+    for column, dtype in config.DATA_VALIDATION['column_dtypes'].items():
+        if column not in chunk.columns:
+            continue
+        if dtype.startswith('datetime'):
+            converted = pd.to_datetime(chunk[column], errors='coerce').astype(dtype)
+            conversion_errors[column] = int((chunk[column].notna() & converted.isna()).sum())
+            chunk[column] = converted
+        elif dtype.startswith('float'):
+            chunk[column] = pd.to_numeric(chunk[column], errors='coerce').astype(dtype)
+        else:
+            chunk[column] = chunk[column].astype(dtype)
+    chunk.attrs['conversion_errors'] = conversion_errors
+    return chunk
+
+
+def iter_csv_chunks(source, chunk_size: int = None) -> Iterator[pd.DataFrame]:
+    """
+    Lit un CSV en streaming et produit des lots typés de chunk_size lignes.
+    La mémoire consommée dépend de la taille d'un lot, pas de celle du fichier.
+    
+    Args:
+        source (str|file): Chemin ou objet fichier du CSV
+        chunk_size (int, optional): Lignes par lot (défaut : config.IMPORT_CONFIG['chunk_size'])
+        
+    Yields:
+        pd.DataFrame: Lot aux colonnes normalisées et typées
+    """
+    chunk_size = chunk_size or config.IMPORT_CONFIG['chunk_size']
+    
+    with pd.read_csv(source, chunksize=chunk_size) as reader:
+        for chunk in reader:
+            yield apply_column_dtypes(normalize_column_names(chunk))
+
+
+def iter_excel_chunks(source, sheet_name=0, chunk_size: int = None) -> Iterator[pd.DataFrame]:
+    """
+    Lit une feuille Excel en streaming (openpyxl en lecture seule).
+    
+    Args:
+        source (str|file): Chemin ou objet fichier Excel
+        sheet_name (str|int): Nom ou index de la feuille à lire
+        chunk_size (int, optional): Lignes par lot (défaut : config.IMPORT_CONFIG['chunk_size'])
+        
+    Yields:
+        pd.DataFrame: Lot aux colonnes normalisées et typées
+    """
+    from openpyxl import load_workbook
+    
+    chunk_size = chunk_size or config.IMPORT_CONFIG['chunk_size']
+    workbook = load_workbook(source, read_only=True, data_only=True)
+    
+    try:
+        sheet = workbook.worksheets[sheet_name] if isinstance(sheet_name, int) else workbook[sheet_name]
+        rows = sheet.iter_rows(values_only=True)
+        
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [str(col) for col in header]
+        
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= chunk_size:
+                yield apply_column_dtypes(normalize_column_names(pd.DataFrame(batch, columns=columns)))
+                batch = []
+        
+        if batch:
+            yield apply_column_dtypes(normalize_column_names(pd.DataFrame(batch, columns=columns)))
+    finally:
+        workbook.close()
+
+
+def iter_xls_chunks(source, sheet_name=0, chunk_size: int = None) -> Iterator[pd.DataFrame]:
+    """
+    Lit une feuille Excel 97-2003 (.xls) par lots.
+    openpyxl ne lit pas ce format binaire : la feuille est chargée en une fois
+    par pandas (moteur xlrd) puis découpée en lots.
+    
+    Args:
+        source (str|file): Chemin ou objet fichier .xls
+        sheet_name (str|int): Nom ou index de la feuille à lire
+        chunk_size (int, optional): Lignes par lot (défaut : config.IMPORT_CONFIG['chunk_size'])
+        
+    Yields:
+        pd.DataFrame: Lot aux colonnes normalisées et typées
+    """
+    chunk_size = chunk_size or config.IMPORT_CONFIG['chunk_size']
+    sheet = pd.read_excel(source, sheet_name=sheet_name, engine='xlrd')
+    
+    for start in range(0, len(sheet), chunk_size):
+        chunk = sheet.iloc[start:start + chunk_size].reset_index(drop=True)
+        yield apply_column_dtypes(normalize_column_names(chunk))
+
+
+def iter_uploaded_file_chunks(uploaded_file, chunk_size: int = None) -> Iterator[pd.DataFrame]:
+    """
+    Lit un fichier uploadé via Streamlit en streaming.
+    Le fichier est rembobiné à chaque appel : plusieurs passes sont possibles
+    (validation puis import).
+    
+    Args:
+        uploaded_file: Objet UploadedFile de Streamlit
+        chunk_size (int, optional): Lignes par lot (défaut : config.IMPORT_CONFIG['chunk_size'])
+        
+    Yields:
+        pd.DataFrame: Lot aux colonnes normalisées et typées
+        
+    Raises:
+        ValueError: Format de fichier non supporté
+    """
+    file_extension = Path(uploaded_file.name).suffix.lower()
+    
+    if file_extension == '.csv':
+        reader = iter_csv_chunks
+    elif file_extension == '.xlsx':
+        reader = iter_excel_chunks
+    elif file_extension == '.xls':
+        reader = iter_xls_chunks
+    else:
+        raise ValueError(f"Format de fichier non supporté : {file_extension}")
+    
+    uploaded_file.seek(0)
+    yield from reader(uploaded_file, chunk_size=chunk_size)
+
+
 def get_file_info(df: pd.DataFrame) -> dict:
     """
     Retourne des informations sur un DataFrame.
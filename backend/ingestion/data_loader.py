@@ -3,10 +3,24 @@ Loader de données pour insérer les mesures dans la base de données.
 """
 import pandas as pd
 from datetime import datetime
-from typing import Tuple, Dict, Set
+from typing import Tuple, Dict, Set, Iterable
+from sqlalchemy import insert, select
 from backend.database.models import MesureKPI, FHLink
 from backend.database.connection import get_db_context
+from backend.database.upsert import insert_ignore_duplicates
+from backend.database.query_cache import invalidate_measures
+from backend.analytics.rollups import update_rollups, rebuild_rollups
+from backend.ai_engine.model_registry import model_registry
+from backend.ai_engine.streaming_detector import update_anomaly_states, rebuild_anomaly_states
+from backend.ai_engine.isolation_forest import reset_multivariate_state, update_multivariate_states
 from backend.security.logger import log_info, log_error
+import config
+
+# Colonnes de mesures_kpi alimentées par les imports (executemany)
+MEASURE_COLUMNS = [
+    'link_id', 'timestamp', 'rssi_dbm', 'snr_db', 'ber', 'acm_modulation',
+    'latency_ms', 'packet_loss', 'rainfall_mm', 'temperature_c'
+]
 
 
 def get_or_create_link(link_name: str) -> Tuple[int, bool]:
@@ -44,114 +58,306 @@ def get_or_create_link(link_name: str) -> Tuple[int, bool]:
         return new_link.id, True
 
 
-def load_measures_to_db(df: pd.DataFrame, link_name: str = None) -> Tuple[bool, Dict]:
+def resolve_link_ids(db, link_names) -> Dict[str, int]:
+    """
+    Résout un ensemble de noms de liaisons en IDs avec une seule requête.
+    Les liaisons inconnues sont créées en bloc.
+    
+    Args:
+        db (Session): Session SQLAlchemy active
+        link_names (Iterable[str]): Noms des liaisons à résoudre
+        
+    Returns:
+        Dict[str, int]: Dictionnaire {nom de liaison: ID}
+    """
+    names = {str(name) for name in link_names}
+    if not names:
+        return {}
+    
+    rows = db.query(FHLink.id, FHLink.nom).filter(FHLink.nom.in_(names)).all()
+    link_ids = {nom: link_id for link_id, nom in rows}
+    
+    missing = sorted(names - link_ids.keys())
+    if missing:
+        db.execute(insert(FHLink), [{
+            'nom': name,
+            'site_a': "Site A",
+            'site_b': "Site B",
+            'frequence_ghz': 18.0,
+            'distance_km': 10.0,
+            'actif': True,
+            'description': "Liaison créée automatiquement lors de l'import"
+        } for name in missing])
+        
+        rows = db.query(FHLink.id, FHLink.nom).filter(FHLink.nom.in_(missing)).all()
+        link_ids.update({nom: link_id for link_id, nom in rows})
+        
+        for name in missing:
+            log_info(f"Nouvelle liaison créée : {name}", "DataLoader")
+    
+    return link_ids
+
+
+def _column_or_default(chunk: pd.DataFrame, column: str, default) -> pd.Series:
+    """Retourne une colonne numérique du lot, ou une colonne constante si absente."""
+    if column in chunk.columns:
+        return pd.to_numeric(chunk[column], errors='coerce')
+    return pd.Series(default, index=chunk.index, dtype='float64')
+
+
+def _to_python_values(series: pd.Series) -> list:
+    """Convertit une Series en liste Python (NaN/NaT -> None) pour executemany."""
+    return series.astype(object).where(series.notna(), None).tolist()
+
+
+def _prepare_chunk(chunk: pd.DataFrame, link_name: str = None) -> Tuple[pd.DataFrame, int]:
+    """
+    Convertit un lot de lignes brutes en colonnes typées prêtes à l'insertion.
+    
+    Args:
+        chunk (pd.DataFrame): Lot de lignes brutes
+        link_name (str, optional): Nom de liaison par défaut
+        
+    Returns:
+        Tuple[pd.DataFrame, int]: (Lignes valides, Nombre de lignes en erreur)
+    """
+    if 'link_name' in chunk.columns:
+        names = chunk['link_name'].astype(object)
+        names = names.where(names.notna(), link_name)
+    else:
+        names = pd.Series(link_name, index=chunk.index, dtype=object)
+    
+    frame = pd.DataFrame({
+        'link_name': names,
+        'timestamp': pd.to_datetime(chunk['timestamp'], errors='coerce') if 'timestamp' in chunk.columns else pd.NaT,
+        'rssi_dbm': _column_or_default(chunk, 'rssi_dbm', float('nan')),
+        'snr_db': _column_or_default(chunk, 'snr_db', float('nan')),
+        'ber': _column_or_default(chunk, 'ber', float('nan')),
+        # Dtype 'string' : les valeurs manquantes restent NA (astype(str) en fait 'nan' avec pandas 2)
+        'acm_modulation': chunk['acm_modulation'].astype('string') if 'acm_modulation' in chunk.columns else None,
+        'latency_ms': _column_or_default(chunk, 'latency_ms', 0.0),
+        'packet_loss': _column_or_default(chunk, 'packet_loss', 0.0),
+        'rainfall_mm': _column_or_default(chunk, 'rainfall_mm', 0.0),
+        'temperature_c': _column_or_default(chunk, 'temperature_c', float('nan'))
+    }, index=chunk.index)
+    
+    # Une ligne sans liaison, sans timestamp ou sans métrique obligatoire est une erreur
+    valid = (
+        frame['link_name'].notna()
+        & (frame['link_name'].astype(str).str.len() > 0)
+        & frame['timestamp'].notna()
+        & frame[['rssi_dbm', 'snr_db', 'ber']].notna().all(axis=1)
+        & frame['acm_modulation'].notna()
+    )
+    
+    return frame[valid], int((~valid).sum())
+
+
+def _existing_keys(db, rows: pd.DataFrame) -> pd.DataFrame:
+    """
+    Clés (link_id, timestamp) déjà en base parmi celles de rows (une requête sur
+    les liaisons et la plage de timestamps du lot, index uq_mesures_link_timestamp).
+    
+    Args:
+        db (Session): Session SQLAlchemy active
+        rows (pd.DataFrame): Mesures candidates (link_id, timestamp)
+        
+    Returns:
+        pd.DataFrame: Clés existantes (link_id, timestamp)
+    """
+    existing = db.execute(
+        select(MesureKPI.link_id, MesureKPI.timestamp).where(
+            MesureKPI.link_id.in_(rows['link_id'].unique().tolist()),
+            MesureKPI.timestamp >= rows['timestamp'].min().to_pydatetime(),
+            MesureKPI.timestamp <= rows['timestamp'].max().to_pydatetime()
+        )
+    ).all()
+    keys = pd.DataFrame(existing, columns=['link_id', 'timestamp'])
+    keys['link_id'] = keys['link_id'].astype('int64')
+    keys['timestamp'] = pd.to_datetime(keys['timestamp']).astype(rows['timestamp'].dtype)
+    return keys
+
+
+def _insert_new_rows(db, new_rows: pd.DataFrame) -> int:
+    """
+    Insère des mesures sans doublon interne en ignorant celles déjà en base, puis
+    met à jour les rollups, le détecteur en flux et l'Isolation Forest avec les
+    seules mesures insérées.
+    
+    Args:
+        db (Session): Session SQLAlchemy active
+        new_rows (pd.DataFrame): Mesures typées (MEASURE_COLUMNS), une seule par (link_id, timestamp)
+        
+    Returns:
+        int: Nombre de mesures effectivement insérées
+        
+    Raises:
+        RuntimeError: Mesures insérées entre-temps par une autre transaction (lot à annuler)
+    """
+    # Anti-jointure sur les clés déjà en base : les doublons n'atteignent ni les
+    # rollups ni les détecteurs (un import qui chevauche l'historique ne déclenche
+    # pas de recalcul complet)
+    marked = new_rows.merge(_existing_keys(db, new_rows), on=['link_id', 'timestamp'], how='left', indicator=True)
+    inserted = marked.loc[marked['_merge'] == 'left_only', MEASURE_COLUMNS].reset_index(drop=True)
+    if inserted.empty:
+        return 0
+    
+    values = [_to_python_values(inserted[col]) for col in MEASURE_COLUMNS]
+    values[0] = inserted['link_id'].tolist()
+    values[1] = list(inserted['timestamp'].dt.to_pydatetime())
+    records = [dict(zip(MEASURE_COLUMNS, row)) for row in zip(*values)]
+    
+    # La contrainte d'unicité reste le garde-fou contre une écriture concurrente
+    nb_inserted = insert_ignore_duplicates(db, MesureKPI.__table__, records, ['link_id', 'timestamp'])
+    if nb_inserted != len(inserted):
+        raise RuntimeError(f"{len(inserted) - nb_inserted} mesure(s) insérée(s) en parallèle par une autre transaction")
+    
+    update_rollups(db, inserted)
+    update_anomaly_states(db, inserted)
+    update_multivariate_states(db, inserted)
+    
+    return nb_inserted
+
+
+def _insert_chunk(db, chunk: pd.DataFrame, link_name: str, link_ids: Dict[str, int], stats: Dict) -> Set[int]:
+    """
+    Importe un lot : résolution des liaisons puis upsert executemany.
+    Les doublons (link_id, timestamp) déjà en base sont écartés par anti-jointure
+    avant l'insertion (voir _insert_new_rows). Les rollups horaires et
+    journaliers et l'état du détecteur d'anomalies sont mis à jour dans la même transaction.
+    
+    Args:
+        db (Session): Session SQLAlchemy active
+        chunk (pd.DataFrame): Lot de lignes brutes
+        link_name (str): Nom de liaison par défaut
+        link_ids (Dict[str, int]): Cache {nom: ID} partagé entre les lots
+        stats (Dict): Statistiques d'import mises à jour sur place
+        
+    Returns:
+        Set[int]: IDs des liaisons présentes dans le lot
+    """
+    frame, nb_errors = _prepare_chunk(chunk, link_name)
+    stats['errors'] += nb_errors
+    if frame.empty:
+        return set()
+    
+    unknown = set(frame['link_name'].astype(str).unique()) - link_ids.keys()
+    if unknown:
+        link_ids.update(resolve_link_ids(db, unknown))
+    frame['link_id'] = frame['link_name'].astype(str).map(link_ids).astype('int64')
+    touched_links = set(frame['link_id'].unique().tolist())
+    
+    # Doublons internes au lot : un seul candidat par (link_id, timestamp)
+    new_rows = frame.drop_duplicates(subset=['link_id', 'timestamp'], keep='first')
+    
+    # Doublons déjà en base : écartés avant l'insertion
+    nb_inserted = _insert_new_rows(db, new_rows)
+    
+    nb_duplicates = len(frame) - nb_inserted
+    stats['imported'] += nb_inserted
+    stats['duplicates'] += nb_duplicates
+    stats['skipped'] += nb_duplicates
+    
+    return touched_links
+
+
+def load_measures_to_db(df: pd.DataFrame, link_name: str = None, generate_alerts: bool = True) -> Tuple[bool, Dict]:
     """
     Charge les mesures d'un DataFrame dans la base de données.
     
+    Le DataFrame est traité par lots de config.IMPORT_CONFIG['chunk_size'] lignes
+    (voir load_measure_chunks_to_db).
+    
     Args:
         df (pd.DataFrame): DataFrame contenant les mesures
         link_name (str, optional): Nom de la liaison (si non présent dans le DataFrame)
+        generate_alerts (bool): Générer les alertes des liaisons importées en tâche de fond
+        
+    Returns:
+        Tuple[bool, Dict]: (Succès, Statistiques d'import ; 'alert_job_id' : tâche de
+        génération des alertes, voir alert_jobs.get_job_status ; 'alerts_generated' : 0
+        sans génération, None tant que la tâche tourne, son nombre d'alertes via nb_alerts)
+    """
+    return load_measure_chunks_to_db([df], link_name=link_name, generate_alerts=generate_alerts)
+
+
+def load_measure_chunks_to_db(chunks: Iterable[pd.DataFrame], link_name: str = None,
+                              generate_alerts: bool = True) -> Tuple[bool, Dict]:
+    """
+    Charge des mesures lues en streaming dans la base de données, lot par lot.
+    
+    Chaque lot est découpé en blocs de config.IMPORT_CONFIG['chunk_size'] lignes :
+    les liaisons sont résolues en une requête et les lignes sont insérées en
+    executemany avec un upsert qui ignore les doublons (link_id, timestamp).
+    Chaque bloc est importé dans sa propre transaction. Seul le lot courant est en mémoire.
+    
+    Args:
+        chunks (Iterable[pd.DataFrame]): Lots de mesures (voir csv_parser.iter_*_chunks)
+        link_name (str, optional): Nom de la liaison (si non présent dans les lots)
+        generate_alerts (bool): Générer les alertes des liaisons importées en tâche de fond
         
     Returns:
-        Tuple[bool, Dict]: (Succès, Statistiques d'import)
+        Tuple[bool, Dict]: (Succès, Statistiques d'import ; 'alert_job_id' : tâche de
+        génération des alertes, voir alert_jobs.get_job_status ; 'alerts_generated' : 0
+        sans génération, None tant que la tâche tourne, son nombre d'alertes via nb_alerts)
     """
     stats = {
-        'total': len(df),
+        'total': 0,
         'imported': 0,
         'skipped': 0,
         'errors': 0,
         'duplicates': 0,
-        'alerts_generated': 0
+        'alerts_generated': 0,
+        'alert_job_id': None
     }
     
     # Ensemble pour suivre les liaisons importées
     imported_links: Set[int] = set()
+    link_ids: Dict[str, int] = {}
+    chunk_size = config.IMPORT_CONFIG['chunk_size']
     
     try:
-        with get_db_context() as db:
-            for idx, row in df.iterrows():
+        # Une session par lot : en SQLite, le verrou de la base (database_lock) est
+        # relâché entre deux lots et pendant la lecture du fichier
+        for frame in chunks:
+            for start in range(0, len(frame), chunk_size):
+                chunk = frame.iloc[start:start + chunk_size]
+                first_row = stats['total']
+                stats['total'] += len(chunk)
+                # Compteurs avant le lot : un lot annulé compte toutes ses lignes en erreur, une seule fois
+                before = dict(stats)
                 try:
-                    # Déterminer le nom de la liaison
-                    current_link_name = row.get('link_name', link_name)
-                    if not current_link_name:
-                        stats['errors'] += 1
-                        continue
-                    
-                    # Récupérer ou créer la liaison
-                    link_id, _ = get_or_create_link(current_link_name)
-                    imported_links.add(link_id)
-                    
-                    # Vérifier si la mesure existe déjà
-                    timestamp = pd.to_datetime(row['timestamp'])
-                    existing = db.query(MesureKPI).filter(
-                        MesureKPI.link_id == link_id,
-                        MesureKPI.timestamp == timestamp
-                    ).first()
-                    
-                    if existing:
-                        stats['duplicates'] += 1
-                        stats['skipped'] += 1
-                        continue
-                    
-                    # Créer la nouvelle mesure
-                    mesure = MesureKPI(
-                        link_id=link_id,
-                        timestamp=timestamp,
-                        rssi_dbm=float(row['rssi_dbm']),
-                        snr_db=float(row['snr_db']),
-                        ber=float(row['ber']),
-                        acm_modulation=str(row['acm_modulation']),
-                        latency_ms=float(row.get('latency_ms', 0)),
-                        packet_loss=float(row.get('packet_loss', 0)),
-                        rainfall_mm=float(row.get('rainfall_mm', 0)),
-                        temperature_c=float(row.get('temperature_c')) if 'temperature_c' in row else None
-                    )
-                    
-                    db.add(mesure)
-                    stats['imported'] += 1
-                    
-                    # Commit par batch de 100 lignes
-                    if stats['imported'] % 100 == 0:
+                    with get_db_context() as db:
+                        chunk_links = _insert_chunk(db, chunk, link_name, link_ids, stats)
                         db.commit()
-                        log_info(f"Import en cours : {stats['imported']} lignes", "DataLoader")
-                
+                    imported_links |= chunk_links
+                    invalidate_measures(chunk_links)
+                    log_info(f"Import en cours : {stats['imported']} lignes", "DataLoader")
                 except Exception as e:
-                    stats['errors'] += 1
-                    log_error(f"Erreur ligne {idx}: {str(e)}", module="DataLoader")
-                    continue
-            
-            # Commit final
-            db.commit()
-            
+                    stats.update(before)
+                    stats['errors'] += len(chunk)
+                    log_error(f"Erreur lot {first_row}-{stats['total'] - 1}: {str(e)}", module="DataLoader")
+                    # Les liaisons créées dans le lot annulé n'existent plus
+                    link_ids.clear()
+        
         success = stats['imported'] > 0
         log_info(f"Import terminé : {stats['imported']}/{stats['total']} lignes importées", "DataLoader")
         
-        # Générer les alertes pour chaque liaison (même si doublons, vérifier quand même)
+        # Nouvelles liaisons et dernières mesures visibles sans attendre le rafraîchissement périodique
         if imported_links:
-            from backend.alerts.alert_engine import check_and_create_alerts
-            print(f"\n{'='*60}")
-            print(f"🚨 GÉNÉRATION DES ALERTES")
-            print(f"{'='*60}")
-            log_info(f"Génération des alertes pour {len(imported_links)} liaison(s)", "DataLoader")
-            
-            for link_id in imported_links:
-                try:
-                    print(f"\n📡 Analyse de la liaison ID={link_id}")
-                    alerts_created = check_and_create_alerts(link_id)
-                    stats['alerts_generated'] += len(alerts_created)
-                    if alerts_created:
-                        log_info(f"Liaison {link_id}: {len(alerts_created)} alerte(s) générée(s)", "DataLoader")
-                        print(f"   ✓ {len(alerts_created)} alerte(s) créée(s)")
-                    else:
-                        print(f"   • Aucune nouvelle alerte (seuils OK ou alertes déjà existantes)")
-                except Exception as e:
-                    log_error(f"Erreur génération alertes pour liaison {link_id}: {str(e)}", module="DataLoader")
-                    print(f"   ✗ Erreur: {str(e)}")
-            
-            print(f"\n{'='*60}")
-            print(f"📊 RÉSULTAT: {stats['alerts_generated']} alerte(s) générée(s) au total")
-            print(f"{'='*60}\n")
-            log_info(f"Total: {stats['alerts_generated']} alerte(s) générée(s)", "DataLoader")
+            from backend.analytics.fleet_snapshot import fleet_snapshot
+            fleet_snapshot.invalidate()
+        
+        # Générer les alertes des liaisons importées (même si doublons, vérifier quand même)
+        # en tâche de fond : l'import retourne dès que les mesures sont enregistrées
+        if imported_links and generate_alerts:
+            from backend.alerts.alert_jobs import submit_alert_job
+            try:
+                stats['alert_job_id'] = submit_alert_job(imported_links)
+                # Nombre connu à la fin de la tâche (get_job_status()['nb_alerts'])
+                stats['alerts_generated'] = None
+            except Exception as e:
+                log_error(f"Erreur soumission génération alertes : {str(e)}", module="DataLoader")
         
         return success, stats
         
@@ -203,7 +409,22 @@ def load_single_measure(
             )
             
             db.add(mesure)
+            db.flush()
+            frame = pd.DataFrame([{
+                'link_id': link_id,
+                'timestamp': timestamp,
+                'rssi_dbm': rssi_dbm,
+                'snr_db': snr_db,
+                'ber': ber,
+                'latency_ms': latency_ms,
+                'packet_loss': packet_loss,
+                'rainfall_mm': rainfall_mm
+            }])
+            update_rollups(db, frame)
+            update_anomaly_states(db, frame)
+            update_multivariate_states(db, frame)
             db.commit()
+            invalidate_measures([link_id])
             
             return True, "Mesure insérée avec succès"
             
@@ -215,6 +436,8 @@ def load_single_measure(
 def bulk_load_measures(measures: list) -> Tuple[bool, Dict]:
     """
     Charge une liste de mesures en bulk.
+    Comme pour l'import par lots, les doublons (link_id, timestamp) sont ignorés
+    sans faire échouer le reste des mesures.
     
     Args:
         measures (list): Liste de dictionnaires contenant les mesures
@@ -225,22 +448,42 @@ def bulk_load_measures(measures: list) -> Tuple[bool, Dict]:
     stats = {
         'total': len(measures),
         'imported': 0,
+        'duplicates': 0,
         'errors': 0
     }
     
+    columns = MEASURE_COLUMNS
+    required = ['link_id', 'timestamp', 'rssi_dbm', 'snr_db', 'ber', 'acm_modulation']
+    
     try:
+        valid_measures = []
+        for measure_data in measures:
+            unknown = set(measure_data) - set(columns)
+            missing = [col for col in required if measure_data.get(col) is None]
+            if unknown or missing:
+                stats['errors'] += 1
+                log_error(f"Erreur mesure : champs inconnus {sorted(unknown)}, manquants {missing}", module="DataLoader")
+                continue
+            valid_measures.append(measure_data)
+        
+        if not valid_measures:
+            return False, stats
+        
+        frame = pd.DataFrame(valid_measures, columns=columns)
+        frame['link_id'] = frame['link_id'].astype('int64')
+        frame['timestamp'] = pd.to_datetime(frame['timestamp'])
+        frame['rainfall_mm'] = frame['rainfall_mm'].fillna(0.0)
+        
+        # Doublons internes à la liste : un seul candidat par (link_id, timestamp)
+        new_rows = frame.drop_duplicates(subset=['link_id', 'timestamp'], keep='first')
+        
         with get_db_context() as db:
-            for measure_data in measures:
-                try:
-                    mesure = MesureKPI(**measure_data)
-                    db.add(mesure)
-                    stats['imported'] += 1
-                except Exception as e:
-                    stats['errors'] += 1
-                    log_error(f"Erreur mesure : {str(e)}", module="DataLoader")
-            
+            nb_inserted = _insert_new_rows(db, new_rows)
             db.commit()
-            
+            invalidate_measures(set(new_rows['link_id'].tolist()))
+        
+        stats['imported'] = nb_inserted
+        stats['duplicates'] = len(frame) - nb_inserted
         return stats['imported'] > 0, stats
         
     except Exception as e:
@@ -271,7 +514,13 @@ def delete_measures_by_link(link_id: int, date_from: datetime = None, date_to: d
             
             count = query.count()
             query.delete(synchronize_session=False)
+            # Les buckets de la plage supprimée sont recalculés depuis les mesures restantes
+            rebuild_rollups(db, link_id, date_from, date_to)
+            rebuild_anomaly_states(db, link_id)
+            reset_multivariate_state(db, link_id)
             db.commit()
+            invalidate_measures([link_id])
+            model_registry.forget(link_id)
             
             log_info(f"{count} mesure(s) supprimée(s) pour link_id={link_id}", "DataLoader")
             return True, count
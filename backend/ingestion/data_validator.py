@@ -2,8 +2,10 @@
 Validateur de données pour les mesures FH.
 Vérifie la conformité des données importées.
 """
+import numpy as np
 import pandas as pd
-from typing import Tuple, List, Dict
+from functools import lru_cache
+from typing import Tuple, List, Dict, Iterable, Iterator, Optional
 import config
 
 
@@ -31,151 +33,223 @@ def validate_schema(df: pd.DataFrame) -> Tuple[bool, List[str], List[str]]:
     return is_valid, missing_columns, df_columns_lower
 
 
-def validate_data_ranges(df: pd.DataFrame) -> Tuple[bool, Dict[str, List]]:
+# Contrôles de plage : (colonne, clé de config.DATA_VALIDATION, unité affichée)
+RANGE_CHECKS = [
+    ('rssi_dbm', 'rssi_range', ' dBm'),
+    ('snr_db', 'snr_range', ' dB'),
+    ('ber', 'ber_range', ''),
+    ('latency_ms', 'latency_range', ' ms'),
+    ('packet_loss', 'packet_loss_range', ' %'),
+    ('rainfall_mm', 'rainfall_range', ' mm')
+]
+
+
+def _as_float(series: pd.Series) -> np.ndarray:
+    """Convertit une colonne en tableau float64 (valeurs non numériques -> NaN)."""
+    if not pd.api.types.is_numeric_dtype(series):
+        series = pd.to_numeric(series, errors='coerce')
+    return series.to_numpy(dtype='float64', na_value=np.nan)
+
+
+def _as_datetime(series: pd.Series, conversion_errors: int = 0) -> Tuple[pd.Series, int]:
     """
-    Valide que les valeurs sont dans les plages acceptables.
+    Convertit une colonne en datetime64 sans re-parser si elle l'est déjà.
     
     Args:
-        df (pd.DataFrame): DataFrame à valider
+        series (pd.Series): Colonne à convertir
+        conversion_errors (int): Valeurs non reconnues lors d'un typage antérieur
         
     Returns:
-        Tuple[bool, Dict[str, List]]: (Validité globale, Dictionnaire des erreurs par colonne)
+        Tuple[pd.Series, int]: (Colonne convertie, Nombre de valeurs non reconnues)
     """
-    errors = {}
-    validation_config = config.DATA_VALIDATION
-    
-    # Valider RSSI
-    if 'rssi_dbm' in df.columns:
-        rssi_min, rssi_max = validation_config['rssi_range']
-        invalid_rssi = df[(df['rssi_dbm'] < rssi_min) | (df['rssi_dbm'] > rssi_max)]
-        if not invalid_rssi.empty:
-            errors['rssi_dbm'] = [
-                f"{len(invalid_rssi)} valeur(s) hors plage [{rssi_min}, {rssi_max}] dBm"
-            ]
-    
-    # Valider SNR
-    if 'snr_db' in df.columns:
-        snr_min, snr_max = validation_config['snr_range']
-        invalid_snr = df[(df['snr_db'] < snr_min) | (df['snr_db'] > snr_max)]
-        if not invalid_snr.empty:
-            errors['snr_db'] = [
-                f"{len(invalid_snr)} valeur(s) hors plage [{snr_min}, {snr_max}] dB"
-            ]
-    
-    # Valider BER
-    if 'ber' in df.columns:
-        ber_min, ber_max = validation_config['ber_range']
-        invalid_ber = df[(df['ber'] < ber_min) | (df['ber'] > ber_max)]
-        if not invalid_ber.empty:
-            errors['ber'] = [
-                f"{len(invalid_ber)} valeur(s) hors plage [{ber_min}, {ber_max}]"
-            ]
-    
-    # Valider latence
-    if 'latency_ms' in df.columns:
-        lat_min, lat_max = validation_config['latency_range']
-        invalid_latency = df[(df['latency_ms'] < lat_min) | (df['latency_ms'] > lat_max)]
-        if not invalid_latency.empty:
-            errors['latency_ms'] = [
-                f"{len(invalid_latency)} valeur(s) hors plage [{lat_min}, {lat_max}] ms"
-            ]
-    
-    # Valider packet loss
-    if 'packet_loss' in df.columns:
-        pl_min, pl_max = validation_config['packet_loss_range']
-        invalid_pl = df[(df['packet_loss'] < pl_min) | (df['packet_loss'] > pl_max)]
-        if not invalid_pl.empty:
-            errors['packet_loss'] = [
-                f"{len(invalid_pl)} valeur(s) hors plage [{pl_min}, {pl_max}] %"
-            ]
-    
-    # Valider pluie
-    if 'rainfall_mm' in df.columns:
-        rain_min, rain_max = validation_config['rainfall_range']
-        invalid_rain = df[(df['rainfall_mm'] < rain_min) | (df['rainfall_mm'] > rain_max)]
-        if not invalid_rain.empty:
-            errors['rainfall_mm'] = [
-                f"{len(invalid_rain)} valeur(s) hors plage [{rain_min}, {rain_max}] mm"
-            ]
-    
-    is_valid = len(errors) == 0
-    return is_valid, errors
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series, conversion_errors
+    timestamps = pd.to_datetime(series, errors='coerce')
+    return timestamps, int((series.notna() & timestamps.isna()).sum())
 
 
-def validate_acm_modulation(df: pd.DataFrame) -> Tuple[bool, List[str]]:
+class ValidationPlan:
     """
-    Valide que les modulations ACM sont valides.
+    Plan de validation compilé une fois à partir de config.DATA_VALIDATION.
     
-    Args:
-        df (pd.DataFrame): DataFrame à valider
-        
-    Returns:
-        Tuple[bool, List[str]]: (Validité, Liste des modulations invalides)
+    scan() évalue toutes les vérifications (plages, modulations ACM, valeurs
+    nulles, ordre chronologique) en une passe NumPy par masques booléens et
+    retourne à la fois les compteurs du rapport et les masques de rejet par ligne.
     """
-    if 'acm_modulation' not in df.columns:
-        return True, []
     
-    valid_modulations = config.ACM_MODULATIONS
-    invalid_modulations = df[~df['acm_modulation'].isin(valid_modulations)]['acm_modulation'].unique()
-    
-    is_valid = len(invalid_modulations) == 0
-    return is_valid, invalid_modulations.tolist()
+    # Colonnes sans lesquelles une ligne ne peut pas être importée
+    MANDATORY_COLUMNS = ['link_name', 'rssi_dbm', 'snr_db', 'ber', 'acm_modulation']
+    
+    def __init__(self):
+        validation_config = config.DATA_VALIDATION
+        self.required_columns = [col.lower().strip() for col in validation_config['required_columns']]
+        self.range_columns = [column for column, _, _ in RANGE_CHECKS]
+        self.range_min = np.array([validation_config[key][0] for _, key, _ in RANGE_CHECKS], dtype='float64')
+        self.range_max = np.array([validation_config[key][1] for _, key, _ in RANGE_CHECKS], dtype='float64')
+        self.acm_modulations = list(config.ACM_MODULATIONS)
+    
+    def _invalid_modulation_mask(self, series: pd.Series) -> np.ndarray:
+        """Masque des modulations hors config.ACM_MODULATIONS (NaN compris)."""
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # Test d'appartenance sur les seules catégories, propagé par les codes ;
+            # le code -1 (NaN) pointe sur la case False ajoutée en fin de tableau
+            valid_categories = np.append(series.cat.categories.isin(self.acm_modulations), False)
+            return ~valid_categories[series.cat.codes.to_numpy()]
+        return ~series.isin(self.acm_modulations).to_numpy()
+    
+    def scan(self, df: pd.DataFrame, previous_timestamp: Optional[pd.Timestamp] = None) -> Dict:
+        """
+        Évalue le plan sur un DataFrame (ou un lot) en une seule passe.
+        
+        Args:
+            df (pd.DataFrame): DataFrame à valider
+            previous_timestamp (pd.Timestamp, optional): Dernier timestamp du lot précédent
+            
+        Returns:
+            Dict: Compteurs du rapport, masques par contrôle, masque de rejet et timestamps convertis
+        """
+        nb_rows = len(df)
+        columns = list(df.columns)
+        columns_lower = [str(col).lower().strip() for col in columns]
+        masks = {}
+        
+        # Plages : matrice (lignes x colonnes) comparée aux bornes par broadcast
+        present = [i for i, col in enumerate(self.range_columns) if col in df.columns]
+        range_columns = [self.range_columns[i] for i in present]
+        if range_columns:
+            values = np.column_stack([_as_float(df[col]) for col in range_columns])
+            out_of_range = (values < self.range_min[present]) | (values > self.range_max[present])
+        else:
+            out_of_range = np.zeros((nb_rows, 0), dtype=bool)
+        range_counts = out_of_range.sum(axis=0)
+        for j, column in enumerate(range_columns):
+            masks[column] = out_of_range[:, j]
+        
+        # Modulations ACM
+        invalid_modulations = []
+        if 'acm_modulation' in df.columns:
+            acm_mask = self._invalid_modulation_mask(df['acm_modulation'])
+            masks['acm_modulation'] = acm_mask
+            if acm_mask.any():
+                invalid_modulations = pd.unique(df['acm_modulation'].to_numpy()[acm_mask]).tolist()
+        
+        # Valeurs nulles : une matrice pour toutes les colonnes
+        null_matrix = df.isna().to_numpy()
+        missing_counts = null_matrix.sum(axis=0)
+        mandatory = [columns.index(col) for col in self.MANDATORY_COLUMNS if col in columns]
+        masks['missing_mandatory'] = null_matrix[:, mandatory].any(axis=1) if mandatory else np.zeros(nb_rows, dtype=bool)
+        
+        # Timestamps : conversion unique, nulls et ordre chronologique
+        timestamps = None
+        null_timestamps = 0
+        unparsable_timestamps = 0
+        chronological = True
+        ts_min = ts_max = last_timestamp = None
+        if 'timestamp' in df.columns:
+            # Lot déjà typé (csv_parser.apply_column_dtypes) : échecs comptés au typage
+            timestamps, unparsable_timestamps = _as_datetime(
+                df['timestamp'], df.attrs.get('conversion_errors', {}).get('timestamp', 0)
+            )
+            ts_values = timestamps.to_numpy(dtype='datetime64[ns]')
+            ts_null = np.isnat(ts_values)
+            # Valeurs absentes et valeurs non reconnues sont signalées séparément
+            null_timestamps = int(ts_null.sum()) - unparsable_timestamps
+            masks['timestamp'] = ts_null
+            
+            valid_ts = ts_values[~ts_null]
+            order_mask = np.zeros(nb_rows, dtype=bool)
+            if valid_ts.size:
+                previous = np.concatenate((
+                    [np.datetime64(previous_timestamp, 'ns') if previous_timestamp is not None else valid_ts[0]],
+                    valid_ts[:-1]
+                ))
+                order_mask[~ts_null] = valid_ts < previous
+                chronological = not order_mask.any()
+                ts_min, ts_max = pd.Timestamp(valid_ts.min()), pd.Timestamp(valid_ts.max())
+                last_timestamp = pd.Timestamp(valid_ts[-1])
+            masks['timestamp_order'] = order_mask
+            missing_counts[columns.index('timestamp')] -= unparsable_timestamps
+        
+        # Rejet : toute ligne fautive sur un contrôle ligne à ligne (l'ordre est un contrôle fichier)
+        reject_mask = out_of_range.any(axis=1) | masks['missing_mandatory']
+        for key in ('acm_modulation', 'timestamp'):
+            if key in masks:
+                reject_mask |= masks[key]
+        
+        return {
+            'nb_rows': nb_rows,
+            'columns': columns,
+            'missing_columns': [col for col in self.required_columns if col not in columns_lower],
+            'range_counts': {col: int(n) for col, n in zip(range_columns, range_counts) if n > 0},
+            'invalid_modulations': invalid_modulations,
+            'missing_values': {col: int(n) for col, n in zip(columns, missing_counts) if n > 0},
+            'has_timestamp': timestamps is not None,
+            'null_timestamps': null_timestamps,
+            'unparsable_timestamps': unparsable_timestamps,
+            'chronological': chronological,
+            'ts_min': ts_min,
+            'ts_max': ts_max,
+            'last_timestamp': last_timestamp,
+            'masks': masks,
+            'reject_mask': reject_mask,
+            'timestamps': timestamps
+        }
+
+
+@lru_cache(maxsize=1)
+def get_validation_plan() -> ValidationPlan:
+    """Retourne le plan de validation compilé (construit une seule fois)."""
+    return ValidationPlan()
 
 
-def validate_timestamps(df: pd.DataFrame) -> Tuple[bool, str]:
+def count_out_of_range(df: pd.DataFrame) -> Dict[str, int]:
     """
-    Valide que les timestamps sont cohérents.
+    Compte les valeurs hors plage pour chaque colonne contrôlée.
     
     Args:
         df (pd.DataFrame): DataFrame à valider
         
     Returns:
-        Tuple[bool, str]: (Validité, Message d'erreur)
+        Dict[str, int]: Dictionnaire {colonne: nombre de valeurs hors plage} (colonnes fautives uniquement)
     """
-    if 'timestamp' not in df.columns:
-        return False, "Colonne 'timestamp' manquante"
-    
-    # Vérifier les valeurs nulles
-    null_timestamps = df['timestamp'].isnull().sum()
-    if null_timestamps > 0:
-        return False, f"{null_timestamps} timestamp(s) manquant(s)"
-    
-    # Convertir en datetime si nécessaire
-    try:
-        timestamps = pd.to_datetime(df['timestamp'])
-    except Exception as e:
-        return False, f"Erreur de conversion des timestamps : {str(e)}"
-    
-    # Vérifier l'ordre chronologique
-    if not timestamps.is_monotonic_increasing:
-        return False, "Les timestamps ne sont pas dans l'ordre chronologique"
-    
-    return True, "Timestamps valides"
+    return get_validation_plan().scan(df)['range_counts']
+
+
+def _range_error_message(column: str, nb_invalid: int) -> str:
+    """Formate le message d'erreur de plage d'une colonne."""
+    range_key, unit = next((key, unit) for col, key, unit in RANGE_CHECKS if col == column)
+    range_min, range_max = config.DATA_VALIDATION[range_key]
+    return f"{nb_invalid} valeur(s) hors plage [{range_min}, {range_max}]{unit}"
 
 
-def check_missing_values(df: pd.DataFrame) -> Dict[str, int]:
+def validate_data_ranges(df: pd.DataFrame) -> Tuple[bool, Dict[str, List]]:
     """
-    Compte les valeurs manquantes par colonne.
+    Valide que les valeurs sont dans les plages acceptables.
     
     Args:
-        df (pd.DataFrame): DataFrame à analyser
+        df (pd.DataFrame): DataFrame à valider
         
     Returns:
-        Dict[str, int]: Dictionnaire {colonne: nombre de valeurs manquantes}
+        Tuple[bool, Dict[str, List]]: (Validité globale, Dictionnaire des erreurs par colonne)
     """
-    missing = df.isnull().sum()
-    return {col: count for col, count in missing.items() if count > 0}
+    errors = {
+        column: [_range_error_message(column, nb_invalid)]
+        for column, nb_invalid in count_out_of_range(df).items()
+    }
+    
+    is_valid = len(errors) == 0
+    return is_valid, errors
 
 
-def validate_complete(df: pd.DataFrame) -> Tuple[bool, Dict[str, any]]:
+def _build_report(summary: Dict) -> Tuple[bool, Dict[str, any], float]:
     """
-    Effectue une validation complète du DataFrame.
+    Construit le rapport de validation et le score de qualité à partir des compteurs d'un scan.
     
     Args:
-        df (pd.DataFrame): DataFrame à valider
+        summary (Dict): Compteurs produits par ValidationPlan.scan (éventuellement cumulés)
         
     Returns:
-        Tuple[bool, Dict]: (Validité globale, Rapport de validation détaillé)
+        Tuple[bool, Dict, float]: (Validité globale, Rapport de validation détaillé, Score de qualité)
     """
     report = {
         'valid': True,
@@ -185,44 +259,107 @@ def validate_complete(df: pd.DataFrame) -> Tuple[bool, Dict[str, any]]:
     }
     
     # 1. Validation du schéma
-    schema_valid, missing_cols, present_cols = validate_schema(df)
-    if not schema_valid:
+    if summary['missing_columns']:
         report['valid'] = False
-        report['errors'].append(f"Colonnes manquantes : {', '.join(missing_cols)}")
+        report['errors'].append(f"Colonnes manquantes : {', '.join(summary['missing_columns'])}")
     
     # 2. Validation des plages de valeurs
-    ranges_valid, range_errors = validate_data_ranges(df)
-    if not ranges_valid:
-        report['warnings'].extend([f"{col}: {msg[0]}" for col, msg in range_errors.items()])
+    report['warnings'].extend([
+        f"{col}: {_range_error_message(col, count)}" for col, count in summary['range_counts'].items()
+    ])
     
     # 3. Validation des modulations ACM
-    acm_valid, invalid_mods = validate_acm_modulation(df)
-    if not acm_valid:
-        report['warnings'].append(f"Modulations invalides : {', '.join(invalid_mods)}")
+    if summary['invalid_modulations']:
+        report['warnings'].append(
+            f"Modulations invalides : {', '.join(str(mod) for mod in summary['invalid_modulations'])}"
+        )
     
     # 4. Validation des timestamps
-    ts_valid, ts_message = validate_timestamps(df)
-    if not ts_valid:
-        report['errors'].append(ts_message)
+    if not summary['has_timestamp']:
+        report['errors'].append("Colonne 'timestamp' manquante")
+        report['valid'] = False
+    elif summary['null_timestamps'] > 0 or summary['unparsable_timestamps'] > 0:
+        if summary['null_timestamps'] > 0:
+            report['errors'].append(f"{summary['null_timestamps']} timestamp(s) manquant(s)")
+        if summary['unparsable_timestamps'] > 0:
+            report['errors'].append(
+                f"Erreur de conversion des timestamps : {summary['unparsable_timestamps']} valeur(s) non reconnue(s)"
+            )
+        report['valid'] = False
+    elif not summary['chronological']:
+        report['errors'].append("Les timestamps ne sont pas dans l'ordre chronologique")
         report['valid'] = False
     
     # 5. Vérification des valeurs manquantes
-    missing_values = check_missing_values(df)
-    if missing_values:
-        report['warnings'].append(f"Valeurs manquantes détectées : {missing_values}")
+    if summary['missing_values']:
+        report['warnings'].append(f"Valeurs manquantes détectées : {summary['missing_values']}")
     
     # Informations générales
     report['info'] = {
-        'nb_lignes': len(df),
-        'nb_colonnes': len(df.columns),
-        'colonnes': list(df.columns),
+        'nb_lignes': summary['nb_rows'],
+        'nb_colonnes': len(summary['columns']),
+        'colonnes': summary['columns'],
         'periode': {
-            'debut': str(df['timestamp'].min()) if 'timestamp' in df.columns else None,
-            'fin': str(df['timestamp'].max()) if 'timestamp' in df.columns else None
+            'debut': str(summary['ts_min']) if summary['ts_min'] is not None else None,
+            'fin': str(summary['ts_max']) if summary['ts_max'] is not None else None
         }
     }
     
-    return report['valid'], report
+    # Score de qualité : pénalités valeurs manquantes, colonnes hors plage, modulations invalides
+    score = 100.0
+    if summary['nb_rows'] and summary['columns']:
+        missing_ratio = sum(summary['missing_values'].values()) / (summary['nb_rows'] * len(summary['columns']))
+        score -= missing_ratio * 30
+    score -= len(summary['range_counts']) * 5
+    score -= len(summary['invalid_modulations']) * 3
+    
+    return report['valid'], report, max(0, min(100, score))
+
+
+def run_validation_plan(df: pd.DataFrame) -> Dict[str, any]:
+    """
+    Valide un DataFrame en une passe et retourne rapport, score et masques ensemble.
+    
+    Args:
+        df (pd.DataFrame): DataFrame à valider
+        
+    Returns:
+        Dict: {
+            'valid': Validité globale,
+            'report': Rapport de validation (format validate_complete),
+            'quality_score': Score de qualité (0-100),
+            'masks': Masques booléens par contrôle,
+            'reject_mask': Masque des lignes à écarter,
+            'droppable': True si écarter les lignes rejetées suffit à rendre l'import possible,
+            'timestamps': Colonne timestamp convertie (réutilisable sans re-parsing)
+        }
+    """
+    summary = get_validation_plan().scan(df)
+    valid, report, quality_score = _build_report(summary)
+    
+    return {
+        'valid': valid,
+        'report': report,
+        'quality_score': quality_score,
+        'masks': summary['masks'],
+        'reject_mask': summary['reject_mask'],
+        'droppable': not summary['missing_columns'] and summary['has_timestamp'] and summary['chronological'],
+        'timestamps': summary['timestamps']
+    }
+
+
+def validate_complete(df: pd.DataFrame) -> Tuple[bool, Dict[str, any]]:
+    """
+    Effectue une validation complète du DataFrame.
+    
+    Args:
+        df (pd.DataFrame): DataFrame à valider
+        
+    Returns:
+        Tuple[bool, Dict]: (Validité globale, Rapport de validation détaillé)
+    """
+    result = run_validation_plan(df)
+    return result['valid'], result['report']
 
 
 def get_data_quality_score(df: pd.DataFrame) -> float:
@@ -235,20 +372,88 @@ def get_data_quality_score(df: pd.DataFrame) -> float:
     Returns:
         float: Score de qualité (0-100)
     """
-    score = 100.0
+    return run_validation_plan(df)['quality_score']
+
+
+def validate_chunks(chunks: Iterable[pd.DataFrame]) -> Dict[str, any]:
+    """
+    Valide un fichier lu en streaming, lot par lot, sans le charger en entier.
+    Les compteurs de chaque lot sont cumulés ; l'ordre chronologique est vérifié
+    y compris entre deux lots. Le masque de rejet couvre l'ensemble du fichier
+    (1 octet par ligne) et s'applique à la passe d'import avec drop_rejected_rows.
     
-    # Pénalité pour valeurs manquantes
-    missing_ratio = df.isnull().sum().sum() / (len(df) * len(df.columns))
-    score -= missing_ratio * 30
+    Args:
+        chunks (Iterable[pd.DataFrame]): Lots typés (voir csv_parser.iter_*_chunks)
+        
+    Returns:
+        Dict: Mêmes clés que run_validation_plan (sans 'masks' ni 'timestamps')
+    """
+    plan = get_validation_plan()
+    summary = None
+    reject_masks = []
+    nb_chunks = 0
+    
+    for chunk in chunks:
+        nb_chunks += 1
+        scan = plan.scan(chunk, previous_timestamp=summary['last_timestamp'] if summary else None)
+        reject_masks.append(scan['reject_mask'])
+        
+        if summary is None:
+            summary = scan
+            continue
+        
+        summary['nb_rows'] += scan['nb_rows']
+        for key in ('range_counts', 'missing_values'):
+            for col, count in scan[key].items():
+                summary[key][col] = summary[key].get(col, 0) + count
+        summary['invalid_modulations'] = list(dict.fromkeys(summary['invalid_modulations'] + scan['invalid_modulations']))
+        summary['null_timestamps'] += scan['null_timestamps']
+        summary['unparsable_timestamps'] += scan['unparsable_timestamps']
+        summary['chronological'] = summary['chronological'] and scan['chronological']
+        if scan['ts_min'] is not None:
+            summary['ts_min'] = scan['ts_min'] if summary['ts_min'] is None else min(summary['ts_min'], scan['ts_min'])
+            summary['ts_max'] = scan['ts_max'] if summary['ts_max'] is None else max(summary['ts_max'], scan['ts_max'])
+            summary['last_timestamp'] = scan['last_timestamp']
+    
+    if summary is None:
+        report = {'valid': False, 'errors': ["Le fichier est vide"], 'warnings': [], 'info': {'nb_lignes': 0}}
+        return {'valid': False, 'report': report, 'quality_score': 0.0,
+                'reject_mask': np.zeros(0, dtype=bool), 'droppable': False}
+    
+    # Compteurs cumulés remis dans l'ordre des colonnes (rapport identique à validate_complete)
+    summary['range_counts'] = {
+        col: summary['range_counts'][col] for col in plan.range_columns if col in summary['range_counts']
+    }
+    summary['missing_values'] = {
+        col: summary['missing_values'][col] for col in summary['columns'] if col in summary['missing_values']
+    }
     
-    # Pénalité pour valeurs hors plage
-    _, range_errors = validate_data_ranges(df)
-    if range_errors:
-        score -= len(range_errors) * 5
+    valid, report, quality_score = _build_report(summary)
+    report['info']['nb_lots'] = nb_chunks
     
-    # Pénalité pour modulations invalides
-    acm_valid, invalid_mods = validate_acm_modulation(df)
-    if not acm_valid:
-        score -= len(invalid_mods) * 3
+    return {
+        'valid': valid,
+        'report': report,
+        'quality_score': quality_score,
+        'reject_mask': np.concatenate(reject_masks),
+        'droppable': not summary['missing_columns'] and summary['has_timestamp'] and summary['chronological']
+    }
+
+
+def drop_rejected_rows(chunks: Iterable[pd.DataFrame], reject_mask: np.ndarray) -> Iterator[pd.DataFrame]:
+    """
+    Écarte d'un flux de lots les lignes marquées par un masque de rejet global.
+    Les lots doivent être relus dans le même ordre que lors de la validation.
     
-    return max(0, min(100, score))
+    Args:
+        chunks (Iterable[pd.DataFrame]): Lots de mesures
+        reject_mask (np.ndarray): Masque de rejet produit par validate_chunks
+        
+    Yields:
+        pd.DataFrame: Lots sans les lignes rejetées
+    """
+    position = 0
+    for chunk in chunks:
+        chunk_mask = reject_mask[position:position + len(chunk)]
+        position += len(chunk)
+        yield chunk[~chunk_mask]
@@ -0,0 +1,156 @@
+"""
+Benchmark du moteur de règles d'alerte : chaînes if/elif évaluées liaison par
+liaison (ancien check_and_create_alerts) vs règles compilées évaluées en lot.
+
+Aucune base de données n'est utilisée : les flux de mesures sont synthétiques.
+Deux scénarios :
+- règles par défaut sur la dernière mesure de chaque liaison ;
+- règles avec durée (3 échantillons consécutifs) et hystérésis (2 dB) sur des
+  flux complets, comparées à une machine à états Python par liaison.
+
+Usage :
+    python benchmarks/benchmark_alert_rules.py --links 1000 --points 288
+"""
+import argparse
+import copy
+import sys
+import time
+from pathlib import Path
+
+root_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(root_dir))
+
+import numpy as np
+from backend.alerts.rule_engine import RuleEngine
+from backend.analytics.measure_window import WINDOW_METRICS
+import config
+
+
+def generate_streams(nb_links: int, nb_points: int):
+    """Génère des flux de mesures (regroupés par liaison) qui franchissent les seuils."""
+    rng = np.random.default_rng(11)
+    n = nb_links * nb_points
+    link_ids = np.repeat(np.arange(1, nb_links + 1), nb_points)
+    base_rssi = np.repeat(rng.choice([-60, -74, -78, -81], nb_links), nb_points)
+    base_snr = np.repeat(rng.choice([25, 11, 8, 4], nb_links), nb_points)
+    columns = {
+        'rssi_dbm': base_rssi + rng.normal(0, 3, n),
+        'snr_db': base_snr + rng.normal(0, 2, n),
+        'ber': 10 ** rng.uniform(-10, -6, n),
+        'latency_ms': rng.normal(3, 0.5, n),
+        'packet_loss': rng.uniform(0, 0.1, n),
+        'rainfall_mm': rng.choice([0.0, 20.0], n, p=[0.9, 0.1])
+    }
+    return link_ids, columns
+
+
+def legacy_latest(kpis: dict) -> dict:
+    """Chaînes if/elif de l'ancien check_and_create_alerts sur une mesure : {(type, sévérité): message}."""
+    alerts = {}
+    if kpis['rssi_dbm'] < config.SEUILS_RSSI['CRITIQUE']:
+        alerts[('RSSI_LOW', 'CRITIQUE')] = f"RSSI critique : {kpis['rssi_dbm']:.1f} dBm"
+    elif kpis['rssi_dbm'] < config.SEUILS_RSSI['DEGRADED']:
+        alerts[('RSSI_LOW', 'MAJEURE')] = f"RSSI dégradé : {kpis['rssi_dbm']:.1f} dBm"
+    if kpis['snr_db'] < config.SEUILS_SNR['CRITIQUE']:
+        alerts[('SNR_LOW', 'CRITIQUE')] = f"SNR critique : {kpis['snr_db']:.1f} dB"
+    elif kpis['snr_db'] < config.SEUILS_SNR['DEGRADED']:
+        alerts[('SNR_LOW', 'MAJEURE')] = f"SNR dégradé : {kpis['snr_db']:.1f} dB"
+    if kpis['rainfall_mm'] > 15 and kpis['rssi_dbm'] < config.SEUILS_RSSI['ACCEPTABLE']:
+        alerts[('RAINFALL_IMPACT', 'MAJEURE')] = (
+            f"Impact pluie détecté : {kpis['rainfall_mm']:.1f} mm, RSSI={kpis['rssi_dbm']:.1f} dBm"
+        )
+    return alerts
+
+
+def legacy_stream(values: list, conditions: list, seuils: list, duree: int, hysteresis: float) -> int:
+    """Machine à états par échantillon (règle à seuil bas) : indice du niveau actif final, -1 sinon."""
+    final = -1
+    for level, seuil in enumerate(seuils):
+        active, run = False, 0
+        for value, condition in zip(values, conditions):
+            breach = condition and value < seuil
+            run = run + 1 if breach else 0
+            if run >= duree:
+                active = True
+            elif not (condition and value < seuil + hysteresis):
+                active = False
+        if active and final == -1:
+            final = level
+    return final
+
+
+def stream_rules() -> list:
+    """Règles par défaut avec durée et hystérésis sur RSSI/SNR."""
+    rules = copy.deepcopy(config.ALERT_RULES)
+    for rule in rules:
+        if rule['type'] in ('RSSI_LOW', 'SNR_LOW'):
+            rule.update(duree=3, hysteresis=2.0)
+    return rules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--links', type=int, default=1000, help="Nombre de liaisons")
+    parser.add_argument('--points', type=int, default=288, help="Mesures par liaison")
+    args = parser.parse_args()
+
+    link_ids, columns = generate_streams(args.links, args.points)
+    ends = np.arange(1, args.links + 1) * args.points - 1
+
+    print("=" * 70)
+    print(f"⏱️ BENCHMARK MOTEUR DE RÈGLES ({args.links} liaisons × {args.points} mesures)")
+    print("=" * 70)
+
+    # 1. Dernière mesure de chaque liaison, règles par défaut
+    t0 = time.perf_counter()
+    engine = RuleEngine(config.ALERT_RULES)
+    compile_time = time.perf_counter() - t0
+
+    latest = {metric: columns[metric][ends] for metric in WINDOW_METRICS}
+    t0 = time.perf_counter()
+    expected = set()
+    for i, link_id in enumerate(link_ids[ends].tolist()):
+        kpis = {metric: float(latest[metric][i]) for metric in WINDOW_METRICS}
+        expected |= {(link_id, *alert, message) for alert, message in legacy_latest(kpis).items()}
+    legacy_time = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    candidates = engine.evaluate(latest, link_ids[ends])
+    engine_time = time.perf_counter() - t0
+    obtained = {(c['link_id'], c['type'], c['severite'], c['message']) for c in candidates}
+
+    print(f"\n1️⃣ Dernière mesure (compilation : {compile_time * 1000:.2f} ms)")
+    print(f"   if/elif par liaison : {legacy_time * 1000:.1f} ms")
+    print(f"   Moteur compilé      : {engine_time * 1000:.1f} ms ({len(candidates)} alertes)")
+    print(f"   {'✅' if obtained == expected else '❌'} Résultats identiques : {obtained == expected}")
+
+    # 2. Flux complets avec durée et hystérésis
+    engine = RuleEngine(stream_rules())
+    t0 = time.perf_counter()
+    expected = set()
+    conditions = [True] * args.points
+    for start in range(0, len(link_ids), args.points):
+        for rule in engine.rules:
+            if rule.type == 'RAINFALL_IMPACT':
+                continue
+            values = columns[rule.metrique][start:start + args.points].tolist()
+            level = legacy_stream(values, conditions, rule.seuils.tolist(), rule.duree, rule.hysteresis)
+            if level >= 0:
+                expected.add((int(link_ids[start]), rule.type, rule.niveaux[level]['severite']))
+    legacy_time = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    candidates = engine.evaluate(columns, link_ids)
+    engine_time = time.perf_counter() - t0
+    obtained = {(c['link_id'], c['type'], c['severite']) for c in candidates if c['type'] != 'RAINFALL_IMPACT'}
+
+    nb_samples = len(link_ids)
+    print(f"\n2️⃣ Flux complets ({nb_samples:,} mesures, durée=3, hystérésis=2)")
+    print(f"   Machine à états par liaison : {legacy_time:.3f}s → {nb_samples / legacy_time:,.0f} mesures/s")
+    print(f"   Moteur compilé (lot)        : {engine_time:.3f}s → {nb_samples / engine_time:,.0f} mesures/s")
+    print(f"   {'✅' if obtained == expected else '❌'} Résultats identiques : {obtained == expected}")
+    print(f"   🚀 Accélération : x{legacy_time / engine_time:.1f}")
+
+
+if __name__ == "__main__":
+    main()
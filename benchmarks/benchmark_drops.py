@@ -0,0 +1,118 @@
+"""
+Benchmark de la détection des chutes brutales : boucle par liaison (np.diff de
+mesures consécutives, un dictionnaire par chute) vs detect_drops_array (diff
+groupé sur toute la flotte, plusieurs lags et fenêtres glissantes).
+
+Aucune base de données n'est utilisée : les mesures sont synthétiques.
+
+Usage :
+    python benchmarks/benchmark_drops.py --samples 10000000 --links 2000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+root_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(root_dir))
+
+import numpy as np
+import pandas as pd
+from backend.ai_engine.anomaly_detector import detect_drops_array
+
+DROP_THRESHOLD = 8
+
+
+def generate_samples(nb_samples: int, nb_links: int):
+    """Génère des séries RSSI au pas de 5 min avec des évanouissements et quelques valeurs manquantes."""
+    rng = np.random.default_rng(42)
+    link_ids = np.sort(rng.integers(1, nb_links + 1, nb_samples))
+    starts = np.searchsorted(link_ids, link_ids, side='left')
+    steps = np.arange(nb_samples) - starts
+    timestamps = np.datetime64('2026-01-01T00:00', 'ns') + steps * np.timedelta64(5, 'm')
+    rssi = rng.normal(-60, 1.5, nb_samples)
+    fades = rng.random(nb_samples) < 0.002
+    rssi[fades] -= rng.uniform(5, 25, fades.sum())
+    rssi[rng.random(nb_samples) < 0.001] = np.nan
+    return link_ids, timestamps, rssi
+
+
+def per_link_loop(link_ids, timestamps, values):
+    """Référence : une passe par liaison, mesures consécutives uniquement."""
+    boundaries = np.flatnonzero(np.diff(link_ids)) + 1
+    drops = []
+    for start, end in zip(np.concatenate(([0], boundaries)), np.concatenate((boundaries, [len(link_ids)]))):
+        series = values[start:end]
+        differences = series[:-1] - series[1:]
+        for i in np.flatnonzero(differences > DROP_THRESHOLD):
+            drops.append({
+                'link_id': int(link_ids[start]),
+                'timestamp': timestamps[start + i + 1],
+                'drop': float(differences[i])
+            })
+    return drops
+
+
+def rolling_reference(link_ids, values, width):
+    """Référence pandas : maximum glissant des w mesures précédentes par liaison."""
+    series = pd.Series(values)
+    previous = series.groupby(link_ids).shift(1)
+    reference = previous.groupby(link_ids).rolling(width, min_periods=1).max().reset_index(level=0, drop=True)
+    return int(((reference.sort_index() - series) > DROP_THRESHOLD).sum())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--samples', type=int, default=10_000_000, help="Nombre de mesures")
+    parser.add_argument('--links', type=int, default=2000, help="Nombre de liaisons")
+    args = parser.parse_args()
+
+    link_ids, timestamps, rssi = generate_samples(args.samples, args.links)
+
+    print("=" * 70)
+    print(f"⏱️ BENCHMARK CHUTES BRUTALES ({args.samples:,} mesures, {args.links} liaisons)")
+    print("=" * 70)
+
+    t0 = time.perf_counter()
+    loop_drops = per_link_loop(link_ids, timestamps, rssi)
+    loop_time = time.perf_counter() - t0
+    print(f"\nBoucle par liaison (lag 1)        : {loop_time:.3f}s → {len(loop_drops):,} chutes")
+
+    t0 = time.perf_counter()
+    lag_drops = detect_drops_array(link_ids, timestamps, rssi, DROP_THRESHOLD)
+    lag_time = time.perf_counter() - t0
+    print(f"Vectorisé (lag 1)                 : {lag_time:.3f}s → {len(lag_drops):,} chutes")
+
+    t0 = time.perf_counter()
+    multi = detect_drops_array(link_ids, timestamps, rssi, DROP_THRESHOLD, lags=(1, 3, 6), windows=(6, 12))
+    multi_time = time.perf_counter() - t0
+    print(f"Vectorisé (lags 1,3,6 ; fen. 6,12) : {multi_time:.3f}s → {len(multi):,} chutes "
+          f"({args.samples / multi_time:,.0f} mesures/s)")
+
+    order = np.random.default_rng(7).permutation(args.samples)
+    t0 = time.perf_counter()
+    shuffled = detect_drops_array(link_ids[order], timestamps[order], rssi[order], DROP_THRESHOLD, lags=(1, 3, 6), windows=(6, 12))
+    shuffled_time = time.perf_counter() - t0
+    print(f"Vectorisé, mesures non triées      : {shuffled_time:.3f}s")
+
+    expected = {(d['link_id'], d['timestamp'], round(d['drop'], 9)) for d in loop_drops}
+    obtained = set(zip(lag_drops['link_id'].tolist(), lag_drops['timestamp'].to_numpy(),
+                       lag_drops['drop'].round(9).tolist()))
+    identical = expected == obtained
+    same_sorted = multi.equals(shuffled)
+    window_counts = multi[multi['methode'] == 'fenetre'].groupby('horizon').size()
+    windows_ok = all(
+        int(window_counts.get(width, 0)) == rolling_reference(link_ids, rssi, width) for width in (6, 12)
+    )
+
+    print(f"\n{'✅' if identical else '❌'} Lag 1 identique à la boucle : {identical}")
+    print(f"{'✅' if windows_ok else '❌'} Fenêtres identiques à pandas rolling : {windows_ok}")
+    print(f"{'✅' if same_sorted else '❌'} Même résultat sur mesures non triées : {same_sorted}")
+    print(f"🚀 Accélération (lag 1) : x{loop_time / lag_time:.1f}")
+
+    if not (identical and windows_ok and same_sorted):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Benchmark de l'évaluation des alertes : check_and_create_alerts liaison par liaison
+vs evaluate_fleet_alerts (une passe pour toute la flotte).
+
+Utilise une base SQLite temporaire (la base de l'application n'est pas touchée).
+
+Usage :
+    python benchmarks/benchmark_fleet_alerts.py --links 1000 --points 150
+"""
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+
+# Base temporaire AVANT l'import du backend (config lit DATABASE_URL au chargement)
+_tmp_dir = tempfile.mkdtemp(prefix="netpulse_bench_")
+os.environ['DATABASE_URL'] = f"sqlite:///{Path(_tmp_dir) / 'bench.db'}"
+os.environ['ENVIRONMENT'] = 'benchmark'
+
+root_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(root_dir))
+
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from backend.database.connection import init_database, get_db_context
+from backend.database.models import Alerte, FHLink, Incident
+from backend.database.query_cache import active_alerts_cache, latest_kpis_cache
+from backend.ingestion.data_loader import load_measures_to_db
+from backend.alerts.alert_engine import check_and_create_alerts
+from backend.alerts.alert_index import open_alert_index
+from backend.alerts.correlation import alert_correlator
+from backend.alerts.fleet_evaluator import evaluate_fleet_alerts
+import config
+
+
+def generate_fleet(nb_links: int, nb_points: int) -> pd.DataFrame:
+    """Génère des mesures récentes ; une partie des liaisons franchit les seuils."""
+    rng = np.random.default_rng(7)
+    end = pd.Timestamp(datetime.utcnow()).floor('min')
+    timestamps = pd.date_range(end=end, periods=nb_points, freq='5min')
+
+    frames = []
+    for i in range(nb_links):
+        base_rssi = rng.choice([-55, -72, -77, -82], p=[0.7, 0.1, 0.1, 0.1])
+        base_snr = rng.choice([28, 12, 8, 4], p=[0.7, 0.1, 0.1, 0.1])
+        frames.append(pd.DataFrame({
+            'timestamp': timestamps,
+            'link_name': f"FLOTTE Liaison {i:04d}",
+            'rssi_dbm': rng.normal(base_rssi, 1.5, nb_points).round(1),
+            'snr_db': rng.normal(base_snr, 1, nb_points).round(1),
+            'ber': 10 ** rng.uniform(-10, -7, nb_points),
+            'acm_modulation': '256QAM',
+            'latency_ms': rng.normal(3, 0.5, nb_points).round(2),
+            'packet_loss': rng.uniform(0, 0.1, nb_points).round(3),
+            'rainfall_mm': rng.choice([0.0, 20.0], nb_points, p=[0.98, 0.02])
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def open_alert_keys() -> set:
+    """Clés (link_id, type) des alertes créées."""
+    with get_db_context() as db:
+        return set(db.query(Alerte.link_id, Alerte.type).all())
+
+
+def reset_alerts():
+    """Supprime toutes les alertes et les incidents (et vide les caches)."""
+    with get_db_context() as db:
+        db.query(Alerte).delete()
+        db.query(Incident).delete()
+        db.commit()
+    open_alert_index.invalidate()
+    alert_correlator.invalidate()
+    active_alerts_cache.clear()
+    latest_kpis_cache.clear()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--links', type=int, default=1000, help="Nombre de liaisons")
+    parser.add_argument('--points', type=int, default=150, help="Mesures par liaison (pas de 5 min)")
+    args = parser.parse_args()
+
+    # Toutes les liaisons importées partagent les mêmes sites : sans limite de tempête,
+    # les deux méthodes créent les mêmes alertes (rattachées aux incidents) et restent comparables
+    config.CORRELATION_CONFIG['storm_threshold'] = sys.maxsize
+
+    init_database()
+    load_measures_to_db(generate_fleet(args.links, args.points), generate_alerts=False)
+
+    print("=" * 70)
+    print(f"⏱️ BENCHMARK ÉVALUATION DES ALERTES ({args.links} liaisons)")
+    print("=" * 70)
+
+    with get_db_context() as db:
+        link_ids = [link_id for (link_id,) in db.query(FHLink.id).order_by(FHLink.id).all()]
+
+    t0 = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        legacy_count = sum(len(check_and_create_alerts(link_id)) for link_id in link_ids)
+    legacy_time = time.perf_counter() - t0
+    legacy_keys = open_alert_keys()
+    print(f"\nLiaison par liaison : {legacy_count} alertes en {legacy_time:.2f}s")
+
+    reset_alerts()
+    t0 = time.perf_counter()
+    evaluation = evaluate_fleet_alerts()
+    fleet_time = time.perf_counter() - t0
+    fleet_keys = open_alert_keys()
+    print(f"Évaluation flotte   : {evaluation['nb_alerts']} alertes en {fleet_time:.3f}s")
+
+    t0 = time.perf_counter()
+    evaluation = evaluate_fleet_alerts()
+    print(f"Réévaluation (alertes déjà ouvertes) : {evaluation['nb_alerts']} alerte(s) en "
+          f"{time.perf_counter() - t0:.3f}s")
+
+    identical = legacy_keys == fleet_keys
+    print(f"\n{'✅' if identical else '❌'} Mêmes alertes (link_id, type) : {identical}")
+    print(f"🚀 Accélération : x{legacy_time / fleet_time:.1f}")
+    print(f"📂 Base temporaire : {_tmp_dir}")
+
+
+if __name__ == "__main__":
+    main()
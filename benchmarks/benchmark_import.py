@@ -0,0 +1,123 @@
+"""
+Benchmark de l'import de mesures : ancien loader ligne par ligne vs import par lots.
+
+Utilise une base SQLite temporaire (la base de l'application n'est pas touchée).
+
+Usage :
+    python benchmarks/benchmark_import.py --rows 20000 --links 50
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Base temporaire AVANT l'import du backend (config lit DATABASE_URL au chargement)
+_tmp_dir = tempfile.mkdtemp(prefix="netpulse_bench_")
+os.environ['DATABASE_URL'] = f"sqlite:///{Path(_tmp_dir) / 'bench.db'}"
+os.environ['ENVIRONMENT'] = 'benchmark'
+
+root_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(root_dir))
+
+import numpy as np
+import pandas as pd
+from backend.database.connection import init_database, get_db_context
+from backend.database.models import MesureKPI
+from backend.ingestion.data_loader import get_or_create_link, load_measures_to_db
+
+
+def generate_measures(nb_rows: int, nb_links: int, prefix: str) -> pd.DataFrame:
+    """Génère des mesures synthétiques réparties sur plusieurs liaisons."""
+    rng = np.random.default_rng(42)
+    per_link = max(1, nb_rows // nb_links)
+    start = pd.Timestamp('2025-01-01')
+
+    frames = []
+    for i in range(nb_links):
+        frames.append(pd.DataFrame({
+            'timestamp': pd.date_range(start, periods=per_link, freq='15min'),
+            'link_name': f"{prefix} Liaison {i:04d}",
+            'rssi_dbm': rng.normal(-55, 5, per_link).round(1),
+            'snr_db': rng.normal(28, 3, per_link).round(1),
+            'ber': 10 ** rng.uniform(-10, -7, per_link),
+            'acm_modulation': '256QAM',
+            'latency_ms': rng.normal(3, 0.5, per_link).round(2),
+            'packet_loss': rng.uniform(0, 0.1, per_link).round(3),
+            'rainfall_mm': rng.exponential(1, per_link).round(1)
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def legacy_load(df: pd.DataFrame) -> int:
+    """Reproduction de l'ancien loader : iterrows, session par liaison, SELECT par ligne."""
+    imported = 0
+    with get_db_context() as db:
+        for _, row in df.iterrows():
+            link_id, _ = get_or_create_link(row['link_name'])
+            timestamp = pd.to_datetime(row['timestamp'])
+            existing = db.query(MesureKPI).filter(
+                MesureKPI.link_id == link_id,
+                MesureKPI.timestamp == timestamp
+            ).first()
+            if existing:
+                continue
+            db.add(MesureKPI(
+                link_id=link_id,
+                timestamp=timestamp,
+                rssi_dbm=float(row['rssi_dbm']),
+                snr_db=float(row['snr_db']),
+                ber=float(row['ber']),
+                acm_modulation=str(row['acm_modulation']),
+                latency_ms=float(row['latency_ms']),
+                packet_loss=float(row['packet_loss']),
+                rainfall_mm=float(row['rainfall_mm'])
+            ))
+            imported += 1
+            if imported % 100 == 0:
+                db.commit()
+        db.commit()
+    return imported
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=20000, help="Nombre de lignes (nouvel import)")
+    parser.add_argument('--links', type=int, default=50, help="Nombre de liaisons")
+    parser.add_argument('--legacy-rows', type=int, default=5000, help="Nombre de lignes (ancien loader)")
+    args = parser.parse_args()
+
+    init_database()
+
+    print("=" * 70)
+    print("⏱️ BENCHMARK IMPORT DE MESURES")
+    print("=" * 70)
+
+    legacy_df = generate_measures(args.legacy_rows, args.links, "LEGACY")
+    t0 = time.perf_counter()
+    legacy_imported = legacy_load(legacy_df)
+    legacy_time = time.perf_counter() - t0
+    legacy_rate = legacy_imported / legacy_time
+    print(f"\nAncien loader : {legacy_imported} lignes en {legacy_time:.2f}s → {legacy_rate:,.0f} lignes/s")
+
+    bulk_df = generate_measures(args.rows, args.links, "BULK")
+    t0 = time.perf_counter()
+    _, stats = load_measures_to_db(bulk_df, generate_alerts=False)
+    bulk_time = time.perf_counter() - t0
+    bulk_rate = stats['imported'] / bulk_time
+    print(f"Import par lots : {stats['imported']} lignes en {bulk_time:.2f}s → {bulk_rate:,.0f} lignes/s")
+
+    # Ré-import complet : uniquement des doublons
+    t0 = time.perf_counter()
+    _, stats = load_measures_to_db(bulk_df, generate_alerts=False)
+    dup_time = time.perf_counter() - t0
+    print(f"Ré-import (100% doublons) : {stats['duplicates']} doublons en {dup_time:.2f}s "
+          f"→ {stats['total'] / dup_time:,.0f} lignes/s")
+
+    print(f"\n🚀 Accélération : x{bulk_rate / legacy_rate:.1f}")
+    print(f"📂 Base temporaire : {_tmp_dir}")
+
+
+if __name__ == "__main__":
+    main()
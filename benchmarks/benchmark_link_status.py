@@ -0,0 +1,71 @@
+"""
+Benchmark du classement d'état des liaisons : calculate_link_status (scalaire)
+vs classify_link_status_array (NumPy).
+
+Aucune base de données n'est utilisée : les mesures sont synthétiques.
+
+Usage :
+    python benchmarks/benchmark_link_status.py --samples 1000000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+root_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(root_dir))
+
+import numpy as np
+from backend.analytics.kpi_calculator import (
+    calculate_link_status,
+    classify_link_status_array,
+    compute_availability
+)
+
+
+def generate_samples(nb_samples: int):
+    """Génère des mesures couvrant les trois états (et quelques valeurs manquantes)."""
+    rng = np.random.default_rng(42)
+    rssi = rng.normal(-65, 8, nb_samples)
+    snr = rng.normal(20, 6, nb_samples)
+    ber = 10 ** rng.uniform(-10, -4, nb_samples)
+    rssi[rng.random(nb_samples) < 0.001] = np.nan
+    return rssi, snr, ber
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--samples', type=int, default=1_000_000, help="Nombre de mesures")
+    args = parser.parse_args()
+
+    rssi, snr, ber = generate_samples(args.samples)
+
+    print("=" * 70)
+    print(f"⏱️ BENCHMARK CLASSEMENT D'ÉTAT ({args.samples:,} mesures)")
+    print("=" * 70)
+
+    t0 = time.perf_counter()
+    scalar_status = [calculate_link_status(r, s, b) for r, s, b in zip(rssi.tolist(), snr.tolist(), ber.tolist())]
+    scalar_time = time.perf_counter() - t0
+    print(f"\nScalaire (boucle Python) : {scalar_time:.3f}s → {args.samples / scalar_time:,.0f} mesures/s")
+
+    t0 = time.perf_counter()
+    array_status = classify_link_status_array(rssi, snr, ber)
+    array_time = time.perf_counter() - t0
+    print(f"Vectorisé (NumPy)        : {array_time:.3f}s → {args.samples / array_time:,.0f} mesures/s")
+
+    t0 = time.perf_counter()
+    disponibilite = compute_availability(rssi, snr, ber)
+    availability_time = time.perf_counter() - t0
+    print(f"Disponibilité (NumPy)    : {availability_time:.3f}s → {disponibilite:.2f} %")
+
+    identical = bool(np.array_equal(np.array(scalar_status), array_status))
+    print(f"\n{'✅' if identical else '❌'} Résultats identiques : {identical}")
+    print(f"🚀 Accélération : x{scalar_time / array_time:.1f}")
+
+    if not identical:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark de l'ajustement des tendances : LinearRegression / np.polyfit liaison
+par liaison vs grouped_linear_fit (moindres carrés groupés en une passe).
+
+Aucune base de données n'est utilisée : les mesures sont synthétiques.
+
+Usage :
+    python benchmarks/benchmark_trends.py --links 2000 --points 576
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+root_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(root_dir))
+
+import numpy as np
+from sklearn.linear_model import LinearRegression
+from backend.analytics.least_squares import grouped_linear_fit
+
+
+def generate_series(nb_links: int, nb_points: int):
+    """Génère une série RSSI par liaison (48h au pas de 5 min par défaut) avec une pente propre."""
+    rng = np.random.default_rng(42)
+    hours = np.arange(nb_points) * 5 / 60
+    slopes = rng.normal(0, 0.1, nb_links)
+    values = -60 + slopes[:, None] * hours[None, :] + rng.normal(0, 1.5, (nb_links, nb_points))
+    return hours, values
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--links', type=int, default=2000, help="Nombre de liaisons")
+    parser.add_argument('--points', type=int, default=576, help="Mesures par liaison")
+    args = parser.parse_args()
+
+    hours, values = generate_series(args.links, args.points)
+    X = hours.reshape(-1, 1)
+
+    print("=" * 70)
+    print(f"⏱️ BENCHMARK TENDANCES ({args.links} liaisons x {args.points} mesures)")
+    print("=" * 70)
+
+    t0 = time.perf_counter()
+    sklearn_fits = []
+    for series in values:
+        model = LinearRegression().fit(X, series)
+        sklearn_fits.append((model.coef_[0], model.intercept_, model.score(X, series)))
+    sklearn_time = time.perf_counter() - t0
+    print(f"\nLinearRegression par liaison : {sklearn_time:.3f}s")
+
+    t0 = time.perf_counter()
+    polyfit_slopes = [np.polyfit(hours, series, 1)[0] for series in values]
+    polyfit_time = time.perf_counter() - t0
+    print(f"np.polyfit par liaison       : {polyfit_time:.3f}s")
+
+    t0 = time.perf_counter()
+    fits = grouped_linear_fit(
+        np.repeat(np.arange(args.links), args.points), np.tile(hours, args.links), values.ravel()
+    )
+    grouped_time = time.perf_counter() - t0
+    print(f"Moindres carrés groupés      : {grouped_time:.3f}s")
+
+    expected = np.array(sklearn_fits)
+    identical = (
+        np.allclose(fits[['slope', 'intercept', 'r2']].to_numpy(), expected, rtol=1e-9, atol=1e-9)
+        and np.allclose(fits['slope'].to_numpy(), polyfit_slopes, rtol=1e-9, atol=1e-12)
+    )
+    print(f"\n{'✅' if identical else '❌'} Pentes, ordonnées et R² identiques : {identical}")
+    print(f"🚀 Accélération : x{sklearn_time / grouped_time:.1f} (LinearRegression), "
+          f"x{polyfit_time / grouped_time:.1f} (np.polyfit)")
+
+    if not identical:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
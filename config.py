@@ -60,6 +60,50 @@ IA_CONFIG = {
     'confidence_threshold': 0.7
 }
 
+# Job de scoring du risque de dégradation (toutes les liaisons actives, en parallèle)
+RISK_SCORING_CONFIG = {
+    'enabled': os.getenv('RISK_SCORING_ENABLED', 'true').lower() == 'true',
+    'interval_minutes': 15,  # période du job planifié
+    # Premier calcul au démarrage du serveur (sinon après interval_minutes)
+    'au_demarrage': os.getenv('RISK_SCORING_AT_STARTUP', 'false').lower() == 'true',
+    'marge_moderee_db': 5,  # risque MODERATE si le RSSI prédit est à moins de N dB du seuil
+    'eta_max_heures': 168,  # au-delà, aucun franchissement du seuil n'est annoncé
+    'max_workers': 4,  # processus de scoring (au plus un par cœur)
+    'min_links_processus': 1000,  # en dessous, scoring dans le processus courant
+    'links_per_batch': 200  # liaisons par lot (une requête et un ajustement groupé par lot)
+}
+
+# Registre des modèles de prédiction (un fichier JSON par liaison et métrique,
+# réentraînement après IA_CONFIG['retrain_interval'] heures ou à l'arrivée de nouvelles mesures)
+MODEL_REGISTRY_CONFIG = {
+    'dossier': os.getenv('MODELS_DIR', 'models')
+}
+
+# Moteur d'anomalies multivariées Isolation Forest : modèles entraînés hors ligne
+# (python -m backend.ai_engine.isolation_forest) par liaison ou par bande de
+# fréquence, stockés dans {MODEL_REGISTRY_CONFIG['dossier']}/isolation_forest
+ISOLATION_FOREST_CONFIG = {
+    'features': ['rssi_dbm', 'snr_db', 'ber', 'latency_ms', 'packet_loss', 'rainfall_mm'],
+    'n_estimators': 100,  # arbres par forêt
+    'max_samples': 256,  # échantillons par arbre
+    'contamination': 0.005,  # part des mesures d'entraînement considérées anormales (seuil)
+    'training_days': 14,  # historique d'entraînement
+    'min_samples': 500,  # mesures minimales pour entraîner un modèle
+    'max_training_samples': 50000,  # mesures tirées au hasard au-delà
+    'bloc_scoring': 256  # mesures parcourues ensemble lors du scoring (tableaux bloc x arbres dans le cache)
+}
+
+# Détecteur d'anomalies en flux : moyenne et variance mobiles exponentielles par
+# liaison et métrique, mises à jour à chaque mesure importée (seuil et nombre
+# minimal de mesures : IA_CONFIG['anomaly_threshold'] et IA_CONFIG['min_data_points'])
+STREAMING_ANOMALY_CONFIG = {
+    'span': 144,  # mesures (~12h au pas de 5 min) : alpha = 2 / (span + 1)
+    'metriques': ['rssi_dbm', 'snr_db'],
+    'fenetre_heures': 12,  # une anomalie reste signalée pendant cette durée
+    'chutes': {'rssi_dbm': 8},  # chute brutale entre deux mesures consécutives (unité de la métrique)
+    'fenetre_chute_heures': 6
+}
+
 # Sévérités des alertes avec couleurs
 ALERT_SEVERITIES = {
     'CRITIQUE': {
@@ -143,7 +187,8 @@ CHART_CONFIG = {
     'template': 'plotly_white',
     'line_width': 2,
     'marker_size': 6,
-    'font_size': 12
+    'font_size': 12,
+    'max_points': 1500  # points par série après réduction (LTTB / min-max)
 }
 
 # Modulations ACM (Adaptive Coding and Modulation)
@@ -172,6 +217,11 @@ CHATBOT_CONFIG = {
     ]
 }
 
+# Pagination de la page Alertes (pagination par clé (timestamp, id))
+ALERTS_PAGE_CONFIG = {
+    'page_size': 25  # alertes affichées par page
+}
+
 # Configuration de l'export
 EXPORT_CONFIG = {
     'max_rows': 10000,
@@ -192,6 +242,18 @@ DATA_VALIDATION = {
         'packet_loss',
         'rainfall_mm'
     ],
+    # Types explicites appliqués à chaque lot lors de la lecture en streaming
+    'column_dtypes': {
+        'timestamp': 'datetime64[ns]',
+        'link_name': 'category',
+        'rssi_dbm': 'float64',
+        'snr_db': 'float64',
+        'ber': 'float64',
+        'acm_modulation': 'category',
+        'latency_ms': 'float64',
+        'packet_loss': 'float64',
+        'rainfall_mm': 'float64'
+    },
     'rssi_range': (-90, -30),
     'snr_range': (0, 50),
     'ber_range': (1e-12, 1e-3),
@@ -200,6 +262,139 @@ DATA_VALIDATION = {
     'rainfall_range': (0, 200)
 }
 
+# Configuration de l'import en masse
+IMPORT_CONFIG = {
+    'chunk_size': 10000  # lignes par lot (lecture en streaming, validation, insertion)
+}
+
+# Rollups KPI (agrégats horaires et journaliers maintenus à l'import)
+ROLLUP_CONFIG = {
+    'min_period_hours': 24 * 7  # à partir de cette période, lecture des rollups au lieu des mesures brutes
+}
+
+# Cache de résultats (dernières mesures, alertes actives) partagé entre sessions
+CACHE_CONFIG = {
+    'ttl_seconds': 30,  # durée de vie d'une entrée
+    'max_entries': 512,  # entrées par cache (éviction LRU)
+    'open_alerts_refresh_seconds': 300  # rechargement de l'index des alertes ouvertes (écritures d'autres processus)
+}
+
+# Instantané de la flotte (page d'accueil, sélecteur de liaison)
+FLEET_SNAPSHOT_CONFIG = {
+    'refresh_seconds': 60  # reconstruction au plus toutes les N secondes (et après chaque import)
+}
+
+# Moteur de règles d'alerte : les définitions sont lues dans ParametresSysteme
+# (clé 'parametre', JSON), sinon dans le fichier YAML 'fichier', sinon dans ALERT_RULES
+ALERT_RULES_CONFIG = {
+    'parametre': 'alertes_regles',
+    'fichier': os.getenv('ALERT_RULES_FILE'),  # chemin d'un fichier YAML (optionnel)
+    'historique_heures': 12  # fenêtre évaluée quand une règle a une durée ou une hystérésis
+}
+
+# Génération des alertes après import, en tâche de fond (pool de threads)
+ALERT_JOBS_CONFIG = {
+    'max_workers': 4,  # lots évalués en parallèle (1 en SQLite : connexion unique partagée)
+    'links_per_batch': 50,  # liaisons par lot
+    'max_jobs_kept': 20  # tâches terminées conservées pour le suivi
+}
+
+# Notifications des alertes (dispatcher asyncio en tâche de fond)
+NOTIFICATION_CONFIG = {
+    'enabled': os.getenv('NOTIFICATIONS_ENABLED', 'false').lower() == 'true',
+    'transport': os.getenv('NOTIFICATION_TRANSPORT', 'console'),  # console, smtp
+    'recipients': [r.strip() for r in os.getenv('NOTIFICATION_RECIPIENTS', '').split(',') if r.strip()],
+    'min_severity': 'MAJEURE',  # sévérité minimale notifiée (niveau ALERT_SEVERITIES)
+    'queue_size': 10000,  # file bornée (alertes) : au-delà, les notifications sont abandonnées (comptées)
+    'digest_size': 20,  # un message dès N alertes distinctes pour un destinataire...
+    'digest_seconds': 60,  # ... ou au plus T secondes après la première
+    'max_retries': 3,
+    'backoff_seconds': 1.0,  # délai initial, doublé à chaque nouvel essai
+    'max_concurrent_sends': 4,
+    'smtp': {
+        'host': os.getenv('SMTP_HOST', 'localhost'),
+        'port': int(os.getenv('SMTP_PORT', 25)),
+        'sender': os.getenv('SMTP_SENDER', 'netpulse@localhost'),
+        'username': os.getenv('SMTP_USERNAME'),
+        'password': os.getenv('SMTP_PASSWORD'),
+        'use_tls': os.getenv('SMTP_TLS', 'false').lower() == 'true'
+    }
+}
+
+# Corrélation des alertes en incidents (tempête de pluie, panne de site...) : les alertes
+# d'un même site et d'une même cause racine dans la fenêtre glissante sont regroupées
+CORRELATION_CONFIG = {
+    'window_minutes': 30,  # fenêtre glissante de corrélation
+    'min_links': 2,  # liaisons distinctes (même site, même cause) pour ouvrir un incident
+    'storm_threshold': 10,  # alertes détaillées créées par incident ; au-delà, seul l'incident est mis à jour
+    # Cause racine par type d'alerte (types absents : pas de corrélation)
+    'causes': {
+        'RAINFALL_IMPACT': 'PLUIE',
+        'RSSI_LOW': 'RADIO',
+        'SNR_LOW': 'RADIO',
+        'BER_HIGH': 'RADIO',
+        'LINK_DOWN': 'PANNE',
+        'LATENCY_HIGH': 'TRANSPORT',
+        'PACKET_LOSS': 'TRANSPORT',
+        'ANOMALY_DETECTED': 'ANOMALIE'
+    },
+    # Cause dominante : active sur un site, elle absorbe les causes listées (RSSI bas sous la pluie -> PLUIE)
+    'dominantes': {
+        'PLUIE': ['RADIO', 'ANOMALIE']
+    },
+    'libelles': {
+        'PLUIE': 'Atténuation due à la pluie',
+        'RADIO': 'Dégradation radio',
+        'PANNE': 'Panne de site',
+        'TRANSPORT': 'Dégradation transport',
+        'ANOMALIE': 'Anomalies IA'
+    }
+}
+
+# Règles d'alerte par défaut. Chaque règle porte sur une métrique avec un opérateur
+# et des niveaux (seuil -> sévérité, du plus sévère au moins sévère) ; options :
+# 'conditions' (conditions supplémentaires, toutes requises), 'duree' (nombre
+# d'échantillons consécutifs requis) et 'hysteresis' (marge à franchir pour lever l'état).
+ALERT_RULES = [
+    {
+        'type': 'RSSI_LOW',
+        'metrique': 'rssi_dbm',
+        'operateur': '<',
+        'niveaux': [
+            {'severite': 'CRITIQUE', 'seuil': SEUILS_RSSI['CRITIQUE'],
+             'message': "RSSI critique : {valeur:.1f} dBm",
+             'recommandation': "Vérifier immédiatement l'alignement des antennes et les conditions météo"},
+            {'severite': 'MAJEURE', 'seuil': SEUILS_RSSI['DEGRADED'],
+             'message': "RSSI dégradé : {valeur:.1f} dBm",
+             'recommandation': "Surveillance accrue recommandée, planifier une inspection"}
+        ]
+    },
+    {
+        'type': 'SNR_LOW',
+        'metrique': 'snr_db',
+        'operateur': '<',
+        'niveaux': [
+            {'severite': 'CRITIQUE', 'seuil': SEUILS_SNR['CRITIQUE'],
+             'message': "SNR critique : {valeur:.1f} dB",
+             'recommandation': "Réduire les sources d'interférence, vérifier la configuration"},
+            {'severite': 'MAJEURE', 'seuil': SEUILS_SNR['DEGRADED'],
+             'message': "SNR dégradé : {valeur:.1f} dB",
+             'recommandation': "Surveiller l'évolution, identifier les sources d'interférence"}
+        ]
+    },
+    {
+        'type': 'RAINFALL_IMPACT',
+        'metrique': 'rainfall_mm',
+        'operateur': '>',
+        'conditions': [{'metrique': 'rssi_dbm', 'operateur': '<', 'seuil': SEUILS_RSSI['ACCEPTABLE']}],
+        'niveaux': [
+            {'severite': 'MAJEURE', 'seuil': 15,
+             'message': "Impact pluie détecté : {valeur:.1f} mm, RSSI={rssi_dbm:.1f} dBm",
+             'recommandation': "Atténuation due à la pluie, surveillance renforcée jusqu'à amélioration météo"}
+        ]
+    }
+]
+
 # Messages système
 MESSAGES = {
     'login_success': "✅ Connexion réussie !",
@@ -6,8 +6,9 @@ import plotly.graph_objects as go
 import plotly.express as px
 import pandas as pd
 from datetime import datetime, timedelta
-from backend.analytics.kpi_calculator import get_latest_kpis, calculate_period_statistics
-from backend.database.models import MesureKPI
+from backend.analytics.kpi_calculator import get_latest_kpis, calculate_period_statistics, get_measure_series
+from backend.analytics.rollups import get_rollups
+from backend.analytics.downsampling import downsample
 from backend.database.connection import get_db_context
 import config
 
@@ -142,62 +143,85 @@ else:
     hours = int(period_selected.replace('h', ''))
     date_from = datetime.utcnow() - timedelta(hours=hours)
 
-# Récupérer les données
-with get_db_context() as db:
-    query = db.query(MesureKPI).filter(MesureKPI.link_id == link_id)
-    
-    if date_from is not None:
-        query = query.filter(MesureKPI.timestamp >= date_from)
-    
-    measures = query.order_by(MesureKPI.timestamp).all()
-    
-    # Conversion en dictionnaires DANS le contexte de la session
-    measures_data = [{
-        'timestamp': m.timestamp,
-        'rssi_dbm': m.rssi_dbm,
-        'snr_db': m.snr_db,
-        'ber': m.ber,
-        'rainfall_mm': m.rainfall_mm,
-        'latency_ms': m.latency_ms,
-        'packet_loss': m.packet_loss
-    } for m in measures]
-
-if len(measures_data) < 2:
+# Colonnes utiles aux graphiques (RSSI, SNR, RSSI vs pluie) : rien d'autre n'est chargé
+chart_columns = ['rssi_dbm', 'snr_db', 'rainfall_mm']
+max_points = config.CHART_CONFIG['max_points']
+
+# Périodes longues : rollups horaires au lieu des mesures brutes
+if period_selected in ("7j", "30j", "Tout"):
+    rollups = get_rollups(link_id, date_from=date_from, granularity='hourly')
+    df = pd.DataFrame({'timestamp': rollups['bucket']})
+    for column in chart_columns:
+        df[column] = rollups[f"{column}_avg"]
+    source_caption = "🕐 Période longue : moyennes horaires (rollups)"
+else:
+    df = get_measure_series(link_id, chart_columns, date_from=date_from)
+    source_caption = "📏 Mesures brutes"
+
+# Mode zoom : fenêtre choisie par l'utilisateur, mesures brutes sans réduction
+zoom_mode = len(df) >= 2 and st.toggle(
+    "🔍 Zoom pleine résolution",
+    help="Choisissez une fenêtre : toutes les mesures brutes de la fenêtre sont affichées, sans réduction"
+)
+if zoom_mode:
+    data_start = df['timestamp'].min().to_pydatetime()
+    data_end = df['timestamp'].max().to_pydatetime()
+    zoom_from, zoom_to = st.slider(
+        "Fenêtre de zoom",
+        min_value=data_start,
+        max_value=data_end,
+        value=(max(data_start, data_end - timedelta(hours=24)), data_end),
+        format="DD/MM/YYYY HH:mm"
+    )
+    df = get_measure_series(link_id, chart_columns, date_from=zoom_from, date_to=zoom_to)
+    source_caption = f"🔍 Pleine résolution : {len(df)} mesure(s)"
+
+if len(df) < 2:
     st.warning(f"⚠️ Aucune donnée disponible pour la période sélectionnée ({period_selected}). Essayez 'Tout' pour voir toutes les mesures.")
 else:
     # Afficher info si données anciennes
-    if measures_data:
-        latest_measure = max(m['timestamp'] for m in measures_data)
-        oldest_measure = min(m['timestamp'] for m in measures_data)
-        time_diff = datetime.utcnow() - latest_measure
+    latest_measure = df['timestamp'].max().to_pydatetime()
+    oldest_measure = df['timestamp'].min().to_pydatetime()
+    time_diff = datetime.utcnow() - latest_measure
+    
+    if time_diff > timedelta(hours=24):
+        days_old = time_diff.days
+        hours_old = int((time_diff.total_seconds() % 86400) / 3600)
         
-        if time_diff > timedelta(hours=24):
-            days_old = time_diff.days
-            hours_old = int((time_diff.total_seconds() % 86400) / 3600)
-            
-            # Message personnalisé selon l'ancienneté
-            if days_old > 7:
-                st.error(f"🔴 **Attention** : Les dernières données datent de **{days_old} jour(s)** ({latest_measure.strftime('%d/%m/%Y %H:%M')}). Importez de nouvelles mesures pour une supervision actuelle !")
-            elif days_old > 1:
-                st.warning(f"⚠️ **Données non récentes** : Les dernières mesures datent de **{days_old} jour(s) et {hours_old}h** ({latest_measure.strftime('%d/%m/%Y %H:%M')}). Importez des données plus récentes.")
-            else:
-                st.info(f"ℹ️ Les dernières données datent d'il y a **{days_old} jour(s) et {hours_old}h** ({latest_measure.strftime('%d/%m/%Y %H:%M')}). Importez de nouvelles mesures pour mettre à jour.")
-            
-            # Afficher la plage de données
-            st.caption(f"📅 Plage des données affichées : du {oldest_measure.strftime('%d/%m/%Y %H:%M')} au {latest_measure.strftime('%d/%m/%Y %H:%M')}")
+        # Message personnalisé selon l'ancienneté
+        if days_old > 7:
+            st.error(f"🔴 **Attention** : Les dernières données datent de **{days_old} jour(s)** ({latest_measure.strftime('%d/%m/%Y %H:%M')}). Importez de nouvelles mesures pour une supervision actuelle !")
+        elif days_old > 1:
+            st.warning(f"⚠️ **Données non récentes** : Les dernières mesures datent de **{days_old} jour(s) et {hours_old}h** ({latest_measure.strftime('%d/%m/%Y %H:%M')}). Importez des données plus récentes.")
         else:
-            # Données récentes
-            st.success(f"✅ Données récentes - Dernière mesure : {latest_measure.strftime('%d/%m/%Y à %H:%M')}")
+            st.info(f"ℹ️ Les dernières données datent d'il y a **{days_old} jour(s) et {hours_old}h** ({latest_measure.strftime('%d/%m/%Y %H:%M')}). Importez de nouvelles mesures pour mettre à jour.")
+        
+        # Afficher la plage de données
+        st.caption(f"📅 Plage des données affichées : du {oldest_measure.strftime('%d/%m/%Y %H:%M')} au {latest_measure.strftime('%d/%m/%Y %H:%M')}")
+    else:
+        # Données récentes
+        st.success(f"✅ Données récentes - Dernière mesure : {latest_measure.strftime('%d/%m/%Y à %H:%M')}")
+    
+    # Réduction côté serveur (sauf en mode zoom) : LTTB pour les courbes, min/max pour la pluie
+    if zoom_mode:
+        rssi_df, snr_df, rain_df = df, df, df
+    else:
+        rssi_df = downsample(df, 'timestamp', 'rssi_dbm', max_points)
+        snr_df = downsample(df, 'timestamp', 'snr_db', max_points)
+        rain_df = downsample(df, 'timestamp', 'rainfall_mm', max_points, method='minmax')
+        if len(df) > max_points:
+            source_caption += f" — {len(df)} points réduits à ~{max_points} par graphique (extrêmes conservés)"
+    st.caption(source_caption)
     
-    # Conversion en DataFrame
-    df = pd.DataFrame(measures_data)
+    # Marqueurs uniquement pour les séries courtes
+    line_mode = 'lines+markers' if len(rssi_df) <= 500 else 'lines'
     
     # Graphique RSSI
     fig_rssi = go.Figure()
     fig_rssi.add_trace(go.Scatter(
-        x=df['timestamp'],
-        y=df['rssi_dbm'],
-        mode='lines+markers',
+        x=rssi_df['timestamp'],
+        y=rssi_df['rssi_dbm'],
+        mode=line_mode,
         name='RSSI',
         line=dict(color='#3B82F6', width=2),
         marker=dict(size=4)
@@ -222,9 +246,9 @@ else:
     # Graphique SNR
     fig_snr = go.Figure()
     fig_snr.add_trace(go.Scatter(
-        x=df['timestamp'],
-        y=df['snr_db'],
-        mode='lines+markers',
+        x=snr_df['timestamp'],
+        y=snr_df['snr_db'],
+        mode=line_mode,
         name='SNR',
         line=dict(color='#10B981', width=2),
         marker=dict(size=4)
@@ -249,8 +273,8 @@ else:
     fig_rain = go.Figure()
     
     fig_rain.add_trace(go.Scatter(
-        x=df['timestamp'],
-        y=df['rssi_dbm'],
+        x=rssi_df['timestamp'],
+        y=rssi_df['rssi_dbm'],
         mode='lines',
         name='RSSI',
         line=dict(color='#3B82F6', width=2),
@@ -258,8 +282,8 @@ else:
     ))
     
     fig_rain.add_trace(go.Bar(
-        x=df['timestamp'],
-        y=df['rainfall_mm'],
+        x=rain_df['timestamp'],
+        y=rain_df['rainfall_mm'],
         name='Pluie',
         marker_color='#60A5FA',
         opacity=0.6,
@@ -283,7 +307,7 @@ st.markdown("### 📊 Statistiques Détaillées")
 
 # Calculer les heures pour les statistiques
 if period_selected == "Tout":
-    stats_hours = 24 * 365  # 1 an pour "Tout"
+    stats_hours = None  # Toutes les mesures (rollups)
 elif period_selected == "7j":
     stats_hours = 24 * 7
 elif period_selected == "30j":
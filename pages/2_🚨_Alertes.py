@@ -3,8 +3,11 @@ Page Alertes - Gestion et visualisation des alertes système.
 """
 import streamlit as st
 from datetime import datetime, timedelta
-from backend.alerts.alert_engine import get_active_alerts, resolve_alert, delete_alert, get_alerts_count_by_severity, check_and_create_alerts
-from backend.database.models import Alerte
+from backend.alerts.alert_engine import (
+    resolve_alert, delete_alert, get_alerts_count_by_severity, check_and_create_alerts,
+    get_alerts_page, get_alert_recommandation, count_alerts, get_alerts_histogram
+)
+from backend.alerts.correlation import get_active_incidents, resolve_incident
 from backend.database.connection import get_db_context
 from backend.security.auth import check_permission
 import config
@@ -72,6 +75,41 @@ with col5:
 
 st.markdown("---")
 
+# Incidents : alertes corrélées (même site, même cause racine)
+incidents = get_active_incidents(limit=20)
+if incidents:
+    st.markdown(f"### 🌩️ Incidents en cours ({len(incidents)})")
+    for incident in incidents:
+        severity_info = config.ALERT_SEVERITIES.get(incident['severite'], {})
+        concerned = " | 📡 concerne la liaison active" if link_id in incident['liaisons'] else ""
+        with st.expander(
+            f"{severity_info.get('icon', '⚠️')} {incident['titre']} — "
+            f"{incident['nb_liaisons']} liaison(s), {incident['nb_alertes']} alerte(s){concerned}"
+        ):
+            st.markdown(
+                f"<small>📅 Début {incident['date_debut'].strftime('%Y-%m-%d %H:%M')} | "
+                f"dernière alerte {incident['date_maj'].strftime('%Y-%m-%d %H:%M')} | "
+                f"types : {', '.join(config.ALERT_TYPES.get(t, t) for t in incident['types'])}</small>",
+                unsafe_allow_html=True
+            )
+            if incident['nb_supprimees']:
+                st.caption(
+                    f"{incident['nb_supprimees']} alerte(s) regroupée(s) dans l'incident sans être créées "
+                    f"(tempête) : absentes de la liste et des compteurs d'alertes ci-dessous, elles sont "
+                    f"closes avec l'incident. Alertes rattachées : "
+                    + ", ".join(f"liaison {member_link} ({config.ALERT_TYPES.get(alert_type, alert_type)})"
+                                for member_link, alert_type in incident['membres'])
+                )
+            if check_permission(user, ['view', 'resolve_alerts']):
+                if st.button("✅ Résoudre l'incident", key=f"resolve_incident_{incident['id']}"):
+                    success, message = resolve_incident(incident['id'], user.email)
+                    if success:
+                        st.success(message)
+                        st.rerun()
+                    else:
+                        st.error(message)
+    st.markdown("---")
+
 # Filtres
 st.markdown("### 🔎 Filtres")
 
@@ -98,53 +136,43 @@ with col3:
         index=0
     )
 
-# Récupérer les alertes
-with get_db_context() as db:
-    query = db.query(Alerte).filter(Alerte.link_id == link_id)
-    
-    # Filtre statut
-    if filter_status == "Actives":
-        query = query.filter(Alerte.resolved == False)
-    elif filter_status == "Résolues":
-        query = query.filter(Alerte.resolved == True)
-    
-    # Filtre sévérité
-    if filter_severity:
-        query = query.filter(Alerte.severite.in_(filter_severity))
-    
-    # Filtre période
-    if filter_period != "Tout":
-        if filter_period == "Dernières 24h":
-            date_from = datetime.utcnow() - timedelta(hours=24)
-        elif filter_period == "Derniers 7 jours":
-            date_from = datetime.utcnow() - timedelta(days=7)
-        else:  # Dernier mois
-            date_from = datetime.utcnow() - timedelta(days=30)
-        
-        query = query.filter(Alerte.timestamp >= date_from)
-    
-    alert_objects = query.order_by(Alerte.timestamp.desc()).all()
-    
-    # Convertir en dictionnaires DANS le contexte de session
-    alerts = []
-    for alert in alert_objects:
-        alerts.append({
-            'id': alert.id,
-            'link_id': alert.link_id,
-            'timestamp': alert.timestamp,
-            'type': alert.type,
-            'severite': alert.severite,
-            'message': alert.message,
-            'recommandation': alert.recommandation,
-            'resolved': alert.resolved,
-            'valeur_mesuree': alert.valeur_mesuree,
-            'seuil_declenche': alert.seuil_declenche,
-            'ia_generated': alert.ia_generated,
-            'resolved_at': alert.resolved_at,
-            'resolved_by': alert.resolved_by
-        })
-
-st.markdown(f"### 📋 Alertes ({len(alerts)})")
+# Filtres convertis pour les requêtes
+resolved_filter = {"Actives": False, "Résolues": True}.get(filter_status)
+date_from = None
+if filter_period == "Dernières 24h":
+    date_from = datetime.utcnow() - timedelta(hours=24)
+elif filter_period == "Derniers 7 jours":
+    date_from = datetime.utcnow() - timedelta(days=7)
+elif filter_period == "Dernier mois":
+    date_from = datetime.utcnow() - timedelta(days=30)
+filters = dict(link_id=link_id, severities=filter_severity or None, resolved=resolved_filter, date_from=date_from)
+
+# Pagination par clé : pile des curseurs des pages visitées, remise à zéro quand les filtres changent
+filters_key = (link_id, tuple(filter_severity), filter_status, filter_period)
+if st.session_state.get('alerts_filters_key') != filters_key:
+    st.session_state.alerts_filters_key = filters_key
+    st.session_state.alerts_cursors = [None]
+cursors = st.session_state.alerts_cursors
+
+total_alerts = count_alerts(**filters)
+alerts, next_cursor = get_alerts_page(**filters, cursor=cursors[-1])
+page_size = config.ALERTS_PAGE_CONFIG['page_size']
+page_number = len(cursors)
+nb_pages = max(1, -(-total_alerts // page_size))
+
+st.markdown(f"### 📋 Alertes ({total_alerts})")
+
+col_prev, col_page, col_next = st.columns([1, 3, 1])
+with col_prev:
+    if st.button("⬅️ Précédente", disabled=page_number == 1, use_container_width=True):
+        cursors.pop()
+        st.rerun()
+with col_page:
+    st.markdown(f"<p style='text-align: center;'>Page {page_number} / {nb_pages}</p>", unsafe_allow_html=True)
+with col_next:
+    if st.button("Suivante ➡️", disabled=next_cursor is None, use_container_width=True):
+        cursors.append(next_cursor)
+        st.rerun()
 
 # Affichage des alertes
 if not alerts:
@@ -179,13 +207,15 @@ else:
                     details_text += f" | ⚠️ Seuil: {alert.get('seuil_declenche'):.2f}"
                 if alert.get('ia_generated'):
                     details_text += " | 🤖 IA"
+                if alert.get('incident_id'):
+                    details_text += f" | 🌩️ Incident #{alert.get('incident_id')}"
                 
                 st.markdown(f"<small>{details_text}</small>", unsafe_allow_html=True)
                 
-                # Recommandation
-                if alert.get('recommandation'):
-                    with st.expander("💡 Recommandation"):
-                        st.write(alert.get('recommandation'))
+                # Recommandation (texte chargé à la demande)
+                if alert.get('has_recommandation'):
+                    if st.toggle("💡 Recommandation", key=f"reco_{alert.get('id')}"):
+                        st.write(get_alert_recommandation(alert.get('id')))
                 
                 # Info résolution
                 if alert.get('resolved'):
@@ -221,14 +251,11 @@ else:
 if alerts:
     st.markdown("### 📈 Statistiques")
     
-    # Répartition par sévérité
+    # Répartition par sévérité de toutes les alertes filtrées (une requête GROUP BY)
     import plotly.express as px
     import pandas as pd
     
-    severity_counts = {}
-    for alert in alerts:
-        severite = alert.get('severite')
-        severity_counts[severite] = severity_counts.get(severite, 0) + 1
+    severity_counts = get_alerts_histogram(**filters)
     
     df_severity = pd.DataFrame({
         'Sévérité': list(severity_counts.keys()),
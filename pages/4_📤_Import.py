@@ -3,9 +3,10 @@ Page Import - Import de données CSV/Excel (ADMIN uniquement).
 """
 import streamlit as st
 import pandas as pd
-from backend.ingestion.csv_parser import parse_uploaded_file, get_file_info
-from backend.ingestion.data_validator import validate_complete, get_data_quality_score
-from backend.ingestion.data_loader import load_measures_to_db
+from backend.ingestion.csv_parser import iter_uploaded_file_chunks
+from backend.ingestion.data_validator import validate_chunks, drop_rejected_rows
+from backend.ingestion.data_loader import load_measure_chunks_to_db
+from backend.alerts.alert_jobs import get_job_status
 from backend.security.auth import check_permission
 
 st.set_page_config(page_title="Import", page_icon="📤", layout="wide")
@@ -53,37 +54,43 @@ uploaded_file = st.file_uploader(
 if uploaded_file is not None:
     st.success(f"✅ Fichier chargé : {uploaded_file.name}")
     
-    # Parser le fichier
-    with st.spinner("Parsing du fichier..."):
-        df, success, message = parse_uploaded_file(uploaded_file)
+    # Lecture en streaming : seul un lot est en mémoire à la fois
+    try:
+        with st.spinner("Lecture de l'aperçu..."):
+            preview_df = next(iter_uploaded_file_chunks(uploaded_file, chunk_size=1000), None)
+        
+        # Validation des données (passe complète, lot par lot)
+        with st.spinner("Validation en cours..."):
+            validation = validate_chunks(iter_uploaded_file_chunks(uploaded_file))
+        is_valid, report, quality_score = validation['valid'], validation['report'], validation['quality_score']
+        reject_mask = validation['reject_mask']
+        nb_rejected = int(reject_mask.sum())
+    except Exception as e:
+        st.error(f"❌ Erreur lors du parsing du fichier : {str(e)}")
+        st.stop()
     
-    if not success:
-        st.error(f"❌ {message}")
+    if preview_df is None or preview_df.empty:
+        st.error("❌ Le fichier est vide")
         st.stop()
     
-    st.success(message)
+    st.success(f"Fichier '{uploaded_file.name}' parsé avec succès : {report['info']['nb_lignes']} lignes "
+               f"({report['info']['nb_lots']} lot(s))")
     
     # Afficher les infos du fichier
     st.markdown("### 📊 Informations du fichier")
     
-    file_info = get_file_info(df)
-    
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        st.metric("Lignes", file_info['nb_lignes'])
+        st.metric("Lignes", report['info']['nb_lignes'])
     with col2:
-        st.metric("Colonnes", file_info['nb_colonnes'])
+        st.metric("Colonnes", report['info']['nb_colonnes'])
     with col3:
-        st.metric("Taille", f"{file_info['memoire_mb']:.2f} MB")
+        st.metric("Taille", f"{uploaded_file.size / (1024 * 1024):.2f} MB")
     
     # Validation des données
     st.markdown("### ✅ Validation des données")
     
-    with st.spinner("Validation en cours..."):
-        is_valid, report = validate_complete(df)
-        quality_score = get_data_quality_score(df)
-    
     # Score de qualité
     col1, col2, col3 = st.columns([2, 1, 1])
     
@@ -114,35 +121,49 @@ if uploaded_file is not None:
     # Prévisualisation
     st.markdown("### 👁️ Prévisualisation")
     
-    st.dataframe(df.head(20), use_container_width=True)
+    st.dataframe(preview_df.head(20), use_container_width=True)
     
     # Statistiques
-    with st.expander("📈 Statistiques détaillées"):
-        st.write(df.describe())
+    with st.expander("📈 Statistiques détaillées (premières lignes)"):
+        st.write(preview_df.describe())
     
     st.markdown("---")
     
     # Import
     st.markdown("### 💾 Import dans la base de données")
     
-    if not is_valid:
+    # Lignes rejetées (hors plage, modulation invalide, timestamp ou métrique manquante)
+    exclude_rejected = False
+    if nb_rejected > 0:
+        exclude_rejected = st.checkbox(
+            f"🧹 Exclure les {nb_rejected} ligne(s) rejetée(s) lors de l'import",
+            value=False,
+            disabled=not validation['droppable']
+        )
+    
+    if not (is_valid or (exclude_rejected and validation['droppable'])):
         st.error("⚠️ Impossible d'importer : des erreurs critiques ont été détectées")
     else:
+        nb_to_import = report['info']['nb_lignes'] - (nb_rejected if exclude_rejected else 0)
         col1, col2 = st.columns([3, 1])
         
         with col1:
-            st.info(f"📦 Prêt à importer {len(df)} ligne(s)")
+            st.info(f"📦 Prêt à importer {nb_to_import} ligne(s)")
         
         with col2:
             if st.button("📤 Importer", use_container_width=True, type="primary"):
                 # Afficher les informations de la liaison cible
-                link_name = df['link_name'].iloc[0] if 'link_name' in df.columns else None
+                link_name = preview_df['link_name'].iloc[0] if 'link_name' in preview_df.columns else None
                 if link_name:
                     st.info(f"📡 Import pour la liaison: **{link_name}**")
                 
-                with st.spinner("Import en cours..."):
+                with st.spinner("Enregistrement des mesures..."):
                     # Import des données
-                    success, stats = load_measures_to_db(df)
+                    chunks = iter_uploaded_file_chunks(uploaded_file)
+                    if exclude_rejected:
+                        # Masque calculé à la validation : aucune revérification
+                        chunks = drop_rejected_rows(chunks, reject_mask)
+                    success, stats = load_measure_chunks_to_db(chunks)
                 
                 if success:
                     st.success("✅ Import réussi !")
@@ -163,7 +184,7 @@ if uploaded_file is not None:
                                     st.info(f"🔄 Liaison active changée vers: **{link.nom}**")
                     
                     # Afficher les statistiques
-                    col1, col2, col3, col4, col5 = st.columns(5)
+                    col1, col2, col3, col4 = st.columns(4)
                     
                     with col1:
                         st.metric("Total", stats['total'])
@@ -173,24 +194,17 @@ if uploaded_file is not None:
                         st.metric("Ignorées", stats['skipped'])
                     with col4:
                         st.metric("Erreurs", stats['errors'])
-                    with col5:
-                        st.metric("Alertes", stats.get('alerts_generated', 0))
                     
                     if stats['duplicates'] > 0:
                         st.warning(f"⚠️ {stats['duplicates']} doublon(s) ignoré(s)")
                     
-                    if stats.get('alerts_generated', 0) > 0:
-                        st.info(f"🚨 {stats['alerts_generated']} alerte(s) générée(s) automatiquement. Consultez la page Alertes.")
+                    # Génération des alertes en tâche de fond (suivie ci-dessous)
+                    st.session_state.alert_job_id = stats.get('alert_job_id')
                     
                     # Message pour aller voir le Dashboard
                     st.success("✅ **Données importées !** Allez sur le 📊 Dashboard pour visualiser les nouvelles données.")
                     
                     st.balloons()
-                    
-                    # Forcer le rechargement de la page après 2 secondes
-                    import time
-                    time.sleep(2)
-                    st.rerun()
                 else:
                     st.error("❌ Erreur lors de l'import")
                     st.write(f"Statistiques : {stats}")
@@ -220,6 +234,38 @@ else:
     st.markdown("### 📥 Fichier exemple")
     st.markdown("Un fichier exemple avec 100 lignes est disponible : `data/sample_fh_data.csv`")
 
+
+def alert_job_panel(job_id: str, polling: bool):
+    """Affiche l'avancement de la génération des alertes."""
+    job = get_job_status(job_id)
+    if job is None:
+        return
+    if job['finished'] and polling:
+        # Tâche terminée pendant le rafraîchissement du fragment : rerun complet pour arrêter le polling
+        st.rerun(scope="app")
+    
+    st.markdown("### 🚨 Génération des alertes")
+    st.progress(job['progress'], text=f"{job['nb_links_done']}/{job['nb_links']} liaison(s) analysée(s)")
+    
+    if not job['finished']:
+        st.caption(f"⏳ {job['status']} — {job['nb_alerts']} alerte(s) créée(s) pour l'instant")
+        return
+    
+    if job['errors']:
+        st.error(f"❌ {len(job['errors'])} lot(s) en erreur : {job['errors'][0]}")
+    if job['nb_alerts'] > 0:
+        details = ", ".join(f"{alert_type} : {count}" for alert_type, count in job['par_type'].items())
+        st.info(f"🚨 {job['nb_alerts']} alerte(s) générée(s) automatiquement ({details}). Consultez la page Alertes.")
+    else:
+        st.success("✅ Aucune nouvelle alerte (seuils OK ou alertes déjà existantes)")
+
+
+if st.session_state.get('alert_job_id'):
+    # Rafraîchi chaque seconde tant que la tâche est en cours
+    job = get_job_status(st.session_state.alert_job_id)
+    polling = 1 if job is not None and not job['finished'] else None
+    st.fragment(run_every=polling)(alert_job_panel)(st.session_state.alert_job_id, polling is not None)
+
 # Footer
 st.markdown("---")
 st.markdown("""
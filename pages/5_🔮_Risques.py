@@ -0,0 +1,106 @@
+"""
+Page Risques - Classement des liaisons par risque de dégradation.
+"""
+import streamlit as st
+import pandas as pd
+from backend.ai_engine.risk_scoring import RISK_LEVELS, get_risk_ranking, get_risk_summary, run_risk_scoring
+from backend.security.auth import check_permission
+import config
+
+st.set_page_config(page_title="Risques", page_icon="🔮", layout="wide")
+
+# Vérifier l'authentification
+if not st.session_state.get('authenticated', False):
+    st.warning("⚠️ Veuillez vous connecter")
+    st.stop()
+
+user = st.session_state.user
+
+# Libellés des niveaux de risque
+LEVEL_LABELS = {
+    'HIGH': "🔴 Élevé",
+    'MODERATE': "🟠 Modéré",
+    'LOW': "🟢 Faible",
+    'UNKNOWN': "⚪ Inconnu"
+}
+
+# En-tête avec bouton de recalcul
+col1, col2 = st.columns([4, 1])
+with col1:
+    st.title("🔮 Risques de Dégradation")
+with col2:
+    if check_permission(user, ['all']):
+        if st.button("🔄 Recalculer", use_container_width=True, type="secondary"):
+            with st.spinner("Scoring de la flotte en cours..."):
+                scoring = run_risk_scoring()
+            st.success(f"✅ {scoring['nb_links']} liaison(s) scorée(s) en {scoring['duree_s']:.1f}s")
+
+st.caption(
+    f"RSSI prédit à {config.IA_CONFIG['prediction_horizon']}h (tendance linéaire sur 48h) comparé au seuil "
+    f"de dégradation ({config.SEUILS_RSSI['DEGRADED']} dBm). Calcul automatique toutes les "
+    f"{config.RISK_SCORING_CONFIG['interval_minutes']} minutes."
+)
+
+summary = get_risk_summary()
+if summary['calcule_le'] is None:
+    st.info(f"💡 Aucun scoring disponible. Le premier calcul automatique a lieu "
+            f"{config.RISK_SCORING_CONFIG['interval_minutes']} minutes après le démarrage du serveur "
+            f"(ou au démarrage avec RISK_SCORING_AT_STARTUP=true).")
+    st.stop()
+
+# Répartition par niveau
+cols = st.columns(len(RISK_LEVELS))
+for col, level in zip(cols, RISK_LEVELS):
+    with col:
+        st.metric(LEVEL_LABELS[level], summary['par_niveau'][level])
+
+# Filtres
+col1, col2 = st.columns([3, 1])
+with col1:
+    niveaux = st.multiselect(
+        "Niveaux",
+        options=RISK_LEVELS,
+        default=['HIGH', 'MODERATE'],
+        format_func=lambda level: LEVEL_LABELS[level],
+        key="risk_levels"
+    )
+with col2:
+    search = st.text_input("Rechercher (liaison, site)", key="risk_search")
+
+ranking = pd.DataFrame(get_risk_ranking(niveaux=niveaux or None))
+if search and not ranking.empty:
+    pattern = search.lower()
+    ranking = ranking[
+        ranking['nom'].str.lower().str.contains(pattern, regex=False)
+        | ranking['site_a'].str.lower().str.contains(pattern, regex=False)
+        | ranking['site_b'].str.lower().str.contains(pattern, regex=False)
+    ]
+
+if ranking.empty:
+    st.success("✅ Aucune liaison pour ces critères")
+else:
+    ranking['niveau'] = ranking['niveau'].map(LEVEL_LABELS)
+    st.dataframe(
+        ranking,
+        hide_index=True,
+        use_container_width=True,
+        column_order=['nom', 'site_a', 'site_b', 'niveau', 'rssi_actuel', 'rssi_predit', 'marge_db',
+                      'pente_db_h', 'confiance', 'eta', 'raison', 'derniere_mesure'],
+        column_config={
+            'nom': "Liaison",
+            'site_a': "Site A",
+            'site_b': "Site B",
+            'niveau': "Risque",
+            'rssi_actuel': st.column_config.NumberColumn("RSSI actuel (dBm)", format="%.1f"),
+            'rssi_predit': st.column_config.NumberColumn("RSSI prédit (dBm)", format="%.1f"),
+            'marge_db': st.column_config.NumberColumn("Marge au seuil (dB)", format="%.1f"),
+            'pente_db_h': st.column_config.NumberColumn("Tendance (dB/h)", format="%.3f"),
+            'confiance': st.column_config.ProgressColumn("Confiance (R²)", min_value=0.0, max_value=1.0,
+                                                         format="%.2f"),
+            'eta': st.column_config.DatetimeColumn("Seuil franchi vers", format="YYYY-MM-DD HH:mm"),
+            'raison': "Détail",
+            'derniere_mesure': st.column_config.DatetimeColumn("Dernière mesure", format="YYYY-MM-DD HH:mm")
+        }
+    )
+
+st.caption(f"{len(ranking)} liaison(s) — scoring du {summary['calcule_le']:%Y-%m-%d %H:%M:%S} UTC")
@@ -3,8 +3,8 @@ Script pour supprimer toutes les alertes et les régénérer.
 Utile pour tester le système de génération d'alertes.
 """
 from backend.database.connection import get_db_context
-from backend.database.models import Alerte, FHLink
-from backend.alerts.alert_engine import check_and_create_alerts
+from backend.database.models import Alerte
+from backend.alerts.fleet_evaluator import evaluate_fleet_alerts
 
 print("=" * 70)
 print("🔄 RÉINITIALISATION ET RÉGÉNÉRATION DES ALERTES")
@@ -18,21 +18,14 @@ with get_db_context() as db:
     db.commit()
     print(f"   ✓ {count} alerte(s) supprimée(s)")
 
-# 2. Régénérer les alertes pour toutes les liaisons
+# 2. Régénérer les alertes pour toutes les liaisons (une passe pour toute la flotte)
 print("\n2️⃣ Régénération des alertes...")
-with get_db_context() as db:
-    links = db.query(FHLink).all()
-    total_alerts = 0
-    
-    for link in links:
-        print(f"\n   📡 Analyse de la liaison: {link.nom} (ID={link.id})")
-        alerts_created = check_and_create_alerts(link.id)
-        total_alerts += len(alerts_created)
-        
-        if alerts_created:
-            print(f"      ✓ {len(alerts_created)} alerte(s) créée(s)")
-        else:
-            print(f"      • Aucune alerte à créer (seuils OK)")
+evaluation = evaluate_fleet_alerts()
+total_alerts = evaluation['nb_alerts']
+
+print(f"   📡 {evaluation['nb_links']} liaison(s) analysée(s)")
+for alert_type, count in evaluation['par_type'].items():
+    print(f"      ✓ {alert_type} : {count} alerte(s) créée(s)")
 
 print(f"\n{'='*70}")
 print(f"✅ TERMINÉ: {total_alerts} alerte(s) générée(s) au total")
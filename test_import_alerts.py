@@ -3,6 +3,7 @@ Script de test pour vérifier l'import de données et la génération d'alertes.
 """
 import pandas as pd
 from backend.ingestion.data_loader import load_measures_to_db
+from backend.alerts.alert_jobs import wait_for_job
 from backend.alerts.alert_engine import get_active_alerts, get_alerts_count_by_severity
 from backend.database.connection import get_db_context
 from backend.database.models import MesureKPI, Alerte
@@ -32,7 +33,10 @@ if success:
     print(f"   - Importées: {stats['imported']}")
     print(f"   - Doublons: {stats['duplicates']}")
     print(f"   - Erreurs: {stats['errors']}")
-    print(f"   - Alertes générées: {stats.get('alerts_generated', 0)}")
+    if stats['alert_job_id']:
+        # Génération des alertes en tâche de fond : attendre la fin
+        job = wait_for_job(stats['alert_job_id'])
+        print(f"   - Alertes générées: {job['nb_alerts']}")
 else:
     print(f"❌ Erreur lors de l'import")
     print(f"   Stats: {stats}")
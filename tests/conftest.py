@@ -0,0 +1,27 @@
+"""
+Configuration des tests : base SQLite en mémoire et dossier de modèles temporaire,
+fixés avant le premier import de config.
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+os.environ['DATABASE_URL'] = 'sqlite://'
+os.environ['ENVIRONMENT'] = 'test'
+os.environ['MODELS_DIR'] = tempfile.mkdtemp(prefix='netpulse_models_')
+os.environ['RISK_SCORING_ENABLED'] = 'false'
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+
+@pytest.fixture
+def database():
+    """Tables recréées à vide pour chaque test."""
+    from backend.database.connection import engine
+    from backend.database.models import Base
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    Base.metadata.drop_all(bind=engine)
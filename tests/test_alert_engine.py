@@ -0,0 +1,128 @@
+"""
+Tests des requêtes de la page Alertes (pagination par clé, comptages agrégés).
+"""
+from collections import Counter
+from datetime import datetime, timedelta
+import numpy as np
+from sqlalchemy import insert, select
+from backend.alerts.alert_engine import (
+    _alert_filters, count_alerts, delete_alert, get_alerts_count_by_severity, get_alerts_histogram,
+    get_alerts_page, get_fleet_alert_counts, resolve_alert
+)
+from backend.database.connection import get_db_context
+from backend.database.models import Alerte, FHLink
+from backend.database.query_cache import invalidate_alerts
+import config
+
+SEVERITES = ['CRITIQUE', 'MAJEURE', 'MINEURE', 'PREDICTIVE']
+DEBUT = datetime(2026, 1, 1)
+
+
+def _insert_alerts(n=600, seed=9):
+    rng = np.random.default_rng(seed)
+    with get_db_context() as db:
+        db.execute(insert(FHLink), [
+            {'nom': f'L{i}', 'site_a': f'S{i}', 'site_b': f'X{i}', 'frequence_ghz': 18.0, 'distance_km': 5.0,
+             'actif': True}
+            for i in (1, 2, 3)
+        ])
+        # Peu d'horodatages distincts : beaucoup d'alertes à égalité de timestamp
+        db.execute(insert(Alerte), [
+            {
+                'link_id': int(rng.integers(1, 4)),
+                'timestamp': DEBUT + timedelta(hours=int(rng.integers(0, 40))),
+                'type': 'RSSI_LOW',
+                'severite': str(rng.choice(SEVERITES)),
+                'message': f"alerte {i}",
+                'resolved': bool(rng.random() < 0.3)
+            }
+            for i in range(n)
+        ])
+    invalidate_alerts([1, 2, 3])
+
+
+def _offset_page(filters, page, page_size):
+    """Page par OFFSET/LIMIT sur le même tri, référence de la pagination par clé."""
+    with get_db_context() as db:
+        return db.execute(
+            select(Alerte.id).where(*_alert_filters(**filters))
+            .order_by(Alerte.timestamp.desc(), Alerte.id.desc())
+            .offset(page * page_size).limit(page_size)
+        ).scalars().all()
+
+
+def test_keyset_pages_match_offset_pages_with_tied_timestamps(database):
+    _insert_alerts()
+
+    for filters in (
+        {},
+        {'link_id': 2},
+        {'severities': ['CRITIQUE', 'MAJEURE'], 'resolved': False},
+        {'resolved': True, 'date_from': DEBUT + timedelta(hours=20)},
+    ):
+        for page_size in (1, 7, 50):
+            pages, cursor = [], None
+            while True:
+                alerts, cursor = get_alerts_page(**filters, cursor=cursor, page_size=page_size)
+                pages.append([alert['id'] for alert in alerts])
+                if cursor is None:
+                    break
+
+            expected = [_offset_page(filters, page, page_size) for page in range(len(pages))]
+            assert pages == expected, (filters, page_size)
+            # Plus de page après la dernière, et pas de page vide quand le total est un multiple
+            assert _offset_page(filters, len(pages), page_size) == []
+            assert all(pages)
+
+
+def _python_counts(*keys, **filters):
+    """Comptage en Python sur les lignes chargées, comme avant les GROUP BY."""
+    with get_db_context() as db:
+        return Counter(
+            tuple(getattr(alert, key) for key in keys) for alert in db.query(Alerte).all()
+            if (not filters.get('link_id') or alert.link_id == filters['link_id'])
+            and (filters.get('resolved') is None or alert.resolved == filters['resolved'])
+            and (not filters.get('severities') or alert.severite in filters['severities'])
+            and (filters.get('date_from') is None or alert.timestamp >= filters['date_from'])
+        )
+
+
+def _fleet_counts_reference():
+    counts = {}
+    for (link_id, severite), count in _python_counts('link_id', 'severite', resolved=False).items():
+        counts.setdefault(link_id, {})[severite] = count
+    return counts
+
+
+def test_grouped_counts_match_python_counts(database):
+    _insert_alerts()
+
+    for filters in (
+        {},
+        {'link_id': 3},
+        {'resolved': False},
+        {'severities': ['MINEURE'], 'date_from': DEBUT + timedelta(hours=10)},
+    ):
+        expected = {severite: count for (severite,), count in _python_counts('severite', **filters).items()}
+        assert get_alerts_histogram(**filters) == expected, filters
+        assert count_alerts(**filters) == sum(expected.values()), filters
+
+    for link_id in (None, 1):
+        expected = _python_counts('severite', link_id=link_id, resolved=False)
+        assert get_alerts_count_by_severity(link_id) == {
+            severite: expected[(severite,)] for severite in config.ALERT_SEVERITIES
+        }
+
+    assert get_fleet_alert_counts() == _fleet_counts_reference()
+
+
+def test_fleet_counts_cache_follows_alert_writes(database):
+    _insert_alerts(100)
+    assert get_fleet_alert_counts() == _fleet_counts_reference()
+
+    with get_db_context() as db:
+        open_ids = db.execute(select(Alerte.id).where(Alerte.resolved == False).limit(2)).scalars().all()
+    assert resolve_alert(open_ids[0], 'operateur@netpulse.local')[0]
+    assert get_fleet_alert_counts() == _fleet_counts_reference()
+    assert delete_alert(open_ids[1])[0]
+    assert get_fleet_alert_counts() == _fleet_counts_reference()
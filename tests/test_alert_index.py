@@ -0,0 +1,72 @@
+"""
+Tests de l'index en mémoire des alertes ouvertes.
+"""
+import numpy as np
+from sqlalchemy import insert, select
+from backend.alerts.alert_engine import create_alert, delete_alert, resolve_alert
+from backend.alerts.alert_index import OpenAlertIndex, open_alert_index
+from backend.alerts.correlation import alert_correlator, get_active_incidents, resolve_incident
+from backend.database.connection import get_db_context
+from backend.database.models import Alerte, FHLink
+
+TYPES = ['RSSI_LOW', 'SNR_LOW', 'LATENCY_HIGH']
+
+
+def _insert_links():
+    # L1 et L2 sur le même site : leurs alertes radio ouvrent des incidents
+    with get_db_context() as db:
+        db.execute(insert(FHLink), [
+            {'nom': f'L{i}', 'site_a': site, 'site_b': f'X{i}', 'frequence_ghz': 18.0, 'distance_km': 5.0,
+             'actif': True}
+            for i, site in ((1, 'S1'), (2, 'S1'), (3, 'S3'), (4, 'S4'))
+        ])
+    alert_correlator.invalidate()
+    open_alert_index.invalidate()
+
+
+def _open_alerts_in_db():
+    with get_db_context() as db:
+        return db.execute(select(Alerte.id, Alerte.link_id, Alerte.type).where(Alerte.resolved == False)).all()
+
+
+def _all_alert_ids():
+    with get_db_context() as db:
+        return db.execute(select(Alerte.id)).scalars().all()
+
+
+def test_index_follows_create_resolve_and_delete(database):
+    _insert_links()
+    rng = np.random.default_rng(5)
+
+    for step in range(200):
+        operation = rng.choice(['create', 'create', 'resolve', 'delete', 'incident'])
+        if operation == 'create':
+            link_id, alert_type = int(rng.integers(1, 5)), str(rng.choice(TYPES))
+            already_open = any((row.link_id, row.type) == (link_id, alert_type) for row in _open_alerts_in_db())
+            created, _ = create_alert(link_id, alert_type, 'MAJEURE', alert_type)
+            assert created != already_open, step
+        elif operation == 'resolve' and _open_alerts_in_db():
+            alert_id = int(rng.choice([row.id for row in _open_alerts_in_db()]))
+            assert resolve_alert(alert_id, 'operateur@netpulse.local')[0]
+        elif operation == 'delete' and _all_alert_ids():
+            assert delete_alert(int(rng.choice(_all_alert_ids())))[0]
+        elif operation == 'incident' and get_active_incidents():
+            incident = get_active_incidents()[0]
+            assert resolve_incident(incident['id'], 'operateur@netpulse.local')[0]
+
+        open_rows = _open_alerts_in_db()
+        assert open_alert_index.open_keys() == {(row.link_id, row.type) for row in open_rows}, step
+        assert open_alert_index.stats()['alerts'] == len(open_rows), step
+
+
+def test_writes_from_another_process_are_seen_after_refresh(database):
+    _insert_links()
+    index = OpenAlertIndex(refresh_seconds=0)
+    assert not index.contains(3, 'RSSI_LOW')
+
+    # Écriture directe en base, sans passer par create_alert
+    with get_db_context() as db:
+        db.execute(insert(Alerte), [{'link_id': 3, 'type': 'RSSI_LOW', 'severite': 'MAJEURE', 'message': 'RSSI bas'}])
+
+    assert index.contains(3, 'RSSI_LOW')
+    assert index.open_keys([3, 4]) == {(3, 'RSSI_LOW')}
@@ -0,0 +1,56 @@
+"""
+Tests de la détection vectorisée des chutes brutales.
+"""
+import numpy as np
+import pandas as pd
+from backend.ai_engine.anomaly_detector import detect_drops_array
+
+
+def _brute_force_drops(frame, drop_threshold, lags, windows):
+    """Référence : comparaisons mesure par mesure, liaison par liaison."""
+    found = set()
+    for link_id, link in frame.sort_values(['link_id', 'timestamp']).groupby('link_id'):
+        values = link['value'].tolist()
+        timestamps = link['timestamp'].tolist()
+        for i, value in enumerate(values):
+            for lag in lags:
+                if i >= lag and values[i - lag] - value > drop_threshold:
+                    found.add((link_id, timestamps[i], 'lag', lag, values[i - lag], value))
+            for width in windows:
+                previous = [v for v in values[max(0, i - width):i] if not np.isnan(v)]
+                if previous and max(previous) - value > drop_threshold:
+                    found.add((link_id, timestamps[i], 'fenetre', width, max(previous), value))
+    return found
+
+
+def test_drops_match_per_link_loop_including_short_links():
+    rng = np.random.default_rng(5)
+    sizes = {1: 1, 2: 2, 3: 3, 4: 5, 5: 40, 6: 4, 7: 120}
+    frame = pd.concat([
+        pd.DataFrame({
+            'link_id': link_id,
+            'timestamp': pd.date_range('2026-01-01', periods=size, freq='5min'),
+            'value': -55 + rng.normal(0, 1, size) - np.where(rng.random(size) < 0.2, 15.0, 0.0)
+        })
+        for link_id, size in sizes.items()
+    ], ignore_index=True)
+    frame.loc[rng.random(len(frame)) < 0.05, 'value'] = np.nan
+    # Mesures dans le désordre : le tri fait partie du contrat
+    frame = frame.sample(frac=1, random_state=1, ignore_index=True)
+    lags, windows = (1, 3, 7), (2, 6, 50, 500)
+
+    drops = detect_drops_array(
+        frame['link_id'], frame['timestamp'], frame['value'], 8.0, lags=lags, windows=windows
+    )
+
+    expected = _brute_force_drops(frame, 8.0, lags, windows)
+    assert expected
+    assert set(drops[['link_id', 'timestamp', 'methode', 'horizon', 'previous_value', 'current_value']]
+               .itertuples(index=False, name=None)) == expected
+    assert len(drops) == len(expected)
+
+
+def test_window_wider_than_measures():
+    drops = detect_drops_array([1, 1, 1], pd.date_range('2026-01-01', periods=3, freq='5min'),
+                               [-50.0, -70.0, -55.0], 8.0, lags=(), windows=(6,))
+    assert drops[['previous_value', 'current_value']].values.tolist() == [[-50.0, -70.0]]
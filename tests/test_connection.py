@@ -0,0 +1,149 @@
+"""
+Tests de la sérialisation des transactions SQLite (connexion StaticPool partagée).
+"""
+import threading
+from datetime import datetime
+import pandas as pd
+from sqlalchemy import func, insert, select
+from backend.alerts.alert_index import open_alert_index
+from backend.alerts.alert_jobs import wait_for_job
+from backend.analytics.fleet_snapshot import fleet_snapshot
+from backend.database.connection import get_db_context
+from backend.database.models import FHLink, MesureKPI
+from backend.ingestion.data_loader import load_measure_chunks_to_db, load_measures_to_db
+
+
+def _link(nom):
+    return {'nom': nom, 'site_a': 'A', 'site_b': 'B', 'frequence_ghz': 18.0, 'distance_km': 5.0, 'actif': True}
+
+
+def test_background_rollback_does_not_discard_other_thread_transaction(database):
+    inside, release = threading.Event(), threading.Event()
+    entered = threading.Event()
+
+    def background():
+        try:
+            with get_db_context() as db:
+                db.execute(insert(FHLink), [_link('job')])
+                inside.set()
+                release.wait(5)
+                raise RuntimeError("échec du job")
+        except RuntimeError:
+            pass
+
+    def page():
+        with get_db_context() as db:
+            entered.set()
+            db.execute(insert(FHLink), [_link('page')])
+
+    job_thread = threading.Thread(target=background)
+    job_thread.start()
+    inside.wait(5)
+    page_thread = threading.Thread(target=page)
+    page_thread.start()
+    # La page attend la fin de la transaction du job
+    assert not entered.wait(0.3)
+    release.set()
+    job_thread.join(5)
+    page_thread.join(5)
+
+    with get_db_context() as db:
+        assert db.execute(select(FHLink.nom)).scalars().all() == ['page']
+
+
+def test_alert_job_runs_while_pages_read(database):
+    timestamps = pd.date_range(end=datetime.utcnow(), periods=60, freq='5min')
+    frame = pd.concat([pd.DataFrame({
+        'timestamp': timestamps, 'link_name': f'L{i}', 'rssi_dbm': -75.0,
+        'snr_db': 12.0, 'ber': 1e-5, 'acm_modulation': 'QPSK', 'latency_ms': 3.0,
+        'packet_loss': 0.0, 'rainfall_mm': 0.0
+    }) for i in range(20)])
+    ok, stats = load_measures_to_db(frame)
+    assert ok and stats['alert_job_id'] is not None
+    # Statistiques historiques conservées : nombre inconnu tant que la tâche tourne
+    assert stats['alerts_generated'] is None
+
+    counts = []
+    while True:
+        with get_db_context() as db:
+            counts.append(db.execute(select(func.count()).select_from(FHLink)).scalar())
+        job = wait_for_job(stats['alert_job_id'], timeout=0.01)
+        if job['finished']:
+            break
+    assert set(counts) == {20}
+    assert job['status'] == 'TERMINEE' and job['errors'] == []
+
+
+def _run_with_timeout(target, timeout=2):
+    """Exécute target dans un thread ; retourne True s'il s'est terminé à temps."""
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    return not thread.is_alive()
+
+
+def test_reader_makes_progress_while_import_runs(database):
+    timestamps = pd.date_range(end=datetime.utcnow(), periods=20, freq='5min')
+    frame = pd.DataFrame({
+        'timestamp': timestamps, 'link_name': 'L1', 'rssi_dbm': -55.0, 'snr_db': 30.0,
+        'ber': 1e-9, 'acm_modulation': '256QAM', 'latency_ms': 3.0, 'packet_loss': 0.0, 'rainfall_mm': 0.0
+    })
+    first_chunk_done, release = threading.Event(), threading.Event()
+
+    def chunks():
+        yield frame.iloc[:10]
+        # Le fichier n'est pas encore lu en entier : l'import est toujours en cours
+        first_chunk_done.set()
+        release.wait(5)
+        yield frame.iloc[10:]
+
+    results = {}
+    importer = threading.Thread(
+        target=lambda: results.update(stats=load_measure_chunks_to_db(chunks(), generate_alerts=False)[1])
+    )
+    importer.start()
+    assert first_chunk_done.wait(5)
+
+    counts = []
+
+    def reader():
+        with get_db_context() as db:
+            counts.append(db.execute(select(func.count()).select_from(MesureKPI)).scalar())
+        open_alert_index.contains(1, 'RSSI_FAIBLE')
+        fleet_snapshot.get()
+
+    try:
+        assert _run_with_timeout(reader)
+    finally:
+        release.set()
+        importer.join(5)
+    assert counts == [10]
+    assert results['stats']['imported'] == 20
+    assert results['stats']['alerts_generated'] == 0 and results['stats']['alert_job_id'] is None
+
+
+def test_in_memory_reads_do_not_wait_for_transactions(database):
+    load_measures_to_db(pd.DataFrame({
+        'timestamp': [datetime.utcnow()], 'link_name': 'L1', 'rssi_dbm': -55.0, 'snr_db': 30.0,
+        'ber': 1e-9, 'acm_modulation': '256QAM'
+    }), generate_alerts=False)
+    open_alert_index.invalidate()
+    fleet_snapshot.invalidate()
+    open_alert_index.contains(1, 'RSSI_FAIBLE')
+    fleet_snapshot.get()
+
+    inside, release = threading.Event(), threading.Event()
+
+    def transaction():
+        with get_db_context():
+            inside.set()
+            release.wait(5)
+
+    writer = threading.Thread(target=transaction)
+    writer.start()
+    assert inside.wait(5)
+    try:
+        assert _run_with_timeout(lambda: (open_alert_index.contains(1, 'RSSI_FAIBLE'), fleet_snapshot.get()))
+    finally:
+        release.set()
+        writer.join(5)
@@ -0,0 +1,68 @@
+"""
+Tests de la corrélation des alertes en incidents.
+"""
+from sqlalchemy import insert, select, update
+from backend.alerts.correlation import AlertCorrelator
+from backend.database.connection import get_db_context
+from backend.database.models import FHLink, Incident
+
+
+def _records(alert_type):
+    return [{'link_id': link_id, 'type': alert_type, 'severite': 'MAJEURE', 'message': alert_type}
+            for link_id in (1, 2)]
+
+
+def test_site_change_is_seen_after_refresh(database):
+    with get_db_context() as db:
+        db.execute(insert(FHLink), [
+            {'nom': f'L{i}', 'site_a': 'S1', 'site_b': f'X{i}', 'frequence_ghz': 18.0, 'distance_km': 5.0,
+             'actif': True}
+            for i in (1, 2)
+        ])
+
+    correlator = AlertCorrelator(refresh_seconds=0)
+    with get_db_context() as db:
+        correlator.correlate(db, _records('RSSI_LOW'))
+    with get_db_context() as db:
+        db.execute(update(FHLink).values(site_a='S2'))
+    with get_db_context() as db:
+        correlator.correlate(db, _records('LATENCY_HIGH'))
+
+    with get_db_context() as db:
+        incidents = db.execute(select(Incident.site, Incident.cause).order_by(Incident.id)).all()
+    assert [tuple(incident) for incident in incidents] == [('S1', 'RADIO'), ('S2', 'TRANSPORT')]
+
+
+def test_resolved_or_deleted_member_is_recreated_while_incident_is_open(database, monkeypatch):
+    import config
+    from backend.alerts.alert_engine import create_alert, delete_alert, resolve_alert
+    from backend.alerts.alert_index import open_alert_index
+    from backend.alerts.correlation import alert_correlator
+
+    monkeypatch.setitem(config.CORRELATION_CONFIG, 'storm_threshold', 3)
+    with get_db_context() as db:
+        db.execute(insert(FHLink), [
+            {'nom': f'L{i}', 'site_a': 'S1', 'site_b': f'X{i}', 'frequence_ghz': 18.0, 'distance_km': 5.0,
+             'actif': True}
+            for i in (1, 2, 3, 4)
+        ])
+    alert_correlator.invalidate()
+    open_alert_index.invalidate()
+
+    created = {link_id: create_alert(link_id, 'RSSI_LOW', 'MAJEURE', 'RSSI bas') for link_id in (1, 2, 3, 4)}
+    assert [ok for ok, _ in created.values()] == [True, True, True, False]  # L4 : tempête
+
+    # Défaut toujours présent : ni doublon ni nouvelle suppression
+    assert [create_alert(link_id, 'RSSI_LOW', 'MAJEURE', 'RSSI bas')[0] for link_id in (1, 2, 3, 4)] == [False] * 4
+
+    # Alertes résolue et supprimée : le défaut qui revient recrée une alerte, même après rechargement
+    resolve_alert(created[1][1], 'operateur@netpulse.local')
+    delete_alert(created[2][1])
+    alert_correlator.invalidate()
+    monkeypatch.setitem(config.CORRELATION_CONFIG, 'storm_threshold', 10)
+    recreated = [create_alert(link_id, 'RSSI_LOW', 'MAJEURE', 'RSSI bas')[0] for link_id in (1, 2, 3, 4)]
+    assert recreated == [True, True, False, False]
+
+    with get_db_context() as db:
+        incident = db.execute(select(Incident)).scalar_one()
+        assert incident.nb_alertes == 6 and incident.nb_supprimees == 1
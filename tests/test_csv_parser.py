@@ -0,0 +1,28 @@
+"""
+Tests de la lecture des fichiers importés.
+"""
+import io
+import pandas as pd
+from backend.ingestion import csv_parser
+
+
+class _Upload(io.BytesIO):
+    def __init__(self, name, content=b''):
+        super().__init__(content)
+        self.name = name
+
+
+def test_xls_upload_is_read_with_xlrd(monkeypatch):
+    calls = []
+
+    def read_excel(source, sheet_name=0, engine=None):
+        calls.append(engine)
+        return pd.DataFrame({'Link Name': ['L1', 'L2', 'L3'], 'RSSI_dBm': [-55, -56, -57]})
+    monkeypatch.setattr(csv_parser.pd, 'read_excel', read_excel)
+
+    chunks = list(csv_parser.iter_uploaded_file_chunks(_Upload('mesures.xls'), chunk_size=2))
+
+    assert calls == ['xlrd']
+    assert [len(chunk) for chunk in chunks] == [2, 1]
+    assert list(chunks[1]['link_name']) == ['L3']
+    assert chunks[1]['rssi_dbm'].tolist() == [-57]
@@ -0,0 +1,101 @@
+"""
+Tests du chargement des mesures en base.
+"""
+from datetime import datetime
+import pandas as pd
+from backend.ingestion import data_loader
+
+
+def _measures(n, link_name='L1'):
+    return pd.DataFrame({
+        'timestamp': pd.date_range(end=datetime(2026, 1, 1), periods=n, freq='5min'),
+        'link_name': link_name,
+        'rssi_dbm': -55.0,
+        'snr_db': 30.0,
+        'ber': 1e-9,
+        'acm_modulation': '256QAM',
+        'latency_ms': 3.0,
+        'packet_loss': 0.0,
+        'rainfall_mm': 0.0
+    })
+
+
+def test_failed_chunk_counts_rejected_rows_once(database, monkeypatch):
+    frame = _measures(5)
+    frame.loc[2, 'rssi_dbm'] = None  # rejetée par _prepare_chunk
+
+    def fail(db, rows):
+        raise RuntimeError("échec du lot")
+    monkeypatch.setattr(data_loader, 'update_rollups', fail)
+
+    ok, stats = data_loader.load_measures_to_db(frame, generate_alerts=False)
+    assert not ok
+    assert stats['total'] == 5
+    assert stats['errors'] == 5
+    assert stats['imported'] == 0 and stats['duplicates'] == 0
+
+
+def test_bulk_load_skips_duplicates_without_losing_the_batch(database):
+    link_id, _ = data_loader.get_or_create_link('L1')
+    measures = [
+        {'link_id': link_id, 'timestamp': ts.to_pydatetime(), 'rssi_dbm': -55.0, 'snr_db': 30.0,
+         'ber': 1e-9, 'acm_modulation': '256QAM'}
+        for ts in pd.date_range(end=datetime(2026, 1, 1), periods=4, freq='5min')
+    ]
+
+    ok, stats = data_loader.bulk_load_measures(measures[:2])
+    assert ok and stats['imported'] == 2
+
+    ok, stats = data_loader.bulk_load_measures(measures + [dict(measures[3]), {'link_id': link_id}])
+    assert ok
+    assert stats['imported'] == 2
+    assert stats['duplicates'] == 3
+    assert stats['errors'] == 1
+    assert data_loader.get_import_statistics()['total_measures'] == 4
+
+
+def test_overlapping_reimport_feeds_only_inserted_rows(database, monkeypatch):
+    from backend.ai_engine import streaming_detector
+    from backend.analytics.rollups import get_rollups, rebuild_rollups
+    from backend.database.connection import get_db_context
+
+    history = _measures(30)
+    ok, _ = data_loader.load_measures_to_db(history.iloc[:20], generate_alerts=False)
+    assert ok
+
+    def no_rebuild(db, link_id):
+        raise AssertionError("recalcul complet de l'historique")
+    monkeypatch.setattr(streaming_detector, 'rebuild_anomaly_states', no_rebuild)
+    seen = {}
+    for name in ('update_rollups', 'update_anomaly_states', 'update_multivariate_states'):
+        def spy(db, rows, _name=name, _target=getattr(data_loader, name)):
+            seen[_name] = rows['timestamp'].tolist()
+            return _target(db, rows)
+        monkeypatch.setattr(data_loader, name, spy)
+
+    # Réimport chevauchant : 10 doublons puis 10 mesures nouvelles
+    ok, stats = data_loader.load_measures_to_db(history.iloc[10:], generate_alerts=False)
+    assert ok and stats['imported'] == 10 and stats['duplicates'] == 10
+    new_timestamps = history['timestamp'].iloc[20:].tolist()
+    assert seen == {name: new_timestamps for name in seen} and len(seen) == 3
+
+    # Les rollups fusionnés sont ceux d'un recalcul complet
+    incremental = get_rollups(1)
+    with get_db_context() as db:
+        rebuild_rollups(db, 1)
+        db.commit()
+    pd.testing.assert_frame_equal(incremental.drop(columns='id'), get_rollups(1).drop(columns='id'), check_exact=False)
+
+
+def test_missing_modulation_is_rejected(database):
+    from sqlalchemy import select
+    from backend.database.connection import get_db_context
+    from backend.database.models import MesureKPI
+
+    frame = _measures(4)
+    frame['acm_modulation'] = pd.Series(['256QAM', None, float('nan'), '64QAM'], dtype='category')
+
+    ok, stats = data_loader.load_measures_to_db(frame, generate_alerts=False)
+    assert ok and stats['imported'] == 2 and stats['errors'] == 2
+    with get_db_context() as db:
+        assert db.execute(select(MesureKPI.acm_modulation)).scalars().all() == ['256QAM', '64QAM']
@@ -0,0 +1,75 @@
+"""
+Tests du plan de validation des mesures importées.
+"""
+import io
+import numpy as np
+import pandas as pd
+from backend.ingestion import csv_parser
+from backend.ingestion.data_validator import run_validation_plan, validate_chunks, validate_complete
+
+CSV = """timestamp,link_name,rssi_dbm,snr_db,ber,acm_modulation,latency_ms,packet_loss,rainfall_mm
+2026-01-01 00:00:00,L1,-55,30,1e-9,256QAM,3,0,0
+pas une date,L1,-55,30,1e-9,256QAM,3,0,0
+,L1,-55,30,1e-9,256QAM,3,0,0
+2026-01-01 00:15:00,L1,-55,30,1e-9,256QAM,3,0,0
+"""
+
+
+def _assert_timestamp_errors(report):
+    assert "1 timestamp(s) manquant(s)" in report['errors']
+    assert "Erreur de conversion des timestamps : 1 valeur(s) non reconnue(s)" in report['errors']
+
+
+def test_unparsable_timestamps_are_reported_apart_from_missing_ones():
+    valid, report = validate_complete(pd.read_csv(io.StringIO(CSV)))
+    assert not valid
+    _assert_timestamp_errors(report)
+
+
+def test_unparsable_timestamps_are_reported_in_streamed_files():
+    result = validate_chunks(csv_parser.iter_csv_chunks(io.StringIO(CSV), chunk_size=2))
+    assert not result['valid']
+    _assert_timestamp_errors(result['report'])
+    assert result['reject_mask'].tolist() == [False, True, True, False]
+
+
+def test_chunk_without_any_modulation_is_rejected():
+    chunk = csv_parser.apply_column_dtypes(pd.read_csv(io.StringIO(CSV)).assign(acm_modulation=None))
+    result = validate_chunks([chunk])
+    assert result['reject_mask'].all()
+
+
+def _messy_frame(n=500, seed=0):
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame({
+        'timestamp': pd.date_range('2026-01-01', periods=n, freq='5min'),
+        'link_name': rng.choice(['L1', 'L2'], n),
+        'rssi_dbm': rng.normal(-60, 15, n),
+        'snr_db': rng.normal(25, 15, n),
+        'ber': 10 ** rng.uniform(-13, -2, n),
+        'acm_modulation': rng.choice(['256QAM', '64QAM', 'QPSK', '8PSK'], n),
+        'latency_ms': rng.gamma(2, 1, n),
+        'packet_loss': rng.exponential(1, n),
+        'rainfall_mm': rng.exponential(5, n)
+    })
+    for column in ('rssi_dbm', 'latency_ms', 'acm_modulation'):
+        frame.loc[rng.random(n) < 0.02, column] = None
+    return frame
+
+
+def test_streamed_validation_matches_complete_validation():
+    frame = _messy_frame()
+    valid, report = validate_complete(csv_parser.apply_column_dtypes(frame.copy()))
+
+    for chunk_size in (1, 7, 100, 1000):
+        chunks = (
+            csv_parser.apply_column_dtypes(frame.iloc[start:start + chunk_size].copy())
+            for start in range(0, len(frame), chunk_size)
+        )
+        result = validate_chunks(chunks)
+        result['report']['info'].pop('nb_lots')
+
+        assert result['valid'] == valid
+        assert result['report'] == report
+        assert result['quality_score'] == run_validation_plan(frame)['quality_score']
+        assert result['reject_mask'].tolist() == run_validation_plan(frame)['reject_mask'].tolist()
@@ -0,0 +1,70 @@
+"""
+Tests de la réduction des séries pour l'affichage.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from backend.analytics.downsampling import downsample, lttb_indices, minmax_indices
+
+
+def _series(n=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    y = -55 + np.cumsum(rng.normal(0, 0.2, n))
+    y[n // 4] -= 40  # évanouissement isolé
+    y[3 * n // 4] += 30
+    return np.arange(n, dtype='float64'), y
+
+
+def test_lttb_keeps_endpoints_and_isolated_extremes():
+    x, y = _series()
+    keep = lttb_indices(x, y, 300)
+
+    assert len(keep) == 300
+    assert keep[0] == 0 and keep[-1] == len(x) - 1
+    assert np.all(np.diff(keep) > 0)
+    assert {int(np.argmin(y)), int(np.argmax(y))} <= set(keep.tolist())
+
+
+def test_minmax_keeps_each_bucket_extremes():
+    _, y = _series()
+    n_out = 200
+    keep = minmax_indices(y, n_out)
+
+    assert len(keep) <= n_out
+    assert np.all(np.diff(keep) > 0)
+    buckets = np.arange(len(y)) * (n_out // 2) // len(y)
+    for bucket in np.unique(buckets):
+        members = np.flatnonzero(buckets == bucket)
+        assert members[np.argmin(y[members])] in keep
+        assert members[np.argmax(y[members])] in keep
+
+
+def test_short_series_are_unchanged():
+    x, y = _series(50)
+    assert lttb_indices(x, y, 100).tolist() == list(range(50))
+    assert minmax_indices(y, 100).tolist() == list(range(50))
+
+
+def test_downsample_timestamps_drops_missing_values():
+    x, y = _series()
+    y[10:20] = np.nan
+    frame = pd.DataFrame({'timestamp': pd.date_range('2026-01-01', periods=len(x), freq='5min'), 'rssi_dbm': y})
+
+    reduced = downsample(frame, 'timestamp', 'rssi_dbm', 300)
+
+    assert len(reduced) == 300
+    assert reduced['rssi_dbm'].notna().all()
+    assert reduced['timestamp'].iloc[0] == frame['timestamp'].iloc[0]
+    assert reduced['timestamp'].iloc[-1] == frame['timestamp'].iloc[-1]
+    assert reduced['rssi_dbm'].min() == np.nanmin(y)
+
+
+def test_downsample_minmax_and_unknown_method():
+    x, y = _series()
+    frame = pd.DataFrame({'x': x, 'y': y})
+
+    reduced = downsample(frame, 'x', 'y', 200, method='minmax')
+    assert reduced['y'].min() == y.min() and reduced['y'].max() == y.max()
+
+    with pytest.raises(ValueError):
+        downsample(frame, 'x', 'y', 200, method='moyenne')
@@ -0,0 +1,103 @@
+"""
+Tests de l'évaluation des alertes de toute la flotte en une passe.
+"""
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from sqlalchemy import insert, select
+from backend.alerts.alert_engine import check_and_create_alerts, create_alert
+from backend.alerts.alert_index import open_alert_index
+from backend.alerts.correlation import alert_correlator
+from backend.alerts.fleet_evaluator import evaluate_fleet_alerts, get_latest_measures
+from backend.database.connection import get_db_context
+from backend.database.models import Alerte, Base, FHLink
+from backend.ingestion.data_loader import load_measures_to_db
+
+# Dernière mesure de chaque liaison : (rssi_dbm, snr_db, rainfall_mm)
+DERNIERES_MESURES = {
+    'L1': (-85.0, 30.0, 0.0),  # RSSI critique
+    'L2': (-77.0, 8.0, 0.0),  # RSSI et SNR dégradés, RSSI déjà en alerte
+    'L3': (-72.0, 25.0, 20.0),  # pluie avec RSSI sous le seuil acceptable
+    'L4': (-55.0, 30.0, 0.0),  # nominale
+    'L5': (-56.0, 3.0, 0.0),  # SNR critique
+    'L6': (-78.0, 25.0, 20.0),  # RSSI dégradé et pluie
+}
+
+
+def _load_fleet():
+    # Un site par liaison : la corrélation en incidents n'influe pas sur les alertes créées
+    with get_db_context() as db:
+        db.execute(insert(FHLink), [
+            {'nom': nom, 'site_a': f'S{nom}', 'site_b': f'X{nom}', 'frequence_ghz': 18.0, 'distance_km': 5.0,
+             'actif': True}
+            for nom in DERNIERES_MESURES
+        ])
+    alert_correlator.invalidate()
+    open_alert_index.invalidate()
+
+    rng = np.random.default_rng(11)
+    end = datetime.utcnow().replace(microsecond=0) - timedelta(minutes=1)
+    frames = []
+    for nom, (rssi, snr, rainfall) in DERNIERES_MESURES.items():
+        n = 60
+        frame = pd.DataFrame({
+            'timestamp': pd.date_range(end=end, periods=n, freq='5min'),
+            'link_name': nom,
+            'rssi_dbm': -55 + rng.normal(0, 1, n),
+            'snr_db': 30 + rng.normal(0, 1, n),
+            'ber': 1e-9,
+            'acm_modulation': '256QAM',
+            'latency_ms': 3.0,
+            'packet_loss': 0.0,
+            'rainfall_mm': 0.0
+        })
+        frame.loc[n - 1, ['rssi_dbm', 'snr_db', 'rainfall_mm']] = [rssi, snr, rainfall]
+        frames.append(frame)
+    ok, stats = load_measures_to_db(pd.concat(frames, ignore_index=True), generate_alerts=False)
+    assert ok and stats['imported'] == 60 * len(DERNIERES_MESURES)
+
+    assert create_alert(2, 'RSSI_LOW', 'MAJEURE', 'RSSI dégradé (existante)')[0]
+
+
+def _alerts():
+    columns = [Alerte.link_id, Alerte.type, Alerte.severite, Alerte.message, Alerte.recommandation,
+               Alerte.valeur_mesuree, Alerte.seuil_declenche, Alerte.ia_generated, Alerte.resolved]
+    with get_db_context() as db:
+        return sorted(tuple(row) for row in db.execute(select(*columns)).all())
+
+
+def test_fleet_evaluation_matches_per_link_checks(database):
+    _load_fleet()
+    result = evaluate_fleet_alerts()
+    fleet_alerts = _alerts()
+    assert result['nb_links'] == len(DERNIERES_MESURES)
+    assert result['nb_alerts'] == len(fleet_alerts) - 1
+
+    # Même flotte évaluée liaison par liaison
+    Base.metadata.drop_all(bind=database)
+    Base.metadata.create_all(bind=database)
+    _load_fleet()
+    for link_id in range(1, len(DERNIERES_MESURES) + 1):
+        check_and_create_alerts(link_id)
+
+    assert fleet_alerts == _alerts()
+    assert {(link_id, alert_type) for link_id, alert_type, *_ in fleet_alerts} >= {
+        (1, 'RSSI_LOW'), (2, 'RSSI_LOW'), (2, 'SNR_LOW'), (3, 'RAINFALL_IMPACT'),
+        (5, 'SNR_LOW'), (6, 'RSSI_LOW'), (6, 'RAINFALL_IMPACT')
+    }
+    # Alerte déjà ouverte : pas de doublon
+    assert sum(1 for link_id, alert_type, *_ in fleet_alerts if (link_id, alert_type) == (2, 'RSSI_LOW')) == 1
+
+    # Seconde passe : tout est déjà ouvert
+    assert evaluate_fleet_alerts()['nb_alerts'] == 0
+
+
+def test_latest_measures_are_last_row_per_link(database):
+    _load_fleet()
+    latest = get_latest_measures([1, 3, 5])
+
+    assert sorted(latest['link_id'].tolist()) == [1, 3, 5]
+    order = np.argsort(latest['link_id'])
+    expected = [DERNIERES_MESURES[nom] for nom in ('L1', 'L3', 'L5')]
+    np.testing.assert_array_equal(latest['rssi_dbm'][order], [rssi for rssi, _, _ in expected])
+    np.testing.assert_array_equal(latest['snr_db'][order], [snr for _, snr, _ in expected])
@@ -0,0 +1,31 @@
+"""
+Tests de l'instantané de la flotte.
+"""
+from sqlalchemy import insert
+from backend.alerts.alert_engine import create_alert, resolve_alert
+from backend.analytics.fleet_snapshot import FleetSnapshot
+from backend.database.connection import get_db_context
+from backend.database.models import FHLink
+
+
+def test_alert_counts_follow_alert_writes(database):
+    with get_db_context() as db:
+        db.execute(insert(FHLink), [{'nom': 'L1', 'site_a': 'A', 'site_b': 'B', 'frequence_ghz': 18.0,
+                                     'distance_km': 5.0, 'actif': True}])
+    snapshot = FleetSnapshot(refresh_seconds=3600)
+    assert snapshot.get()['alertes_actives'].tolist() == [0]
+
+    ok, alert_id = create_alert(1, 'RSSI_CRITIQUE', 'CRITIQUE', "RSSI critique")
+    assert ok
+    frame = snapshot.get()
+    assert frame[['alertes_actives', 'critiques', 'majeures']].values.tolist() == [[1, 1, 0]]
+    assert str(frame['alertes_actives'].dtype) == 'int64'
+
+    resolve_alert(alert_id, 'admin@netpulse.local')
+    assert snapshot.get()['alertes_actives'].tolist() == [0]
+
+
+def test_empty_fleet_counts_are_integers(database):
+    frame = FleetSnapshot(refresh_seconds=3600).get()
+    assert frame.empty
+    assert all(str(frame[column].dtype) == 'int64' for column in ('alertes_actives', 'critiques', 'majeures'))
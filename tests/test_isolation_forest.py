@@ -0,0 +1,40 @@
+"""
+Tests du moteur Isolation Forest exporté en tableaux plats.
+"""
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import IsolationForest
+from backend.ai_engine.isolation_forest import export_forest, forest_scores, link_key, prepare_features
+
+
+def _measures(n, seed, anomaly_rate=0.0):
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame({
+        'rssi_dbm': -55 + rng.normal(0, 1.5, n),
+        'snr_db': 30 + rng.normal(0, 1, n),
+        'ber': 10 ** rng.normal(-9, 0.5, n),
+        'latency_ms': 2 + rng.gamma(2, 0.5, n),
+        'packet_loss': rng.exponential(0.01, n),
+        'rainfall_mm': np.where(rng.random(n) < 0.1, rng.exponential(5, n), 0.0)
+    })
+    faded = rng.random(n) < anomaly_rate
+    frame.loc[faded, 'rssi_dbm'] -= 20
+    frame.loc[faded, 'ber'] = 1e-4
+    frame.loc[rng.random(n) < 0.01, 'latency_ms'] = np.nan
+    return frame
+
+
+def test_forest_scores_match_sklearn():
+    X_train, medians = prepare_features(_measures(3000, seed=1))
+    forest = IsolationForest(n_estimators=50, max_samples=256, contamination=0.005, random_state=42)
+    forest.fit(X_train.astype('float32'))
+    model = export_forest(forest, medians, {'key': link_key(1), 'scope': 'liaison', 'link_ids': [1]})
+
+    X, _ = prepare_features(_measures(5000, seed=2, anomaly_rate=0.01), medians)
+    # Blocs de taille quelconque : le dernier bloc est incomplet
+    scores = forest_scores(model, X, block_size=97)
+
+    np.testing.assert_allclose(scores, -forest.score_samples(X.astype('float32')), rtol=0, atol=1e-12)
+    flags = scores > model['threshold_score']
+    assert flags.any()
+    assert np.array_equal(flags, forest.predict(X.astype('float32')) == -1)
@@ -0,0 +1,79 @@
+"""
+Tests du calcul d'état des liaisons.
+"""
+import itertools
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+import config
+from backend.analytics.kpi_calculator import (
+    calculate_link_status, calculate_period_statistics, classify_link_status_array, compute_availability
+)
+from backend.ingestion.data_loader import load_measures_to_db
+
+
+def _around(thresholds):
+    """Valeurs encadrant chaque seuil (au seuil, juste au-dessus et juste en dessous)."""
+    values = [np.nan]
+    for threshold in thresholds.values():
+        values += [threshold, np.nextafter(threshold, -np.inf), np.nextafter(threshold, np.inf)]
+    return values
+
+
+def test_vectorized_status_matches_scalar_status():
+    rows = list(itertools.product(
+        _around(config.SEUILS_RSSI) + [-20.0, -100.0],
+        _around(config.SEUILS_SNR) + [60.0, -5.0],
+        _around(config.SEUILS_BER) + [0.0, 1e-2]
+    ))
+    rssi, snr, ber = (np.array(column) for column in zip(*rows))
+
+    expected = [calculate_link_status(*row) for row in rows]
+    assert classify_link_status_array(rssi, snr, ber).tolist() == expected
+
+
+def _pandas_period_statistics(frame):
+    """Ancien calcul de calculate_period_statistics : mesures chargées puis agrégées par pandas."""
+    return {
+        'nb_mesures': len(frame),
+        'rssi': {'avg': frame['rssi_dbm'].mean(), 'min': frame['rssi_dbm'].min(),
+                 'max': frame['rssi_dbm'].max(), 'std': frame['rssi_dbm'].std()},
+        'snr': {'avg': frame['snr_db'].mean(), 'min': frame['snr_db'].min(),
+                'max': frame['snr_db'].max(), 'std': frame['snr_db'].std()},
+        'ber': {'avg': frame['ber'].mean(), 'min': frame['ber'].min(), 'max': frame['ber'].max()},
+        'latency': {'avg': frame['latency_ms'].mean(), 'max': frame['latency_ms'].max()},
+        'packet_loss': {'avg': frame['packet_loss'].mean(), 'max': frame['packet_loss'].max()},
+        'rainfall': {'avg': frame['rainfall_mm'].mean(), 'max': frame['rainfall_mm'].max()},
+        'disponibilite': compute_availability(frame['rssi_dbm'], frame['snr_db'], frame['ber'])
+    }
+
+
+def test_sql_period_statistics_match_pandas(database):
+    rng = np.random.default_rng(2)
+    n = 200
+    frame = pd.DataFrame({
+        'timestamp': pd.date_range(end=datetime.utcnow() - timedelta(minutes=1), periods=n, freq='1min'),
+        'link_name': 'L1',
+        'rssi_dbm': rng.choice([config.SEUILS_RSSI['ACCEPTABLE'], -50.0, -75.0, -85.0], n) + rng.normal(0, 0.5, n),
+        'snr_db': rng.normal(25, 8, n),
+        'ber': 10 ** rng.uniform(-10, -4, n),
+        'acm_modulation': '256QAM',
+        'latency_ms': rng.gamma(2, 1, n),
+        'packet_loss': rng.exponential(0.5, n),
+        'rainfall_mm': rng.exponential(2, n)
+    })
+    # Valeurs exactement au seuil et latence non remontée
+    frame.loc[:9, 'rssi_dbm'] = config.SEUILS_RSSI['ACCEPTABLE']
+    frame.loc[10:19, 'ber'] = config.SEUILS_BER['ACCEPTABLE']
+    frame.loc[20:29, 'latency_ms'] = np.nan
+    ok, _ = load_measures_to_db(frame, generate_alerts=False)
+    assert ok
+
+    stats = calculate_period_statistics(1, hours=6)
+    expected = _pandas_period_statistics(frame)
+
+    assert stats['nb_mesures'] == expected['nb_mesures']
+    assert np.isclose(stats['disponibilite'], expected['disponibilite'])
+    for group in ('rssi', 'snr', 'ber', 'latency', 'packet_loss', 'rainfall'):
+        for name, value in expected[group].items():
+            assert np.isclose(stats[group][name], value, rtol=1e-9), (group, name)
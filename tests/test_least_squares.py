@@ -0,0 +1,92 @@
+"""
+Tests des moindres carrés linéaires vectorisés par groupe.
+"""
+import numpy as np
+import pandas as pd
+from backend.analytics.least_squares import grouped_linear_fit, linear_fit_from_sums, rollup_regression_sums
+
+
+def _points(seed=1, nb_groups=40, origin=0.0):
+    rng = np.random.default_rng(seed)
+    sizes = rng.integers(2, 300, nb_groups)
+    group_ids = np.repeat(np.arange(nb_groups) * 7 + 3, sizes)
+    x = origin + np.concatenate([np.sort(rng.uniform(0, 48, size)) for size in sizes])
+    slopes = np.repeat(rng.normal(0, 0.5, nb_groups), sizes)
+    y = -60 + slopes * (x - origin) + rng.normal(0, 2, len(x))
+    return group_ids, x, y
+
+
+def _assert_matches_polyfit(fit, group_ids, x, y):
+    for group in np.unique(group_ids):
+        mask = (group_ids == group) & ~(np.isnan(x) | np.isnan(y))
+        slope, intercept = np.polyfit(x[mask], y[mask], 1)
+        r2 = np.corrcoef(x[mask], y[mask])[0, 1] ** 2
+        row = fit.loc[group]
+        assert row['n'] == mask.sum()
+        np.testing.assert_allclose([row['slope'], row['intercept'], row['r2']], [slope, intercept, r2],
+                                   rtol=1e-7, atol=1e-9, err_msg=str(group))
+
+
+def test_grouped_fit_matches_polyfit_per_group():
+    group_ids, x, y = _points()
+    y[::17] = np.nan
+
+    # Groupes triés (fenêtres de la flotte) puis mélangés
+    fit = grouped_linear_fit(group_ids, x, y)
+    _assert_matches_polyfit(fit, group_ids, x, y)
+    order = np.random.default_rng(2).permutation(len(x))
+    pd.testing.assert_frame_equal(grouped_linear_fit(group_ids[order], x[order], y[order]), fit,
+                                  check_exact=False, rtol=1e-9)
+
+
+def test_grouped_fit_is_stable_far_from_the_origin():
+    # x en heures depuis l'époque Unix : les sommes brutes perdraient la pente
+    group_ids, x, y = _points(seed=3, origin=490000.0)
+    _assert_matches_polyfit(grouped_linear_fit(group_ids, x, y), group_ids, x, y)
+
+
+def test_degenerate_groups():
+    fit = grouped_linear_fit(
+        np.array([1, 2, 2, 2, 3, 3]),
+        np.array([5.0, 1.0, 1.0, 1.0, 1.0, 2.0]),
+        np.array([-60.0, -61.0, -62.0, -63.0, np.nan, np.nan])
+    )
+    # Un seul point ou x constant : pente nulle, ordonnée = moyenne
+    assert fit.loc[1, ['n', 'slope', 'intercept']].tolist() == [1, 0.0, -60.0]
+    assert fit.loc[2, ['n', 'slope', 'intercept']].tolist() == [3, 0.0, -62.0]
+    # Aucun point valide
+    assert fit.loc[3, 'n'] == 0 and np.isnan(fit.loc[3, 'slope'])
+
+
+def test_fit_from_sums_matches_grouped_fit():
+    group_ids, x, y = _points(seed=4, nb_groups=1)
+    sums = {
+        'n': len(x), 'sum_x': x.sum(), 'sum_y': y.sum(), 'sum_xy': (x * y).sum(),
+        'sum_xx': (x * x).sum(), 'sum_yy': (y * y).sum()
+    }
+    fit = linear_fit_from_sums(**sums)
+    expected = grouped_linear_fit(group_ids, x, y).iloc[0]
+    for column in ('n', 'slope', 'intercept', 'r2'):
+        np.testing.assert_allclose(fit[column], expected[column], rtol=1e-9)
+
+
+def test_rollup_sums_match_polyfit_at_bucket_centres():
+    rng = np.random.default_rng(5)
+    buckets = pd.date_range('2026-01-01', periods=72, freq='h')
+    counts = rng.integers(1, 12, len(buckets))
+    values = [-55 - 0.1 * i + rng.normal(0, 1, count) for i, count in enumerate(counts)]
+    rollups = pd.DataFrame({
+        'bucket': buckets,
+        'rssi_dbm_count': counts,
+        'rssi_dbm_sum': [v.sum() for v in values],
+        'rssi_dbm_sumsq': [(v * v).sum() for v in values]
+    })
+
+    fit = linear_fit_from_sums(**rollup_regression_sums(rollups, 'rssi_dbm', bucket_hours=1))
+
+    # Mesures placées au centre de leur bucket horaire
+    x = np.repeat(np.arange(len(buckets)) + 0.5, counts)
+    y = np.concatenate(values)
+    slope, intercept = np.polyfit(x, y, 1)
+    np.testing.assert_allclose([fit['slope'], fit['intercept'], fit['r2']],
+                               [slope, intercept, np.corrcoef(x, y)[0, 1] ** 2], rtol=1e-7)
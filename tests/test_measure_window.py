@@ -0,0 +1,121 @@
+"""
+Tests des fenêtres de mesures partagées par l'analyse et l'IA.
+"""
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+import config
+from backend.ai_engine.anomaly_detector import detect_anomalies_zscore, detect_sudden_drops
+from backend.analytics import measure_window
+from backend.analytics.measure_window import load_fleet_windows, load_measure_window, window_scope
+from backend.database.connection import get_db_context
+from backend.database.models import MesureKPI
+from backend.ingestion.data_loader import load_measures_to_db
+
+
+def _load_recent_measures():
+    rng = np.random.default_rng(7)
+    end = datetime.utcnow().replace(microsecond=0) - timedelta(minutes=1)
+    frames = []
+    # L3 n'a que quelques mesures récentes, plus courte que les fenêtres demandées
+    for link_name, periods in (('L1', 400), ('L2', 250), ('L3', 5)):
+        n = periods
+        rssi = -55 + rng.normal(0, 1, n)
+        rssi[rng.random(n) < 0.05] -= 25
+        frames.append(pd.DataFrame({
+            'timestamp': pd.date_range(end=end, periods=n, freq='5min'),
+            'link_name': link_name,
+            'rssi_dbm': rssi,
+            'snr_db': 30 + rng.normal(0, 2, n),
+            'ber': 10 ** rng.uniform(-10, -6, n),
+            'acm_modulation': '256QAM',
+            'latency_ms': rng.gamma(2, 1, n),
+            'packet_loss': rng.exponential(0.5, n),
+            'rainfall_mm': rng.exponential(2, n)
+        }))
+    ok, stats = load_measures_to_db(pd.concat(frames, ignore_index=True), generate_alerts=False)
+    assert ok and stats['errors'] == 0
+
+
+def _orm_measures(link_id, date_from):
+    """Requête ORM par liaison, telle que la faisaient les fonctions d'analyse."""
+    with get_db_context() as db:
+        measures = (
+            db.query(MesureKPI)
+            .filter(MesureKPI.link_id == link_id, MesureKPI.timestamp >= date_from)
+            .order_by(MesureKPI.timestamp)
+            .all()
+        )
+        return [
+            (m.timestamp, {metric: getattr(m, metric) for metric in measure_window.WINDOW_METRICS})
+            for m in measures
+        ]
+
+
+def _assert_window_matches(window, link_id):
+    measures = _orm_measures(link_id, window.date_from)
+    assert len(window) == len(measures)
+    assert [window.timestamp_at(i) for i in range(len(window))] == [timestamp for timestamp, _ in measures]
+    for metric in measure_window.WINDOW_METRICS:
+        np.testing.assert_array_equal(window[metric], [values[metric] for _, values in measures])
+
+
+def test_fleet_and_sliced_windows_match_per_link_queries(database):
+    _load_recent_measures()
+
+    with window_scope():
+        fleet = load_fleet_windows(24)
+        assert sorted(fleet) == [1, 2, 3]
+        for link_id, window in fleet.items():
+            _assert_window_matches(window, link_id)
+            # Fenêtres plus courtes découpées sans requête
+            for hours in (12, 6, 1):
+                shorter = load_measure_window(link_id, hours)
+                assert shorter.now == window.now
+                _assert_window_matches(shorter, link_id)
+
+
+def _zscore_reference(measures, metric, threshold):
+    values = [m[metric] for _, m in measures]
+    if len(values) < config.IA_CONFIG['min_data_points'] or np.std(values) == 0:
+        return []
+    mean_val, std_val = np.mean(values), np.std(values)
+    anomalies = []
+    for (timestamp, _), value in zip(measures, values):
+        z = (value - mean_val) / std_val
+        if abs(z) > threshold:
+            anomalies.append({
+                'timestamp': timestamp, 'value': value, 'z_score': float(z),
+                'severity': 'HIGH' if abs(z) > threshold + 1 else 'MODERATE'
+            })
+    return anomalies
+
+
+def _drops_reference(measures, metric, drop_threshold):
+    drops = []
+    for (_, previous), (timestamp, current) in zip(measures, measures[1:]):
+        drop = previous[metric] - current[metric]
+        if drop > drop_threshold:
+            drops.append({
+                'timestamp': timestamp, 'previous_value': previous[metric],
+                'current_value': current[metric], 'drop': float(drop),
+                'severity': 'CRITICAL' if drop > drop_threshold * 2 else 'HIGH'
+            })
+    return drops
+
+
+def test_detectors_on_preloaded_window_match_orm_loop(database):
+    _load_recent_measures()
+    threshold = config.IA_CONFIG['anomaly_threshold']
+
+    with window_scope():
+        fleet = load_fleet_windows(48)
+        for link_id, window in fleet.items():
+            measures = _orm_measures(link_id, window.date_from)
+            assert detect_anomalies_zscore(link_id, 'rssi_dbm', hours=48, window=window) == \
+                _zscore_reference(measures, 'rssi_dbm', threshold)
+
+            shorter = window.last(24)
+            measures = _orm_measures(link_id, shorter.date_from)
+            assert detect_sudden_drops(link_id, 'rssi_dbm', hours=24, drop_threshold=10, window=window) == \
+                _drops_reference(measures, 'rssi_dbm', 10)
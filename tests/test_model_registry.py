@@ -0,0 +1,100 @@
+"""
+Tests du registre des modèles de prédiction (fraîcheur, persistance, invalidation).
+"""
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LinearRegression
+from backend.ai_engine import predictor
+from backend.ai_engine.model_registry import ModelRegistry
+from backend.analytics.measure_window import load_measure_window
+from backend.ingestion import data_loader
+from backend.ingestion.data_loader import delete_measures_by_link, load_measures_to_db
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    """Registre isolé dans un dossier temporaire, utilisé par le prédicteur et le chargeur."""
+    registry = ModelRegistry(directory=str(tmp_path))
+    monkeypatch.setattr(predictor, 'model_registry', registry)
+    monkeypatch.setattr(data_loader, 'model_registry', registry)
+    return registry
+
+
+def _measures(end, periods, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'timestamp': pd.date_range(end=end, periods=periods, freq='15min'),
+        'link_name': 'L1',
+        'rssi_dbm': -55 - 0.05 * np.arange(periods) + rng.normal(0, 0.5, periods),
+        'snr_db': 30 + rng.normal(0, 1, periods),
+        'ber': 1e-9,
+        'acm_modulation': '256QAM',
+        'latency_ms': 3.0,
+        'packet_loss': 0.0,
+        'rainfall_mm': 0.0
+    })
+
+
+def _sklearn_predictions(hours_ahead):
+    """Prédictions par LinearRegression réentraînée à chaque appel, comme avant le registre."""
+    window = load_measure_window(1, predictor.TRAINING_HOURS)
+    x = (window.elapsed_seconds() / 3600).reshape(-1, 1)
+    model = LinearRegression().fit(x, window['rssi_dbm'])
+    future = np.array([x[-1, 0] + i for i in range(1, hours_ahead + 1)]).reshape(-1, 1)
+    return model.predict(future), model.score(x, window['rssi_dbm'])
+
+
+def test_model_is_reused_until_new_measures_arrive(database, registry):
+    end = datetime.utcnow().replace(microsecond=0) - timedelta(minutes=5)
+    assert load_measures_to_db(_measures(end, 150), generate_alerts=False)[0]
+
+    first = predictor.predict_next_values(1, 'rssi_dbm', hours_ahead=6)
+    predictions, score = _sklearn_predictions(6)
+    np.testing.assert_allclose(first['predictions'], predictions, rtol=1e-9)
+    assert first['confidence'] == pytest.approx(score, rel=1e-9)
+    assert registry.stats() == {'models': 1, 'hits': 0, 'fits': 1}
+
+    # Aucune mesure nouvelle : modèle servi depuis le registre
+    assert predictor.predict_next_values(1, 'rssi_dbm', hours_ahead=6) == first
+    assert registry.stats() == {'models': 1, 'hits': 1, 'fits': 1}
+
+    # Mesure plus récente : réentraînement
+    newer = _measures(end + timedelta(minutes=4), 1, seed=1)
+    assert load_measures_to_db(newer, generate_alerts=False)[0]
+    second = predictor.predict_next_values(1, 'rssi_dbm', hours_ahead=6)
+    assert registry.stats()['fits'] == 2
+    np.testing.assert_allclose(second['predictions'], _sklearn_predictions(6)[0], rtol=1e-9)
+
+
+def test_model_expires_after_retrain_interval(database, registry):
+    end = datetime.utcnow().replace(microsecond=0) - timedelta(minutes=5)
+    assert load_measures_to_db(_measures(end, 150), generate_alerts=False)[0]
+    predictor.predict_next_values(1, 'rssi_dbm')
+
+    model = registry.get(1, 'rssi_dbm')
+    last, trained_at = model['last_timestamp'], model['trained_at']
+    assert registry.is_fresh(model, last, now=trained_at + timedelta(hours=registry.retrain_hours - 1))
+    assert not registry.is_fresh(model, last, now=trained_at + timedelta(hours=registry.retrain_hours))
+    assert not registry.is_fresh(model, last + timedelta(minutes=15), now=trained_at)
+
+
+def test_models_survive_restart_and_are_forgotten_on_delete(database, registry):
+    end = datetime.utcnow().replace(microsecond=0) - timedelta(minutes=5)
+    assert load_measures_to_db(_measures(end, 150), generate_alerts=False)[0]
+    predictor.predict_next_values(1, 'rssi_dbm')
+    predictor.predict_next_values(1, 'snr_db')
+
+    # Nouveau processus : modèles relus depuis le disque, sans réentraînement
+    restarted = ModelRegistry(directory=str(registry.directory))
+    assert restarted.get(1, 'rssi_dbm') == registry.get(1, 'rssi_dbm')
+    assert restarted.stats() == {'models': 1, 'hits': 0, 'fits': 0}
+
+    # Suppression d'une plage ancienne : la dernière mesure ne bouge pas, les modèles sont oubliés
+    assert delete_measures_by_link(1, date_to=end - timedelta(hours=12))[0]
+    assert registry.get(1, 'rssi_dbm') is None and registry.get(1, 'snr_db') is None
+    assert list(registry.directory.glob('1_*.json')) == []
+
+    predictor.predict_next_values(1, 'rssi_dbm')
+    assert registry.stats()['fits'] == 3
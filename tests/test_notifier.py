@@ -0,0 +1,104 @@
+"""
+Tests du dispatcher de notifications (regroupement, digests, nouvelles tentatives).
+"""
+import asyncio
+import re
+from collections import Counter
+import numpy as np
+from backend.alerts.local_smtp import LocalSMTPServer
+from backend.alerts.notifier import NotificationDispatcher, NotificationService, SMTPTransport
+
+LIGNE = re.compile(r"- \[(\w+)\] (\w+) liaison (\d+) : .*?(?: \(x(\d+)\))?$")
+
+
+class RecordingTransport:
+    """Transport de test : conserve les messages, le premier envoi d'un message sur trois échoue."""
+
+    def __init__(self):
+        self.messages = []
+        self.attempted = set()
+        self.failed = 0
+
+    async def send(self, recipient, subject, body):
+        message = (recipient, subject, body)
+        if message not in self.attempted:
+            self.attempted.add(message)
+            if len(self.attempted) % 3 == 0:
+                self.failed += 1
+                raise ConnectionError("panne transitoire")
+        self.messages.append(message)
+
+
+def _alerts(n, seed=2):
+    rng = np.random.default_rng(seed)
+    return [
+        {'link_id': int(link_id), 'type': str(alert_type), 'severite': 'MAJEURE', 'message': f"alerte {i}"}
+        for i, (link_id, alert_type) in enumerate(zip(rng.integers(1, 30, n), rng.choice(['RSSI_LOW', 'SNR_LOW'], n)))
+    ]
+
+
+def test_every_notification_is_delivered_once_per_recipient():
+    recipients = ['noc@netpulse.local', 'astreinte@netpulse.local', '+33600000000']
+    alerts = _alerts(300)
+    transport = RecordingTransport()
+    service = NotificationService(transport, digest_size=5, digest_seconds=0.05, backoff_seconds=0.001)
+    for alert in alerts:
+        service.notify(alert, recipients)
+    service.stop(timeout=30)
+
+    submitted = Counter((alert['link_id'], alert['type']) for alert in alerts)
+    for recipient in recipients:
+        delivered = Counter()
+        for _, _, body in (message for message in transport.messages if message[0] == recipient):
+            keys = []
+            for line in body.splitlines():
+                _, alert_type, link_id, count = LIGNE.match(line).groups()
+                keys.append((int(link_id), alert_type))
+                delivered[keys[-1]] += int(count or 1)
+            # Un digest : au plus digest_size alertes distinctes
+            assert len(keys) == len(set(keys)) <= 5
+        assert delivered == submitted, recipient
+
+    metrics = service.metrics()
+    assert metrics['submitted'] == len(alerts) and metrics['dropped'] == 0
+    assert metrics['alerts_delivered'] == len(alerts) * len(recipients)
+    assert metrics['messages_sent'] == len(transport.messages)
+    assert metrics['retries'] == transport.failed > 0 and metrics['failures'] == 0
+    assert metrics['coalesced'] > 0
+
+
+def test_full_queue_drops_and_counts():
+    async def scenario():
+        dispatcher = NotificationDispatcher(RecordingTransport(), queue_size=10, digest_size=100,
+                                            digest_seconds=0.01, backoff_seconds=0.001)
+        task = asyncio.ensure_future(dispatcher.run())
+        await asyncio.sleep(0)
+        # Soumissions sans rendre la main à la boucle : la file se remplit
+        accepted = [dispatcher.submit_nowait(['noc@netpulse.local'], alert) for alert in _alerts(25)]
+        dispatcher.stop()
+        await task
+        return accepted, dispatcher.metrics()
+
+    accepted, metrics = asyncio.run(scenario())
+    assert accepted == [True] * 10 + [False] * 15
+    assert metrics['submitted'] == 10 and metrics['dropped'] == 15
+    assert metrics['alerts_delivered'] == 10
+
+
+def test_smtp_transport_retries_transient_failures():
+    server = LocalSMTPServer(fail_first=2).start()
+    try:
+        transport = SMTPTransport('127.0.0.1', server.port, 'netpulse@localhost')
+        service = NotificationService(transport, digest_size=10, digest_seconds=0.05, backoff_seconds=0.001)
+        alerts = _alerts(40)
+        for alert in alerts:
+            service.notify(alert, ['noc@netpulse.local'])
+        service.stop(timeout=30)
+    finally:
+        server.stop()
+
+    metrics = service.metrics()
+    assert metrics['retries'] == 2 and metrics['failures'] == 0
+    assert len(server.messages) == metrics['messages_sent']
+    assert metrics['alerts_delivered'] == len(alerts)
+    assert all(message['To'] == 'noc@netpulse.local' for message in server.messages)
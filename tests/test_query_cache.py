@@ -0,0 +1,38 @@
+"""
+Tests du cache de requêtes.
+"""
+from backend.database.query_cache import QueryCache
+
+
+def test_load_racing_invalidation_is_not_cached():
+    cache = QueryCache('test', ttl_seconds=60, max_entries=10)
+
+    def stale_loader():
+        cache.invalidate([1])  # écriture concurrente pendant le chargement
+        return 'ancienne'
+
+    assert cache.get_or_load(1, stale_loader) == 'ancienne'
+    assert cache.get_or_load(1, lambda: 'nouvelle') == 'nouvelle'
+    assert cache.get_or_load(1, lambda: 'jamais appelé') == 'nouvelle'
+
+
+def test_load_racing_clear_is_not_cached():
+    cache = QueryCache('test', ttl_seconds=60, max_entries=10)
+
+    def stale_loader():
+        cache.clear()
+        return 'ancienne'
+
+    cache.get_or_load(None, stale_loader)
+    assert cache.get_or_load(None, lambda: 'nouvelle') == 'nouvelle'
+
+
+def test_other_key_invalidation_does_not_block_caching():
+    cache = QueryCache('test', ttl_seconds=60, max_entries=10)
+
+    def loader():
+        cache.invalidate([2])
+        return 'valeur'
+
+    cache.get_or_load(1, loader)
+    assert cache.get_or_load(1, lambda: 'jamais appelé') == 'valeur'
@@ -0,0 +1,31 @@
+"""
+Tests du planificateur de scoring du risque.
+"""
+import threading
+from backend.ai_engine import risk_scoring
+
+
+def _scheduler(monkeypatch, run_at_start):
+    runs = threading.Event()
+    monkeypatch.setattr(risk_scoring, 'run_risk_scoring', lambda: runs.set() or {'nb_links': 0})
+    return risk_scoring.RiskScoringScheduler(interval_minutes=60, run_at_start=run_at_start), runs
+
+
+def test_first_run_waits_for_interval(monkeypatch):
+    scheduler, runs = _scheduler(monkeypatch, run_at_start=False)
+    scheduler.start()
+    try:
+        assert not runs.wait(0.3)
+        assert scheduler.status()['running'] and scheduler.status()['next_run'] is not None
+    finally:
+        scheduler.stop(5)
+    assert not scheduler.status()['running']
+
+
+def test_first_run_at_start_when_enabled(monkeypatch):
+    scheduler, runs = _scheduler(monkeypatch, run_at_start=True)
+    scheduler.start()
+    try:
+        assert runs.wait(5)
+    finally:
+        scheduler.stop(5)
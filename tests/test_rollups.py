@@ -0,0 +1,64 @@
+"""
+Tests des rollups horaires et journaliers maintenus à l'import.
+"""
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from backend.analytics.rollups import get_rollups, rebuild_rollups
+from backend.database.connection import get_db_context
+from backend.ingestion.data_loader import delete_measures_by_link, load_measure_chunks_to_db
+
+
+def _measures(n, seed):
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame({
+        # Pas irrégulier à cheval sur plusieurs heures et jours
+        'timestamp': pd.Timestamp('2026-01-01 21:00') + pd.to_timedelta(np.sort(rng.uniform(0, 30 * 3600, n)), unit='s'),
+        'link_name': rng.choice(['L1', 'L2'], n),
+        'rssi_dbm': rng.normal(-60, 8, n),
+        'snr_db': rng.normal(25, 6, n),
+        'ber': 10 ** rng.uniform(-10, -4, n),
+        'acm_modulation': '256QAM',
+        'latency_ms': rng.gamma(2, 1, n),
+        'packet_loss': rng.exponential(0.5, n),
+        'rainfall_mm': rng.exponential(2, n)
+    })
+    frame.loc[rng.random(n) < 0.05, 'latency_ms'] = np.nan
+    frame['timestamp'] = frame['timestamp'].dt.floor('s')
+    return frame
+
+
+def _rollups():
+    return {
+        (link_id, granularity): get_rollups(link_id, granularity=granularity).drop(columns='id')
+        for link_id in (1, 2) for granularity in ('hourly', 'daily')
+    }
+
+
+def _assert_rebuild_matches(incremental):
+    with get_db_context() as db:
+        for link_id in (1, 2):
+            rebuild_rollups(db, link_id)
+    rebuilt = _rollups()
+    for key, frame in incremental.items():
+        pd.testing.assert_frame_equal(frame, rebuilt[key], check_exact=False, rtol=1e-9, obj=str(key))
+
+
+def test_incremental_rollups_match_rebuild(database):
+    frame = _measures(3000, seed=4)
+    # Lots successifs qui partagent des buckets horaires et journaliers
+    chunks = [frame.iloc[i:i + 250] for i in range(0, len(frame), 250)]
+    ok, stats = load_measure_chunks_to_db(chunks, generate_alerts=False)
+    assert ok and stats['imported'] + stats['duplicates'] == len(frame)
+
+    incremental = _rollups()
+    assert all(len(rollup) for rollup in incremental.values())
+    _assert_rebuild_matches(incremental)
+
+
+def test_rollups_follow_measure_deletion(database):
+    ok, _ = load_measure_chunks_to_db([_measures(1000, seed=5)], generate_alerts=False)
+    assert ok
+    delete_measures_by_link(1, datetime(2026, 1, 2, 3, 30), datetime(2026, 1, 2, 9, 15))
+
+    _assert_rebuild_matches(_rollups())
@@ -0,0 +1,105 @@
+"""
+Tests du moteur de règles d'alerte déclaratif.
+"""
+import itertools
+import numpy as np
+import config
+from backend.alerts.rule_engine import RuleEngine
+
+
+def _hard_coded_checks(link_id, kpis):
+    """Vérifications if/elif de check_and_create_alerts avant le moteur de règles."""
+    alerts = []
+
+    def alert(alert_type, severite, message, recommandation, valeur, seuil):
+        alerts.append({
+            'link_id': link_id, 'type': alert_type, 'severite': severite, 'message': message,
+            'recommandation': recommandation, 'valeur_mesuree': valeur, 'seuil_declenche': seuil,
+            'ia_generated': False
+        })
+
+    if kpis['rssi_dbm'] < config.SEUILS_RSSI['CRITIQUE']:
+        alert('RSSI_LOW', 'CRITIQUE', f"RSSI critique : {kpis['rssi_dbm']:.1f} dBm",
+              "Vérifier immédiatement l'alignement des antennes et les conditions météo",
+              kpis['rssi_dbm'], config.SEUILS_RSSI['CRITIQUE'])
+    elif kpis['rssi_dbm'] < config.SEUILS_RSSI['DEGRADED']:
+        alert('RSSI_LOW', 'MAJEURE', f"RSSI dégradé : {kpis['rssi_dbm']:.1f} dBm",
+              "Surveillance accrue recommandée, planifier une inspection",
+              kpis['rssi_dbm'], config.SEUILS_RSSI['DEGRADED'])
+
+    if kpis['snr_db'] < config.SEUILS_SNR['CRITIQUE']:
+        alert('SNR_LOW', 'CRITIQUE', f"SNR critique : {kpis['snr_db']:.1f} dB",
+              "Réduire les sources d'interférence, vérifier la configuration",
+              kpis['snr_db'], config.SEUILS_SNR['CRITIQUE'])
+    elif kpis['snr_db'] < config.SEUILS_SNR['DEGRADED']:
+        alert('SNR_LOW', 'MAJEURE', f"SNR dégradé : {kpis['snr_db']:.1f} dB",
+              "Surveiller l'évolution, identifier les sources d'interférence",
+              kpis['snr_db'], config.SEUILS_SNR['DEGRADED'])
+
+    if kpis['rainfall_mm'] > 15 and kpis['rssi_dbm'] < config.SEUILS_RSSI['ACCEPTABLE']:
+        alert('RAINFALL_IMPACT', 'MAJEURE',
+              f"Impact pluie détecté : {kpis['rainfall_mm']:.1f} mm, RSSI={kpis['rssi_dbm']:.1f} dBm",
+              "Atténuation due à la pluie, surveillance renforcée jusqu'à amélioration météo",
+              kpis['rainfall_mm'], 15)
+    return alerts
+
+
+def _key(alert):
+    return alert['link_id'], alert['type']
+
+
+def test_default_rules_match_hard_coded_checks():
+    # Valeurs de part et d'autre de chaque seuil, seuils exacts compris
+    rssi = [-90.0, -80.0, -79.95, -77.0, -75.0, -72.0, -70.0, -55.0]
+    snr = [2.0, 5.0, 7.5, 10.0, 25.0]
+    rainfall = [0.0, 15.0, 15.1, 40.0]
+    grid = list(itertools.product(rssi, snr, rainfall))
+
+    link_ids = np.arange(1, len(grid) + 1)
+    columns = {metric: np.array(values) for metric, values in zip(('rssi_dbm', 'snr_db', 'rainfall_mm'), zip(*grid))}
+    candidates = RuleEngine(config.ALERT_RULES).evaluate(columns, link_ids)
+
+    expected = []
+    for link_id, (rssi_dbm, snr_db, rainfall_mm) in zip(link_ids.tolist(), grid):
+        expected += _hard_coded_checks(link_id, {'rssi_dbm': rssi_dbm, 'snr_db': snr_db, 'rainfall_mm': rainfall_mm})
+
+    assert sorted(candidates, key=_key) == sorted(expected, key=_key)
+
+
+def _state_machine(values, seuils, duree, hysteresis):
+    """État de chaque niveau mesure par mesure (règle '<'), niveau actif le plus sévère à la fin."""
+    active = []
+    for seuil in seuils:
+        state, consecutive = False, 0
+        for value in values:
+            consecutive = consecutive + 1 if value < seuil else 0
+            if not value < seuil + hysteresis:
+                state = False
+            if consecutive >= duree:
+                state = True
+        active.append(state)
+    return active.index(True) if True in active else -1
+
+
+def test_duration_and_hysteresis_match_per_stream_state_machine():
+    rule = {
+        'type': 'RSSI_LOW', 'metrique': 'rssi_dbm', 'operateur': '<', 'duree': 3, 'hysteresis': 2.0,
+        'niveaux': [{'severite': 'CRITIQUE', 'seuil': -80}, {'severite': 'MAJEURE', 'seuil': -75}]
+    }
+    engine = RuleEngine([rule])
+    assert engine.requires_history
+
+    rng = np.random.default_rng(3)
+    lengths = rng.integers(1, 12, 300)  # flux plus courts que la durée compris
+    streams = [np.round(rng.normal(-76, 4, length), 1) for length in lengths]
+    link_ids = np.concatenate([np.full(len(stream), link_id) for link_id, stream in enumerate(streams, 1)])
+    candidates = engine.evaluate({'rssi_dbm': np.concatenate(streams)}, link_ids)
+
+    severities = [niveau['severite'] for niveau in rule['niveaux']]
+    got = {candidate['link_id']: candidate['severite'] for candidate in candidates}
+    expected = {}
+    for link_id, stream in enumerate(streams, 1):
+        level = _state_machine(stream, [-80, -75], 3, 2.0)
+        if level >= 0:
+            expected[link_id] = severities[level]
+    assert expected and got == expected
@@ -0,0 +1,107 @@
+"""
+Tests du détecteur d'anomalies en flux.
+"""
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+import config
+from backend.ai_engine.streaming_detector import (
+    MULTIVARIATE_METRIC, get_anomaly_states, new_state, update_event_states, update_stream
+)
+from backend.database.connection import get_db_context
+from backend.ingestion.data_loader import delete_measures_by_link, load_measures_to_db
+
+
+def _measures(timestamps, link_name='L1', seed=0):
+    rng = np.random.default_rng(seed)
+    n = len(timestamps)
+    return pd.DataFrame({
+        'timestamp': timestamps,
+        'link_name': link_name,
+        'rssi_dbm': -55 + rng.normal(0, 1, n),
+        'snr_db': 30 + rng.normal(0, 1, n),
+        'ber': 1e-9,
+        'acm_modulation': '256QAM',
+        'latency_ms': 3.0,
+        'packet_loss': 0.0,
+        'rainfall_mm': 0.0
+    })
+
+
+def test_late_import_and_delete_with_multivariate_state(database):
+    end = datetime(2026, 1, 2)
+    recent = pd.date_range(end=end, periods=100, freq='5min')
+    ok, stats = load_measures_to_db(_measures(recent), generate_alerts=False)
+    assert ok and stats['imported'] == 100
+
+    # État Isolation Forest à jour jusqu'à la dernière mesure
+    with get_db_context() as db:
+        frame = pd.DataFrame({'link_id': 1, 'timestamp': recent})
+        flags = np.zeros(len(frame), dtype=bool)
+        flags[-1] = True
+        update_event_states(db, MULTIVARIATE_METRIC, frame, np.full(len(frame), 0.5), flags)
+
+    # Import antérieur à l'état : recalcul EWMA de la liaison, état multivarié conservé
+    older = pd.date_range(end=recent[0] - timedelta(minutes=5), periods=50, freq='5min')
+    ok, stats = load_measures_to_db(_measures(older, seed=1), generate_alerts=False)
+    assert ok and stats['imported'] == 50 and stats['errors'] == 0
+
+    states = get_anomaly_states([1])[1]
+    assert states['rssi_dbm']['nb_mesures'] == 150
+    assert states[MULTIVARIATE_METRIC]['nb_mesures'] == 100
+    assert states[MULTIVARIATE_METRIC]['nb_anomalies'] == 1
+
+    assert delete_measures_by_link(1) == (True, 150)
+    assert get_anomaly_states([1]) == {}
+
+
+def _scalar_stream(metric, timestamps, values):
+    """Mise à jour EWMA mesure par mesure (formules du module), référence de update_stream."""
+    alpha = 2.0 / (config.STREAMING_ANOMALY_CONFIG['span'] + 1)
+    decay = 1.0 - alpha
+    drop_threshold = config.STREAMING_ANOMALY_CONFIG['chutes'].get(metric)
+    n, mean, variance, previous, z_score = 0, 0.0, 0.0, None, 0.0
+    anomalies, last_drop = [], None
+    for timestamp, value in zip(timestamps, values):
+        if n == 0:
+            mean, variance = value, 0.0
+        diff = value - mean
+        weight = 1.0 - decay ** max(n - 1, 0)
+        std = np.sqrt(variance / weight) if weight > 0 else 0.0
+        z_score = diff / std if std > 0 else 0.0
+        if n >= config.IA_CONFIG['min_data_points'] and abs(z_score) > config.IA_CONFIG['anomaly_threshold']:
+            anomalies.append(timestamp)
+        if drop_threshold is not None and previous is not None and previous - value > drop_threshold:
+            last_drop = (timestamp, previous - value)
+        mean += alpha * diff
+        variance = decay * (variance + alpha * diff ** 2)
+        previous = value
+        n += 1
+    return {'nb_mesures': n, 'moyenne': mean, 'variance': variance, 'dernier_zscore': z_score,
+            'anomalies': anomalies, 'derniere_chute': last_drop}
+
+
+def test_batched_stream_matches_measure_by_measure_update():
+    n = 2000
+    rng = np.random.default_rng(3)
+    timestamps = pd.date_range('2026-01-01', periods=n, freq='5min').to_numpy()
+    values = -55 + rng.normal(0, 1, n)
+    values[rng.random(n) < 0.01] -= 12.0  # évanouissements : anomalies et chutes brutales
+    expected = _scalar_stream('rssi_dbm', timestamps, values)
+    assert expected['anomalies'] and expected['derniere_chute']
+
+    # Plusieurs lots successifs : l'état persisté entre deux lots suffit à reprendre le calcul
+    state, nb_anomalies = new_state(), 0
+    for batch in np.array_split(np.arange(n), [1, 60, 61, 900]):
+        state, found = update_stream(state, 'rssi_dbm', timestamps[batch], values[batch])
+        nb_anomalies += found
+
+    assert state['nb_mesures'] == expected['nb_mesures']
+    assert np.isclose(state['moyenne'], expected['moyenne'], rtol=1e-12)
+    assert np.isclose(state['variance'], expected['variance'], rtol=1e-9)
+    assert np.isclose(state['dernier_zscore'], expected['dernier_zscore'], rtol=1e-9)
+    assert nb_anomalies == len(expected['anomalies'])
+    assert state['derniere_anomalie'] == pd.Timestamp(expected['anomalies'][-1]).to_pydatetime()
+    drop_timestamp, drop = expected['derniere_chute']
+    assert state['derniere_chute'] == pd.Timestamp(drop_timestamp).to_pydatetime()
+    assert np.isclose(state['valeur_chute'], drop)